@@ -0,0 +1,90 @@
+"""Benchmark of the Excel read backends on the workbooks of a folder.
+
+Reads every .xlsx file of the folder and of its subfolders (e.g. a scenario folder) with each installed
+backend of optim_analyser.optim.excel, and prints the best time of each backend per workbook and in total.
+Without a folder, a synthetic scenario folder is written first: the input and output workbooks of each
+scenario, with the sheets of benchmark_excel_writer.py.
+
+Usage: python scripts/benchmark_excel_read.py [<folder>] [--repeat 3] [--engines calamine openpyxl]
+                                               [--scenarios 4] [--steps 96] [--assets 10]
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from benchmark_excel_writer import synthetic_input
+
+from optim_analyser.optim import excel
+from optim_analyser.optim.dataframes import dataframe_to_excel
+
+
+def write_scenarios(folder: Path, scenarios: int, steps: int, assets: int) -> None:
+    """Write the input and output workbooks of synthetic scenarios, each in its subfolder."""
+    data = synthetic_input(steps, assets)
+    output = {
+        "ASSET_STEPS_OUTPUT": data["ASSET_STEPS"],
+        "OPERATION_STEPS_OUTPUT": data["OPERATION_STEPS"],
+    }
+    for i in range(1, scenarios + 1):
+        scenario_folder = folder / f"sc{i}"
+        scenario_folder.mkdir()
+        dataframe_to_excel(data, str(scenario_folder / "in_prob_site.xlsx"), streaming=True)
+        dataframe_to_excel(output, str(scenario_folder / "out_prob_site.xlsx"), streaming=True)
+
+
+def best_time(excel_file: Path, engine: excel.ExcelEngine, repeat: int) -> float:
+    """Return the best time in seconds of reading all the sheets of the workbook."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        engine.read(str(excel_file), sheet_name=None)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def benchmark(folder: Path, engines: list[excel.ExcelEngine], repeat: int) -> None:
+    """Print the read times of the workbooks of the folder with each engine."""
+    workbooks = sorted(file for file in folder.rglob("*.xlsx") if not file.name.startswith("~$"))
+    totals = dict.fromkeys((engine.name for engine in engines), 0.0)
+    print(f"{'workbook':<50}" + "".join(f"{engine.name:>12}" for engine in engines))
+    for workbook in workbooks:
+        line = f"{str(workbook.relative_to(folder))[:49]:<50}"
+        for engine in engines:
+            elapsed = best_time(workbook, engine, repeat)
+            totals[engine.name] += elapsed
+            line += f"{elapsed:>11.3f}s"
+        print(line)
+    print(f"{f'total ({len(workbooks)} workbooks)':<50}" + "".join(f"{total:>11.3f}s" for total in totals.values()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "folder",
+        type=Path,
+        nargs="?",
+        help="Folder containing the workbooks, e.g. a scenario folder (default: synthetic)",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Number of reads of each workbook")
+    parser.add_argument("--engines", nargs="+", default=None, help="Engines to compare (default: all installed)")
+    parser.add_argument("--scenarios", type=int, default=4, help="Number of synthetic scenarios")
+    parser.add_argument("--steps", type=int, default=96, help="Number of steps of the synthetic scenarios")
+    parser.add_argument("--assets", type=int, default=10, help="Number of assets of the synthetic scenarios")
+    args = parser.parse_args()
+
+    engines = [excel.resolve_engine(name) for name in (args.engines or excel.available_engines())]
+    if args.folder is not None:
+        if not any(args.folder.rglob("*.xlsx")):
+            parser.error(f"No .xlsx file found in {args.folder}")
+        benchmark(args.folder, engines, args.repeat)
+        return
+    print(f"{args.scenarios} synthetic scenarios ({args.steps} steps x {args.assets} assets)")
+    with tempfile.TemporaryDirectory() as folder:
+        write_scenarios(Path(folder), args.scenarios, args.steps, args.assets)
+        benchmark(Path(folder), engines, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Benchmark of the Excel writers used for the input and initial workbooks of a replay.
+
+Writes a synthetic long-horizon optimization input with dataframe_to_excel, with the default
+pandas/openpyxl writer and with the streaming write-only writer, and prints the time of each run.
+With --memory, the peak Python memory is also measured with tracemalloc, in a second run as tracing
+slows the writers down.
+
+Usage: python scripts/benchmark_excel_writer.py [--steps 35040] [--assets 20] [--memory]
+"""
+
+import argparse
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from optim_analyser.optim.dataframes import dataframe_to_excel
+from optim_analyser.optim.schema import apply_schema
+
+
+def synthetic_input(steps: int, assets: int) -> dict[str, pd.DataFrame]:
+    """Build input sheets with the size of a job of the given horizon."""
+    rng = np.random.default_rng(0)
+    asset_ids = [f"ASSET_{i}" for i in range(assets)]
+    asset_steps = pd.DataFrame(
+        {
+            "asset_id": np.repeat(asset_ids, steps),
+            "step_id": np.tile(np.arange(steps).astype(str), assets),
+            "power_prediction": rng.normal(50, 20, steps * assets),
+            "soc_target": np.nan,
+            "availability": 1,
+            "forced_power": np.nan,
+        }
+    )
+    operation_steps = pd.DataFrame(
+        {
+            "step_id": np.arange(steps).astype(str),
+            "step_duration": 900,
+            "electricity_price": rng.normal(80, 30, steps),
+            "max_export_to_main_grid": -1000.0,
+            "max_import_from_main_grid": 1000.0,
+        }
+    )
+    assets_sheet = pd.DataFrame({"asset_id": asset_ids, "type": "GENERATOR", "max_power": 100.0})
+    return {
+        name: apply_schema(name, sheet)
+        for name, sheet in {
+            "ASSETS": assets_sheet,
+            "OPERATION_STEPS": operation_steps,
+            "ASSET_STEPS": asset_steps,
+        }.items()
+    }
+
+
+def measure_time(data: dict[str, pd.DataFrame], output_file: Path, streaming: bool) -> float:
+    """Return the time in seconds of writing the workbook."""
+    start = time.perf_counter()
+    dataframe_to_excel(data, str(output_file), streaming=streaming)
+    return time.perf_counter() - start
+
+
+def measure_memory(data: dict[str, pd.DataFrame], output_file: Path, streaming: bool) -> float:
+    """Return the peak Python memory in MB allocated while writing the workbook."""
+    tracemalloc.start()
+    dataframe_to_excel(data, str(output_file), streaming=streaming)
+    peak = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--steps", type=int, default=35040, help="Number of steps (default: one year of 15 min)")
+    parser.add_argument("--assets", type=int, default=20, help="Number of assets")
+    parser.add_argument("--memory", action="store_true", help="Also measure the peak memory (slow)")
+    args = parser.parse_args()
+
+    data = synthetic_input(args.steps, args.assets)
+    rows = sum(len(sheet) for sheet in data.values())
+    print(f"{rows} rows ({args.steps} steps x {args.assets} assets)")
+    with tempfile.TemporaryDirectory() as folder:
+        for streaming in (False, True):
+            output_file = Path(folder) / f"input_{streaming}.xlsx"
+            elapsed = measure_time(data, output_file, streaming)
+            mode = "streaming" if streaming else "in-memory"
+            size = output_file.stat().st_size / 1024 / 1024
+            line = f"{mode:>10}: {elapsed:6.1f} s, file {size:.1f} MB"
+            if args.memory:
+                line += f", peak memory {measure_memory(data, output_file, streaming):7.1f} MB"
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-"""GUI entry point for Optim Analyser."""
+"""Entry point for Optim Analyser: the GUI, or the CLI when arguments are given."""
 
 import sys
 from pathlib import Path
@@ -11,7 +11,12 @@ if __name__ == "__main__":
 
 
 def main():
-    """Launch the GUI application."""
+    """Launch the GUI application, or run the CLI command given in the arguments (e.g. --help)."""
+    if len(sys.argv) > 1:
+        from optim_analyser.cli import main as cli_main
+
+        sys.exit(cli_main())
+
     try:
         from optim_analyser.app.app import App
         from optim_analyser.config import load_config
@@ -3,36 +3,84 @@ from __future__ import annotations
 import os
 import shutil
 import time
-import tkinter as tk
+from typing import TYPE_CHECKING
+
+import pandas as pd
 
 from optim_analyser.analysis import compare, display
 from optim_analyser.config import load_config
+from optim_analyser.errors import OptimizationFail
 from optim_analyser.ibm import optimizationIBM
-from optim_analyser.optim import dataframes, optimization, path, replay
+from optim_analyser.models import WarmStartReport
+from optim_analyser.optim import (
+    dataframes,
+    jobfile,
+    optimization,
+    path,
+    replay,
+    results,
+    scenarios,
+    solvelog,
+    solver,
+    stages,
+    warmstart,
+)
+from optim_analyser.optim.bundle import JobBundle
+
+if TYPE_CHECKING:
+    import tkinter as tk
+
+
+def plot_from_data_stage(
+    all_data: dict[str, pd.DataFrame],
+    html_path: str,
+    plot_param: pd.Series,
+    color_blind: bool = False,
+    use_cache: bool = True,
+) -> None:
+    """
+    Generate the .html file with the visuals of the data, unless it is up to date (see stages), and show it
+
+    :param all_data: The optimization input and output data
+    :type all_data: dict[str,pd.DataFrame]
+    :param html_path: The .html file path
+    :type html_path: str
+    :param plot_param: The specific plotting parameters for the microgrid
+    :type plot_param: pd.Series
+    :param color_blind: If True, the color blind palette will be used, defaults to False
+    :type color_blind: bool, optional
+    :param use_cache: If False, the file is generated even if it is up to date, defaults to True
+    :type use_cache: bool, optional
+    """
+
+    def build() -> None:
+        display.plot_from_data(
+            all_data=all_data, sc_name=None, html_path=html_path, subplots_param=plot_param, color_blind=color_blind
+        )
 
+    if not stages.run_stage("html", [html_path], [all_data, plot_param, color_blind], build, use_cache):
+        display.show_html(html_path)
 
-def display_from_json(json_path: str, output_folder: str, color_blind: bool = False) -> None:
+
+def display_from_json(job: JobBundle, output_folder: str, color_blind: bool = False, use_cache: bool = True) -> None:
     """
-    Display the optimization job from the .json file and save the results in the output folder
+    Display the optimization job loaded from the .json file and save the results in the output folder
 
-    :param json_path: The optimization job path (can be a .json or a .txt)
-    :type json_path: str
+    :param job: The optimization job loaded from the .json file
+    :type job: JobBundle
     :param output_folder: The folder path where all files will be saved
     :type output_folder: str
     :param color_blind: If True, the color blind palette will be used, defaults to False, defaults to False
     :type color_blind: bool, optional
+    :param use_cache: If False, the .html file is generated even if it is up to date, defaults to True
+    :type use_cache: bool, optional
     """
 
-    # Load data from .json
-    data = dataframes.json_to_dataframe(json_path)
-
     # Get corresponding paths and plotting parameters
-    (_, _, html_path, plot_param) = path.get_display_paths_and_param_json(json_path, output_folder)
+    (_, _, html_path, plot_param) = path.get_display_paths_and_param_json(job, output_folder)
 
     # Display and save visuals in the .html
-    display.plot_from_data(
-        all_data=data, sc_name=None, html_path=html_path, subplots_param=plot_param, color_blind=color_blind
-    )
+    plot_from_data_stage(job.dataframes, html_path, plot_param, color_blind=color_blind, use_cache=use_cache)
 
 
 def display_from_excel(
@@ -73,23 +121,38 @@ def display_from_excel(
 
 
 def replay_from_json_and_display_local(
-    json_path: str, output_folder: str, add_costs: bool = True, color_blind: bool = False
+    job: JobBundle,
+    output_folder: str,
+    add_costs: bool = True,
+    color_blind: bool = False,
+    data_format: str = optimization.DATA_FORMAT_EXCEL,
+    use_cache: bool = True,
+    warm_start: bool = False,
+    solver_profile: str | None = None,
 ) -> None:
     """
-    Replay the optimization job from the .json and display the recomputed display
+    Replay the optimization job loaded from the .json and display the recomputed display
 
-    :param json_path: The optimization job path (can be a .json or a .txt)
-    :type json_path: str
+    :param job: The optimization job loaded from the .json file
+    :type job: JobBundle
     :param output_folder: The folder path where all files will be saved
     :type output_folder: str
     :param add_costs: If True, the detailed repartition of the optimization costs will be added, defaults to True
     :type add_costs: bool, optional
     :param color_blind: If True, the color blind palette will be used, defaults to False
     :type color_blind: bool, optional
+    :param data_format: 'excel' to exchange the data with OPL through Excel files, 'text' through the .dat file and CSV files, defaults to 'excel'
+    :type data_format: str, optional
+    :param use_cache: If False, the optimization is run even if its results are in the result cache, defaults to True
+    :type use_cache: bool, optional
+    :param warm_start: If True, CPLEX starts from the solution of the original job, defaults to False
+    :type warm_start: bool, optional
+    :param solver_profile: The name of the solver profile of the run, defaults to None for the SOLVER_PROFILE setting
+    :type solver_profile: str | None, optional
     """
 
-    # Load data from .json
-    data = dataframes.json_to_dataframe(json_path)
+    data = job.dataframes
+    profile = solver.get_solver_profile(solver_profile)
 
     # Get all paths and plotting parameters
     (
@@ -104,13 +167,16 @@ def replay_from_json_and_display_local(
         mod_costs_extension_path,
         html_path,
         plot_param,
-    ) = path.get_run_paths_and_param_json(json_path, output_folder)
+    ) = path.get_run_paths_and_param_json(job, output_folder)
 
     # Create the excel with all initial data contained in the optimisation job (.json)
-    optimization.prepare_excel_initial_data(data, excel_init_path)
+    optimization.prepare_excel_initial_data(data, excel_init_path, use_cache=use_cache)
+
+    # Start CPLEX from the on/off decisions of the original solution
+    warm_start_values = warmstart.start_values(data, model_path) if warm_start else None
 
     # Create the input Excel file and update the .dat file
-    optimization.prepare_optimization(
+    input_data = optimization.prepare_optimization(
         data,
         model_path,
         run_model_path,
@@ -120,21 +186,29 @@ def replay_from_json_and_display_local(
         add_costs=add_costs,
         mod_costs_extension_path=mod_costs_extension_path,
         dat_costs_extension_path=dat_costs_extension_path,
+        data_format=data_format,
+        warm_start=warm_start_values,
+        solver_profile=profile,
+        use_cache=use_cache,
     )
     print(f"All optimization files generated.\nPlease check the files at '{output_folder}'.\n")
 
-    # Replay the optimisation
-    replay.replay_optimization(run_model_path, run_dat_path, data, excel_output_path)
-    data_recomputed = dataframes.excel_to_dataframe(excel_input_path) | dataframes.excel_to_dataframe(excel_output_path)
+    # Replay the optimisation, the written input data is merged with the output data written by CPLEX
+    output_data = replay.replay_optimization(
+        run_model_path,
+        run_dat_path,
+        data,
+        excel_output_path,
+        data_format,
+        input_data=input_data,
+        use_cache=use_cache,
+        warm_start=warm_start,
+    )
+    data_recomputed = input_data | output_data
 
     # Display results and save the graphs in a html file
-    display.plot_from_data(
-        all_data=(data | data_recomputed),  # This should keep the data from the .json and replace the recomputed sheets
-        sc_name=None,
-        html_path=html_path,
-        subplots_param=plot_param,
-        color_blind=color_blind,
-    )
+    # This should keep the data from the .json and replace the recomputed sheets
+    plot_from_data_stage(data | data_recomputed, html_path, plot_param, color_blind=color_blind, use_cache=use_cache)
 
 
 def run_from_excel_and_display_local(
@@ -143,6 +217,7 @@ def run_from_excel_and_display_local(
     text_console: tk.Text | None = None,
     add_costs: bool = True,
     color_blind: bool = False,
+    solver_profile: str | None = None,
 ) -> None:
     """
     Replay the optimization job from the Excel files and display the recomputed display
@@ -155,9 +230,12 @@ def run_from_excel_and_display_local(
     :type add_costs: bool, optional
     :param color_blind: If True, the color blind palette will be used, defaults to False
     :type color_blind: bool, optional
+    :param solver_profile: The name of the solver profile of the run, defaults to None for the SOLVER_PROFILE setting
+    :type solver_profile: str | None, optional
     """
 
     data = dataframes.excel_to_dataframe(excel_input_path)  # dataframes.excel_to_dataframe(excel_output_path)
+    profile = solver.get_solver_profile(solver_profile)
 
     # Create all files paths
     (
@@ -173,7 +251,7 @@ def run_from_excel_and_display_local(
     ) = path.get_run_paths_and_param_excel(excel_input_path, output_folder)
 
     # Create the input Excel file and update the .dat file
-    optimization.prepare_optimization(
+    input_data = optimization.prepare_optimization(
         data,
         model_path,
         run_model_path,
@@ -183,6 +261,7 @@ def run_from_excel_and_display_local(
         add_costs=add_costs,
         mod_costs_extension_path=mod_costs_extension_path,
         dat_costs_extension_path=dat_costs_extension_path,
+        solver_profile=profile,
     )
     print(f"All optimization files generated.\nPlease check the files at '{output_folder}'.\n")
 
@@ -193,37 +272,31 @@ def run_from_excel_and_display_local(
     shutil.copy(excel_output_path, run_excel_output_path)
 
     # Replay the optimisation
-    optimization.run_optimization(run_model_path, run_dat_path)
-    time.sleep(1)  # Wait for CPLEX to write output data in the excel file before moving it
+    run_result = optimization.run_optimization(run_model_path, run_dat_path, output_files=[run_excel_output_path])
+    solvelog.record_metrics(excel_output_path, run_result.metrics, run_model_path)
 
     # The original input and output files will be replaced by the recomputed ones
     excel_input_final_path = excel_input_path
     excel_output_final_path = excel_output_path
 
-    data_recomputed = dataframes.excel_to_dataframe(run_excel_input_path) | dataframes.excel_to_dataframe(
-        run_excel_output_path
-    )
+    data_recomputed = input_data | dataframes.excel_output_to_dataframe(run_excel_output_path)
 
     shutil.move(run_excel_input_path, excel_input_final_path)
     shutil.move(run_excel_output_path, excel_output_final_path)
 
     # Display results and save the graphs in a html file
-    display.plot_from_data(
-        all_data=(data | data_recomputed),
-        sc_name=None,
-        html_path=html_path,
-        subplots_param=plot_param,
-        color_blind=color_blind,
-    )
+    plot_from_data_stage(data | data_recomputed, html_path, plot_param, color_blind=color_blind)
 
 
 def run_scenarios_local(
     run_model_path: str,
     run_dat_path: str,
-    run_data_folder: str,
     excel_folder_path: str,
     sc_list: list[str],
     in_place: bool,
+    jobs: int = 1,
+    threads: int | None = None,
+    use_cache: bool = True,
 ) -> None:
     """
     Run multiple times the given optimization configuration with for each scenario given in the list and located in a subfolder of the Excel folder path
@@ -232,48 +305,45 @@ def run_scenarios_local(
     :type run_model_path: str
     :param run_dat_path: The .dat file path used to run the optimization
     :type run_dat_path: str
-    :param run_data_folder: The folder path containing the input and output Excel files used to run the optimization
-    :type run_data_folder: str
     :param excel_folder_path: The folder path containing the input and output Excel files for every scenario in their respective subfolders
     :type excel_folder_path: str
     :param sc_list: The scenario names list
     :type sc_list: list[str]
     :param in_place: If True, the output data Excel file is modified in place, otherwise the Excel files will be found in the optimization configuration parent folder
     :type in_place: bool
+    :param jobs: The number of scenarios run at once, each in its own working directory, defaults to 1
+    :type jobs: int, optional
+    :param threads: The number of threads used by CPLEX for each scenario, defaults to None to share the processors between the simultaneous runs
+    :type threads: int | None, optional
+    :param use_cache: If False, the scenarios are run even if their results are in the result cache, defaults to True
+    :type use_cache: bool, optional
+    :raises OptimizationFail: If the optimization of some scenarios failed, once all the scenarios are run
     """
 
-    for sc_name in sc_list:
-        print(sc_name)
-        list_dir = os.listdir(os.path.join(excel_folder_path, sc_name))
-        for file in list_dir:
-            if file.startswith("in_prob_"):
-                excel_input_path = os.path.join(excel_folder_path, sc_name, file)
-        excel_output_path = excel_input_path.replace("in_prob", "out_prob")
-
-        run_excel_input_path = os.path.join(run_data_folder, os.path.basename(excel_input_path))
-        run_excel_output_path = os.path.join(run_data_folder, os.path.basename(excel_output_path))
+    def on_result(sc_name: str, error: str) -> None:
+        print(f"✗ {sc_name}: {error}" if error else f"✓ {sc_name}")
 
-        shutil.copy(excel_input_path, run_excel_input_path)
-        shutil.copy(excel_output_path, run_excel_output_path)
-
-        optimization.run_optimization(run_model_path, run_dat_path)
-        time.sleep(1)  # Wait for CPLEX to write output data in the excel file before moving it
-
-        if in_place:
-            # The original input and output files will be replaced by the recomputed ones
-            excel_input_final_path = excel_input_path
-            excel_output_final_path = excel_output_path
-        else:
-            # The in/output excel files used for the optimization will be stored in a folder at the same level as the run_cplex folder
-            run_cplex_folder = os.path.dirname(os.path.dirname(run_model_path))
-            run_sc_folder = os.path.join(run_cplex_folder, sc_name)
-            if not os.path.exists(run_sc_folder):
-                os.makedirs(run_sc_folder)
-            excel_input_final_path = os.path.join(run_sc_folder, os.path.basename(excel_input_path))
-            excel_output_final_path = os.path.join(run_sc_folder, os.path.basename(excel_output_path))
-
-        shutil.move(run_excel_input_path, excel_input_final_path)
-        shutil.move(run_excel_output_path, excel_output_final_path)
+    report = scenarios.run_scenarios(
+        run_model_path,
+        run_dat_path,
+        excel_folder_path,
+        sc_list,
+        in_place,
+        jobs=jobs,
+        threads=threads,
+        on_result=on_result,
+        use_cache=use_cache,
+    )
+    print(
+        f"{len(report.completed)} scenarios run ({len(report.cached)} from the result cache), {len(report.failed)} "
+        f"failed in {report.elapsed_seconds:.1f}s"
+    )
+    if report.failed:
+        raise OptimizationFail(
+            f"The optimization failed for {len(report.failed)} scenarios",
+            error_code="SCENARIOS_FAILED",
+            context={"scenarios": list(report.failed)},
+        )
 
 
 def run_scenarios_from_folder_local(
@@ -282,6 +352,10 @@ def run_scenarios_from_folder_local(
     sc_list: list[str] | None = None,
     add_costs: bool = False,
     in_place: bool = True,
+    jobs: int = 1,
+    threads: int | None = None,
+    use_cache: bool = True,
+    solver_profile: str | None = None,
 ) -> None:
     """
     Run the optimization with for each scenario (corresponding to a single optimization configuration) given in the list and located in a subfolder of the Excel folder path
@@ -296,8 +370,18 @@ def run_scenarios_from_folder_local(
     :type add_costs: bool, optional
     :param in_place: If True, the output data Excel file is modified in place, otherwise the Excel files will be found in the optimization configuration parent folder
     :type in_place: bool
+    :param jobs: The number of scenarios run at once, each in its own working directory, defaults to 1
+    :type jobs: int, optional
+    :param threads: The number of threads used by CPLEX for each scenario, defaults to None to share the processors between the simultaneous runs
+    :type threads: int | None, optional
+    :param use_cache: If False, the scenarios are run even if their results are in the result cache, defaults to True
+    :type use_cache: bool, optional
+    :param solver_profile: The name of the solver profile of the run, defaults to None for the SOLVER_PROFILE setting
+    :type solver_profile: str | None, optional
     """
 
+    profile = solver.get_solver_profile(solver_profile)
+
     if sc_list == None:
         sc_list = [f.name for f in os.scandir(excel_folder_path) if f.is_dir()]
 
@@ -320,7 +404,7 @@ def run_scenarios_from_folder_local(
         model_path,
         run_dat_path,
         run_model_path,
-        run_data_folder,
+        _,
         dat_costs_extension_path,
         mod_costs_extension_path,
         _,
@@ -341,16 +425,26 @@ def run_scenarios_from_folder_local(
         add_costs=add_costs,
         mod_costs_extension_path=mod_costs_extension_path,
         dat_costs_extension_path=dat_costs_extension_path,
+        solver_profile=profile,
     )
 
     # Copy the empty output file for all scenarios
     for sc_name in sc_list[1:]:
         list_dir = os.listdir(os.path.join(excel_folder_path, sc_name))
-        shutil.copy(excel_output_path, os.path.join(excel_folder_path, sc_name, os.path.basename(excel_output_path)))
+        sc_output_path = os.path.join(excel_folder_path, sc_name, os.path.basename(excel_output_path))
+        shutil.copy(excel_output_path, sc_output_path)
+        solver.record_profile(sc_output_path, profile)
 
     # Run scenarios that appear in the scenario list
     run_scenarios_local(
-        run_model_path, run_dat_path, run_data_folder, excel_folder_path, sc_list=sc_list, in_place=in_place
+        run_model_path,
+        run_dat_path,
+        excel_folder_path,
+        sc_list=sc_list,
+        in_place=in_place,
+        jobs=jobs,
+        threads=threads,
+        use_cache=use_cache,
     )
 
 
@@ -498,7 +592,10 @@ def compare_from_excel(
 
     # Load forced optimization data
     data_in_f = dataframes.excel_to_dataframe(excel_input_forced_path)
-    data_out_f = dataframes.excel_to_dataframe(excel_output_forced_path)
+    data_out_f = dataframes.excel_output_to_dataframe(excel_output_forced_path)
+
+    # Tolerance of the objective values, from the solver profiles of the runs
+    epgap = solver.recorded_mip_gap([excel_output_init_path, excel_output_forced_path])
 
     # Get paths and plotting parameters
     html_path, plot_param = path.get_compare_paths_excel(excel_input_init_path, output_folder=output_folder)
@@ -512,21 +609,22 @@ def compare_from_excel(
         html_path=html_path,
         subplots_param=plot_param,
         color_blind=color_blind,
+        epgap=epgap,
     )
 
 
 def compare_from_json_excel(
-    json_init_path: str,
+    job_init: JobBundle,
     excel_input_forced_path: str,
     excel_output_forced_path: str,
     output_folder: str | None = None,
     color_blind: bool = False,
 ):
     """
-    Compare an initial optimization from a .json file with a forced optimization from Excel files
+    Compare an initial optimization loaded from a .json file with a forced optimization from Excel files
 
-    :param json_init_path: The optimization job path (can be a .json or a .txt)
-    :type json_init_path: str
+    :param job_init: The initial optimization job loaded from the .json file
+    :type job_init: JobBundle
     :param excel_input_forced_path: The forced input data Excel file path
     :type excel_input_forced_path: str
     :param excel_output_forced_path: The forced output data Excel file path
@@ -538,14 +636,17 @@ def compare_from_json_excel(
     """
 
     # Load initial optimization data
-    data_in_i, data_out_i = dataframes.json_to_input_output_dataframes(json_init_path)
+    data_in_i, data_out_i = job_init.input_data, job_init.output_data
 
     # Load forced optimization data
     data_in_f = dataframes.excel_to_dataframe(excel_input_forced_path)
-    data_out_f = dataframes.excel_to_dataframe(excel_output_forced_path)
+    data_out_f = dataframes.excel_output_to_dataframe(excel_output_forced_path)
+
+    # Tolerance of the objective values, from the solver profile of the forced run
+    epgap = solver.recorded_mip_gap([excel_output_forced_path])
 
     # Get paths and optimization data
-    html_path, plot_param = path.get_compare_paths_json(json_init_path, output_folder=output_folder)
+    html_path, plot_param = path.get_compare_paths_json(job_init, output_folder=output_folder)
 
     # Compare the optimizations
     compare.compare_from_input_output_data(
@@ -556,6 +657,7 @@ def compare_from_json_excel(
         html_path=html_path,
         subplots_param=plot_param,
         color_blind=color_blind,
+        epgap=epgap,
     )
 
 
@@ -563,7 +665,11 @@ def compare_from_json_excel(
 
 
 def run_from_excel_and_display_distant(
-    excel_input_path: str, output_folder: str, add_costs: bool = True, color_blind: bool = False
+    excel_input_path: str,
+    output_folder: str,
+    add_costs: bool = True,
+    color_blind: bool = False,
+    solver_profile: str | None = None,
 ) -> None:
     """
     Replay in the distant environment the optimization job from the Excel files and display the recomputed display
@@ -576,10 +682,13 @@ def run_from_excel_and_display_distant(
     :type add_costs: bool, optional
     :param color_blind: If True, the color blind palette will be used, defaults to False
     :type color_blind: bool, optional
+    :param solver_profile: The name of the solver profile of the run, defaults to None for the SOLVER_PROFILE setting
+    :type solver_profile: str | None, optional
     """
 
     config = load_config()
     ibm_watson_ml_properties = config.to_dict()
+    profile = solver.get_solver_profile(solver_profile)
 
     data = dataframes.excel_to_dataframe(excel_input_path)
     input_data = dataframes.get_cloud_input_from_dataframe(data)
@@ -596,7 +705,9 @@ def run_from_excel_and_display_distant(
         excel_output_path,
         plot_param,
     ) = path.get_run_paths_and_param_excel(excel_input_path, output_folder)
-    output_path = excel_output_path.removesuffix(".xlsx") + ".json"
+    output_path = jobfile.job_output_path(
+        excel_output_path.removesuffix(".xlsx") + ".json", ibm_watson_ml_properties["OUTPUT_COMPRESSION"]
+    )
 
     # Create the input Excel file and update the .dat file
     optimization.prepare_optimization(
@@ -609,6 +720,7 @@ def run_from_excel_and_display_distant(
         add_costs=add_costs,
         mod_costs_extension_path=mod_costs_extension_path,
         dat_costs_extension_path=dat_costs_extension_path,
+        solver_profile=profile,
     )
     print(f"All optimization files generated.\nPlease check the files at '{output_folder}'.\n")
 
@@ -622,6 +734,7 @@ def run_from_excel_and_display_distant(
         ibm_watson_ml_properties=ibm_watson_ml_properties,
         modelId=model_id,
         deploymentId=deployment_id,
+        solve_parameters=solver.wml_solve_parameters(profile),
     )
 
     # DELETE DEPLOYMENT AND MODEL
@@ -630,40 +743,43 @@ def run_from_excel_and_display_distant(
     )
 
     # Save optimization results in Excel file
-    dataframes.dataframe_to_excel(dataframes.json_to_dataframe(output_path), excel_output_path)
-    data_recomputed = dataframes.json_to_dataframe(output_path)
+    data_recomputed = JobBundle.from_json(output_path).dataframes
+    dataframes.dataframe_to_excel(data_recomputed, excel_output_path)
 
     # Display results and save the graphs in a html file
-    display.plot_from_data(
-        all_data=data_recomputed,  # This should keep the data from the .json and replace the recomputed sheets
-        sc_name=None,
-        html_path=html_path,
-        subplots_param=plot_param,
-        color_blind=color_blind,
-    )
+    plot_from_data_stage(data_recomputed, html_path, plot_param, color_blind=color_blind)
 
 
 def replay_from_json_and_display_distant(
-    json_path: str, output_folder: str, add_costs: bool = True, color_blind: bool = False
+    job: JobBundle,
+    output_folder: str,
+    add_costs: bool = True,
+    color_blind: bool = False,
+    warm_start: bool = False,
+    solver_profile: str | None = None,
 ) -> None:
     """
-    Replay in the distant environment the optimization job from the .json and display the recomputed display
+    Replay in the distant environment the optimization job loaded from the .json and display the recomputed display
 
-    :param json_path: The optimization job path (can be a .json or a .txt)
-    :type json_path: str
+    :param job: The optimization job loaded from the .json file
+    :type job: JobBundle
     :param output_folder: The folder path where all files will be saved
     :type output_folder: str
     :param add_costs: If True, the detailed repartition of the optimization costs will be added, defaults to True
     :type add_costs: bool, optional
     :param color_blind: If True, the color blind palette will be used, defaults to False
     :type color_blind: bool, optional
+    :param warm_start: If True, CPLEX starts from the solution of the original job, defaults to False
+    :type warm_start: bool, optional
+    :param solver_profile: The name of the solver profile of the run, defaults to None for the SOLVER_PROFILE setting
+    :type solver_profile: str | None, optional
     """
 
     config = load_config()
     ibm_watson_ml_properties = config.to_dict()
+    profile = solver.get_solver_profile(solver_profile)
 
-    # Load data from .json
-    data = dataframes.json_to_dataframe(json_path)
+    data = job.dataframes
     input_data = dataframes.get_cloud_input_from_dataframe(data)
 
     # Get all paths and plotting parameters
@@ -679,14 +795,22 @@ def replay_from_json_and_display_distant(
         mod_costs_extension_path,
         html_path,
         plot_param,
-    ) = path.get_run_paths_and_param_json(json_path, output_folder)
-    output_path = excel_output_path.removesuffix(".xlsx") + ".json"
+    ) = path.get_run_paths_and_param_json(job, output_folder)
+    output_path = jobfile.job_output_path(
+        excel_output_path.removesuffix(".xlsx") + ".json", ibm_watson_ml_properties["OUTPUT_COMPRESSION"]
+    )
+
+    # Start CPLEX from the on/off decisions of the original solution, sent as the WARM_START table
+    warm_start_values = None
+    if warm_start:
+        warm_start_values = warmstart.start_values(data, model_path)
+        input_data += dataframes.get_cloud_input_from_dataframe({warmstart.WARM_START_SHEET: warm_start_values})
 
     # Create the excel with all initial data contained in the optimisation job (.json)
     optimization.prepare_excel_initial_data(data, excel_init_path)
 
     # Create the input Excel file and update the .dat file
-    optimization.prepare_optimization(
+    data_dat = optimization.prepare_optimization(
         data,
         model_path,
         run_model_path,
@@ -696,6 +820,8 @@ def replay_from_json_and_display_distant(
         add_costs=add_costs,
         mod_costs_extension_path=mod_costs_extension_path,
         dat_costs_extension_path=dat_costs_extension_path,
+        warm_start=warm_start_values,
+        solver_profile=profile,
     )
     print(f"All optimization files generated.\nPlease check the files at '{output_folder}'.\n")
 
@@ -703,13 +829,22 @@ def replay_from_json_and_display_distant(
     model_id, deployment_id = optimizationIBM.create_model_and_deployment_distant(
         ibm_watson_ml_properties=ibm_watson_ml_properties, modelPath=run_model_path, modelName="OptimAnalyser"
     )
+    start = time.perf_counter()
     optimizationIBM.run_optimization_distant(
         in_data=input_data,
         output_path=output_path,
         ibm_watson_ml_properties=ibm_watson_ml_properties,
         modelId=model_id,
         deploymentId=deployment_id,
+        solve_parameters=solver.wml_solve_parameters(profile),
     )
+    elapsed_seconds = time.perf_counter() - start
+    # The CPLEX log of the WML job is not retrieved, whether the MIP start was accepted is unknown
+    if warm_start:
+        cold_elapsed_seconds = results.load_solve_time(data_dat, backend=results.DISTANT)
+        warmstart.print_warm_start_report(WarmStartReport(elapsed_seconds, cold_elapsed_seconds=cold_elapsed_seconds))
+    else:
+        results.store_solve_time(data_dat, elapsed_seconds, backend=results.DISTANT)
 
     # DELETE DEPLOYMENT AND MODEL
     optimizationIBM.delete_deployment_and_model_distant(
@@ -717,16 +852,22 @@ def replay_from_json_and_display_distant(
     )
 
     # Save optimization results in Excel file
-    dataframes.dataframe_to_excel(dataframes.json_to_dataframe(output_path), excel_output_path)
-    data_recomputed = dataframes.json_to_dataframe(output_path)
+    data_recomputed = JobBundle.from_json(output_path).dataframes
+    dataframes.dataframe_to_excel(data_recomputed, excel_output_path)
 
     # Display results and save the graphs in a html file
-    display.plot_from_data(
-        all_data=data_recomputed, sc_name=None, html_path=html_path, subplots_param=plot_param, color_blind=color_blind
-    )
+    plot_from_data_stage(data_recomputed, html_path, plot_param, color_blind=color_blind)
 
 
-def run_scenarios_distant(model_id: str, deployment_id: str, excel_folder_path: str, sc_list: list[str]) -> None:
+def run_scenarios_distant(
+    model_id: str,
+    deployment_id: str,
+    excel_folder_path: str,
+    sc_list: list[str],
+    model_path: str | None = None,
+    use_cache: bool = True,
+    solver_profile: str | None = None,
+) -> None:
     """
     Run multiple times in the distant environment the given optimization configuration with for each scenario given in the list and located in a subfolder of the Excel folder path
 
@@ -738,10 +879,20 @@ def run_scenarios_distant(model_id: str, deployment_id: str, excel_folder_path:
     :type excel_folder_path: str
     :param sc_list: The scenario names list
     :type sc_list: list[str]
+    :param model_path: The OPL model file path (.mod) deployed in the WML model, the results of the scenarios are
+    looked up in the result cache with it, defaults to None to always run the scenarios
+    :type model_path: str | None, optional
+    :param use_cache: If False, the scenarios are run even if their results are in the result cache, defaults to True
+    :type use_cache: bool, optional
+    :param solver_profile: The name of the solver profile of the deployed model, defaults to None for the
+    SOLVER_PROFILE setting
+    :type solver_profile: str | None, optional
     """
 
     config = load_config()
     ibm_watson_ml_properties = config.to_dict()
+    profile = solver.get_solver_profile(solver_profile)
+    solve_parameters = solver.wml_solve_parameters(profile)
 
     for sc_name in sc_list:
         print(sc_name)
@@ -750,7 +901,19 @@ def run_scenarios_distant(model_id: str, deployment_id: str, excel_folder_path:
             if file.startswith("in_prob_"):
                 excel_input_path = os.path.join(excel_folder_path, sc_name, file)
         excel_output_path = excel_input_path.replace("in_prob", "out_prob")
-        output_path = excel_output_path.removesuffix(".xlsx") + ".json"
+        output_path = jobfile.job_output_path(
+            excel_output_path.removesuffix(".xlsx") + ".json", ibm_watson_ml_properties["OUTPUT_COMPRESSION"]
+        )
+        solver.record_profile(excel_output_path, profile)
+
+        key = None
+        if use_cache and model_path is not None and results.cache_enabled():
+            key = results.excel_result_key(model_path, excel_input_path, backend=results.DISTANT)
+            output_data = results.load_result(key)
+            if output_data is not None:
+                print("Results found in the result cache.")
+                dataframes.dataframe_to_excel(output_data, excel_output_path)
+                continue
 
         data = dataframes.excel_to_dataframe(excel_input_path)
         input_data = dataframes.get_cloud_input_from_dataframe(data)
@@ -761,13 +924,22 @@ def run_scenarios_distant(model_id: str, deployment_id: str, excel_folder_path:
             ibm_watson_ml_properties=ibm_watson_ml_properties,
             modelId=model_id,
             deploymentId=deployment_id,
+            solve_parameters=solve_parameters,
         )
 
-        dataframes.dataframe_to_excel(dataframes.json_to_dataframe(output_path), excel_output_path)
+        output_data = dataframes.json_to_dataframe(output_path)
+        dataframes.dataframe_to_excel(output_data, excel_output_path)
+        if key is not None:
+            results.store_result(key, output_data)
 
 
 def run_scenarios_from_folder_distant(
-    excel_folder_path: str, output_folder: str, sc_list: list[str] | None = None, add_costs: bool = False
+    excel_folder_path: str,
+    output_folder: str,
+    sc_list: list[str] | None = None,
+    add_costs: bool = False,
+    use_cache: bool = True,
+    solver_profile: str | None = None,
 ) -> None:
     """
     Run the optimization in the distant environment with for each scenario (corresponding to a single optimization configuration) given in the list and located in a subfolder of the Excel folder path
@@ -780,10 +952,15 @@ def run_scenarios_from_folder_distant(
     :type sc_list: list[str], optional
     :param add_costs: If True, the detailed repartition of the optimization costs will be added, defaults to False
     :type add_costs: bool, optional
+    :param use_cache: If False, the scenarios are run even if their results are in the result cache, defaults to True
+    :type use_cache: bool, optional
+    :param solver_profile: The name of the solver profile of the run, defaults to None for the SOLVER_PROFILE setting
+    :type solver_profile: str | None, optional
     """
 
     config = load_config()
     ibm_watson_ml_properties = config.to_dict()
+    profile = solver.get_solver_profile(solver_profile)
 
     if sc_list == None:
         sc_list = [f.name for f in os.scandir(excel_folder_path) if f.is_dir()]
@@ -820,6 +997,7 @@ def run_scenarios_from_folder_distant(
         add_costs=add_costs,
         mod_costs_extension_path=mod_costs_extension_path,
         dat_costs_extension_path=dat_costs_extension_path,
+        solver_profile=profile,
     )
 
     model_id, deployment_id = optimizationIBM.create_model_and_deployment_distant(
@@ -828,7 +1006,15 @@ def run_scenarios_from_folder_distant(
     print("In main " + model_id)
 
     # Run scenarios that appear in the scenario list
-    run_scenarios_distant(model_id, deployment_id, excel_folder_path, sc_list=sc_list)
+    run_scenarios_distant(
+        model_id,
+        deployment_id,
+        excel_folder_path,
+        sc_list=sc_list,
+        model_path=run_model_path,
+        use_cache=use_cache,
+        solver_profile=profile.name,
+    )
 
     # DELETE DEPLOYMENT AND MODEL
     optimizationIBM.delete_deployment_and_model_distant(
@@ -63,9 +63,12 @@ def input_comparison(data_in_init: dict[str, pd.DataFrame], data_in_forced: dict
 
     data_in_changed = dict()
     for sheet_name in data_in_init.keys():
-        data_in_changed[sheet_name] = data_in_init[sheet_name].compare(
-            data_in_forced[sheet_name], result_names=("init", "forced")
-        )
+        # The categories of the two optimizations can differ, the values are compared instead
+        sheet_init, sheet_forced = [
+            data[sheet_name].astype({column: object for column in data[sheet_name].select_dtypes("category").columns})
+            for data in (data_in_init, data_in_forced)
+        ]
+        data_in_changed[sheet_name] = sheet_init.compare(sheet_forced, result_names=("init", "forced"))
 
     fields = []
     field_init_values = []
@@ -127,6 +130,7 @@ def compare_from_input_output_data(
     subplots_param: pd.DataFrame,
     add_costs: bool = True,
     color_blind: bool = False,
+    epgap: float | None = None,
 ) -> None:
     """
     Create the .html file with visuals to help comparison of the two given optimizations (ran on the same model and with the same asset_step number)
@@ -147,6 +151,8 @@ def compare_from_input_output_data(
     :type add_costs: bool, optional
     :param color_blind: If True, the color blind palette will be used, defaults to False
     :type color_blind: bool, optional
+    :param epgap: The MIP gap tolerance of the solutions (see solver.recorded_mip_gap), defaults to None when unknown
+    :type epgap: float | None, optional
     :rtype: None
     """
 
@@ -162,7 +168,12 @@ def compare_from_input_output_data(
         data_forced["OPERATION_OUTPUT"].set_index("param_id").transpose()["optimiser_objective_value"]["param_val"]
     )
 
-    obj_func_comparison_text = obj_func_comparison(optim_objective_value_init, optim_objective_value_forced)
+    if epgap is None:
+        obj_func_comparison_text = obj_func_comparison(optim_objective_value_init, optim_objective_value_forced)
+    else:
+        obj_func_comparison_text = obj_func_comparison(
+            optim_objective_value_init, optim_objective_value_forced, epgap=epgap
+        )
 
     # Comparison will take initial solution as a base
     # The differences expressed correspond to what has to be added to this initial base in order to get the forced solution
@@ -303,7 +314,9 @@ def compare_from_input_output_data(
     engagement_df_diff = engagement_df_forced - engagement_df_init
     # asset_steps_soc_df_diff -= asset_steps_soc_df_init
     asset_steps_availability_df_diff -= asset_steps_availability_df_init
-    operation_steps_output_df_diff -= operation_steps_output_df_init
+    # The step ids are categories, only the numeric columns are compared
+    numeric_columns = operation_steps_output_df_diff.select_dtypes("number").columns
+    operation_steps_output_df_diff[numeric_columns] -= operation_steps_output_df_init[numeric_columns]
 
     # PLOT OPTIMIZATION COMPARISON TOOLS ------------------------------------------------------------
     # Load the step numbers/durations
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
+import webbrowser
 from datetime import datetime, timedelta
+from pathlib import Path
 
 import pandas as pd
 import plotly.graph_objects as go
@@ -10,6 +12,8 @@ from optim_analyser.analysis import subplot
 from optim_analyser.analysis.colors import color_blind_map, color_map_costs, color_map_default
 from optim_analyser.errors import OptimizationFail
 from optim_analyser.optim import dataframes
+from optim_analyser.optim.schema import step_numbers
+from optim_analyser.optim.sheets import select_columns, sheet_fields
 
 
 def get_df(
@@ -56,9 +60,9 @@ def get_df(
     :rtype: tuple[pd.DataFrame,pd.DataFrame,pd.DataFrame,pd.DataFrame,pd.DataFrame,pd.DataFrame,pd.Series,pd.DataFrame,pd.DataFrame,pd.DataFrame,pd.DataFrame,pd.DataFrame,pd.DataFrame,pd.DataFrame,pd.DataFrame]
     """
 
-    if any([input_data[sheet_name].columns.tolist() == [] for sheet_name in input_data.keys()]):
+    if any([sheet_fields(input_data, sheet_name) == [] for sheet_name in input_data.keys()]):
         raise OptimizationFail("No optimization input data to display")
-    if any([output_data[sheet_name].columns.tolist() == [] for sheet_name in output_data.keys()]):
+    if any([sheet_fields(output_data, sheet_name) == [] for sheet_name in output_data.keys()]):
         raise OptimizationFail("No optimization output data to display")
 
     operation_df = input_data["OPERATION"].set_index("param_id").transpose()
@@ -95,50 +99,54 @@ def get_df(
             f"Output data is missing 'ASSET_STEPS_OUTPUT' sheet. Available sheets: {list(output_data.keys())}"
         )
 
-    asset_steps_df = output_data["ASSET_STEPS_OUTPUT"].filter(
-        items=["asset_id", "step_id", "power_target", "target_soc", "storage_target", "energy_target"]
-    )
-    maingrid_serie = (
-        asset_steps_df[asset_steps_df["asset_id"] == "MAINGRID"]
-        .set_index("step_id", drop=True)["power_target"]
-        .astype(float)
+    asset_steps_df = select_columns(
+        output_data,
+        "ASSET_STEPS_OUTPUT",
+        ["asset_id", "step_id", "power_target", "target_soc", "storage_target", "energy_target"],
     )
+    asset_steps_df = asset_steps_df.assign(step_id=step_numbers(asset_steps_df["step_id"]))
+    maingrid_serie = asset_steps_df[asset_steps_df["asset_id"] == "MAINGRID"].set_index("step_id", drop=True)[
+        "power_target"
+    ]
     asset_steps_df = asset_steps_df[asset_steps_df["asset_id"] != "MAINGRID"]
-    asset_steps_df.loc[:, "step_id"] = pd.to_numeric(asset_steps_df["step_id"])
     asset_steps_df = asset_steps_df.sort_values(by=["step_id"])  # Sort by step_id to ensure proper stacking
     # Pivot the DataFrame for stacked bar plotting
     asset_steps_power_df = asset_steps_df.pivot_table(
-        index="step_id", columns="asset_id", values="power_target", fill_value=0, aggfunc=lambda x: float(x.iloc[0])
+        index="step_id", columns="asset_id", values="power_target", fill_value=0, aggfunc="first", observed=True
     )
 
     # Intermittent potential
-    intermittent_steps_df = input_data["ASSET_STEPS"].filter(items=["asset_id", "step_id", "power_prediction"])
+    intermittent_steps_df = select_columns(input_data, "ASSET_STEPS", ["asset_id", "step_id", "power_prediction"])
     intermittent_steps_df = intermittent_steps_df.loc[
         intermittent_steps_df["asset_id"].isin(intermittent_assets_df.index)
     ]
-    intermittent_steps_df.loc[:, "step_id"] = pd.to_numeric(intermittent_steps_df["step_id"])
+    intermittent_steps_df = intermittent_steps_df.assign(step_id=step_numbers(intermittent_steps_df["step_id"]))
     intermittent_steps_df = intermittent_steps_df.sort_values(by="step_id").pivot_table(
-        index="step_id", columns="asset_id", values="power_prediction", fill_value=0, aggfunc=lambda x: x
+        index="step_id", columns="asset_id", values="power_prediction", fill_value=0, aggfunc="first", observed=True
     )
 
     # ENERGY MARKET PRICES & ENGAGEMENTS ------------------------------------------------------
     operation_steps_link = (
-        input_data["OPERATION_STEPS_LINK"].astype(float).astype(int).set_index("asset_step", drop=True)
-    )  # All steps are converted into int (str->float->int), they are used as indexes later
+        input_data["OPERATION_STEPS_LINK"].apply(step_numbers).set_index("asset_step", drop=True)
+    )  # All steps are converted into int, they are used as indexes later
+
+    # The market sheets are indexed by step number to be matched with the steps links
+    market_price_steps_df = input_data["MARKET_PRICE_STEPS"].set_index(
+        step_numbers(input_data["MARKET_PRICE_STEPS"]["step_index"])
+    )
+    market_engagements_df = input_data["MARKET_ENGAGEMENTS"].set_index(
+        step_numbers(input_data["MARKET_ENGAGEMENTS"]["step_index"])
+    )
+    if subplots_param["spot_threshold"] or subplots_param["engagement"]:
+        market_bids_df = output_data["MARKET_BIDS_OUTPUT"].set_index(
+            step_numbers(output_data["MARKET_BIDS_OUTPUT"]["step_id"])
+        )
 
     # PRICES
     prices_df = pd.DataFrame()
 
     # Spot price
-    day_ahead_init_df = (
-        input_data["MARKET_PRICE_STEPS"][input_data["MARKET_PRICE_STEPS"]["type"] == "DAY_AHEAD"]
-        .astype({"step_index": int})
-        .filter(items=["step_index", "price"])
-        .set_index(
-            "step_index",
-            drop=True,
-        )
-    )
+    day_ahead_init_df = market_price_steps_df[market_price_steps_df["type"] == "DAY_AHEAD"].filter(items=["price"])
     if not day_ahead_init_df.empty:
         for index, steps in operation_steps_link.iterrows():
             # if steps['day_ahead_step'] < day_ahead_init_df.last_valid_index() :
@@ -148,12 +156,7 @@ def get_df(
                 prices_df.at[index, "day_ahead"] = 0
 
     # PPA price
-    ppa_init_df = input_data["MARKET_PRICE_STEPS"]
-    ppa_init_df = (
-        ppa_init_df[ppa_init_df["type"] == "PPA"]
-        .filter(items=["step_index", "price"])
-        .set_index("step_index", drop=True)
-    )
+    ppa_init_df = market_price_steps_df[market_price_steps_df["type"] == "PPA"].filter(items=["price"])
     if not ppa_init_df.empty:
         for index, steps in operation_steps_link.iterrows():
             if steps["ppa_step"] in list(ppa_init_df.index):
@@ -162,24 +165,11 @@ def get_df(
                 prices_df.at[index, "ppa"] = 0
 
     # TURPE price
-    prices_df["transport"] = (
-        input_data["MARKET_PRICE_STEPS"][input_data["MARKET_PRICE_STEPS"]["type"] == "TRANSPORT"]
-        .astype({"step_index": int})
-        .filter(items=["step_index", "price"])
-        .set_index("step_index", drop=True)
-    )
+    prices_df["transport"] = market_price_steps_df[market_price_steps_df["type"] == "TRANSPORT"]["price"]
 
     # Threshold on day-ahead price
     if subplots_param["spot_threshold"]:
-        threshold_init_df = (
-            output_data["MARKET_BIDS_OUTPUT"][output_data["MARKET_BIDS_OUTPUT"]["type"] == "DAY_AHEAD"]
-            .astype({"step_id": int})
-            .filter(items=["step_id", "price"])
-            .set_index(
-                "step_id",
-                drop=True,
-            )
-        )
+        threshold_init_df = market_bids_df[market_bids_df["type"] == "DAY_AHEAD"].filter(items=["price"])
         if not threshold_init_df.empty:
             for index, steps in operation_steps_link.iterrows():
                 if steps["day_ahead_step"] in list(day_ahead_init_df.index):
@@ -191,14 +181,9 @@ def get_df(
     engagement_df = pd.DataFrame()
 
     # Long term engagement
-    long_term_engagement_init_df = (
-        input_data["MARKET_ENGAGEMENTS"].astype({"step_index": int}).set_index("step_index", drop=True)
-    )
-    long_term_engagement_init_df = (
-        long_term_engagement_init_df[long_term_engagement_init_df["type"] == "ELECTRICITY_LONG_TERM_AGREGATED_BIDS"]
-        .filter(items=["engagement"])
-        .astype(float)
-    )
+    long_term_engagement_init_df = market_engagements_df[
+        market_engagements_df["type"] == "ELECTRICITY_LONG_TERM_AGREGATED_BIDS"
+    ].filter(items=["engagement"])
     if not (long_term_engagement_init_df.empty):
         for index, steps in operation_steps_link.iterrows():
             engagement_df.at[index, "long_term"] = long_term_engagement_init_df.loc[
@@ -207,21 +192,9 @@ def get_df(
 
     if subplots_param["engagement"]:
         # Day ahead engagement and clearing
-        day_ahead_engagement_init_df = (
-            output_data["MARKET_BIDS_OUTPUT"].astype({"step_id": int}).set_index("step_id", drop=True)
-        )
-        day_ahead_engagement_init_df = (
-            day_ahead_engagement_init_df[day_ahead_engagement_init_df["type"] == "DAY_AHEAD"]
-            .filter(items=["power"])
-            .astype(float)
-        )
-        day_ahead_clearing_init_df = (
-            input_data["MARKET_ENGAGEMENTS"].astype({"step_index": int}).set_index("step_index", drop=True)
-        )
-        day_ahead_clearing_init_df = (
-            day_ahead_clearing_init_df[day_ahead_clearing_init_df["type"] == "DAY_AHEAD"]
-            .filter(items=["is_step_cleared"])
-            .astype(int)
+        day_ahead_engagement_init_df = market_bids_df[market_bids_df["type"] == "DAY_AHEAD"].filter(items=["power"])
+        day_ahead_clearing_init_df = market_engagements_df[market_engagements_df["type"] == "DAY_AHEAD"].filter(
+            items=["is_step_cleared"]
         )
         if not (day_ahead_engagement_init_df.empty):
             for index, steps in operation_steps_link.iterrows():
@@ -233,34 +206,23 @@ def get_df(
                 ]
 
         # PPA engagement
-        ppa_engagement_init_df = output_data["MARKET_BIDS_OUTPUT"].set_index("step_id", drop=True)
-        ppa_engagement_init_df = (
-            ppa_engagement_init_df[ppa_engagement_init_df["type"] == "PPA"].filter(items=["power"]).astype(float)
-        )
+        ppa_engagement_init_df = market_bids_df[market_bids_df["type"] == "PPA"].filter(items=["power"])
         if not (ppa_engagement_init_df.empty):
             for index, steps in operation_steps_link.iterrows():
                 engagement_df.at[index, "ppa"] = -ppa_engagement_init_df.loc[
-                    int(steps["ppa_step"]), "power"
+                    steps["ppa_step"], "power"
                 ]  # PPA engagement sign seems to be the opposite of usual signs for engagements
 
         # FCR engagement
-        fcr_engagement_init_df = output_data["MARKET_BIDS_OUTPUT"].set_index("step_id", drop=True)
-        fcr_engagement_init_df = (
-            fcr_engagement_init_df[fcr_engagement_init_df["type"] == "FCR"].filter(items=["power"]).astype(float)
-        )
+        fcr_engagement_init_df = market_bids_df[market_bids_df["type"] == "FCR"].filter(items=["power"])
         if not (fcr_engagement_init_df.empty):
             for index, steps in operation_steps_link.iterrows():
                 engagement_df.at[index, "fcr"] = fcr_engagement_init_df.loc[steps["fcr_step"], "power"]
 
         # aFRR capacity up engagement (input)
-        afrr_capacity_up_engagement_init_df = (
-            input_data["MARKET_ENGAGEMENTS"].astype({"step_index": int}).set_index("step_index", drop=True)
-        )
-        afrr_capacity_up_engagement_init_df = (
-            afrr_capacity_up_engagement_init_df[afrr_capacity_up_engagement_init_df["type"] == "AFRR_R2_CAPACITY_UP"]
-            .filter(items=["engagement"])
-            .astype(float)
-        )
+        afrr_capacity_up_engagement_init_df = market_engagements_df[
+            market_engagements_df["type"] == "AFRR_R2_CAPACITY_UP"
+        ].filter(items=["engagement"])
         if not (afrr_capacity_up_engagement_init_df.empty):
             for index, steps in operation_steps_link.iterrows():
                 engagement_df.at[index, "afrr_capacity_up"] = -afrr_capacity_up_engagement_init_df.loc[
@@ -268,16 +230,9 @@ def get_df(
                 ]
 
         # aFRR capacity down engagement (input)
-        afrr_capacity_down_engagement_init_df = (
-            input_data["MARKET_ENGAGEMENTS"].astype({"step_index": int}).set_index("step_index", drop=True)
-        )
-        afrr_capacity_down_engagement_init_df = (
-            afrr_capacity_down_engagement_init_df[
-                afrr_capacity_down_engagement_init_df["type"] == "AFRR_R2_CAPACITY_DOWN"
-            ]
-            .filter(items=["engagement"])
-            .astype(float)
-        )
+        afrr_capacity_down_engagement_init_df = market_engagements_df[
+            market_engagements_df["type"] == "AFRR_R2_CAPACITY_DOWN"
+        ].filter(items=["engagement"])
         if not (afrr_capacity_down_engagement_init_df.empty):
             for index, steps in operation_steps_link.iterrows():
                 engagement_df.at[index, "afrr_capacity_down"] = +afrr_capacity_down_engagement_init_df.loc[
@@ -285,14 +240,9 @@ def get_df(
                 ]
 
         # aFRR voluntary up engagement (input)
-        afrr_voluntary_up_engagement_init_df = (
-            input_data["MARKET_ENGAGEMENTS"].astype({"step_index": int}).set_index("step_index", drop=True)
-        )
-        afrr_voluntary_up_engagement_init_df = (
-            afrr_voluntary_up_engagement_init_df[afrr_voluntary_up_engagement_init_df["type"] == "AFRR_R2_VOLUNTARY_UP"]
-            .filter(items=["engagement"])
-            .astype(float)
-        )
+        afrr_voluntary_up_engagement_init_df = market_engagements_df[
+            market_engagements_df["type"] == "AFRR_R2_VOLUNTARY_UP"
+        ].filter(items=["engagement"])
         if not (afrr_voluntary_up_engagement_init_df.empty):
             for index, steps in operation_steps_link.iterrows():
                 engagement_df.at[index, "afrr_voluntary_up"] = -afrr_voluntary_up_engagement_init_df.loc[
@@ -300,16 +250,9 @@ def get_df(
                 ]
 
         # aFRR voluntary down engagement (input)
-        afrr_voluntary_down_engagement_init_df = (
-            input_data["MARKET_ENGAGEMENTS"].astype({"step_index": int}).set_index("step_index", drop=True)
-        )
-        afrr_voluntary_down_engagement_init_df = (
-            afrr_voluntary_down_engagement_init_df[
-                afrr_voluntary_down_engagement_init_df["type"] == "AFRR_R2_VOLUNTARY_DOWN"
-            ]
-            .filter(items=["engagement"])
-            .astype(float)
-        )
+        afrr_voluntary_down_engagement_init_df = market_engagements_df[
+            market_engagements_df["type"] == "AFRR_R2_VOLUNTARY_DOWN"
+        ].filter(items=["engagement"])
         if not (afrr_voluntary_down_engagement_init_df.empty):
             for index, steps in operation_steps_link.iterrows():
                 engagement_df.at[index, "afrr_voluntary_down"] = +afrr_voluntary_down_engagement_init_df.loc[
@@ -329,16 +272,26 @@ def get_df(
 
     if "target_soc" in list(asset_steps_df.columns):
         asset_steps_soc_df = asset_steps_df.pivot_table(
-            index="step_id", columns="asset_id", values="target_soc", fill_value=0, aggfunc=lambda x: x
+            index="step_id", columns="asset_id", values="target_soc", fill_value=0, aggfunc="first", observed=True
         )
     else:  # If target_soc is not computed, recompute from storage_target/energy_target values
         if "storage_target" in list(asset_steps_df.columns):
             asset_steps_soc_df = asset_steps_df.pivot_table(
-                index="step_id", columns="asset_id", values="storage_target", fill_value=0, aggfunc=lambda x: x
+                index="step_id",
+                columns="asset_id",
+                values="storage_target",
+                fill_value=0,
+                aggfunc="first",
+                observed=True,
             )
         elif "energy_target" in list(asset_steps_df.columns):
             asset_steps_soc_df = asset_steps_df.pivot_table(
-                index="step_id", columns="asset_id", values="energy_target", fill_value=0, aggfunc=lambda x: x
+                index="step_id",
+                columns="asset_id",
+                values="energy_target",
+                fill_value=0,
+                aggfunc="first",
+                observed=True,
             )
         for asset_id in storage_assets_df.index:
             try:
@@ -352,9 +305,12 @@ def get_df(
 
     # AVAILABILITY --------------------------------------------------------------------------
 
-    asset_steps_availability_df = input_data["ASSET_STEPS"].filter(items=["asset_id", "step_id", "availability"])
+    asset_steps_availability_df = select_columns(input_data, "ASSET_STEPS", ["asset_id", "step_id", "availability"])
+    asset_steps_availability_df = asset_steps_availability_df.assign(
+        step_id=step_numbers(asset_steps_availability_df["step_id"])
+    )
     asset_steps_availability_df = asset_steps_availability_df.pivot_table(
-        index="step_id", columns="asset_id", values="availability", fill_value=0, aggfunc=lambda x: x
+        index="step_id", columns="asset_id", values="availability", fill_value=0, aggfunc="first", observed=True
     )
     asset_steps_availability_df = asset_steps_availability_df.filter(items=assets_df.index)
 
@@ -760,6 +716,16 @@ def plot_from_data(
     plot_from_input_output_data(input_data, output_data, sc_name, html_path, subplots_param, add_costs, color_blind)
 
 
+def show_html(html_path: str) -> None:
+    """
+    Open the saved .html file with the visuals in the web browser, as when the figure is generated
+
+    :param html_path: The .html file path
+    :type html_path: str
+    """
+    webbrowser.open(Path(html_path).resolve().as_uri())
+
+
 def plot_from_excel(
     excel_input_path: str,
     excel_output_path: str,
@@ -790,6 +756,6 @@ def plot_from_excel(
 
     # Load the input and output data from the Excel files
     input_data = dataframes.excel_to_dataframe(excel_input_path)
-    output_data = dataframes.excel_to_dataframe(excel_output_path)
+    output_data = dataframes.excel_output_to_dataframe(excel_output_path)
 
     plot_from_input_output_data(input_data, output_data, sc_name, html_path, client_param, add_costs, color_blind)
@@ -10,7 +10,7 @@ from typing import List
 from optim_analyser.analysis import compare
 from optim_analyser.errors import DataError, VisualizationError
 from optim_analyser.models import ComparisonConfig, ComparisonResult, JobStatus, OptimizationJob
-from optim_analyser.optim import dataframes, path
+from optim_analyser.optim import dataframes, path, solvelog
 
 
 class ComparisonService:
@@ -34,9 +34,10 @@ class ComparisonService:
             VisualizationError: If comparison generation fails
         """
         try:
-            json_list = [f for f in os.listdir(jobs_folder) if f.endswith(".json")]
+            # Only the operation metadata is read, the .json files that are not optimization jobs are discarded
+            summaries = dataframes.probe_job_folder(jobs_folder)
 
-            if not json_list:
+            if not summaries:
                 raise DataError(
                     "No JSON files found in folder", error_code="NO_JOBS_FOUND", context={"folder": jobs_folder}
                 )
@@ -49,8 +50,12 @@ class ComparisonService:
 
             # Create ComparisonResult (simplified - would need more info in real impl)
             jobs = [
-                OptimizationJob(job_id=json_file, input_data=None, status=JobStatus.COMPLETED)  # Would need to load
-                for json_file in json_list
+                _compared_job(
+                    summary.source_path.name,
+                    path.microgrid_name_date(str(summary.operation_id), str(summary.optimisation_request_time))[0],
+                    output_folder,
+                )
+                for summary in summaries
             ]
 
             return ComparisonResult(jobs=jobs, comparison_name=Path(jobs_folder).name, html_path=Path(html_path))
@@ -85,14 +90,16 @@ class ComparisonService:
             html_path = os.path.join(output_folder, f"{comparison_name}.html")
 
             # Plot parameters from first job
-            plot_param = path.get_display_paths_and_param_json(json_paths[0], output_folder)[3]
+            operation_id, _, _ = path.op_id_and_microgrid_name_date_from_json(json_paths[0])
+            plot_param = path.get_microgrid_param(operation_id)
 
             compare.compare_jobs_from_list(
                 json_paths=json_paths, html_path=html_path, client_param=plot_param, color_blind=color_blind
             )
 
             jobs = [
-                OptimizationJob(job_id=Path(jp).stem, input_data=None, status=JobStatus.COMPLETED) for jp in json_paths
+                _compared_job(Path(jp).stem, path.op_id_and_microgrid_name_date_from_json(jp)[1], output_folder)
+                for jp in json_paths
             ]
 
             return ComparisonResult(jobs=jobs, comparison_name=comparison_name, html_path=Path(html_path))
@@ -103,3 +110,13 @@ class ComparisonService:
                 error_code="JOBS_COMPARISON_FAILED",
                 context={"job_count": len(json_paths)},
             ) from e
+
+
+def _compared_job(job_id: str, microgrid_name: str, output_folder: str) -> OptimizationJob:
+    """Return a compared job, with the solve metrics of its local replay in the output folder if any."""
+    return OptimizationJob(
+        job_id=job_id,
+        input_data=None,
+        status=JobStatus.COMPLETED,
+        solve_metrics=solvelog.load_metrics(path.get_replay_output_path(output_folder, microgrid_name)),
+    )
@@ -10,7 +10,8 @@ from typing import Optional
 from optim_analyser.analysis import display
 from optim_analyser.errors import DataError, VisualizationError
 from optim_analyser.models import DisplayConfig, OptimizationData, VisualizationResult
-from optim_analyser.optim import dataframes, path
+from optim_analyser.optim import path
+from optim_analyser.optim.bundle import JobBundle
 
 
 class DisplayService:
@@ -33,17 +34,21 @@ class DisplayService:
         """
         try:
             # Load data from .json
-            data = dataframes.json_to_dataframe(json_path)
+            job = JobBundle.from_json(json_path)
 
             # Get corresponding paths and plotting parameters
-            (_, _, html_path, plot_param) = path.get_display_paths_and_param_json(json_path, output_folder)
+            (_, _, html_path, plot_param) = path.get_display_paths_and_param_json(job, output_folder)
 
             # Display and save visuals in the .html
             display.plot_from_data(
-                all_data=data, sc_name=None, html_path=html_path, subplots_param=plot_param, color_blind=color_blind
+                all_data=job.dataframes,
+                sc_name=None,
+                html_path=html_path,
+                subplots_param=plot_param,
+                color_blind=color_blind,
             )
 
-            return VisualizationResult(html_path=Path(html_path), plot_count=len(data))  # Approximate
+            return VisualizationResult(html_path=Path(html_path), plot_count=len(job.dataframes))  # Approximate
 
         except FileNotFoundError as e:
             raise DataError(
@@ -10,14 +10,23 @@ from optim_analyser.analysis import display
 from optim_analyser.errors import IBMJobError, OptimizationFail
 from optim_analyser.ibm import optimizationIBM
 from optim_analyser.models import OptimizationMode, ReplayConfig, VisualizationResult
-from optim_analyser.optim import dataframes, optimization, path, replay
+from optim_analyser.optim import optimization, path, replay, solver, warmstart
+from optim_analyser.optim.bundle import JobBundle
 
 
 class ReplayService:
     """Service for replaying optimization jobs."""
 
     def replay_local(
-        self, json_path: str, output_folder: str, add_costs: bool = True, color_blind: bool = False
+        self,
+        json_path: str,
+        output_folder: str,
+        add_costs: bool = True,
+        color_blind: bool = False,
+        data_format: str = "excel",
+        use_cache: bool = True,
+        warm_start: bool = False,
+        solver_profile: Optional[str] = None,
     ) -> VisualizationResult:
         """Replay optimization locally using CPLEX.
 
@@ -26,6 +35,12 @@ class ReplayService:
             output_folder: Output directory
             add_costs: Include cost breakdown
             color_blind: Use color-blind friendly palette
+            data_format: 'excel' to exchange the data with CPLEX through Excel files, 'text' through the .dat
+                file and CSV files
+            use_cache: Return the results of the same model and input data from the result cache instead of
+                running CPLEX again
+            warm_start: Start CPLEX from the on/off decisions of the solution of the original job
+            solver_profile: Name of the solver profile of the run, the SOLVER_PROFILE setting if None
 
         Returns:
             VisualizationResult with generated HTML
@@ -34,7 +49,8 @@ class ReplayService:
             OptimizationFail: If CPLEX execution fails
         """
         try:
-            data = dataframes.json_to_dataframe(json_path)
+            job = JobBundle.from_json(json_path)
+            data = job.dataframes
 
             (
                 excel_init_path,
@@ -48,28 +64,42 @@ class ReplayService:
                 mod_costs_extension_path,
                 html_path,
                 plot_param,
-            ) = path.get_run_paths_and_param_json(json_path, output_folder)
+            ) = path.get_run_paths_and_param_json(job, output_folder)
 
             optimization.prepare_excel_initial_data(data, excel_init_path)
-            optimization.prepare_optimization(
+            warm_start_values = warmstart.start_values(data, model_path) if warm_start else None
+            input_data = optimization.prepare_optimization(
                 data,
                 model_path,
                 run_model_path,
                 excel_input_path=excel_input_path,
                 dat_path=run_dat_path,
+                excel_output_path=excel_output_path,
                 add_costs=add_costs,
                 dat_costs_extension_path=dat_costs_extension_path,
                 mod_costs_extension_path=mod_costs_extension_path,
+                data_format=data_format,
+                warm_start=warm_start_values,
+                solver_profile=solver.get_solver_profile(solver_profile),
             )
 
-            replay.replay_optimization(run_model_path, run_dat_path, data, excel_output_path)
-
-            display.plot_from_excel(
-                excel_input_path,
+            output_data = replay.replay_optimization(
+                run_model_path,
+                run_dat_path,
+                data,
                 excel_output_path,
+                data_format=data_format,
+                input_data=input_data,
+                use_cache=use_cache,
+                warm_start=warm_start,
+            )
+
+            display.plot_from_input_output_data(
+                input_data,
+                output_data,
                 sc_name=None,
                 html_path=html_path,
-                client_param=plot_param,
+                subplots_param=plot_param,
                 add_costs=add_costs,
                 color_blind=color_blind,
             )
@@ -105,7 +135,8 @@ class ReplayService:
             IBMJobError: If remote execution fails
         """
         try:
-            data = dataframes.json_to_dataframe(json_path)
+            job = JobBundle.from_json(json_path)
+            data = job.dataframes
 
             (
                 excel_init_path,
@@ -119,7 +150,7 @@ class ReplayService:
                 mod_costs_extension_path,
                 html_path,
                 plot_param,
-            ) = path.get_run_paths_and_param_json(json_path, output_folder)
+            ) = path.get_run_paths_and_param_json(job, output_folder)
 
             optimization.prepare_excel_initial_data(data, excel_init_path)
 
@@ -134,9 +165,9 @@ class ReplayService:
                 mod_costs_extension_path=mod_costs_extension_path,
             )
 
-            data_recomputed = dataframes.json_to_dataframe(json_output_path)
+            data_recomputed = JobBundle.from_json(json_output_path)
             display.plot_from_data(
-                all_data=data_recomputed,
+                all_data=data_recomputed.dataframes,
                 sc_name=None,
                 html_path=html_path,
                 subplots_param=plot_param,
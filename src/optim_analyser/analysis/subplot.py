@@ -1141,7 +1141,7 @@ def plot_costs(
             .set_index("step_id")
         )
         violations_df = violations_df.pivot_table(
-            index="step_id", columns="violation_type", values="violation_cost", fill_value=0
+            index="step_id", columns="violation_type", values="violation_cost", fill_value=0, observed=True
         )
         for violation_type in violations_df.columns:
             costs_df[violation_type] = violations_df[violation_type]
@@ -1244,7 +1244,7 @@ def plot_total_costs(
             .set_index("step_id")
         )
         violations_df = violations_df.pivot_table(
-            index="step_id", columns="violation_type", values="violation_cost", fill_value=0
+            index="step_id", columns="violation_type", values="violation_cost", fill_value=0, observed=True
         )
         for violation_type in violations_df.columns:
             costs[violation_type] = violations_df[violation_type].sum()
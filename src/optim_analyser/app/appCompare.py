@@ -4,6 +4,8 @@ from tkinter import ttk
 from optim_analyser.analysis import analyse
 from optim_analyser.app import appOptimJob
 from optim_analyser.app.appOptimJob import OptimJob
+from optim_analyser.optim import jobfile
+from optim_analyser.optim.bundle import JobBundle
 from optim_analyser.optim.path import output_path
 
 
@@ -175,9 +177,7 @@ class Comparison(ttk.Frame):
         self.add_costs = self.add_costs_var.get()
 
     def check_files(self, job_i: OptimJob, job_f: OptimJob):
-        json_init_ready = job_i.json_path != None and (
-            job_i.json_path.endswith(".json") or job_i.json_path.endswith(".txt")
-        )
+        json_init_ready = job_i.json_path != None and jobfile.is_job_file(job_i.json_path)
         excel_init_ready = (
             job_i.excel_input_path != None
             and job_i.excel_input_path.endswith(".xlsx")
@@ -234,10 +234,12 @@ class Comparison(ttk.Frame):
         html_path: str = output_path("./output/comparison.html"),
         color_blind: bool = False,
     ):
-        analyse.display_from_json(json_init_path, output_path("./output/"), color_blind=True)
+        # The initial job is loaded once for both the display and the comparison
+        job_init = JobBundle.from_json(json_init_path)
+        analyse.display_from_json(job_init, output_path("./output/"), color_blind=True)
         analyse.display_from_excel(
             excel_input_forced_path, excel_output_forced_path, output_path("./output/"), "Forced behavior", color_blind
         )
         analyse.compare_from_json_excel(
-            json_init_path, excel_input_forced_path, excel_output_forced_path, html_path, color_blind
+            job_init, excel_input_forced_path, excel_output_forced_path, html_path, color_blind
         )
@@ -7,6 +7,8 @@ from tkinter import ttk
 from optim_analyser.analysis import analyse
 from optim_analyser.app import appOptimJob
 from optim_analyser.app.appOptimJob import OptimJob
+from optim_analyser.optim import jobfile
+from optim_analyser.optim.bundle import JobBundle
 from optim_analyser.optim.path import output_path
 
 
@@ -217,7 +219,7 @@ class DisplayRun(ttk.Frame):
         self.add_costs = self.add_costs_var.get()
 
     def check_files(self, job: OptimJob):
-        if job.json_path != None and (job.json_path.endswith(".json") or job.json_path.endswith(".txt")):
+        if job.json_path != None and jobfile.is_job_file(job.json_path):
             self.button_display_json.grid(column=0, row=0, padx=2.5)
             self.button_run_json.grid(column=1, row=0, padx=2.5)
         else:
@@ -238,7 +240,7 @@ class DisplayRun(ttk.Frame):
             self.button_run_sc.grid_forget()
 
     def display_json(self, json_path: str, color_blind: bool):
-        analyse.display_from_json(json_path, self.output_folder, color_blind)
+        analyse.display_from_json(JobBundle.from_json(json_path), self.output_folder, color_blind)
 
     def display_excel(self, excel_input_path: str, excel_output_path: str, color_blind: bool):
         analyse.display_from_excel(
@@ -254,12 +256,16 @@ class DisplayRun(ttk.Frame):
     def run_json(self, json_path: str, add_costs: bool, color_blind: bool, run_local: bool):
         if run_local:
             t = threading.Thread(
-                target=analyse.replay_from_json_and_display_local(json_path, self.output_folder, add_costs, color_blind)
+                target=analyse.replay_from_json_and_display_local(
+                    JobBundle.from_json(json_path), self.output_folder, add_costs, color_blind
+                )
             )
             t.daemon = True  # close pipe if GUI process exits
             t.start()
         else:
-            analyse.replay_from_json_and_display_distant(json_path, self.output_folder, add_costs, color_blind)
+            analyse.replay_from_json_and_display_distant(
+                JobBundle.from_json(json_path), self.output_folder, add_costs, color_blind
+            )
 
     def run_excel(self, excel_input_path: str, add_costs: bool, color_blind: bool, run_local: bool):
         if run_local:
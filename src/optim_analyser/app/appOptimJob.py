@@ -1,6 +1,9 @@
 from tkinter import ttk
 from tkinter.filedialog import askdirectory, askopenfilename
 
+from optim_analyser.errors import DataError
+from optim_analyser.optim import dataframes
+
 
 class OptimJob:
     # Class to store optimization input and output paths
@@ -14,7 +17,16 @@ class OptimJob:
 # Commands to select a file and display the selected file path
 def click_choose_json(job: OptimJob, label_txt_file_selected: ttk.Label):
     job.json_path = askopenfilename()
-    label_txt_file_selected.config(text=job.json_path.split("/")[-1])
+    text = job.json_path.split("/")[-1]
+    if job.json_path:
+        # Show the operation of the selected job, only its header is read
+        try:
+            summary = dataframes.probe_job(job.json_path, with_sheet_ids=False)
+        except (DataError, OSError, UnicodeDecodeError):
+            summary = None
+        if summary is not None and summary.is_job():
+            text += f" (operation {summary.operation_id}, {summary.optimisation_request_time})"
+    label_txt_file_selected.config(text=text)
 
 
 def click_choose_excel_in(job: OptimJob, label_txt_file_selected: ttk.Label):
@@ -1,11 +1,33 @@
-"""Command-line interface for Optim Analyser."""
+"""Command-line interface for Optim Analyser.
+
+The commands import the modules they use when they run, so that the help and the argument errors are shown
+without importing pandas, plotly or tkinter.
+"""
 
 import argparse
 import sys
-from pathlib import Path
 from typing import Optional
 
 
+class _OutputFormatNames:
+    """Names of the output formats registered in optim.convert, read when they are first needed.
+
+    The conversion module imports pandas, so it is only imported when a format is checked or listed in the help.
+    """
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._names()
+
+    def __iter__(self):
+        return iter(self._names())
+
+    @staticmethod
+    def _names() -> list[str]:
+        from optim_analyser.optim.convert import OUTPUT_FORMATS
+
+        return list(OUTPUT_FORMATS)
+
+
 def main():
     """Main CLI entry point."""
     parser = argparse.ArgumentParser(
@@ -26,8 +48,21 @@ Examples:
   # Convert JSON to Excel
   optim-analyser convert results.json --output results.xlsx
 
+  # Convert a tree of archived jobs to CSV folders with 8 processes
+  optim-analyser convert archive/ --recursive --format csv --jobs 8 --output converted/
+
+  # Run the scenarios of a folder locally, 4 at once
+  optim-analyser scenarios scenarios/ --output results/ --jobs 4
+
+  # Compare the solve times of the model versions run in a folder
+  optim-analyser metrics results/
+
   # Launch GUI
   optim-analyser gui
+
+  # Show the size of the cache of the parsed files and results, or empty it
+  optim-analyser cache
+  optim-analyser cache --clear
         """,
     )
 
@@ -43,6 +78,9 @@ Examples:
     display_parser.add_argument("-o", "--output", type=str, help="Output directory for visualizations")
     display_parser.add_argument("--color-blind", action="store_true", help="Use color-blind friendly palette")
     display_parser.add_argument("--no-costs", action="store_true", help="Exclude cost breakdown")
+    display_parser.add_argument(
+        "--no-cache", action="store_true", help="Generate the visualizations even if they are up to date"
+    )
 
     # Replay command
     replay_parser = subparsers.add_parser("replay", help="Replay optimization")
@@ -51,6 +89,27 @@ Examples:
     replay_parser.add_argument("--remote", action="store_true", help="Run on IBM Watson ML")
     replay_parser.add_argument("--model-id", type=str, help="IBM Watson ML model ID")
     replay_parser.add_argument("--deployment-id", type=str, help="IBM Watson ML deployment ID")
+    replay_parser.add_argument(
+        "--data-format",
+        choices=["excel", "text"],
+        default="excel",
+        help="Exchange the data with CPLEX through Excel files (default) or through the .dat file and CSV files",
+    )
+    replay_parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Run the optimization and generate its files even if they are cached or up to date",
+    )
+    replay_parser.add_argument(
+        "--warm-start",
+        action="store_true",
+        help="Start CPLEX from the on/off decisions of the original solution and report the time saved",
+    )
+    replay_parser.add_argument(
+        "--solver-profile",
+        type=str,
+        help="Named CPLEX settings: default, fast-preview, exact or parallel-16 (default: SOLVER_PROFILE setting)",
+    )
 
     # Compare command
     compare_parser = subparsers.add_parser("compare", help="Compare multiple optimization runs")
@@ -59,14 +118,58 @@ Examples:
     compare_parser.add_argument("--color-blind", action="store_true", help="Use color-blind friendly palette")
 
     # Convert command
-    convert_parser = subparsers.add_parser("convert", help="Convert JSON to Excel")
+    convert_parser = subparsers.add_parser("convert", help="Convert JSON jobs to Excel, CSV or Parquet")
     convert_parser.add_argument("input", type=str, help="Path to JSON input file or directory")
-    convert_parser.add_argument("-o", "--output", type=str, help="Output Excel file path")
+    convert_parser.add_argument(
+        "-o", "--output", type=str, help="Output file path, or output directory when converting a directory"
+    )
     convert_parser.add_argument("-r", "--recursive", action="store_true", help="Process directory recursively")
+    convert_parser.add_argument(
+        "-f",
+        "--format",
+        choices=_OutputFormatNames(),
+        default="xlsx",
+        metavar="FORMAT",
+        help="Output format: %(choices)s (default: xlsx)",
+    )
+    convert_parser.add_argument("-j", "--jobs", type=int, default=1, help="Number of conversion processes")
+    convert_parser.add_argument("--force", action="store_true", help="Convert files whose outputs are up to date")
+
+    # Scenarios command
+    scenarios_parser = subparsers.add_parser("scenarios", help="Run the scenarios of a folder locally")
+    scenarios_parser.add_argument("input", type=str, help="Folder containing a subfolder per scenario")
+    scenarios_parser.add_argument("-o", "--output", type=str, required=True, help="Output directory")
+    scenarios_parser.add_argument("-s", "--scenarios", type=str, nargs="+", help="Scenarios to run (default: all)")
+    scenarios_parser.add_argument("--costs", action="store_true", help="Add the cost breakdown to the outputs")
+    scenarios_parser.add_argument(
+        "--no-in-place", action="store_true", help="Write the recomputed files next to the run folder"
+    )
+    scenarios_parser.add_argument("-j", "--jobs", type=int, default=1, help="Number of scenarios run at once")
+    scenarios_parser.add_argument(
+        "--threads", type=int, help="CPLEX threads per scenario (default: processors shared between the jobs)"
+    )
+    scenarios_parser.add_argument(
+        "--no-cache", action="store_true", help="Run the scenarios even if their results are in the result cache"
+    )
+    scenarios_parser.add_argument(
+        "--solver-profile",
+        type=str,
+        help="Named CPLEX settings: default, fast-preview, exact or parallel-16 (default: SOLVER_PROFILE setting)",
+    )
+
+    # Metrics command
+    metrics_parser = subparsers.add_parser("metrics", help="Summarise the solve metrics of the local runs of a folder")
+    metrics_parser.add_argument("input", type=str, help="Folder of the runs, searched recursively")
+    metrics_parser.add_argument("--runs", action="store_true", help="List every run instead of the model versions")
 
     # GUI command
     gui_parser = subparsers.add_parser("gui", help="Launch GUI application")
 
+    # Cache command
+    cache_parser = subparsers.add_parser("cache", help="Show or clear the cache of the parsed files and results")
+    cache_parser.add_argument("--clear", action="store_true", help="Remove all the cache entries")
+    cache_parser.add_argument("--invalidate", type=str, nargs="+", help="Remove the cache entries of these files")
+
     args = parser.parse_args()
 
     # Handle no command
@@ -99,8 +202,14 @@ Examples:
             return cmd_compare(args, config)
         elif args.command == "convert":
             return cmd_convert(args, config)
+        elif args.command == "scenarios":
+            return cmd_scenarios(args, config)
+        elif args.command == "metrics":
+            return cmd_metrics(args, config)
         elif args.command == "gui":
             return cmd_gui(args, config)
+        elif args.command == "cache":
+            return cmd_cache(args, config)
     except Exception as e:
         print(f"Error executing command: {e}")
         if args.verbose:
@@ -115,15 +224,16 @@ Examples:
 def cmd_display(args, config):
     """Handle display command."""
     from optim_analyser.analysis.analyse import display_from_json
+    from optim_analyser.optim.bundle import JobBundle
 
     print(f"Displaying results from: {args.input}")
 
     output_dir = args.output or "output"
     display_from_json(
-        json_path=args.input,
+        job=JobBundle.from_json(args.input),
         output_folder=output_dir,
-        add_costs=not args.no_costs,
         color_blind=args.color_blind,
+        use_cache=not args.no_cache,
     )
 
     print(f"✓ Visualizations saved to: {output_dir}")
@@ -139,9 +249,18 @@ def cmd_replay(args, config):
         # Implementation would go here
     else:
         from optim_analyser.analysis.analyse import replay_from_json_and_display_local
+        from optim_analyser.optim.bundle import JobBundle
 
         print(f"Replaying optimization locally: {args.input}")
-        replay_from_json_and_display_local(json_path=args.input, output_folder=args.output)
+        replay_from_json_and_display_local(
+            job=JobBundle.from_json(args.input),
+            output_folder=args.output,
+            data_format=args.data_format,
+            use_cache=not args.no_cache,
+            warm_start=args.warm_start,
+            solver_profile=args.solver_profile,
+        )
+        print_result_cache_stats()
 
     print(f"✓ Results saved to: {args.output}")
     return 0
@@ -162,21 +281,67 @@ def cmd_compare(args, config):
 
 def cmd_convert(args, config):
     """Handle convert command."""
-    print(f"Converting JSON to Excel: {args.input}")
+    from optim_analyser.optim.convert import FAILED, convert_jobs
+
+    print(f"Converting {args.input} to {args.format}")
+
+    def on_result(job_file, status, error):
+        if status == FAILED:
+            print(f"✗ {job_file}: {error}")
+        elif args.verbose:
+            print(f"{status}: {job_file}")
+
+    report = convert_jobs(
+        args.input,
+        output_path=args.output,
+        format_name=args.format,
+        recursive=args.recursive,
+        jobs=args.jobs,
+        force=args.force,
+        on_result=on_result,
+    )
 
-    input_path = Path(args.input)
+    print(
+        f"{'✗' if report.failed else '✓'} {len(report.converted)} converted, {len(report.skipped)} up to date, {len(report.failed)} failed "
+        f"in {report.elapsed_seconds:.1f}s ({report.files_per_second():.2f} files/s, "
+        f"{report.bytes_processed / 1024 / 1024:.1f} MB at {report.bytes_per_second() / 1024 / 1024:.1f} MB/s)"
+    )
+    return 1 if report.failed else 0
+
+
+def cmd_scenarios(args, config):
+    """Handle scenarios command."""
+    from optim_analyser.analysis.analyse import run_scenarios_from_folder_local
+
+    print(f"Running the scenarios of {args.input} locally with {args.jobs} job(s)")
+    run_scenarios_from_folder_local(
+        args.input,
+        args.output,
+        sc_list=args.scenarios,
+        add_costs=args.costs,
+        in_place=not args.no_in_place,
+        jobs=args.jobs,
+        threads=args.threads,
+        use_cache=not args.no_cache,
+        solver_profile=args.solver_profile,
+    )
+    print_result_cache_stats()
+
+    print(f"✓ Scenarios run, files saved to: {args.input if not args.no_in_place else args.output}")
+    return 0
 
-    if input_path.is_dir():
-        # Import the conversion module that will be migrated
-        print(f"Processing directory: {input_path}")
-        # Directory processing logic
-    else:
-        # Single file conversion
-        output_path = args.output or input_path.with_suffix(".xlsx")
-        print(f"Output: {output_path}")
-        # Conversion logic
 
-    print("✓ Conversion complete")
+def cmd_metrics(args, config):
+    """Handle metrics command."""
+    from optim_analyser.optim.solvelog import metrics_frame, metrics_summary
+
+    frame = metrics_frame(args.input)
+    if frame.empty:
+        print(f"No solve metrics recorded in {args.input}")
+        return 0
+
+    table = frame.drop(columns="path") if args.runs else metrics_summary(frame)
+    print(table.to_string(index=False, float_format=lambda value: f"{value:.2f}"))
     return 0
 
 
@@ -190,5 +355,34 @@ def cmd_gui(args, config):
     return 0
 
 
+def cmd_cache(args, config):
+    """Handle cache command."""
+    from optim_analyser.optim.cache import SheetCache
+
+    cache = SheetCache.from_config(config)
+
+    if args.clear:
+        cache.clear()
+        print(f"✓ Cache cleared: {cache.folder}")
+    elif args.invalidate:
+        for file in args.invalidate:
+            cache.invalidate(file)
+        print(f"✓ Cache entries removed for {len(args.invalidate)} file(s)")
+    else:
+        print(f"Cache: {cache.folder} ({cache.size() / 1024 / 1024:.1f} MB / {config.app.cache_max_size_mb} MB)")
+        for kind, (entries, size) in sorted(cache.stats().items()):
+            print(f"  {kind}: {entries} entries, {size / 1024 / 1024:.1f} MB")
+    return 0
+
+
+def print_result_cache_stats():
+    """Print the lookups of the optimization results in the result cache."""
+    from optim_analyser.optim.results import result_stats
+
+    stats = result_stats()
+    if stats.hits or stats.misses:
+        print(f"Result cache: {stats.hits} hit(s), {stats.misses} miss(es), {stats.stored} stored")
+
+
 if __name__ == "__main__":
     sys.exit(main())
@@ -8,8 +8,6 @@ from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Optional
 
-import yaml
-
 
 @dataclass
 class IBMConfig:
@@ -22,6 +20,8 @@ class IBMConfig:
     hardware_spec_name: str = "S"
     hardware_spec_num_nodes: int = 1
     run_time_version: str = "20.1"
+    stream_payload: bool = False
+    output_compression: str = "none"
 
 
 @dataclass
@@ -31,6 +31,7 @@ class PathConfig:
     models_path: Path = field(default_factory=lambda: Path("resources/models"))
     config_path: Path = field(default_factory=lambda: Path("resources/config"))
     output_path: Path = field(default_factory=lambda: Path("output"))
+    cache_path: Path = field(default_factory=lambda: Path("cache"))
 
 
 @dataclass
@@ -40,6 +41,11 @@ class AppConfig:
     theme: str = "Arc"
     log_level: str = "INFO"
     color_blind_mode: bool = False
+    cache_max_size_mb: int = 2048
+    excel_engine: str = "auto"
+    oplrun: str = "oplrun"
+    opl_timeout_seconds: float = 0.0
+    solver_profile: str = "default"
 
 
 @dataclass
@@ -71,18 +77,26 @@ class Config:
             hardware_spec_name=os.getenv("IBM_HARDWARE_SPEC_NAME", "S"),
             hardware_spec_num_nodes=int(os.getenv("IBM_HARDWARE_SPEC_NUM_NODES", "1")),
             run_time_version=os.getenv("IBM_RUN_TIME_VERSION", "20.1"),
+            stream_payload=os.getenv("IBM_STREAM_PAYLOAD", "false").lower() == "true",
+            output_compression=os.getenv("IBM_OUTPUT_COMPRESSION", "none").lower(),
         )
 
         paths = PathConfig(
             models_path=Path(os.getenv("MODELS_PATH", "resources/models")),
             config_path=Path(os.getenv("CONFIG_PATH", "resources/config")),
             output_path=Path(os.getenv("OUTPUT_PATH", "output")),
+            cache_path=Path(os.getenv("CACHE_PATH", "cache")),
         )
 
         app = AppConfig(
             theme=os.getenv("APP_THEME", "Arc"),
             log_level=os.getenv("LOG_LEVEL", "INFO"),
             color_blind_mode=os.getenv("COLOR_BLIND_MODE", "false").lower() == "true",
+            cache_max_size_mb=int(os.getenv("CACHE_MAX_SIZE_MB", "2048")),
+            excel_engine=os.getenv("EXCEL_ENGINE", "auto"),
+            oplrun=os.getenv("OPLRUN", "oplrun"),
+            opl_timeout_seconds=float(os.getenv("OPL_TIMEOUT_SECONDS", "0")),
+            solver_profile=os.getenv("SOLVER_PROFILE", "default"),
         )
 
         return cls(ibm=ibm, paths=paths, app=app)
@@ -97,6 +111,8 @@ class Config:
             "HARDWARE_SPEC_NAME": self.ibm.hardware_spec_name,
             "HARDWARE_SPEC_NUM_NODES": self.ibm.hardware_spec_num_nodes,
             "RUN_TIME_VERSION": self.ibm.run_time_version,
+            "STREAM_PAYLOAD": self.ibm.stream_payload,
+            "OUTPUT_COMPRESSION": self.ibm.output_compression,
         }
 
 
@@ -1,9 +1,10 @@
 import http.client
 import json
+import shutil
 import urllib.parse
 from datetime import datetime, timedelta
 from time import sleep
-from typing import Optional, Union
+from typing import BinaryIO, Iterator, Optional, Union
 
 
 class WMLJobClient:
@@ -33,6 +34,9 @@ class WMLJobClient:
     LOG_OUTPUT_ID = "log.txt"
     METADATA = "metadata"
     JOBID = "id"
+    PAYLOAD_MARKER = "@PAYLOAD@"
+    PAYLOAD_ROWS_PER_PART = 10000
+    DOWNLOAD_CHUNK_SIZE = 1 << 20  # bytes of the job data copied at once when it is saved
 
     def __init__(
         self,
@@ -43,6 +47,7 @@ class WMLJobClient:
         modelId: dict,
         deploymentId: str,
         runtimeVersion: float,
+        solveParameters: Optional[dict] = None,
     ):
 
         # the type annotation (Optional[str]) is used to indicate that attributes can be character strings
@@ -53,6 +58,8 @@ class WMLJobClient:
         self.modelId = modelId
         self.deploymentId = deploymentId
         self.runtimeVersion = runtimeVersion
+        # CPLEX parameters of the jobs, e.g. {"mip.tolerances.mipgap": "0.01"}
+        self.solveParameters = solveParameters or {}
 
     def funLookupBearerToken(self) -> str:
         global iamToken
@@ -85,21 +92,58 @@ class WMLJobClient:
         if inputData is None:
             payload = {}
         else:
-            payload = {
-                "deployment": {"id": self.deploymentId},
-                "space_id": self.spaceId,
-                "name": jobName,
-                "decision_optimization": {
-                    "solve_parameters": {"oaas.logAttachmentName": self.LOG_OUTPUT_ID, "oaas.logTailEnabled": "true"},
-                    "input_data": inputData,
-                    "output_data": [{"id": ".*\\.csv"}, {"id": ".*\\.txt"}],
-                },
-            }
+            payload = self.funGetJobDefinition(jobName, inputData)
 
             jsonPayload = json.dumps(payload)
 
         return jsonPayload
 
+    def funGetJobDefinition(self, jobName: str, inputData: object) -> dict:
+        return {
+            "deployment": {"id": self.deploymentId},
+            "space_id": self.spaceId,
+            "name": jobName,
+            "decision_optimization": {
+                "solve_parameters": {
+                    "oaas.logAttachmentName": self.LOG_OUTPUT_ID,
+                    "oaas.logTailEnabled": "true",
+                    **self.solveParameters,
+                },
+                "input_data": inputData,
+                "output_data": [{"id": ".*\\.csv"}, {"id": ".*\\.txt"}],
+            },
+        }
+
+    def funIterJobPayload(self, jobName: str = "DEFAULT_JOB", inputData: Optional[list] = None) -> Iterator[bytes]:
+        """
+        Yield the JSON payload of funGetJobPayload in parts, to stream it in the request body without
+        holding the whole serialised payload in memory.
+        Args:
+          inputData (list): the input tables, in the createJob format.
+          jobName(str) : Job name. Default = "DEFAULT_JOB.
+        Returns:
+            (Iterator[bytes]) : the parts of the payload, at most PAYLOAD_ROWS_PER_PART rows of a table each.
+        """
+        if inputData is None:
+            yield json.dumps({}).encode("utf-8")
+            return
+        # The tables are serialised in place of the marker
+        before, after = json.dumps(self.funGetJobDefinition(jobName, self.PAYLOAD_MARKER)).split(
+            json.dumps(self.PAYLOAD_MARKER)
+        )
+        yield (before + "[").encode("utf-8")
+        for tableIndex, table in enumerate(inputData):
+            tableBefore, tableAfter = json.dumps({**table, "values": self.PAYLOAD_MARKER}).split(
+                json.dumps(self.PAYLOAD_MARKER)
+            )
+            yield ((", " if tableIndex else "") + tableBefore + "[").encode("utf-8")
+            values = table["values"]
+            for start in range(0, len(values), self.PAYLOAD_ROWS_PER_PART):
+                rows = ", ".join(json.dumps(row) for row in values[start : start + self.PAYLOAD_ROWS_PER_PART])
+                yield ((", " if start else "") + rows).encode("utf-8")
+            yield ("]" + tableAfter).encode("utf-8")
+        yield ("]" + after).encode("utf-8")
+
     def funGetJobHeaders(self, accessToken: Optional[str] = None) -> dict:
 
         if accessToken is None:
@@ -114,7 +158,11 @@ class WMLJobClient:
         return headers
 
     def createJob(
-        self, inputData: list, jobName: str = "DEFAULT_JOB", accessToken: Optional[str] = None
+        self,
+        inputData: list,
+        jobName: str = "DEFAULT_JOB",
+        accessToken: Optional[str] = None,
+        streamPayload: bool = False,
     ) -> Optional[Union[dict, None]]:
         """
         A function that allows to create jobs on an optimization model already deployed on IBM's Watson studio
@@ -137,6 +185,7 @@ class WMLJobClient:
           ]
           jobName(str) : Job name. Default = "DEFAULT_JOB.
           accessToken (str) : access token which allows to request the API to submit the job. Default = None, it is essential when launching a package of jobs with the same access token.
+          streamPayload (bool) : if True, the payload is serialised while it is sent (chunked transfer encoding) instead of before. Default = False.
         Returns:
             jobResponseData (dict) : the response of the HTTPS request.
             :param inputData:
@@ -155,8 +204,13 @@ class WMLJobClient:
                 connection.request(
                     "POST",
                     self.REP_JOBS + self.VERSION_PARAMETER,
-                    self.funGetJobPayload(jobName, inputData),
+                    (
+                        self.funIterJobPayload(jobName, inputData)
+                        if streamPayload
+                        else self.funGetJobPayload(jobName, inputData)
+                    ),
                     self.funGetJobHeaders(accessToken),
+                    encode_chunked=streamPayload,
                 )
                 # Get the response
                 response = connection.getresponse()
@@ -221,3 +275,34 @@ class WMLJobClient:
                 # logger.loggingWarning(f"An error occurred while getting job: {jobID} data state : {e}")
                 print(f"An error occurred while getting job: {jobID} data state : {e}")
             return None
+
+    def funSaveJobData(self, jobID, output: BinaryIO, accessToken: Optional[str] = None) -> bool:
+        """
+        Copy the job details with the output data into a file while they are downloaded, instead of loading them
+        like funGetJobData.
+        Args:
+          jobID (str) : the job ID.
+          output (BinaryIO) : the opened file, e.g. a compressed job file (see optim.jobfile.open_job_for_write).
+          accessToken (str) : Default = None.
+        Returns:
+            (bool) : True if the job details were saved.
+        """
+        try:
+            connection = http.client.HTTPSConnection(self.apiDomain, 443)
+            connection.request(
+                "GET",
+                self.REP_JOB + jobID + self.VERSION_PARAMETER + self.SPACE_ID + self.spaceId,
+                self.funGetJobPayload(),
+                self.funGetJobHeaders(accessToken),
+            )
+            response = connection.getresponse()
+            if response.status != 200:
+                print(f"Error getting job details for job ID {jobID} : {response.read().decode('utf-8')}")
+                return False
+            shutil.copyfileobj(response, output, self.DOWNLOAD_CHUNK_SIZE)
+            print(f"Output data is retrieved for job ID: {jobID}")
+            return True
+
+        except Exception as e:
+            print(f"An error occurred while getting job: {jobID} data : {e}")
+            return False
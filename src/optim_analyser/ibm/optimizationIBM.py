@@ -1,8 +1,9 @@
-import json
 import os
 from time import sleep
 
+from optim_analyser.errors import OptimizationFail
 from optim_analyser.ibm import getJobsStatus, jobWMLRestClient, modelDeploymentWithRestClient
+from optim_analyser.optim import jobfile
 
 
 def create_model_and_deployment_distant(
@@ -50,7 +51,12 @@ def create_model_and_deployment_distant(
 
 
 def run_optimization_distant(
-    in_data: str, output_path: str, ibm_watson_ml_properties: dict, modelId: str, deploymentId: str
+    in_data: str,
+    output_path: str,
+    ibm_watson_ml_properties: dict,
+    modelId: str,
+    deploymentId: str,
+    solve_parameters: dict | None = None,
 ) -> None:
     apiDomain = ibm_watson_ml_properties["API_DOMAIN"]
     iamDomain = ibm_watson_ml_properties["IAM_DOMAIN"]
@@ -66,9 +72,12 @@ def run_optimization_distant(
         modelId=modelId,
         deploymentId=deploymentId,
         runtimeVersion=runtimeVersion,
+        solveParameters=solve_parameters,
     )
 
-    jobResponseData = job.createJob(inputData=in_data)
+    jobResponseData = job.createJob(
+        inputData=in_data, streamPayload=ibm_watson_ml_properties.get("STREAM_PAYLOAD", False)
+    )
     jobId = job.fungetJobId(jobResponseData)
     print("\nOptimization job sent to IBM Cloud")
 
@@ -87,8 +96,16 @@ def run_optimization_distant(
 
     if jobStatus.isCompleted(jobID=jobId):
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        with open(output_path, "w") as json_file:
-            json.dump(job.funGetJobData(jobID=jobId)["entity"], json_file, indent=4)
+        # The job details are written as they are downloaded, compressed if the path ends with .gz, .zst or .zip
+        with jobfile.open_job_for_write(output_path, binary=True) as job_file:
+            saved = job.funSaveJobData(jobID=jobId, output=job_file)
+        if not saved:
+            os.remove(output_path)
+            raise OptimizationFail(
+                "The results of the optimization job could not be retrieved",
+                error_code="WML_OUTPUT_NOT_RETRIEVED",
+                context={"job_id": jobId},
+            )
         print(f"Optimization completed, please check the results at {output_path}")
     elif jobStatus.isFailed(jobID=jobId):
         print("Optimization failed, please retry")
@@ -8,7 +8,7 @@ from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import pandas as pd
 
@@ -49,6 +49,21 @@ class OptimizationData:
         return list(self.dataframes.keys())
 
 
+@dataclass
+class JobSummary:
+    """Operation metadata of an optimization job file, read without loading its sheets."""
+
+    source_path: Path
+    operation_id: Optional[str] = None
+    optimisation_request_time: Optional[str] = None
+    step_number: Optional[int] = None
+    sheet_ids: List[str] = field(default_factory=list)
+
+    def is_job(self) -> bool:
+        """Check if the file contains the operation metadata of an optimization job."""
+        return self.operation_id is not None
+
+
 @dataclass
 class PlotParameters:
     """Visualization configuration."""
@@ -79,6 +94,8 @@ class OptimizationJob:
 
     # Results
     output_data: Optional[OptimizationData] = None
+    # Metrics read from the CPLEX log of the local run
+    solve_metrics: Optional["SolveMetrics"] = None
 
     def is_complete(self) -> bool:
         """Check if job completed successfully."""
@@ -88,11 +105,12 @@ class OptimizationJob:
         """Check if job failed."""
         return self.status == JobStatus.FAILED
 
-    def mark_completed(self, output_data: OptimizationData):
-        """Mark job as completed with results."""
+    def mark_completed(self, output_data: OptimizationData, solve_metrics: Optional["SolveMetrics"] = None):
+        """Mark job as completed with results, and the solve metrics of the run if known."""
         self.status = JobStatus.COMPLETED
         self.completed_at = datetime.now()
         self.output_data = output_data
+        self.solve_metrics = solve_metrics
 
     def mark_failed(self, error: str):
         """Mark job as failed with error message."""
@@ -160,11 +178,55 @@ class ModelInfo:
     model_name: str
     input_fields: List[str] = field(default_factory=list)
     output_fields: List[str] = field(default_factory=list)
+    # Type and name of the members of each tuple (without the 't_' prefix), in their order of declaration
+    tuple_members: Dict[str, List[Tuple[str, str]]] = field(default_factory=dict)
+    # Terms of the objective function that are not sums
+    objective_terms: List[str] = field(default_factory=list)
+    # Definition of each 'dexpr float' on a single line, without the comments
+    dexpr_definitions: Dict[str, str] = field(default_factory=dict)
+    # Index sets of each decision variable as declared, e.g. ['[isE_STORAGES]', '[isDECISION_STEPS]']
+    decision_variables: Dict[str, List[str]] = field(default_factory=dict)
 
     def has_costs_extension(self) -> bool:
         """Check if model supports cost extraction."""
         return "costs" in self.model_name.lower()
 
+    def used_columns(self, tuple_name: str) -> List[str]:
+        """Names of the members of the tuple, i.e. the columns of its datasheet read by the model."""
+        return [member for _, member in self.tuple_members.get(tuple_name, [])]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to a JSON serialisable dictionary."""
+        return {
+            "model_path": str(self.model_path),
+            "model_name": self.model_name,
+            "input_fields": self.input_fields,
+            "output_fields": self.output_fields,
+            "tuple_members": {
+                name: [list(member) for member in members] for name, members in self.tuple_members.items()
+            },
+            "objective_terms": self.objective_terms,
+            "dexpr_definitions": self.dexpr_definitions,
+            "decision_variables": self.decision_variables,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ModelInfo":
+        """Create from a dictionary written by to_dict."""
+        return cls(
+            model_path=Path(data["model_path"]),
+            model_name=data["model_name"],
+            input_fields=list(data["input_fields"]),
+            output_fields=list(data["output_fields"]),
+            tuple_members={
+                name: [(member_type, member) for member_type, member in members]
+                for name, members in data["tuple_members"].items()
+            },
+            objective_terms=list(data["objective_terms"]),
+            dexpr_definitions=dict(data["dexpr_definitions"]),
+            decision_variables={name: list(indexes) for name, indexes in data["decision_variables"].items()},
+        )
+
 
 @dataclass
 class IBMDeployment:
@@ -207,3 +269,155 @@ class VisualizationResult:
     def exists(self) -> bool:
         """Check if the HTML file was created."""
         return self.html_path.exists()
+
+
+@dataclass
+class OplRunResult:
+    """Result of a local run of an OPL model with oplrun."""
+
+    command: List[str]
+    return_code: int
+    elapsed_seconds: float
+    output: List[str] = field(default_factory=list)
+    # Metrics read from the CPLEX log while the output was streamed
+    metrics: Optional["SolveMetrics"] = None
+
+
+@dataclass
+class ConversionReport:
+    """Result of converting optimization job files to another format."""
+
+    converted: List[Path] = field(default_factory=list)
+    skipped: List[Path] = field(default_factory=list)
+    failed: Dict[Path, str] = field(default_factory=dict)
+    bytes_processed: int = 0
+    elapsed_seconds: float = 0.0
+
+    def files_per_second(self) -> float:
+        """Number of converted files per second."""
+        return len(self.converted) / self.elapsed_seconds if self.elapsed_seconds > 0 else 0.0
+
+    def bytes_per_second(self) -> float:
+        """Size of the converted job files read per second."""
+        return self.bytes_processed / self.elapsed_seconds if self.elapsed_seconds > 0 else 0.0
+
+
+@dataclass
+class ScenarioRunReport:
+    """Result of the local runs of the scenarios of a folder."""
+
+    completed: List[str] = field(default_factory=list)
+    failed: Dict[str, str] = field(default_factory=dict)
+    elapsed_seconds: float = 0.0
+    # Completed scenarios whose results were found in the result cache instead of being run
+    cached: List[str] = field(default_factory=list)
+
+
+@dataclass
+class ResultCacheStats:
+    """Lookups of the optimization results in the result cache since the start of the process."""
+
+    hits: int = 0
+    misses: int = 0
+    stored: int = 0
+
+    def hit_rate(self) -> float:
+        """Share of the lookups that found the results in the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+@dataclass
+class WarmStartReport:
+    """Result of a replay started from the solution of the original job."""
+
+    elapsed_seconds: float
+    # None when the solver log is not available (e.g. on IBM Watson ML)
+    accepted: Optional[bool] = None
+    # Duration of a replay of the same input data without warm start, if any
+    cold_elapsed_seconds: Optional[float] = None
+
+    def time_saved(self) -> Optional[float]:
+        """Seconds saved compared to the replay without warm start, None if it was not run."""
+        if self.cold_elapsed_seconds is None:
+            return None
+        return self.cold_elapsed_seconds - self.elapsed_seconds
+
+
+@dataclass
+class SolverProfile:
+    """Named CPLEX settings of the runs, overriding the settings of the model."""
+
+    name: str
+    # OPL names of the CPLEX parameters (e.g. 'epgap', 'tilim') and their values
+    parameters: Dict[str, float] = field(default_factory=dict)
+    description: str = ""
+
+    def mip_gap(self) -> float:
+        """Relative MIP gap tolerance of the runs, the CPLEX default (1e-4) if the profile does not set it."""
+        return float(self.parameters.get("epgap", 1e-4))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to a JSON serialisable dictionary."""
+        return {"name": self.name, "parameters": self.parameters, "description": self.description}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SolverProfile":
+        """Create from a dictionary written by to_dict."""
+        return cls(name=data["name"], parameters=dict(data["parameters"]), description=data.get("description", ""))
+
+
+@dataclass
+class SolveProgressPoint:
+    """Best solution and bound of a MIP search at a time of the run."""
+
+    seconds: Optional[float]
+    best_integer: Optional[float]
+    best_bound: Optional[float]
+    gap_percent: float
+
+
+@dataclass
+class SolveMetrics:
+    """Metrics of a local run read from the oplrun and CPLEX log, None when the log does not report them."""
+
+    elapsed_seconds: float = 0.0
+    # OPL model of the run: file name without extension and hash of its content, to follow the model versions
+    model_name: str = ""
+    model_digest: str = ""
+    recorded_at: datetime = field(default_factory=datetime.now)
+    status: Optional[str] = None
+    objective: Optional[float] = None
+    # Size of the problem after presolve
+    presolve_rows: Optional[int] = None
+    presolve_columns: Optional[int] = None
+    presolve_nonzeros: Optional[int] = None
+    presolve_seconds: Optional[float] = None
+    root_relaxation_seconds: Optional[float] = None
+    node_count: Optional[int] = None
+    best_integer: Optional[float] = None
+    best_bound: Optional[float] = None
+    gap_percent: Optional[float] = None
+    # Time of the optimization reported by CPLEX, without reading the model and the data
+    solve_seconds: Optional[float] = None
+    # Peak resident memory of oplrun, where the platform reports it, and peak memory of the branch-and-bound tree
+    peak_memory_mb: Optional[float] = None
+    peak_tree_memory_mb: Optional[float] = None
+    progress: List[SolveProgressPoint] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to a JSON serialisable dictionary."""
+        data = {name: getattr(self, name) for name in self.__dataclass_fields__}
+        data["recorded_at"] = self.recorded_at.isoformat()
+        data["progress"] = [
+            [point.seconds, point.best_integer, point.best_bound, point.gap_percent] for point in self.progress
+        ]
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SolveMetrics":
+        """Create from a dictionary written by to_dict."""
+        values = {name: data[name] for name in cls.__dataclass_fields__ if name in data}
+        values["recorded_at"] = datetime.fromisoformat(data["recorded_at"])
+        values["progress"] = [SolveProgressPoint(*point) for point in data.get("progress", [])]
+        return cls(**values)
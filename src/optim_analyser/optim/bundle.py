@@ -0,0 +1,133 @@
+"""Optimization job parsed once and shared by the workflows.
+
+A ``JobBundle`` holds the sheets of an optimization job together with its operation metadata, so that
+path resolution, loading and display all work on the same parsed data instead of each re-reading the
+.json file.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+from optim_analyser.errors import DataError
+from optim_analyser.models import OptimizationData
+from optim_analyser.optim import dataframes, path
+from optim_analyser.optim.sheets import LazySheets
+
+
+@dataclass
+class JobBundle(OptimizationData):
+    """Optimization job loaded from a .json file.
+
+    The operation metadata extracted from the OPERATION sheet is stored in ``metadata`` under the keys
+    'operation_id', 'optimisation_request_time', 'microgrid_name' and 'optim_name'.
+    """
+
+    source_path: str = ""
+    input_sheets: list[str] = field(default_factory=list)
+
+    @classmethod
+    def from_json(cls, json_file: str) -> JobBundle:
+        """
+        Parse the optimization job file once
+
+        :param json_file: The optimization job path (can be a .json or a .txt, compressed or not)
+        :type json_file: str
+        :return: The optimization job sheets and metadata
+        :rtype: JobBundle
+        """
+        data_in, data_out = dataframes.json_to_dataframes_split(json_file)
+        return cls.from_dataframes(data_in, data_out, source_path=json_file)
+
+    @classmethod
+    def from_dataframes(
+        cls, data_in: Mapping[str, pd.DataFrame], data_out: Mapping[str, pd.DataFrame], source_path: str = ""
+    ) -> JobBundle:
+        """
+        Build the bundle from already loaded input and output sheets
+
+        :param data_in: The input sheets of the optimization job
+        :type data_in: Mapping[str,pd.DataFrame]
+        :param data_out: The output sheets of the optimization job
+        :type data_out: Mapping[str,pd.DataFrame]
+        :param source_path: The file the sheets were loaded from, defaults to ""
+        :type source_path: str, optional
+        :return: The optimization job sheets and metadata
+        :rtype: JobBundle
+        """
+        return cls(
+            # The lazy sheets are kept unbuilt, LazySheets is used like the dictionary of the sheets
+            dataframes=LazySheets(data_in) | data_out,  # type: ignore[arg-type]
+            metadata=operation_metadata(data_in.get("OPERATION")),
+            source_path=source_path,
+            input_sheets=list(data_in),
+        )
+
+    @property
+    def operation_id(self) -> str:
+        return self._operation_value("operation_id")
+
+    @property
+    def optimisation_request_time(self) -> str:
+        return self._operation_value("optimisation_request_time")
+
+    @property
+    def microgrid_name(self) -> str:
+        return self._operation_value("microgrid_name")
+
+    @property
+    def optim_name(self) -> str:
+        """The microgrid name with the optimization request time, used in generated files names."""
+        return self._operation_value("optim_name")
+
+    def _operation_value(self, key: str) -> str:
+        # Same error as path.op_id_and_microgrid_name_date_from_json for the jobs without operation metadata
+        if key not in self.metadata:
+            raise DataError(
+                "No operation_id or optimisation_request_time found in the OPERATION sheet",
+                error_code="MISSING_OPERATION_DATA",
+                context={"path": self.source_path},
+            )
+        return str(self.metadata[key])
+
+    @property
+    def input_data(self) -> Mapping[str, pd.DataFrame]:
+        return self._sheets([name for name in self.input_sheets if name in self.dataframes])
+
+    @property
+    def output_data(self) -> Mapping[str, pd.DataFrame]:
+        return self._sheets([name for name in self.dataframes if name not in self.input_sheets])
+
+    def _sheets(self, names: list[str]) -> Mapping[str, pd.DataFrame]:
+        # The lazy sheets are not built
+        if isinstance(self.dataframes, LazySheets):
+            return self.dataframes.subset(names)
+        return {name: self.dataframes[name] for name in names}
+
+
+def operation_metadata(operation: pd.DataFrame | None) -> dict[str, str]:
+    """
+    Extract the operation metadata from the OPERATION sheet of an optimization job
+
+    :param operation: The OPERATION sheet, with the 'param_id' and 'param_val' columns
+    :type operation: pd.DataFrame | None
+    :return: The operation ID, the optimization request time, the microgrid name and the microgrid name with the optimization request time,
+    empty if the sheet is missing
+    :rtype: dict[str,str]
+    """
+    if operation is None or "param_id" not in operation.columns:
+        return {}
+    params = dict(zip(operation["param_id"], operation["param_val"]))
+    if "operation_id" not in params or "optimisation_request_time" not in params:
+        return {}
+    metadata = {
+        "operation_id": params["operation_id"],
+        "optimisation_request_time": str(params["optimisation_request_time"]),
+    }
+    metadata["microgrid_name"], metadata["optim_name"] = path.microgrid_name_date(
+        metadata["operation_id"], metadata["optimisation_request_time"]
+    )
+    return metadata
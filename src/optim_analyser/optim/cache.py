@@ -0,0 +1,435 @@
+"""On-disk cache of the parsed optimization data.
+
+The sheets loaded from a job or Excel file are stored column by column in binary files, in a folder named after
+the hash of the file content. Opening the same file again reads the columns back instead of parsing the file,
+each column being read when its sheet is first accessed.
+The least recently used entries are removed when the cache grows over its maximum size.
+
+Cache entry layout::
+
+    <cache_path>/<kind>-<hash>/
+        meta.json       # Groups, sheets, columns and how each column is stored
+        <n>.npy         # Numeric columns, category codes
+        <n>.json        # Text and mixed columns, category labels
+
+The entries of small values (e.g. the parsed OPL models) only contain their ``meta.json`` file. The entries of
+generated files (e.g. the OPL models of the local runs) contain the files, and their size and modification time
+in ``meta.json``.
+"""
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import itertools
+import json
+import os
+import shutil
+import uuid
+from collections.abc import Callable, Iterator, Mapping, Sequence
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from optim_analyser.config import Config
+from optim_analyser.optim.schema import SHEET_SCHEMAS
+from optim_analyser.optim.sheets import LazySheets, select_columns
+
+CACHE_FORMAT = 1  # To increase when the layout of the entries or the loaders output changes
+HASH_CHUNK_SIZE = 1 << 20
+
+_META_FILE = "meta.json"
+# The entries are invalidated when the column types of the schema change
+_VERSION = hashlib.blake2b(f"{CACHE_FORMAT}{sorted(SHEET_SCHEMAS.items())}".encode(), digest_size=4).hexdigest()
+
+Groups = dict[str, Mapping[str, pd.DataFrame]]
+
+
+class UncacheableData(Exception):
+    """Raised when a sheet contains values that cannot be stored in the cache."""
+
+
+class SheetCache:
+    """Content-addressed cache of the sheets loaded from job and Excel files.
+
+    Args:
+        folder: The folder containing the cache entries
+        max_size: The maximum size of the cache in bytes, the cache is disabled if it is 0
+    """
+
+    def __init__(self, folder: str | Path, max_size: int):
+        self.folder = Path(folder)
+        self.max_size = max_size
+
+    @classmethod
+    def from_config(cls, config: Config) -> SheetCache:
+        """Create the cache from the cache path and maximum size of the configuration."""
+        return cls(config.paths.cache_path, config.app.cache_max_size_mb * 1024 * 1024)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    def key(self, source_file: str | Path, kind: str) -> str:
+        """Return the key of the entry for the current content of the file, kind identifies the loader."""
+        return self.digest_key(kind, file_digest(source_file))
+
+    def digest_key(self, kind: str, digest: str) -> str:
+        """Return the key of the entry of a content hash, e.g. the hash of several files or of DataFrames."""
+        return f"{kind}-{_VERSION}-{digest}"
+
+    def load(self, key: str, fallback: Callable[[], Groups] | None = None) -> Groups | None:
+        """Return the lazy sheets of an entry, return None if the entry is missing or unreadable.
+
+        The columns are read when the sheets are accessed, fallback is called to load the sheets instead if the
+        entry has been removed in the meantime.
+        """
+        entry = self.folder / key
+        try:
+            with open(entry / _META_FILE, "r") as f:
+                meta = json.load(f)
+            groups: Groups = {}
+            for group, sheets in meta["groups"].items():
+                group_sheets = LazySheets()
+                for sheet in sheets:
+                    group_sheets.add_lazy(
+                        sheet["name"],
+                        [column["name"] for column in sheet["columns"]],
+                        _sheet_loader(entry, sheet, group, fallback),
+                    )
+                groups[group] = group_sheets
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError):
+            shutil.rmtree(entry, ignore_errors=True)  # Corrupted entry
+            return None
+        try:
+            os.utime(entry / _META_FILE)  # Most recently used
+        except OSError:
+            pass
+        return groups
+
+    def store(self, key: str, groups: Groups) -> None:
+        """Write the sheets as a new entry, nothing is stored if they cannot be cached or the disk write fails.
+
+        The lazy sheets are built one at a time and are not kept in their mapping.
+        """
+        entry = self.folder / key
+        temp_entry = self.folder / f"tmp-{uuid.uuid4().hex}"
+        try:
+            temp_entry.mkdir(parents=True)
+            files = itertools.count()
+            meta = {
+                "groups": {
+                    group: [_write_sheet(temp_entry, files, name, _whole_sheet(sheets, name)) for name in sheets]
+                    for group, sheets in groups.items()
+                }
+            }
+            with open(temp_entry / _META_FILE, "w") as f:
+                json.dump(meta, f)
+            if _folder_size(temp_entry) > self.max_size:
+                raise UncacheableData("The entry is larger than the cache")
+            os.rename(temp_entry, entry)
+        except (UncacheableData, OSError):
+            shutil.rmtree(temp_entry, ignore_errors=True)  # Also when the entry was written at the same time
+            return
+        self.evict()
+
+    def load_value(self, key: str) -> Any:
+        """Return the value of an entry written by store_value, return None if the entry is missing or unreadable."""
+        entry = self.folder / key
+        try:
+            with open(entry / _META_FILE, "r") as f:
+                value = json.load(f)["value"]
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError):
+            shutil.rmtree(entry, ignore_errors=True)  # Corrupted entry
+            return None
+        try:
+            os.utime(entry / _META_FILE)  # Most recently used
+        except OSError:
+            pass
+        return value
+
+    def store_value(self, key: str, value: Any) -> None:
+        """Write a JSON serialisable value as a new entry, nothing is stored if the disk write fails."""
+        entry = self.folder / key
+        temp_entry = self.folder / f"tmp-{uuid.uuid4().hex}"
+        try:
+            temp_entry.mkdir(parents=True)
+            with open(temp_entry / _META_FILE, "w") as f:
+                json.dump({"value": value}, f)
+            if _folder_size(temp_entry) > self.max_size:
+                raise UncacheableData("The entry is larger than the cache")
+            os.rename(temp_entry, entry)
+        except (UncacheableData, OSError):
+            shutil.rmtree(temp_entry, ignore_errors=True)
+            return
+        self.evict()
+
+    def load_files(self, key: str) -> dict[str, Path] | None:
+        """Return the paths of the files of an entry written by store_files, return None if the entry is missing.
+
+        The entry is removed if one of its files has been modified since it was stored, e.g. through a hard link.
+        """
+        entry = self.folder / key
+        try:
+            with open(entry / _META_FILE, "r") as f:
+                meta = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            meta = None
+        try:
+            files = {}
+            for name, stamp in meta["files"].items():
+                stat = os.stat(entry / name)
+                if [stat.st_size, stat.st_mtime_ns] != stamp:
+                    raise ValueError(f"{name} has been modified")
+                files[name] = entry / name
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            shutil.rmtree(entry, ignore_errors=True)  # Corrupted entry
+            return None
+        try:
+            os.utime(entry / _META_FILE)  # Most recently used
+        except OSError:
+            pass
+        return files
+
+    def store_files(self, key: str, writer: Callable[[Path], None]) -> None:
+        """Write the files created by writer in the folder it is given as a new entry.
+
+        Nothing is stored if the disk write fails, the exceptions raised by writer are propagated.
+        """
+        entry = self.folder / key
+        temp_entry = self.folder / f"tmp-{uuid.uuid4().hex}"
+        try:
+            temp_entry.mkdir(parents=True)
+            writer(temp_entry)
+            stamps = {}
+            for file in temp_entry.iterdir():
+                stat = file.stat()
+                stamps[file.name] = [stat.st_size, stat.st_mtime_ns]
+            with open(temp_entry / _META_FILE, "w") as f:
+                json.dump({"files": stamps}, f)
+            if _folder_size(temp_entry) > self.max_size:
+                raise UncacheableData("The entry is larger than the cache")
+            os.rename(temp_entry, entry)
+        except (UncacheableData, OSError):
+            shutil.rmtree(temp_entry, ignore_errors=True)
+            return
+        except BaseException:
+            shutil.rmtree(temp_entry, ignore_errors=True)
+            raise
+        self.evict()
+
+    def evict(self) -> None:
+        """Remove the least recently used entries until the cache size is below its maximum size."""
+        if not self.folder.is_dir():
+            return
+        entries = []
+        for entry in self.folder.iterdir():
+            try:
+                entries.append((os.stat(entry / _META_FILE).st_mtime, _folder_size(entry), entry))
+            except OSError:
+                continue  # Entry being written or removed
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total_size -= size
+
+    def invalidate(self, source_file: str | Path) -> None:
+        """Remove the entries of the current content of the file."""
+        if not self.folder.is_dir():
+            return
+        for entry in self.folder.glob(f"*-{file_digest(source_file)}"):
+            shutil.rmtree(entry, ignore_errors=True)
+
+    def clear(self) -> None:
+        """Remove all the entries."""
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def stats(self) -> dict[str, tuple[int, int]]:
+        """Return the number of entries and their size in bytes for each kind of entry."""
+        stats: dict[str, tuple[int, int]] = {}
+        if not self.folder.is_dir():
+            return stats
+        for entry in self.folder.iterdir():
+            if not entry.is_dir() or entry.name.startswith("tmp-"):
+                continue
+            kind = entry.name.rsplit("-", 2)[0]
+            try:
+                size = _folder_size(entry)
+            except OSError:
+                continue  # Entry being removed
+            entries, total_size = stats.get(kind, (0, 0))
+            stats[kind] = (entries + 1, total_size + size)
+        return stats
+
+    def size(self) -> int:
+        """Return the size of the cache in bytes."""
+        if not self.folder.is_dir():
+            return 0
+        return sum(_folder_size(entry) for entry in self.folder.iterdir() if entry.is_dir())
+
+
+def default_cache() -> SheetCache:
+    """
+    Return the cache configured by the CACHE_PATH and CACHE_MAX_SIZE_MB environment variables
+
+    :return: The cache of the parsed optimization data
+    :rtype: SheetCache
+    """
+    return SheetCache.from_config(Config.from_env())
+
+
+def load_cached(source_file: str | Path, kind: str, loader: Callable[[], Groups]) -> Groups:
+    """
+    Return the sheets of the file from the cache, or load them and store them in the cache
+
+    :param source_file: The loaded file path
+    :type source_file: str | Path
+    :param kind: The name of the loader, files loaded by different loaders have different entries
+    :type kind: str
+    :param loader: Called to load the sheets when the file is not in the cache
+    :type loader: Callable[[],dict[str,Mapping[str,pd.DataFrame]]]
+    :return: The groups of sheets (e.g. input and output data) with the names of the sheets and their content,
+    the cached sheets are read when accessed
+    :rtype: dict[str,Mapping[str,pd.DataFrame]]
+    """
+    cache = default_cache()
+    if not cache.enabled:
+        return loader()
+    key = cache.key(source_file, kind)
+    fallback = functools.cache(loader)  # Parses the file at most once
+    groups = cache.load(key, fallback)
+    if groups is None:
+        groups = loader()
+        cache.store(key, groups)
+        # The sheets are read back from the new entry so that the parsed data is not kept in memory
+        groups = cache.load(key, fallback) or groups
+    return groups
+
+
+def file_digest(source_file: str | Path) -> str:
+    """
+    Return the hash of the content of the file
+
+    :param source_file: The file path
+    :type source_file: str | Path
+    :return: The hexadecimal hash
+    :rtype: str
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    with open(source_file, "rb") as f:
+        while chunk := f.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def frames_digest(frames: Mapping[str, pd.DataFrame]) -> str:
+    """
+    Return a hash of the names, columns and values of the sheets, in their order
+
+    :param frames: The names of the datasheets and their content
+    :type frames: Mapping[str,pd.DataFrame]
+    :return: The hexadecimal hash, identical for identical values whether the text columns are categorical or not
+    :rtype: str
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    for name, frame in frames.items():
+        digest.update(json.dumps([name, [str(column) for column in frame.columns], len(frame)]).encode())
+        digest.update(pd.util.hash_pandas_object(frame, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _folder_size(folder: Path) -> int:
+    return sum(file.stat().st_size for file in folder.iterdir())
+
+
+def _write_sheet(entry: Path, files: Iterator[int], name: str, sheet: pd.DataFrame) -> dict[str, Any]:
+    """Write the columns of the sheet and return their description."""
+    if not isinstance(sheet.index, pd.RangeIndex) or sheet.index.start != 0 or sheet.index.step != 1:
+        raise UncacheableData("Only sheets with a default index are cached")
+    return {
+        "name": name,
+        "rows": len(sheet),
+        "columns": [_write_column(entry, files, column, sheet.iloc[:, i]) for i, column in enumerate(sheet.columns)],
+    }
+
+
+def _write_column(entry: Path, files: Iterator[int], name: Any, column: pd.Series) -> dict[str, Any]:
+    """Write the values of the column and return its description."""
+    if not isinstance(name, (str, int, float, type(None))):
+        raise UncacheableData(f"Column name {name!r} is not cached")
+    description: dict[str, Any] = {"name": name}
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        description["categories"] = _write_column(entry, files, None, pd.Series(column.cat.categories))
+        description["ordered"] = bool(column.cat.ordered)
+        column = pd.Series(column.cat.codes)
+    if isinstance(column.dtype, np.dtype) and column.dtype.kind in "biufcmM":
+        description["file"] = f"{next(files)}.npy"
+        np.save(entry / description["file"], column.to_numpy(), allow_pickle=False)
+    elif column.dtype == object:
+        description["file"] = f"{next(files)}.json"
+        try:
+            with open(entry / description["file"], "w") as f:
+                json.dump(column.tolist(), f)
+        except TypeError as e:  # e.g. dates read from Excel in a text column
+            raise UncacheableData(str(e)) from e
+    else:
+        raise UncacheableData(f"Column type {column.dtype} is not cached")
+    return description
+
+
+def _whole_sheet(sheets: Mapping[str, pd.DataFrame], name: str) -> pd.DataFrame:
+    return sheets.select(name) if isinstance(sheets, LazySheets) else sheets[name]
+
+
+def _sheet_loader(
+    entry: Path, sheet: dict[str, Any], group: str, fallback: Callable[[], Groups] | None
+) -> Callable[[Sequence[str] | None], pd.DataFrame]:
+    """Return the function reading the columns of the sheet from the entry."""
+
+    def load(columns: Sequence[str] | None) -> pd.DataFrame:
+        try:
+            return _read_sheet(entry, sheet, columns)
+        except (OSError, ValueError, KeyError):
+            if fallback is None:
+                raise
+            # The entry has been evicted or corrupted since it was opened
+            if columns is None:
+                return _whole_sheet(fallback()[group], sheet["name"])
+            return select_columns(fallback()[group], sheet["name"], columns)
+
+    return load
+
+
+def _read_sheet(entry: Path, sheet: dict[str, Any], columns: Sequence[str] | None = None) -> pd.DataFrame:
+    descriptions = sheet["columns"]
+    if columns is not None:
+        by_name = {column["name"]: column for column in descriptions}
+        descriptions = [by_name[name] for name in columns if name in by_name]
+    values = [_read_column(entry, column) for column in descriptions]
+    data = pd.DataFrame(dict(enumerate(values)), index=pd.RangeIndex(sheet["rows"]))
+    data.columns = [column["name"] for column in descriptions]
+    return data
+
+
+def _read_column(entry: Path, column: dict[str, Any]) -> pd.Series:
+    if column["file"].endswith(".npy"):
+        values = pd.Series(np.load(entry / column["file"], allow_pickle=False))
+    else:
+        with open(entry / column["file"], "r") as f:
+            values = pd.Series(json.load(f), dtype=object)
+    if "categories" in column:
+        categories = _read_column(entry, column["categories"])
+        values = pd.Series(
+            pd.Categorical.from_codes(values.to_numpy(), categories=categories, ordered=column["ordered"])
+        )
+    return values
@@ -0,0 +1,269 @@
+"""Bulk conversion of optimization job files to Excel, CSV or Parquet.
+
+The job files of a folder (and of its subfolders) are converted one per process, the converted files mirror
+the folder tree in the output folder. A job whose converted file is more recent than the job is skipped, the
+outputs are written under a temporary name and renamed once complete so that an interrupted conversion is
+not taken for an up-to-date one.
+
+The output formats are registered in ``OUTPUT_FORMATS`` with ``register_format``. The formats used with
+several processes must be registered when their module is imported, as the conversion processes only know
+the formats registered at import time.
+"""
+
+from __future__ import annotations
+
+import functools
+import os
+import shutil
+import time
+import uuid
+from collections.abc import Callable, Mapping
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+
+import pandas as pd
+
+from optim_analyser.errors import ValidationError
+from optim_analyser.models import ConversionReport
+from optim_analyser.optim import dataframes
+from optim_analyser.optim.jobfile import JSON_JOB_SUFFIXES
+
+CONVERTED = "converted"
+SKIPPED = "skipped"
+FAILED = "failed"
+
+
+@dataclass(frozen=True)
+class OutputFormat:
+    """Output format of the conversion.
+
+    Args:
+        name: The format name used on the command line
+        suffix: The suffix of the converted file, empty for the formats written as a folder of files
+        writer: Writes the sheets to the given path, such as dataframes.dataframe_to_excel
+    """
+
+    name: str
+    suffix: str
+    writer: Callable[[Mapping[str, pd.DataFrame], str], None]
+
+    @property
+    def is_folder(self) -> bool:
+        return not self.suffix
+
+
+OUTPUT_FORMATS: dict[str, OutputFormat] = {}
+
+
+def register_format(name: str, suffix: str, writer: Callable[[Mapping[str, pd.DataFrame], str], None]) -> None:
+    """
+    Register an output format of the conversion
+
+    :param name: The format name (e.g. 'xlsx')
+    :type name: str
+    :param suffix: The suffix of the converted file (e.g. '.xlsx'), empty if the sheets are written in a folder
+    :type suffix: str
+    :param writer: Writes the sheets names and their content to the converted file or folder path
+    :type writer: Callable[[Mapping[str,pd.DataFrame],str],None]
+    """
+    OUTPUT_FORMATS[name] = OutputFormat(name, suffix, writer)
+
+
+register_format("xlsx", ".xlsx", functools.partial(dataframes.dataframe_to_excel, streaming=True))
+register_format("csv", "", dataframes.dataframe_to_csvs)
+register_format("parquet", "", dataframes.dataframe_to_parquets)
+
+
+def job_stem(job_file: str | Path) -> str:
+    """
+    Return the name of the job file without its suffixes (e.g. 'job' for 'job.json.gz')
+
+    :param job_file: The optimization job path
+    :type job_file: str | Path
+    :return: The job name
+    :rtype: str
+    """
+    name = Path(job_file).name
+    for suffixes in ((".gz", ".zst", ".zip"), (".json", ".txt")):
+        for suffix in suffixes:
+            if name.lower().endswith(suffix):
+                name = name[: -len(suffix)]
+                break
+    return name
+
+
+def find_job_files(input_path: str | Path, recursive: bool = False) -> list[Path]:
+    """
+    List the optimization job files to convert
+
+    :param input_path: A job file, or a folder containing job files
+    :type input_path: str | Path
+    :param recursive: If True, the job files of the subfolders are also listed, defaults to False
+    :type recursive: bool, optional
+    :return: The job files (.json, .json.gz, .json.zst, .zip) sorted by path, or the input path if it is a file
+    :rtype: list[Path]
+    """
+    input_path = Path(input_path)
+    if not input_path.is_dir():
+        return [input_path]
+    files = input_path.rglob("*") if recursive else input_path.iterdir()
+    return sorted(file for file in files if file.is_file() and file.name.lower().endswith(JSON_JOB_SUFFIXES))
+
+
+def target_path(job_file: Path, input_root: Path, output_root: Path, output_format: OutputFormat) -> Path:
+    """
+    Return the path of the converted job, in the same subfolder of the output folder as the job in the input folder
+
+    :param job_file: The optimization job path
+    :type job_file: Path
+    :param input_root: The converted folder
+    :type input_root: Path
+    :param output_root: The folder of the converted files
+    :type output_root: Path
+    :param output_format: The output format
+    :type output_format: OutputFormat
+    :return: The converted file path, or folder path for the formats written as a folder
+    :rtype: Path
+    """
+    return output_root / job_file.parent.relative_to(input_root) / f"{job_stem(job_file)}{output_format.suffix}"
+
+
+def is_up_to_date(job_file: Path, target: Path) -> bool:
+    """
+    Check if the converted job is more recent than the job
+
+    :param job_file: The optimization job path
+    :type job_file: Path
+    :param target: The converted file or folder path
+    :type target: Path
+    :return: True if the converted job exists and has been written after the last modification of the job
+    :rtype: bool
+    """
+    return target.exists() and target.stat().st_mtime >= job_file.stat().st_mtime
+
+
+def convert_job(job_file: str | Path, target: str | Path, format_name: str = "xlsx") -> None:
+    """
+    Convert an optimization job to the output format
+
+    :param job_file: The optimization job path
+    :type job_file: str | Path
+    :param target: The converted file or folder path, replaced if it exists
+    :type target: str | Path
+    :param format_name: The output format name, defaults to 'xlsx'
+    :type format_name: str, optional
+    """
+    output_format = OUTPUT_FORMATS[format_name]
+    target = Path(target)
+    # The conversions must not fill the cache of the parsed files
+    data = dataframes.json_to_dataframe(str(job_file), cached=False)
+
+    target.parent.mkdir(parents=True, exist_ok=True)
+    temp_target = target.with_name(f".{target.stem}.tmp-{uuid.uuid4().hex}{target.suffix}")
+    try:
+        output_format.writer(data, str(temp_target))
+        if output_format.is_folder and target.exists():
+            shutil.rmtree(target)
+        os.replace(temp_target, target)
+    finally:
+        if temp_target.is_dir():
+            shutil.rmtree(temp_target, ignore_errors=True)
+        elif temp_target.exists():
+            temp_target.unlink()
+
+
+def _convert_task(job_file: Path, target: Path, format_name: str, force: bool) -> tuple[str, int, str]:
+    """Convert one job in a conversion process, return the status, the job size and the error message."""
+    try:
+        if not force and is_up_to_date(job_file, target):
+            return SKIPPED, 0, ""
+        convert_job(job_file, target, format_name)
+        return CONVERTED, job_file.stat().st_size, ""
+    except Exception as e:  # One failed job does not stop the conversion of the others
+        return FAILED, 0, f"{type(e).__name__}: {e}"
+
+
+def convert_jobs(
+    input_path: str | Path,
+    output_path: str | Path | None = None,
+    format_name: str = "xlsx",
+    recursive: bool = False,
+    jobs: int = 1,
+    force: bool = False,
+    on_result: Callable[[Path, str, str], None] | None = None,
+) -> ConversionReport:
+    """
+    Convert an optimization job, or all the jobs of a folder, to the output format
+
+    :param input_path: A job file, or a folder containing job files
+    :type input_path: str | Path
+    :param output_path: The converted file path for a job file, the folder of the converted files for a folder,
+    defaults to None to write the converted files next to the jobs
+    :type output_path: str | Path | None, optional
+    :param format_name: The output format name ('xlsx', 'csv', 'parquet' or a registered format), defaults to 'xlsx'
+    :type format_name: str, optional
+    :param recursive: If True, the jobs of the subfolders are also converted, defaults to False
+    :type recursive: bool, optional
+    :param jobs: The number of conversion processes, defaults to 1 to convert in the current process
+    :type jobs: int, optional
+    :param force: If True, the jobs are converted even if their converted files are up to date, defaults to False
+    :type force: bool, optional
+    :param on_result: Called with the job path, its status ('converted', 'skipped' or 'failed') and the error
+    message after each job, defaults to None
+    :type on_result: Callable[[Path,str,str],None] | None, optional
+    :raises ValidationError: If the format is unknown, the number of processes is not positive or the input is missing
+    :return: The converted, skipped and failed jobs with the size of the converted jobs and the conversion time
+    :rtype: ConversionReport
+    """
+    if format_name not in OUTPUT_FORMATS:
+        raise ValidationError(
+            f"Unknown output format '{format_name}'",
+            error_code="UNKNOWN_FORMAT",
+            context={"formats": list(OUTPUT_FORMATS)},
+        )
+    if jobs < 1:
+        raise ValidationError("The number of conversion processes must be at least 1", context={"jobs": jobs})
+    input_path = Path(input_path)
+    if not input_path.exists():
+        raise ValidationError(f"Input not found: {input_path}", error_code="INPUT_NOT_FOUND")
+    output_format = OUTPUT_FORMATS[format_name]
+
+    if input_path.is_dir():
+        output_root = Path(output_path) if output_path else input_path
+        tasks = [
+            (job_file, target_path(job_file, input_path, output_root, output_format))
+            for job_file in find_job_files(input_path, recursive)
+        ]
+    else:
+        target = Path(output_path) if output_path else input_path.with_name(job_stem(input_path) + output_format.suffix)
+        tasks = [(input_path, target)]
+
+    report = ConversionReport()
+    start = time.perf_counter()
+
+    def add_result(job_file: Path, status: str, size: int, error: str) -> None:
+        if status == CONVERTED:
+            report.converted.append(job_file)
+            report.bytes_processed += size
+        elif status == SKIPPED:
+            report.skipped.append(job_file)
+        else:
+            report.failed[job_file] = error
+        if on_result is not None:
+            on_result(job_file, status, error)
+
+    if jobs == 1 or len(tasks) <= 1:
+        for job_file, target in tasks:
+            add_result(job_file, *_convert_task(job_file, target, format_name, force))
+    else:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(tasks))) as executor:
+            futures = {
+                executor.submit(_convert_task, job_file, target, format_name, force): job_file
+                for job_file, target in tasks
+            }
+            for future in as_completed(futures):
+                add_result(futures[future], *future.result())
+
+    report.elapsed_seconds = time.perf_counter() - start
+    return report
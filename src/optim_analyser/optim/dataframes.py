@@ -1,63 +1,148 @@
 from __future__ import annotations
 
-import json
+import csv
+import datetime
+import math
 import os
+from collections.abc import Iterator, Mapping, Sequence
+from pathlib import Path
+from typing import Any
 
+import numpy as np
+import openpyxl
 import pandas as pd
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Border, Font, Side
+
+from optim_analyser.errors import ConfigurationError, DataError
+from optim_analyser.models import JobSummary
+from optim_analyser.optim import excel
+from optim_analyser.optim.cache import load_cached
+from optim_analyser.optim.jobfile import JSON_JOB_SUFFIXES, open_job
+from optim_analyser.optim.schema import apply_schema
+from optim_analyser.optim.sheets import LazySheets
+from optim_analyser.optim.streaming import JOB_SECTIONS, SheetPayload, iter_job_sheets
+
+EXCEL_ROWS_PER_BATCH = 10000  # Number of rows converted at once by the streaming Excel writer
+_THIN_SIDE = Side(style="thin")
+
+# Output sheets kept when loading all the data of an optimization job
+OUTPUT_SHEETS = [
+    "OPERATION_OUTPUT",
+    "OPERATION_STEPS_OUTPUT",
+    "ASSETS_OUTPUT",
+    "ASSET_STEPS_OUTPUT",
+    "VIOLATIONS_OUTPUT",
+    "MARKET_BIDS_OUTPUT",
+    "ASSET_STEPS_COST",
+    "STEP_COSTS",
+    "COSTS",
+]
+
+
+def sheet_name_from_id(sheet_id: str) -> str:
+    """
+    Return the sheet name corresponding to the id of a sheet in the optimization job
+
+    :param sheet_id: The sheet id in the optimization job (e.g. 'ASSETS.csv')
+    :type sheet_id: str
+    :return: The sheet name without the '.csv' extension
+    :rtype: str
+    """
+    # Remove '.csv' from the end of the sheet name if it exists
+    if sheet_id.endswith(".csv"):
+        return sheet_id[:-4]
+    return sheet_id
+
+
+def sheet_to_dataframe(sheet: SheetPayload, columns: Sequence[str] | None = None) -> pd.DataFrame:
+    """
+    Build the DataFrame of a sheet read from the optimization job
+
+    :param sheet: The sheet fields and values
+    :type sheet: SheetPayload
+    :param columns: The columns to build, all the columns if None, defaults to None
+    :type columns: Sequence[str] | None, optional
+    :return: The sheet content
+    :rtype: pd.DataFrame
+    """
+    fields = list(sheet.fields) if columns is None else [field for field in columns if field in sheet.fields]
+    if sheet.values is None:
+        return pd.DataFrame(data=[], columns=fields)
+    values = sheet.values
+    if columns is not None:
+        values = values[:, [sheet.fields.index(field) for field in fields]]
+    # Same dtypes inference as when building the DataFrame from the list of rows
+    return pd.DataFrame(values, columns=fields).infer_objects()
 
 
-def json_to_dataframe(json_file: str) -> dict[str, pd.DataFrame]:
+def lazy_sheet(sheets: LazySheets, sheet_name: str, sheet: SheetPayload) -> None:
+    """
+    Add a sheet read from the optimization job to the lazy sheets, its DataFrame is built when first accessed
+
+    :param sheets: The lazy sheets
+    :type sheets: LazySheets
+    :param sheet_name: The sheet name (e.g. 'ASSET_STEPS')
+    :type sheet_name: str
+    :param sheet: The sheet fields and values
+    :type sheet: SheetPayload
+    """
+    sheets.add_lazy(
+        sheet_name, sheet.fields, lambda columns: apply_schema(sheet_name, sheet_to_dataframe(sheet, columns))
+    )
+
+
+def json_to_dataframe(json_file: str, cached: bool = True) -> LazySheets:
     """
     Read the .json file and return the dictionnary containing the names
-    of the sheets and their content in the associated pd.Dataframes
+    of the sheets and their content in the associated pd.Dataframes.
+    The DataFrame of a sheet is built when the sheet is first accessed.
 
-    :param json_file: The optimization job path (can be a .json or a .txt)
+    :param json_file: The optimization job path (can be a .json or a .txt, compressed or not)
     :type json_file: str
+    :param cached: If False, the file is parsed without reading or writing the cache, defaults to True
+    :type cached: bool, optional
     :return: The dictionnary containing the names of the datasheets and their content
-    :rtype: dict[str,pd.DataFrame]
+    :rtype: LazySheets
     """
+    data_in, data_out = json_to_dataframes_split(json_file, cached=cached)
+    return data_in | data_out
 
-    with open(json_file, "r") as f:
-        json_data = json.load(f)
-
-        if "entity" in json_data:
-            json_data = json_data["entity"]
-
-        data = dict()
-
-        for sheet_data in json_data["decision_optimization"]["input_data"]:
-            sheet_name = sheet_data["id"]
-            # Remove '.csv' from the end of the sheet name if it exists
-            if sheet_name.endswith(".csv"):
-                sheet_name = sheet_name[:-4]
-            columns = sheet_data["fields"]
-            values = sheet_data["values"]
-
-            sheet_df = pd.DataFrame(data=values, columns=columns)
-            data[sheet_name] = sheet_df
-
-        for sheet_data in json_data["decision_optimization"]["output_data"]:
-            sheet_name = sheet_data["id"]
-            # Remove '.csv' from the end of the sheet name if it exists
-            if sheet_name.endswith(".csv"):
-                sheet_name = sheet_name[:-4]
-                if sheet_name in [
-                    "OPERATION_OUTPUT",
-                    "OPERATION_STEPS_OUTPUT",
-                    "ASSETS_OUTPUT",
-                    "ASSET_STEPS_OUTPUT",
-                    "VIOLATIONS_OUTPUT",
-                    "MARKET_BIDS_OUTPUT",
-                    "ASSET_STEPS_COST",
-                    "STEP_COSTS",
-                    "COSTS",
-                ]:
-                    columns = sheet_data["fields"]
-                    values = sheet_data["values"]
-                    sheet_df = pd.DataFrame(data=values, columns=columns)
-                    data[sheet_name] = sheet_df
-
-    return data
+
+def json_to_dataframes_split(json_file: str, cached: bool = True) -> tuple[LazySheets, LazySheets]:
+    """
+    Read the .json file and return the input sheets and the known output sheets separately.
+    The sheets are read from the cache if the same file content has already been loaded, and the DataFrame
+    of a sheet is built when the sheet is first accessed.
+
+    :param json_file: The optimization job path (can be a .json or a .txt, compressed or not)
+    :type json_file: str
+    :param cached: If False, the file is parsed without reading or writing the cache, defaults to True
+    :type cached: bool, optional
+    :return: The dictionnaries containing the names of the input and output datasheets and their content
+    :rtype: LazySheets,LazySheets
+    """
+    if not cached:
+        return _read_json_split(json_file)
+    data = load_cached(json_file, "job", lambda: dict(zip(JOB_SECTIONS, _read_json_split(json_file))))
+    return data["input_data"], data["output_data"]
+
+
+def _read_json_split(json_file: str) -> tuple[LazySheets, LazySheets]:
+    """Parse the .json file, see json_to_dataframes_split."""
+
+    def keep_sheet(section: str, sheet_id: str) -> bool:
+        # Only the known output sheets with a '.csv' id are kept
+        return section == "input_data" or (sheet_id.endswith(".csv") and sheet_name_from_id(sheet_id) in OUTPUT_SHEETS)
+
+    data_in = LazySheets()
+    data_out = LazySheets()
+    with open_job(json_file) as f:
+        for sheet in iter_job_sheets(f, sheet_filter=keep_sheet):
+            data = data_in if sheet.section == "input_data" else data_out
+            lazy_sheet(data, sheet_name_from_id(sheet.sheet_id), sheet)
+
+    return data_in, data_out
 
 
 def json_to_input_output_dataframes(json_file: str) -> tuple[dict[str, pd.DataFrame], dict[str, pd.DataFrame]]:
@@ -65,55 +150,104 @@ def json_to_input_output_dataframes(json_file: str) -> tuple[dict[str, pd.DataFr
     Read the .json file and return the dictionnary containing the names
     of the sheets and their content in the associated pd.Dataframes
 
-    :param json_file: The optimization job path (can be a .json or a .txt)
+    :param json_file: The optimization job path (can be a .json or a .txt, compressed or not)
     :type json_file: str
     :return: The dictionnaries containing the names of the input and output datasheets and their content
     :rtype: dict[str,pd.DataFrame],dict[str,pd.DataFrame]
     """
 
-    with open(json_file, "r") as f:
-        json_data = json.load(f)
-
-        if "entity" in json_data:
-            json_data = json_data["entity"]
-
-        data_in = dict()
-        data_out = dict()
-        for sheet_data in json_data["decision_optimization"]["input_data"]:
-            sheet_name = sheet_data["id"]
-            # Remove '.csv' from the end of the sheet name if it exists
-            if sheet_name.endswith(".csv"):
-                sheet_name = sheet_name[:-4]
-            columns = sheet_data["fields"]
-            values = sheet_data["values"]
-
-            sheet_df = pd.DataFrame(data=values, columns=columns)
-            data_in[sheet_name] = sheet_df
-
-        for sheet_data in json_data["decision_optimization"]["output_data"]:
-            sheet_name = sheet_data["id"]
-            # Remove '.csv' from the end of the sheet name if it exists
-            if sheet_name.endswith(".csv"):
-                sheet_name = sheet_name[:-4]
-            columns = sheet_data["fields"]
-            values = sheet_data["values"]
-
-            sheet_df = pd.DataFrame(data=values, columns=columns)
-            data_out[sheet_name] = sheet_df
-            if sheet_name == "OPERATION_STEPS_OUTPUT":
-                break
+    data_in = dict()
+    data_out = dict()
+
+    def keep_sheet(section: str, sheet_id: str) -> bool:
+        # The output sheets after OPERATION_STEPS_OUTPUT are not used
+        return section == "input_data" or "OPERATION_STEPS_OUTPUT" not in data_out
+
+    with open_job(json_file) as f:
+        for sheet in iter_job_sheets(f, sheet_filter=keep_sheet):
+            sheet_name = sheet_name_from_id(sheet.sheet_id)
+            if sheet.section == "input_data":
+                data_in[sheet_name] = apply_schema(sheet_name, sheet_to_dataframe(sheet))
+            else:
+                data_out[sheet_name] = apply_schema(sheet_name, sheet_to_dataframe(sheet))
+                if "OPERATION_STEPS_OUTPUT" in data_out and data_in:
+                    break
 
     return data_in, data_out
 
 
-def dataframe_to_excel(dataframe: dict[str, pd.DataFrame], output_file: str) -> None:
+def probe_job(json_file: str, with_sheet_ids: bool = True) -> JobSummary:
+    """
+    Read the operation metadata of the optimization job without loading its sheets.
+    Only the OPERATION sheet is decoded, the values of the other sheets are skipped, and the file is not read
+    further than the OPERATION sheet if the sheet ids are not required.
+
+    :param json_file: The optimization job path (can be a .json or a .txt, compressed or not)
+    :type json_file: str
+    :param with_sheet_ids: If True, the ids of all the sheets of the job are listed, defaults to True
+    :type with_sheet_ids: bool, optional
+    :return: The operation ID, the optimization request time, the number of optimization steps and the sheet ids
+    :rtype: JobSummary
+    """
+    summary = JobSummary(source_path=Path(json_file))
+    sections = JOB_SECTIONS if with_sheet_ids else ("input_data",)
+
+    with open_job(json_file) as f:
+        for sheet in iter_job_sheets(
+            f, sections=sections, sheet_filter=lambda _, sheet_id: sheet_id == "OPERATION.csv", include_skipped=True
+        ):
+            if with_sheet_ids:
+                summary.sheet_ids.append(sheet.sheet_id)
+            if sheet.sheet_id != "OPERATION.csv" or sheet.skipped:
+                continue
+
+            params = {row[0]: row[1] for row in sheet.values} if sheet.values is not None else {}
+            summary.operation_id = params.get("operation_id")
+            if "optimisation_request_time" in params:
+                summary.optimisation_request_time = str(params["optimisation_request_time"])
+            try:
+                summary.step_number = int(params["optimisation_step_number"])
+            except (KeyError, TypeError, ValueError):
+                pass
+            if not with_sheet_ids:
+                break
+
+    return summary
+
+
+def probe_job_folder(folder: str, with_sheet_ids: bool = False) -> list[JobSummary]:
+    """
+    Read the operation metadata of all the optimization jobs (.json files, compressed or not) of the folder
+
+    :param folder: The folder containing the optimization jobs
+    :type folder: str
+    :param with_sheet_ids: If True, the ids of all the sheets of the jobs are listed, defaults to False
+    :type with_sheet_ids: bool, optional
+    :return: The metadata of the optimization jobs sorted by file name, the files which are not optimization jobs are ignored
+    :rtype: list[JobSummary]
+    """
+    summaries = []
+    for json_file in sorted(f for f in os.listdir(folder) if f.lower().endswith(JSON_JOB_SUFFIXES)):
+        try:
+            summary = probe_job(os.path.join(folder, json_file), with_sheet_ids=with_sheet_ids)
+        except (DataError, UnicodeDecodeError, EOFError, OSError):  # Also the truncated compressed files
+            continue
+        if summary.is_job():
+            summaries.append(summary)
+    return summaries
+
+
+def dataframe_to_excel(dataframe: Mapping[str, pd.DataFrame], output_file: str, streaming: bool = False) -> None:
     """
     Save the data as an Excel with multiple sheets in the output_file
 
     :param dataframe: The dictionnary containing the names of the datasheets and their content
-    :type dataframe: dict[str,pd.DataFrame]
+    :type dataframe: Mapping[str,pd.DataFrame]
     :param output_file: The saved Excel file path
     :type output_file: str
+    :param streaming: If True, the rows are written to the file by batches through a write-only workbook, which
+    keeps the memory used constant, instead of building the whole workbook in memory, defaults to False
+    :type streaming: bool, optional
     :rtype: None
     """
     # Create the output directory if it does not exist
@@ -121,6 +255,10 @@ def dataframe_to_excel(dataframe: dict[str, pd.DataFrame], output_file: str) ->
     if output_dir:  # Only create if a directory path is specified
         os.makedirs(output_dir, exist_ok=True)
 
+    if streaming:
+        _dataframe_to_excel_streaming(dataframe, output_file)
+        return
+
     # Use ExcelWriter to save multiple sheets in one Excel file
     with pd.ExcelWriter(output_file, engine="openpyxl") as writer:
         for sheet_name, sheet_data in dataframe.items():
@@ -128,17 +266,160 @@ def dataframe_to_excel(dataframe: dict[str, pd.DataFrame], output_file: str) ->
             sheet_data.to_excel(writer, sheet_name=sheet_name, index=False)
 
 
-def excel_to_dataframe(excel_file: str) -> dict[str, pd.DataFrame]:
+def _dataframe_to_excel_streaming(dataframe: Mapping[str, pd.DataFrame], output_file: str) -> None:
+    """Write the sheets like DataFrame.to_excel, a header row then the values from A2, see dataframe_to_excel."""
+    workbook = openpyxl.Workbook(write_only=True)
+    for sheet_name in dataframe.keys():
+        sheet_data = dataframe[sheet_name]
+        worksheet = workbook.create_sheet(sheet_name)
+        if sheet_data.shape[1] > 0:
+            worksheet.append([_excel_header_cell(worksheet, column) for column in sheet_data.columns])
+        for start in range(0, len(sheet_data), EXCEL_ROWS_PER_BATCH):
+            batch = sheet_data.iloc[start : start + EXCEL_ROWS_PER_BATCH]
+            for row in zip(*(_excel_column(worksheet, batch.iloc[:, i]) for i in range(batch.shape[1]))):
+                worksheet.append(row)
+    workbook.save(output_file)
+
+
+def _excel_header_cell(worksheet: Any, column: Any) -> WriteOnlyCell:
+    # Same style as the header written by pandas
+    cell = WriteOnlyCell(worksheet, value=str(column))
+    cell.font = Font(bold=True)
+    cell.border = Border(left=_THIN_SIDE, right=_THIN_SIDE, top=_THIN_SIDE, bottom=_THIN_SIDE)
+    cell.alignment = Alignment(horizontal="center", vertical="top")
+    return cell
+
+
+def _excel_column(worksheet: Any, column: pd.Series) -> list:
+    """Return the values of the column as Excel cell values, missing values are empty cells as with to_excel."""
+    kind = column.dtype.kind if isinstance(column.dtype, np.dtype) else None
+    if kind in ("b", "i", "u"):
+        return column.tolist()
+    values = column.astype(object).tolist()
+    for i, value in enumerate(values):
+        if isinstance(value, np.generic):
+            value = values[i] = value.item()
+        if value is None or value is pd.NA or value is pd.NaT or (isinstance(value, float) and math.isnan(value)):
+            values[i] = None
+        elif isinstance(value, float) and math.isinf(value):
+            values[i] = "inf" if value > 0 else "-inf"  # inf_rep of to_excel
+        elif isinstance(value, datetime.date):
+            # Same date formats as to_excel
+            values[i] = WriteOnlyCell(worksheet, value=value)
+            values[i].number_format = "YYYY-MM-DD HH:MM:SS" if isinstance(value, datetime.datetime) else "YYYY-MM-DD"
+    return values
+
+
+def excel_to_dataframe(excel_file: str) -> Mapping[str, pd.DataFrame]:
     """
-    Read an Excel file and return its data
+    Read an Excel file with the configured backend (EXCEL_ENGINE) and return its data, from the cache if the same
+    file content has already been loaded with this backend.
+    The sheets read from the cache are LazySheets, built when first accessed.
 
     :param excel_file: The saved Excel file path
     :type excel_file: str
     :return: The dictionnary containing the names of the datasheets and their content
+    :rtype: Mapping[str,pd.DataFrame]
+    """
+
+    engine = excel.resolve_engine()
+
+    def read_excel() -> dict[str, dict[str, pd.DataFrame]]:
+        data = engine.read(excel_file, sheet_name=None)
+        return {"sheets": {sheet_name: apply_schema(sheet_name, sheet_data) for sheet_name, sheet_data in data.items()}}
+
+    return load_cached(excel_file, f"excel-{engine.name}", read_excel)["sheets"]
+
+
+def excel_output_to_dataframe(excel_file: str) -> Mapping[str, pd.DataFrame]:
+    """
+    Read an output Excel file written by the OPL SheetWrite instructions of the .dat file, from the cache if the
+    same file content has already been loaded.
+    The .dat blanks a whole range of each output sheet (EMPTY_OUTPUT to 'A1:T10001') before writing the results,
+    so only the populated range is read: the columns of the header row up to its first empty cell, and the rows
+    up to the first empty row. The values are the ones read by excel_to_dataframe.
+
+    :param excel_file: The output Excel file path
+    :type excel_file: str
+    :return: The dictionnary containing the names of the datasheets and their content
+    :rtype: Mapping[str,pd.DataFrame]
+    """
+
+    def read_excel() -> dict[str, dict[str, pd.DataFrame]]:
+        workbook = openpyxl.load_workbook(excel_file, read_only=True, data_only=True)
+        try:
+            sheets = {worksheet.title: _read_populated_range(worksheet) for worksheet in workbook.worksheets}
+        finally:
+            workbook.close()
+        return {
+            "sheets": {sheet_name: apply_schema(sheet_name, sheet_data) for sheet_name, sheet_data in sheets.items()}
+        }
+
+    return load_cached(excel_file, "excel_output", read_excel)["sheets"]
+
+
+def _read_populated_range(worksheet: Any) -> pd.DataFrame:
+    """Read the sheet from its header row in A1 to its first empty row, column by column."""
+    header_row = next(worksheet.iter_rows(min_row=1, max_row=1, values_only=True), ())
+    header = []
+    for name in header_row:
+        if _is_empty_cell(name):
+            break
+        header.append(name)
+    if not header:
+        return pd.DataFrame()
+
+    columns: list[list] = [[] for _ in header]
+    for row in worksheet.iter_rows(min_row=2, max_col=len(header), values_only=True):
+        if all(_is_empty_cell(value) for value in row):
+            break
+        for values, value in zip(columns, row):
+            if _is_empty_cell(value):
+                value = np.nan
+            elif isinstance(value, float) and value.is_integer():
+                value = int(value)  # Integral numbers are read as int, as by read_excel
+            values.append(value)
+        for values in columns[len(row) :]:
+            values.append(np.nan)
+    # The columns are built by position, so that the duplicated names of the header are kept
+    sheet = pd.DataFrame({i: pd.Series(values, dtype=None if values else object) for i, values in enumerate(columns)})
+    sheet.columns = header
+    return sheet
+
+
+def text_output_to_dataframe(output_folder: str) -> dict[str, pd.DataFrame]:
+    """
+    Read the CSV output files written by the OPL model with the text data format (see optimization.prepare_optimization)
+    The first line of each file is the header of the Excel output sheet, read up to its first empty name like
+    excel_output_to_dataframe reads the output Excel files.
+
+    :param output_folder: The folder containing a <sheet name>.csv file per output datasheet
+    :type output_folder: str
+    :return: The dictionnary containing the names of the datasheets and their content
     :rtype: dict[str,pd.DataFrame]
     """
-    # Use ExcelWriter to save multiple sheets in one Excel file
-    return pd.read_excel(excel_file, sheet_name=None, engine="openpyxl")
+    sheets = {}
+    for csv_file in sorted(Path(output_folder).glob("*.csv")):
+        with open(csv_file, newline="") as f:
+            header = []
+            for name in next(csv.reader([f.readline()]), []):
+                if _is_empty_cell(name):
+                    break
+                header.append(name)
+            try:
+                sheet = pd.read_csv(f, header=None) if header else pd.DataFrame()
+            except pd.errors.EmptyDataError:
+                sheet = pd.DataFrame({i: pd.Series(dtype=object) for i in range(len(header))})
+        if header:
+            # The content has as many columns as the header, like the range read in the Excel file
+            sheet = sheet.reindex(columns=range(len(header)))
+            sheet.columns = header
+        sheets[csv_file.stem] = apply_schema(csv_file.stem, sheet)
+    return sheets
+
+
+def _is_empty_cell(value: Any) -> bool:
+    return value is None or value == ""
 
 
 def dataframe_to_csvs(dataframe: dict[str, pd.DataFrame], output_folder: str) -> None:
@@ -155,35 +436,102 @@ def dataframe_to_csvs(dataframe: dict[str, pd.DataFrame], output_folder: str) ->
     os.makedirs(output_folder, exist_ok=True)
 
     for sheet_name, sheet_data in dataframe.items():
-        # Build the path for the Excel file of this sheet
-        csv_file_path = os.path.join(output_folder, f"{sheet_name}")
+        # Build the path for the .csv file of this sheet
+        csv_file_path = os.path.join(output_folder, f"{sheet_name}.csv")
         # Write the datafile as a .csv
         sheet_data.to_csv(csv_file_path, index=False)
 
 
-def get_cloud_input_from_dataframe(input_data: dict[str, pd.DataFrame]) -> list[dict]:
+def dataframe_to_parquets(dataframe: Mapping[str, pd.DataFrame], output_folder: str) -> None:
+    """
+    Save the given data as one .parquet file per sheet, requires the pyarrow package
+
+    :param dataframe: The dictionnary containing the names of the datasheets and their content
+    :type dataframe: Mapping[str,pd.DataFrame]
+    :param output_folder: The path to save the .parquet files
+    :type output_folder: str
+    :raises ConfigurationError: If pyarrow is not installed
+    :rtype: None
+    """
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError as e:
+        raise ConfigurationError(
+            "The pyarrow package is required to write .parquet files, install it with 'pip install pyarrow'",
+            error_code="MISSING_DEPENDENCY",
+        ) from e
+    os.makedirs(output_folder, exist_ok=True)
+
+    for sheet_name, sheet_data in dataframe.items():
+        sheet_data.to_parquet(os.path.join(output_folder, f"{sheet_name}.parquet"), index=False)
+
+
+def get_cloud_input_from_dataframe(input_data: Mapping[str, pd.DataFrame]) -> list[dict]:
     """
     Get the formatted optimization input data that can be used to create a job on IBM cloud
 
     :param input_data: The dictionnary containing the names of the input datasheets and their content
-    :type input_data: dict[str, pd.DataFrame]
+    :type input_data: Mapping[str, pd.DataFrame]
     :return: The list containing the formatted input data required to run the job
     :rtype: list[dict]
     """
-    json_list_of_dict = []
+    return list(iter_cloud_input(input_data))
+
+
+def iter_cloud_input(input_data: Mapping[str, pd.DataFrame]) -> Iterator[dict]:
+    """
+    Yield the formatted input sheets one at a time, built directly from the columns of the DataFrames.
+    The values are those written by DataFrame.to_json: missing and infinite numbers are None and dates are
+    milliseconds since the epoch.
+
+    :param input_data: The dictionnary containing the names of the input datasheets and their content
+    :type input_data: Mapping[str, pd.DataFrame]
+    :return: The sheets as {'id': '<sheet name>.csv', 'fields': [...], 'values': [[...], ...]}
+    :rtype: Iterator[dict]
+    """
     for sheet_name in input_data.keys():
-        # Convert excel to string
-        # (define orientation of document in this case from up to down)
-        values = (
-            input_data[sheet_name]
-            .to_json(orient="split", index=False)
-            .replace('"columns":', '"fields":', 1)
-            .replace('"data":', '"values":', 1)
-        )
-        values = values.replace("{", '{"id": "' + sheet_name + '.csv",\n')
-
-        json_list_of_dict.append(json.loads(values))
-    return json_list_of_dict
+        sheet = input_data[sheet_name]
+        columns = [_json_column(sheet.iloc[:, i]) for i in range(sheet.shape[1])]
+        yield {
+            "id": f"{sheet_name}.csv",
+            "fields": sheet.columns.tolist(),
+            "values": [list(row) for row in zip(*columns)],
+        }
+
+
+def _json_column(column: pd.Series) -> list:
+    """Return the values of the column as JSON values."""
+    kind = column.dtype.kind if isinstance(column.dtype, np.dtype) else None
+    if kind in ("b", "i", "u"):
+        return column.tolist()
+    if kind == "f":
+        values = column.to_numpy()
+        json_values = values.tolist()
+        for i in np.flatnonzero(~np.isfinite(values)):
+            json_values[i] = None
+        return json_values
+    if kind in ("m", "M"):
+        json_values = column.dt.as_unit("ms").array.asi8.tolist()
+        for i in np.flatnonzero(column.isna().to_numpy()):
+            json_values[i] = None
+        return json_values
+    return [_json_value(value) for value in column.astype(object).tolist()]
+
+
+def _json_value(value: Any) -> Any:
+    if isinstance(value, np.generic):
+        value = value.item()
+    if value is None or value is pd.NA or value is pd.NaT:
+        return None
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, (datetime.date, pd.Timestamp)):
+        return pd.Timestamp(value).value // 10**6
+    if isinstance(value, (datetime.timedelta, pd.Timedelta)):
+        return pd.Timedelta(value).value // 10**6
+    if isinstance(value, datetime.time):
+        return value.isoformat()
+    return value
 
 
 if __name__ == "__main__":
@@ -0,0 +1,135 @@
+"""Backends reading the Excel files.
+
+pandas reads the xlsx files with openpyxl by default, which parses the XML of the sheets in Python and is the
+slowest part of the display of the Excel files and scenario folders. The calamine backend parses the workbooks
+natively and reads them several times faster, it requires the optional ``python-calamine`` package
+(``pip install optim-analyser[excel]``).
+
+The backend is chosen with the ``EXCEL_ENGINE`` environment variable: 'auto' (default) uses the first installed
+backend of ``ENGINE_PREFERENCE``, 'calamine' or 'openpyxl' force a backend. Other pandas engines can be added
+with ``register_engine``.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any
+
+import pandas as pd
+
+from optim_analyser.config import Config
+from optim_analyser.errors import ConfigurationError
+
+AUTO = "auto"
+CALAMINE = "calamine"
+OPENPYXL = "openpyxl"
+
+
+@dataclass(frozen=True)
+class ExcelEngine:
+    """Backend reading the Excel files through pandas.
+
+    Args:
+        name: The pandas engine name, used in the EXCEL_ENGINE environment variable
+        module: The module required by the engine
+        package: The package to install to get the module
+    """
+
+    name: str
+    module: str
+    package: str
+
+    def is_available(self) -> bool:
+        return importlib.util.find_spec(self.module) is not None
+
+    def read(self, excel_file: str, sheet_name: str | int | list | None = 0, **kwargs: Any) -> Any:
+        """Read the sheets with pandas.read_excel, see its documentation for the arguments."""
+        return pd.read_excel(excel_file, sheet_name=sheet_name, engine=self.name, **kwargs)
+
+
+EXCEL_ENGINES: dict[str, ExcelEngine] = {}
+# Engines tried in order when EXCEL_ENGINE is 'auto'
+ENGINE_PREFERENCE: list[str] = [CALAMINE, OPENPYXL]
+
+
+def register_engine(name: str, module: str, package: str | None = None) -> None:
+    """
+    Register a pandas engine as an Excel read backend
+
+    :param name: The pandas engine name (e.g. 'calamine')
+    :type name: str
+    :param module: The module required by the engine (e.g. 'python_calamine')
+    :type module: str
+    :param package: The package to install to get the module, defaults to None for the module name
+    :type package: str | None, optional
+    """
+    EXCEL_ENGINES[name] = ExcelEngine(name, module, package or module)
+
+
+register_engine(CALAMINE, "python_calamine", "python-calamine")
+register_engine(OPENPYXL, "openpyxl")
+
+
+def available_engines() -> list[str]:
+    """
+    Return the names of the registered engines whose modules are installed
+
+    :return: The installed engines, in the order of preference
+    :rtype: list[str]
+    """
+    names = ENGINE_PREFERENCE + [name for name in EXCEL_ENGINES if name not in ENGINE_PREFERENCE]
+    return [name for name in names if name in EXCEL_ENGINES and EXCEL_ENGINES[name].is_available()]
+
+
+def resolve_engine(name: str | None = None) -> ExcelEngine:
+    """
+    Return the Excel read backend
+
+    :param name: The engine name or 'auto', defaults to None for the EXCEL_ENGINE environment variable
+    :type name: str | None, optional
+    :raises ConfigurationError: If the engine is unknown, or if its package is not installed
+    :return: The engine, for 'auto' the first installed engine of ENGINE_PREFERENCE
+    :rtype: ExcelEngine
+    """
+    if name is None:
+        name = Config.from_env().app.excel_engine
+    name = name.strip().lower()
+    if name == AUTO:
+        available = available_engines()
+        if not available:
+            raise ConfigurationError("No Excel read engine is installed", error_code="MISSING_DEPENDENCY")
+        return EXCEL_ENGINES[available[0]]
+    if name not in EXCEL_ENGINES:
+        raise ConfigurationError(
+            f"Unknown Excel engine '{name}'",
+            error_code="INVALID_EXCEL_ENGINE",
+            context={"engines": [AUTO, *EXCEL_ENGINES]},
+        )
+    engine = EXCEL_ENGINES[name]
+    if not engine.is_available():
+        raise ConfigurationError(
+            f"The {engine.package} package is required for the '{name}' Excel engine, "
+            f"install it with 'pip install {engine.package}'",
+            error_code="MISSING_DEPENDENCY",
+        )
+    return engine
+
+
+def read_excel(
+    excel_file: str, sheet_name: str | int | Sequence[str | int] | None = 0, engine: str | None = None, **kwargs: Any
+) -> Any:
+    """
+    Read an Excel file with the configured backend, like pandas.read_excel
+
+    :param excel_file: The Excel file path
+    :type excel_file: str
+    :param sheet_name: The sheet name or index, a list of them, or None for all the sheets, defaults to 0
+    :type sheet_name: str | int | Sequence[str|int] | None, optional
+    :param engine: The engine name or 'auto', defaults to None for the EXCEL_ENGINE environment variable
+    :type engine: str | None, optional
+    :return: The sheet content, or the dictionnary of the sheets names and their content for several sheets
+    :rtype: pd.DataFrame | dict[str,pd.DataFrame]
+    """
+    return resolve_engine(engine).read(excel_file, sheet_name=sheet_name, **kwargs)
@@ -0,0 +1,175 @@
+"""Optimization job files, plain or compressed.
+
+The archived jobs can be compressed with gzip (.json.gz), zstandard (.json.zst) or stored in a zip archive
+(.zip). When reading, the compression is detected from the first bytes of the file whatever its name, and the
+file is decompressed while it is read, so that the loaders of ``optim.dataframes`` stream the compressed jobs
+like the plain ones. When writing, the compression is chosen from the file suffix, e.g. the results of the WML jobs
+are saved with the suffix of the ``IBM_OUTPUT_COMPRESSION`` setting (see job_output_path).
+
+The zstandard compression requires the optional ``zstandard`` package (``pip install optim-analyser[zstd]``).
+"""
+
+from __future__ import annotations
+
+import gzip
+import io
+import zipfile
+from collections.abc import Iterator
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+from typing import BinaryIO, TextIO
+
+from optim_analyser.errors import ConfigurationError, DataError
+
+GZIP = "gzip"
+ZSTD = "zstd"
+ZIP = "zip"
+
+_MAGIC_BYTES = {
+    GZIP: b"\x1f\x8b",
+    ZSTD: b"\x28\xb5\x2f\xfd",
+    ZIP: b"PK\x03\x04",
+}
+_SUFFIXES = {".gz": GZIP, ".zst": ZSTD, ".zip": ZIP}
+NO_COMPRESSION = "none"
+# Suffixes of the .json jobs written with each compression
+_JOB_SUFFIXES = {NO_COMPRESSION: ".json", GZIP: ".json.gz", ZSTD: ".json.zst", ZIP: ".zip"}
+
+# Suffixes of the .json optimization jobs, compressed or not
+JSON_JOB_SUFFIXES = (".json", ".json.gz", ".json.zst", ".zip")
+# Suffixes of the files that can be opened as optimization jobs
+JOB_FILE_SUFFIXES = JSON_JOB_SUFFIXES + (".txt",)
+
+
+def is_job_file(job_file: str | Path) -> bool:
+    """
+    Return True if the file name is the one of an optimization job, plain or compressed
+
+    :param job_file: The file path
+    :type job_file: str | Path
+    :return: True if the file ends with .json, .txt, .json.gz, .json.zst or .zip
+    :rtype: bool
+    """
+    return str(job_file).lower().endswith(JOB_FILE_SUFFIXES)
+
+
+def detect_compression(job_file: str | Path) -> str | None:
+    """
+    Detect the compression of a file from its first bytes
+
+    :param job_file: The file path
+    :type job_file: str | Path
+    :return: 'gzip', 'zstd', 'zip' or None if the file is not compressed
+    :rtype: str | None
+    """
+    with open(job_file, "rb") as f:
+        header = f.read(4)
+    for compression, magic_bytes in _MAGIC_BYTES.items():
+        if header.startswith(magic_bytes):
+            return compression
+    return None
+
+
+@contextmanager
+def open_job(job_file: str | Path) -> Iterator[TextIO]:
+    """
+    Open an optimization job file for reading, decompressing it while it is read
+
+    :param job_file: The optimization job path, plain or compressed
+    :type job_file: str | Path
+    :raises DataError: If the zip archive is invalid or does not contain a single job file
+    :raises ConfigurationError: If the file is compressed with zstandard and the package is not installed
+    :return: The job text stream
+    :rtype: Iterator[TextIO]
+    """
+    compression = detect_compression(job_file)
+    with ExitStack() as stack:
+        if compression is None:
+            yield stack.enter_context(open(job_file, "r"))
+            return
+        if compression == GZIP:
+            binary = stack.enter_context(gzip.open(job_file, "rb"))
+        elif compression == ZSTD:
+            binary = stack.enter_context(_zstandard().ZstdDecompressor().stream_reader(open(job_file, "rb")))
+        else:
+            try:
+                archive = stack.enter_context(zipfile.ZipFile(job_file))
+            except zipfile.BadZipFile as e:
+                raise DataError(str(e), error_code="INVALID_JOB_ARCHIVE", context={"path": str(job_file)}) from e
+            binary = stack.enter_context(archive.open(_archived_job(archive, job_file)))
+        yield stack.enter_context(io.TextIOWrapper(binary))
+
+
+def job_output_path(json_path: str | Path, compression: str = NO_COMPRESSION) -> str:
+    """
+    Return the path of an optimization job written with the compression
+
+    :param json_path: The plain job path, ending with .json
+    :type json_path: str | Path
+    :param compression: 'none', 'gzip', 'zstd' or 'zip', defaults to 'none'
+    :type compression: str, optional
+    :raises ConfigurationError: If the compression is unknown
+    :return: The job path with the suffix of the compression, e.g. 'job.json.gz' for 'job.json' and 'gzip'
+    :rtype: str
+    """
+    if compression not in _JOB_SUFFIXES:
+        raise ConfigurationError(
+            f"Unknown job compression '{compression}'",
+            error_code="UNKNOWN_JOB_COMPRESSION",
+            context={"compressions": list(_JOB_SUFFIXES)},
+        )
+    return str(json_path).removesuffix(".json") + _JOB_SUFFIXES[compression]
+
+
+@contextmanager
+def open_job_for_write(job_file: str | Path, binary: bool = False) -> Iterator[TextIO | BinaryIO]:
+    """
+    Open an optimization job file for writing, compressed according to its suffix (.gz, .zst or .zip)
+
+    :param job_file: The optimization job path, the job is stored as <name>.json in a .zip archive
+    :type job_file: str | Path
+    :param binary: If True, the stream takes the encoded job (e.g. copied from a download), defaults to False
+    :type binary: bool, optional
+    :raises ConfigurationError: If the file is a .zst and the zstandard package is not installed
+    :return: The job text stream, or binary stream
+    :rtype: Iterator[TextIO | BinaryIO]
+    """
+    job_file = Path(job_file)
+    compression = _SUFFIXES.get(job_file.suffix.lower())
+    with ExitStack() as stack:
+        if compression is None:
+            yield stack.enter_context(open(job_file, "wb" if binary else "w"))
+            return
+        if compression == GZIP:
+            compressed = stack.enter_context(gzip.open(job_file, "wb"))
+        elif compression == ZSTD:
+            compressed = stack.enter_context(_zstandard().ZstdCompressor().stream_writer(open(job_file, "wb")))
+        else:
+            archive = stack.enter_context(zipfile.ZipFile(job_file, "w", compression=zipfile.ZIP_DEFLATED))
+            member = job_file.stem if job_file.stem.lower().endswith(".json") else f"{job_file.stem}.json"
+            compressed = stack.enter_context(archive.open(member, "w", force_zip64=True))
+        yield compressed if binary else stack.enter_context(io.TextIOWrapper(compressed))
+
+
+def _archived_job(archive: zipfile.ZipFile, job_file: str | Path) -> str:
+    """Return the name of the job file stored in the zip archive."""
+    members = [info.filename for info in archive.infolist() if not info.is_dir()]
+    jobs = [member for member in members if member.lower().endswith((".json", ".txt"))]
+    if len(jobs) != 1:
+        raise DataError(
+            "The zip archive must contain a single optimization job file",
+            error_code="INVALID_JOB_ARCHIVE",
+            context={"path": str(job_file), "files": members},
+        )
+    return jobs[0]
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError as e:
+        raise ConfigurationError(
+            "The zstandard package is required for .zst job files, install it with 'pip install zstandard'",
+            error_code="MISSING_DEPENDENCY",
+        ) from e
+    return zstandard
@@ -0,0 +1,189 @@
+"""Single-pass parser of the OPL models.
+
+The models are several thousand lines long and are read for each replay and scenario run: to find their input
+and output datasheets, the columns of the input datasheets, the members of the output tuples and the terms of the
+objective function with their definitions. The model is read once into a ``ModelInfo``, which is kept in memory
+until the file changes and stored in the on-disk cache under the hash of the model content.
+
+Layout of the models::
+
+    tuple t_<input> { ... }     # Input datasheets
+    // Converting this reference to ...
+    tuple t_empty { ... }
+    tuple t_<output> { ... }    # Output datasheets, until the first 'execute' block
+    execute ... { ... }
+    dvar boolean <Var>[...];    # Decision variables
+    dexpr float <Cost> = ...;   # Terms of the objective function
+    minimize
+      <Cost>
+      + sum(...) ...
+      ;
+"""
+
+from __future__ import annotations
+
+import os
+import re
+from pathlib import Path
+
+from optim_analyser.errors import ModelReferenceError
+from optim_analyser.models import ModelInfo
+from optim_analyser.optim.cache import default_cache
+from optim_analyser.optim.registry import default_registry
+
+MODEL_INFO_FORMAT = 2  # To increase when the parser output changes
+
+_INPUTS_END = "// Converting this reference to"
+_OUTPUTS_START = "tuple t_empty"
+_OUTPUTS_END = "execute"
+_TUPLE = "tuple t_"
+_DEXPR = re.compile(r"dexpr float (\w+)")
+_DVAR = re.compile(r"dvar\s+\S+\s+(\w+)\s*((?:\[[^\]]*\]\s*)*)")
+_INDEX = re.compile(r"\[[^\]]*\]")
+
+# Sections of the model
+_INPUTS, _EMPTY, _OUTPUTS, _MODEL = range(4)
+
+
+def parse_model(model_file: str) -> ModelInfo:
+    """
+    Read the OPL model file once and retrieve its datasheets, tuples, variables, objective terms and cost definitions
+
+    :param model_file: The OPL model file path (.mod)
+    :type model_file: str
+    :raises ModelReferenceError: If the model file does not exist
+    :return: The model information
+    :rtype: ModelInfo
+    """
+    try:
+        with open(model_file, "r") as f:
+            mod_lines = f.readlines()
+    except FileNotFoundError:
+        raise ModelReferenceError(f"Model file not found at {model_file}")
+
+    info = ModelInfo(model_path=Path(model_file), model_name=Path(model_file).stem)
+    section = _INPUTS
+    objective_found = False
+    line_index = 0
+    while line_index < len(mod_lines):
+        line = mod_lines[line_index]
+
+        if section == _INPUTS and line.startswith(_INPUTS_END):
+            section = _EMPTY
+        elif section == _EMPTY and line.startswith(_OUTPUTS_START):
+            section = _OUTPUTS
+            line_index += 1
+            continue
+        elif section == _OUTPUTS and line.startswith(_OUTPUTS_END):
+            section = _MODEL
+
+        if line.startswith(_TUPLE):
+            tuple_name = line[len(_TUPLE) :].split("{")[0].strip()
+            if section == _INPUTS:
+                info.input_fields.append(tuple_name)
+            elif section == _OUTPUTS:
+                info.output_fields.append(tuple_name)
+            if "}" in line:  # Tuple declared on one line
+                line_index += 1
+                info.tuple_members.setdefault(tuple_name, [])
+                continue
+            line_index, members = _read_tuple_members(mod_lines, line_index + 1)
+            info.tuple_members.setdefault(tuple_name, members)
+            continue
+
+        match = _DVAR.match(line)
+        if match:
+            info.decision_variables[match.group(1)] = _INDEX.findall(match.group(2))
+            line_index += 1
+            continue
+
+        match = _DEXPR.match(line)
+        if match:
+            line_index, definition = _read_statement(mod_lines, line_index)
+            info.dexpr_definitions[match.group(1)] = definition
+            continue
+
+        if line.startswith("minimize") and not objective_found:
+            objective_found = True
+            line_index, info.objective_terms = _read_objective_terms(mod_lines, line_index + 1)
+            continue
+
+        line_index += 1
+    return info
+
+
+def load_model_info(model_file: str) -> ModelInfo:
+    """
+    Return the information of the OPL model, parsed once per version of the model file
+
+    The information is kept in memory until the file is modified, and stored in the on-disk cache so that other
+    processes do not parse the same model again. The returned object is shared and must not be modified.
+
+    :param model_file: The OPL model file path (.mod)
+    :type model_file: str
+    :raises ModelReferenceError: If the model file does not exist
+    :return: The model information
+    :rtype: ModelInfo
+    """
+    if not os.path.isfile(model_file):
+        raise ModelReferenceError(f"Model file not found at {model_file}")
+    return default_registry().get(model_file, "model_info", _load_cached_model_info)
+
+
+def _load_cached_model_info(model_file: str) -> ModelInfo:
+    """Read the model information from the on-disk cache, or parse the model and store it in the cache."""
+    cache = default_cache()
+    if not cache.enabled:
+        return parse_model(model_file)
+    key = cache.key(model_file, f"model{MODEL_INFO_FORMAT}")
+    value = cache.load_value(key)
+    if value is not None:
+        try:
+            info = ModelInfo.from_dict(value)
+        except (KeyError, TypeError, ValueError):
+            cache.invalidate(model_file)
+        else:
+            # The same model content may have been cached from another path
+            info.model_path = Path(model_file)
+            info.model_name = Path(model_file).stem
+            return info
+    info = parse_model(model_file)
+    cache.store_value(key, info.to_dict())
+    return info
+
+
+def _read_tuple_members(mod_lines: list[str], line_index: int) -> tuple[int, list[tuple[str, str]]]:
+    """Return the index of the line following the tuple and the type and name of its members."""
+    members = []
+    while line_index < len(mod_lines) and "}" not in mod_lines[line_index]:
+        # Keep the part of the line before the ';', without the commented members
+        words = mod_lines[line_index].split(";")[0].split()
+        if len(words) >= 2 and "//" not in words[0]:
+            members.append((words[-2], words[-1]))
+        line_index += 1
+    return line_index + 1, members
+
+
+def _read_statement(mod_lines: list[str], line_index: int) -> tuple[int, str]:
+    """Return the index of the line following the statement and the statement on one line without comments."""
+    statement = ""
+    while line_index < len(mod_lines):
+        line = mod_lines[line_index]
+        statement += line.replace("\n", "").replace("\t", "").split("//")[0]
+        line_index += 1
+        if ";" in line:
+            break
+    return line_index, statement
+
+
+def _read_objective_terms(mod_lines: list[str], line_index: int) -> tuple[int, list[str]]:
+    """Return the index of the line following the objective function and its terms which are not sums."""
+    terms = []
+    while line_index < len(mod_lines) and ";" not in mod_lines[line_index]:
+        words = mod_lines[line_index].split()
+        if words and words[0] == "+":
+            words = words[1:]  # Remove the +
+        if words and "//" not in words[0] and "sum" not in "\t".join(words):  # Check if the line is not commented
+            terms.append(words[0])
+        line_index += 1
+    return line_index + 1, terms
@@ -1,14 +1,63 @@
 from __future__ import annotations
 
+import hashlib
+import json
+import math
 import os
 import shutil
-import subprocess
+from collections.abc import Mapping
 from datetime import datetime
+from pathlib import Path
 
 import pandas as pd
 
-from optim_analyser.errors import ModelReferenceError
+from optim_analyser.config import Config
+from optim_analyser.errors import ModelReferenceError, ValidationError
+from optim_analyser.models import OplRunResult, SolverProfile
+from optim_analyser.optim.cache import default_cache
 from optim_analyser.optim.dataframes import dataframe_to_excel
+from optim_analyser.optim.oplmodel import load_model_info, parse_model
+from optim_analyser.optim.registry import default_registry
+from optim_analyser.optim.runner import OplRunner
+from optim_analyser.optim.sheets import select_columns
+from optim_analyser.optim.solver import get_solver_profile, record_profile
+from optim_analyser.optim.stages import run_stage
+from optim_analyser.optim.warmstart import WARM_START_MEMBERS, WARM_START_SHEET, warm_start_variables
+
+DATA_FORMAT_EXCEL = "excel"  # The data is read and written by OPL in Excel files (SheetRead/SheetWrite)
+DATA_FORMAT_TEXT = "text"  # The input data is written in the .dat file, the output data in CSV files
+DATA_FORMATS = (DATA_FORMAT_EXCEL, DATA_FORMAT_TEXT)
+
+# Tuple sets of the OPL models holding the header and the content of each output datasheet
+OUTPUT_HEADER_SETS = {
+    "operation_output": "OPERATION_HEADER",
+    "operation_steps_output": "OPERATION_STEPS_HEADER",
+    "assets_output": "ASSETS_HEADER",
+    "asset_steps_output": "ASSET_STEPS_HEADER",
+    "market_bids_output": "MARKET_BIDS_OUTPUT_HEADER",
+    "violations_output": "VIOLATIONS_OUTPUT_HEADER",
+    "asset_steps_cost": "ASSET_STEPS_COST_HEADER",
+    "step_costs": "STEP_COSTS_HEADER",
+    "costs_output": "COSTS_OUTPUT_HEADER",
+}
+OUTPUT_DATA_SETS = {
+    "operation_output": "OPERATION_OUTPUT",
+    "operation_steps_output": "OPERATION_STEPS_OUTPUT",
+    "assets_output": "ASSETS_OUTPUT",
+    "asset_steps_output": "ASSET_STEPS_OUTPUT",
+    "market_bids_output": "MARKET_BIDS_OUTPUT",
+    "violations_output": "VIOLATIONS_OUTPUT",
+    "asset_steps_cost": "ASSET_STEPS_COST",
+    "step_costs": "STEP_COSTS",
+    "costs_output": "COSTS_OUTPUT",
+}
+HEADER_FIELDS_NUMBER = 20  # Number of fields of the t_empty tuple of the header sets
+
+MODEL_FILES_FORMAT = 3  # To increase when the generated model files change
+# Names of the generated model files in their cache entries
+_RUN_MODEL_FILE = "model.mod"
+_MOD_COSTS_EXTENSION_FILE = "cost_extraction.mod"
+_DAT_COSTS_EXTENSION_FILE = "cost_extraction.dat"
 
 
 def get_column_from_int(n: int) -> str:
@@ -30,69 +79,53 @@ def get_column_from_int(n: int) -> str:
         return get_column_from_int(q) + alphabet[r]
 
 
-def prepare_excel_initial_data(data: dict[str, list[str]], excel_init_path: str) -> None:
+def output_set_field(output_field: str) -> str:
     """
-    Save the Excel file containing all input and output data at excel_init_path
+    Return the name of the output datasheet in OUTPUT_HEADER_SETS and OUTPUT_DATA_SETS
+
+    :param output_field: The output tuple name in the OPL model (e.g. 'asset_step_cost')
+    :type output_field: str
+    :return: The output datasheet name in lowercase (e.g. 'asset_steps_cost')
+    :rtype: str
+    """
+    # Temporary fix for asset_step_cost/asset_steps_cost naming issue between old and new models
+    if output_field == "asset_step_cost":
+        return "asset_steps_cost"
+    return output_field
+
+
+def prepare_excel_initial_data(data: dict[str, list[str]], excel_init_path: str, use_cache: bool = True) -> None:
+    """
+    Save the Excel file containing all input and output data at excel_init_path, unless it is up to date (see stages)
 
     :param data: The dictionnary containing the names of the datasheets and their content
     :type data: dict[str,list[str]]
     :param excel_init_path: The saved Excel file path
     :type excel_init_path: str
+    :param use_cache: If False, the file is saved even if it is up to date, defaults to True
+    :type use_cache: bool, optional
     :rtype: None
     """
 
-    dataframe_to_excel(data, excel_init_path)
-    print(f"Excel file with all input and output data completed.\nPlease check the file at '{excel_init_path}'.\n")
+    def build() -> None:
+        dataframe_to_excel(data, excel_init_path, streaming=True)
+        print(f"Excel file with all input and output data completed.\nPlease check the file at '{excel_init_path}'.\n")
 
+    run_stage("excel_initial_data", [excel_init_path], [data], build, use_cache)
 
-def find_in_out_fields(model_file: str) -> tuple[list[str]]:
+
+def find_in_out_fields(model_file: str) -> tuple[list[str], list[str]]:
     """
     Read the OPL model file, retrieve the input and output datasheet names used
 
     :param model_file: The OPL model file path (.mod)
     :type model_file: str
+    :raises ModelReferenceError: If the model file does not exist
     :return: The lists containing the input and output datasheet names
-    :rtype: tuple[list[str]]
+    :rtype: tuple[list[str],list[str]]
     """
-
-    input_fields = []
-    output_fields = []
-
-    try:
-        with open(model_file, "r") as f:
-            mod_lines = f.readlines()
-            l = 0
-            line = mod_lines[l]
-
-            # Find the input fields names
-            while l < len(mod_lines) and not (
-                mod_lines[l].startswith("// Converting this reference to")
-            ):  # Could probably replace 2nd condition with tuple t_empty limit
-                if line.startswith("tuple t_"):
-                    input = line[len("tuple t_") :].split("{")[0].split(" ")[0]
-                    input_fields.append(input)
-                l += 1
-                line = mod_lines[l]
-
-            while l < len(mod_lines) and not (mod_lines[l].startswith("tuple t_empty")):
-                l += 1
-                line = mod_lines[l]
-
-            l += 1
-            line = mod_lines[l]
-
-            while l < len(mod_lines):
-                if line.startswith("tuple t_"):
-                    output = line[len("tuple t_") :].split("{")[0].split(" ")[0]
-                    output_fields.append(output)
-                if line.startswith("execute"):
-                    break
-                l += 1
-                line = mod_lines[l]
-
-        return input_fields, output_fields
-    except FileNotFoundError:
-        raise ModelReferenceError(f"Model file not found at {model_file}")
+    info = load_model_info(model_file)
+    return list(info.input_fields), list(info.output_fields)
 
 
 def find_used_columns(model_file: str, input_fields: list[str]) -> dict[str, list[str]]:
@@ -106,46 +139,17 @@ def find_used_columns(model_file: str, input_fields: list[str]) -> dict[str, lis
     :return: The dictionnary containing the input datasheet names associated with the columns names used in the OPL model, in their order of appearance
     :rtype: dict[str,list[str]]
     """
+    info = load_model_info(model_file)
+    # Warning : order of the used_columns kept only thanks to adding order in the dictionnary
+    return {str.upper(i): info.used_columns(i) for i in input_fields if i in info.tuple_members}
 
-    used_columns = dict()  # Warning : order of the used_columns kept only thanks to adding order in the dictionnary
 
-    with open(model_file, "r") as f:
-        mod_lines = f.readlines()
-
-        # Find the datasheets used in the optimization model
-        for l, line in enumerate(mod_lines):
-            if line.startswith("tuple t_"):
-                for i in input_fields:
-                    if line.startswith("tuple t_" + i + " {"):
-
-                        sheet_name = str.upper(i)
-                        sheet_data = []
-
-                        l += 1
-                        line = mod_lines[l]
-                        while not ("}" in line):
-                            # Find the columns of the datasheet used in the optimization model
-                            words = line.split(";")  # Separate the line in two parts : before/after the ';'
-                            if "//" not in words[0]:  # Check if the line is not commented
-                                words = words[0].split(
-                                    " "
-                                )  # Separate the words of the first part of the line (before the ';')
-                                words = list(filter(None, words))  # Remove empty characters resulting from the splits
-                                sheet_data.append(
-                                    words[-1]
-                                )  # Keep only the name of the column (last word before the ';')
-                            l += 1
-                            line = mod_lines[l]
-                        used_columns[sheet_name] = sheet_data
-    return used_columns
-
-
-def reorder_columns(data: dict[str, pd.DataFrame], used_columns: dict[str, list[str]]) -> dict[str, pd.DataFrame]:
+def reorder_columns(data: Mapping[str, pd.DataFrame], used_columns: dict[str, list[str]]) -> dict[str, pd.DataFrame]:
     """
     Clear and reorder the input data to keep only the columns in the OPL model, in their order of appearance
 
     :param data: The dictionnary containing the names of the input datasheets and their content
-    :type data: dict[str,pd.DataFrame]
+    :type data: Mapping[str,pd.DataFrame]
     :param used_columns: The dictionnary containing the input datasheet names associated with the columns names used in the OPL model, in their order of appearance
     :type used_columns: dict[str,list[str]]
     :return: The dictionnary containing the names of the input datasheets and only the content of the columns used in the OPL model, in their order of appearance
@@ -155,22 +159,21 @@ def reorder_columns(data: dict[str, pd.DataFrame], used_columns: dict[str, list[
     ordered_data = dict()
 
     for sheet_name in used_columns.keys():
-        sheet_data = data[sheet_name].filter(
-            items=used_columns[sheet_name]
-        )  # Reorder and keep only the columns of used_columns
+        # Reorder and keep only the columns of used_columns, the other columns of lazy sheets are not built
+        sheet_data = select_columns(data, sheet_name, used_columns[sheet_name])
         ordered_data[sheet_name] = sheet_data
 
     return ordered_data
 
 
 def prepare_input_data(
-    data: dict[str, pd.DataFrame], mod_file: str, input_fields: list[str]
+    data: Mapping[str, pd.DataFrame], mod_file: str, input_fields: list[str]
 ) -> dict[str, pd.DataFrame]:
     """
     Format the data as expected in the OPL model
 
     :param data: The dictionnary containing the names of the input and output datasheets and their content
-    :type data: dict[str,pd.DataFrame]
+    :type data: Mapping[str,pd.DataFrame]
     :param mod_file: The OPL model file path (.mod)
     :type mod_file: str
     :param input_fields: The list of the input datasheets used in the OPL model
@@ -193,7 +196,7 @@ def prepare_excel_input(data_dat: dict[str, pd.DataFrame], excel_input_path: str
     :type excel_input_path: str
     :rtype: None
     """
-    dataframe_to_excel(data_dat, excel_input_path)
+    dataframe_to_excel(data_dat, excel_input_path, streaming=True)
     print(f"Excel file with formated input data completed.\nPlease check the file at '{excel_input_path}'.\n")
 
 
@@ -232,80 +235,36 @@ def create_cost_extraction_opl_model(model_file: str, opl_cost_extraction_path:
     :type dat_extension_path: str
     :rtype: None
     """
-    costs_variables_names = []
     project_name = opl_cost_extraction_path.split("/")[-1][: -len("_cost_extraction.mod")]
-
-    with open(model_file, "r") as f:
-        mod_lines = f.readlines()
-
-        # Find the objective function terms
-        for l, line in enumerate(mod_lines):
-            if line.startswith("minimize"):
-                l += 1
-                line = mod_lines[l]
-                while not (";" in list(line)):
-                    words = list(filter(None, line.split()))
-                    if words[0] == "+":
-                        words = words[1:]  # Remove the +
-                    if "//" not in words[0] and not ("sum" in "\t".join(words)):  # Check if the line is not commented
-                        costs_variables_names.append(words[0])
-                    l += 1
-                    line = mod_lines[l]
-                break
-
-        # Find the expression of the objective function terms
-        def find_obj_function_term_definition(mod_lines: list[str], costs_variables_names: list[str]) -> list[str]:
-            """
-            Return the list of definitions of the objective function terms given in costs_variables_names
-
-            :param mod_lines: The OPL model (.mod) lines
-            :type mod_lines: list[str]
-            :param costs_variables_names: The objective function terms which will appear in the optimization output
-            :type costs_variables_names: list[str]
-            :return: The list of definitions of the objective function terms
-            :rtype: list[str]
-            """
-            variables_definitions = []
-            totalFCRNetworkCostsByStep_defined = False
-            for l, line in enumerate(mod_lines):
-                if "TotalFCRNetworkCostsByStep" in line:
-                    totalFCRNetworkCostsByStep_defined = True
-                if line.startswith("dexpr float "):
-                    for costs_variable in costs_variables_names:
-                        if line.startswith("dexpr float " + costs_variable + "=") or line.startswith(
-                            "dexpr float " + costs_variable + " ="
-                        ):
-                            cost_definition = line.replace("\n", "").replace("\t", "").split("//")[0]
-                            while not (";" in list(line)):
-                                l += 1
-                                line = mod_lines[l]
-                                cost_definition += line.replace("\n", "").replace("\t", "").split("//")[0]
-                            if (
-                                cost_definition
-                                == "dexpr float DayAheadTotalTradeCost = NotInCFDDaTotalTradCost - InCFDDaTotalTradRevenues;"
-                            ):
-                                cost_definition = (
-                                    "dexpr float DayAheadTotalTradeCost = "
-                                    + "(sum(h in isHOURLY_STEPS_POS) NotInCFDDaPosition[h] * daElecPrice[h] * effDaStepDurationInHours[h])"
-                                    + " - "
-                                    + "(sum(h in isHOURLY_STEPS_POS) -InCFDDaPosition[h] * inCFDDaPrice[h] * effDaStepDurationInHours[h]);"
-                                )
-                            elif (
-                                cost_definition
-                                == "dexpr float ImbalanceTotalCost = NotInCFDTotalImbalanceCost + InCFDTotalImbalanceCost;"
-                            ):
-                                cost_definition = (
-                                    "dexpr float ImbalanceTotalCost = "
-                                    + "(sum(imb in isIMBALANCE_STEPS_POS) (NotInCFDNegativeImbalancePower_imb [imb] * negative_imb_price[imb]  - NotInCFDPositiveImbalancePower_imb[imb] * positive_imb_price[imb]) * effImbStepDurationInHours[imb])"
-                                    + " + "
-                                    + "(sum(imb in isIMBALANCE_STEPS_POS) (InCFDNegativeImbalancePower_imb[imb] * inCFDNegImbPrice[imb] - InCFDPositiveImbalancePower_imb[imb] * inCFDPosImbPrice[imb]) *  effImbStepDurationInHours[imb]);"
-                                )
-                            variables_definitions.append(cost_definition)
-            return variables_definitions, totalFCRNetworkCostsByStep_defined
-
-        costs_variables_definitions, totalFCRNetworkCostsByStep_defined = find_obj_function_term_definition(
-            mod_lines=mod_lines, costs_variables_names=costs_variables_names
-        )
+    info = load_model_info(model_file)
+
+    # The objective function terms and their expressions, in their order of definition
+    costs_variables_names = info.objective_terms
+    costs_variables_definitions = []
+    for name, cost_definition in info.dexpr_definitions.items():
+        if name not in costs_variables_names:
+            continue
+        if (
+            cost_definition
+            == "dexpr float DayAheadTotalTradeCost = NotInCFDDaTotalTradCost - InCFDDaTotalTradRevenues;"
+        ):
+            cost_definition = (
+                "dexpr float DayAheadTotalTradeCost = "
+                + "(sum(h in isHOURLY_STEPS_POS) NotInCFDDaPosition[h] * daElecPrice[h] * effDaStepDurationInHours[h])"
+                + " - "
+                + "(sum(h in isHOURLY_STEPS_POS) -InCFDDaPosition[h] * inCFDDaPrice[h] * effDaStepDurationInHours[h]);"
+            )
+        elif (
+            cost_definition == "dexpr float ImbalanceTotalCost = NotInCFDTotalImbalanceCost + InCFDTotalImbalanceCost;"
+        ):
+            cost_definition = (
+                "dexpr float ImbalanceTotalCost = "
+                + "(sum(imb in isIMBALANCE_STEPS_POS) (NotInCFDNegativeImbalancePower_imb [imb] * negative_imb_price[imb]  - NotInCFDPositiveImbalancePower_imb[imb] * positive_imb_price[imb]) * effImbStepDurationInHours[imb])"
+                + " + "
+                + "(sum(imb in isIMBALANCE_STEPS_POS) (InCFDNegativeImbalancePower_imb[imb] * inCFDNegImbPrice[imb] - InCFDPositiveImbalancePower_imb[imb] * inCFDPosImbPrice[imb]) *  effImbStepDurationInHours[imb]);"
+            )
+        costs_variables_definitions.append(cost_definition)
+    totalFCRNetworkCostsByStep_defined = "TotalFCRNetworkCostsByStep" in info.dexpr_definitions
 
     def sum_into_time_series(cost: str, time_step: str) -> str:
         """
@@ -516,7 +475,7 @@ def create_cost_extraction_opl_model(model_file: str, opl_cost_extraction_path:
 def create_dat_file(
     data_dat: dict[str, pd.DataFrame],
     dat_path: str,
-    output_fields_dat: str,
+    output_fields_dat: list[str],
     excel_input_path: str,
     excel_output_path: str,
     add_costs: bool = True,
@@ -530,7 +489,7 @@ def create_dat_file(
     :param dat_path: The .dat file path
     :type dat_path: str
     :param output_fields_dat: The output fields required in the OPL model that need to appear in the .dat
-    :type output_fields_dat: str
+    :type output_fields_dat: list[str]
     :param excel_input_path: The input data Excel file path
     :type excel_input_path: str
     :param excel_output_path: The empty output Excel file path
@@ -562,7 +521,7 @@ def create_dat_file(
 
     # Input reading instructions
     for sheet_name, sheet_data in data_dat.items():
-        (n_rows, n_columns) = sheet_data.shape
+        n_rows, n_columns = sheet_data.shape
         last_cell = get_column_from_int(n_columns) + str(n_rows + 1)
         new_dat.append(sheet_name + ' from SheetRead(inputSheet, "' + "'" + sheet_name + "'!A2:" + last_cell + '");\n')
     new_dat.append("\n")
@@ -587,37 +546,11 @@ def create_dat_file(
             "step_costs": "stepCostsExcelRange",
         }
     )
-    output_header = dict(
-        {
-            "operation_output": "OPERATION_HEADER",
-            "operation_steps_output": "OPERATION_STEPS_HEADER",
-            "assets_output": "ASSETS_HEADER",
-            "asset_steps_output": "ASSET_STEPS_HEADER",
-            "market_bids_output": "MARKET_BIDS_OUTPUT_HEADER",
-            "violations_output": "VIOLATIONS_OUTPUT_HEADER",
-            "asset_steps_cost": "ASSET_STEPS_COST_HEADER",
-            "step_costs": "STEP_COSTS_HEADER",
-            "costs_output": "COSTS_OUTPUT_HEADER",
-        }
-    )
-    output_data = dict(
-        {
-            "operation_output": "OPERATION_OUTPUT",
-            "operation_steps_output": "OPERATION_STEPS_OUTPUT",
-            "assets_output": "ASSETS_OUTPUT",
-            "asset_steps_output": "ASSET_STEPS_OUTPUT",
-            "market_bids_output": "MARKET_BIDS_OUTPUT",
-            "violations_output": "VIOLATIONS_OUTPUT",
-            "asset_steps_cost": "ASSET_STEPS_COST",
-            "step_costs": "STEP_COSTS",
-            "costs_output": "COSTS_OUTPUT",
-        }
-    )
+    output_header = OUTPUT_HEADER_SETS
+    output_data = OUTPUT_DATA_SETS
 
     for output_field in output_fields_dat:
-        # Temporary fix for asset_step_cost/asset_steps_cost naming issue between old and new models
-        if output_field == "asset_step_cost" and output_field not in excel_range.keys():
-            output_field = "asset_steps_cost"
+        output_field = output_set_field(output_field)
 
         field = output_field
         if field.endswith("_output"):
@@ -674,6 +607,411 @@ def copy_model(
                 shutil.copyfileobj(fsrc=fsrc, fdst=fdst)
 
 
+def place_file(source: str | Path, destination: str) -> None:
+    """
+    Place a file at the destination as a hard link, or as a copy if it cannot be linked (e.g. on another drive)
+
+    :param source: The file path
+    :type source: str | Path
+    :param destination: The destination file path, replaced if it exists
+    :type destination: str
+    :rtype: None
+    """
+    try:
+        os.remove(destination)  # The previous file may be a link to another cache entry
+    except FileNotFoundError:
+        pass
+    try:
+        os.link(source, destination)
+    except OSError:
+        shutil.copyfile(source, destination)
+
+
+def write_model_files(
+    mod_file: str,
+    copied_model_path: str,
+    add_costs: bool = True,
+    mod_costs_extension_path: str | None = None,
+    dat_costs_extension_path: str | None = None,
+    data_format: str = DATA_FORMAT_EXCEL,
+    warm_start: bool = False,
+    solver_profile: SolverProfile | None = None,
+) -> None:
+    """
+    Generate the OPL model of the run from the original model, with the costs extension, the text output block, the
+    warm start and the CPLEX parameters of the solver profile
+
+    :param mod_file: The original OPL model file path (.mod)
+    :type mod_file: str
+    :param copied_model_path: The copied OPL model file path (.mod)
+    :type copied_model_path: str
+    :param add_costs: If True, the detailed optimization costs will be added in the copied OPL model file, defaults to True
+    :type add_costs: bool, optional
+    :param mod_costs_extension_path: The path to the OPL file containing the additional code to add the detailed costs in the optimization output, defaults to None
+    :type mod_costs_extension_path: str, optional
+    :param dat_costs_extension_path: The path to the file containing the additional code to add the detailed costs in the optimization output, defaults to None
+    :type dat_costs_extension_path: str, optional
+    :param data_format: 'excel' or 'text', defaults to 'excel'
+    :type data_format: str, optional
+    :param warm_start: If True, the model reads the WARM_START values and starts CPLEX from them, defaults to False
+    :type warm_start: bool, optional
+    :param solver_profile: The solver profile overriding the CPLEX parameters of the model, defaults to None
+    :type solver_profile: SolverProfile | None, optional
+    :rtype: None
+    """
+    if add_costs:
+        create_cost_extraction_opl_model(mod_file, mod_costs_extension_path, dat_costs_extension_path)
+    copy_model(mod_file, copied_model_path, add_costs=add_costs, mod_costs_extension_path=mod_costs_extension_path)
+    if data_format == DATA_FORMAT_TEXT:
+        create_text_output_opl_model(copied_model_path, load_model_info(mod_file).output_fields, add_costs=add_costs)
+    if warm_start:
+        add_warm_start_opl_model(copied_model_path, mod_file)
+    if solver_profile is not None and solver_profile.parameters:
+        add_cplex_parameters(copied_model_path, solver_profile.parameters)
+
+
+def prepare_model_files(
+    mod_file: str,
+    copied_model_path: str,
+    add_costs: bool = True,
+    mod_costs_extension_path: str | None = None,
+    dat_costs_extension_path: str | None = None,
+    data_format: str = DATA_FORMAT_EXCEL,
+    warm_start: bool = False,
+    solver_profile: SolverProfile | None = None,
+) -> None:
+    """
+    Place the OPL model of the run and the costs extension files in the run folder.
+    The files only depend on the original model, the detailed costs, the data format, the warm start and the solver
+    profile: they are generated once in the on-disk cache, then hard linked (or copied) from the cache, without
+    reading the model again.
+
+    :param mod_file: The original OPL model file path (.mod)
+    :type mod_file: str
+    :param copied_model_path: The copied OPL model file path (.mod)
+    :type copied_model_path: str
+    :param add_costs: If True, the detailed optimization costs will be added in the copied OPL model file, defaults to True
+    :type add_costs: bool, optional
+    :param mod_costs_extension_path: The path to the OPL file containing the additional code to add the detailed costs in the optimization output, defaults to None
+    :type mod_costs_extension_path: str, optional
+    :param dat_costs_extension_path: The path to the file containing the additional code to add the detailed costs in the optimization output, defaults to None
+    :type dat_costs_extension_path: str, optional
+    :param data_format: 'excel' or 'text', defaults to 'excel'
+    :type data_format: str, optional
+    :param warm_start: If True, the model reads the WARM_START values and starts CPLEX from them, defaults to False
+    :type warm_start: bool, optional
+    :param solver_profile: The solver profile overriding the CPLEX parameters of the model, defaults to None
+    :type solver_profile: SolverProfile | None, optional
+    :raises ModelReferenceError: If the model file does not exist
+    :rtype: None
+    """
+    cache = default_cache()
+    if cache.enabled:
+        kind = f"model_files{MODEL_FILES_FORMAT}-{data_format}" + ("-costs" if add_costs else "")
+        kind += "-warmstart" if warm_start else ""
+        if solver_profile is not None and solver_profile.parameters:
+            parameters = json.dumps(solver_profile.parameters, sort_keys=True).encode()
+            kind += "-cplex" + hashlib.blake2b(parameters, digest_size=4).hexdigest()
+        # The hash of the model is computed once per version of the model file
+        key = default_registry().get(mod_file, kind, lambda file: cache.key(file, kind))
+        files = cache.load_files(key)
+        if files is None:
+            cache.store_files(
+                key,
+                lambda folder: write_model_files(
+                    mod_file,
+                    str(folder / _RUN_MODEL_FILE),
+                    add_costs,
+                    str(folder / _MOD_COSTS_EXTENSION_FILE),
+                    str(folder / _DAT_COSTS_EXTENSION_FILE),
+                    data_format,
+                    warm_start,
+                    solver_profile,
+                ),
+            )
+            files = cache.load_files(key)
+        if files is not None:
+            destinations = {_RUN_MODEL_FILE: copied_model_path}
+            if add_costs:
+                destinations[_MOD_COSTS_EXTENSION_FILE] = mod_costs_extension_path
+                destinations[_DAT_COSTS_EXTENSION_FILE] = dat_costs_extension_path
+            for name, destination in destinations.items():
+                place_file(files[name], destination)
+            print(f"OPL model placed from the cache.\nPlease check the file at '{copied_model_path}'.\n")
+            return
+    # The files of a previous run may be links to a cache entry, they are replaced instead of being overwritten
+    for destination in (copied_model_path, mod_costs_extension_path, dat_costs_extension_path):
+        if destination is not None and os.path.exists(destination):
+            os.remove(destination)
+    write_model_files(
+        mod_file,
+        copied_model_path,
+        add_costs,
+        mod_costs_extension_path,
+        dat_costs_extension_path,
+        data_format,
+        warm_start,
+        solver_profile,
+    )
+
+
+def add_cplex_parameters(model_path: str, parameters: Mapping[str, int | float]) -> None:
+    """
+    Set CPLEX parameters in an OPL model file, in a preprocessing block inserted before the objective so that they
+    override the parameters set by the model
+
+    :param model_path: The OPL model file path (.mod), modified in place
+    :type model_path: str
+    :param parameters: The CPLEX parameters names (e.g. 'threads') and values
+    :type parameters: Mapping[str,int|float]
+    :raises ModelReferenceError: If the model has no objective
+    :rtype: None
+    """
+    with open(model_path, "r") as f:
+        mod_lines = f.readlines()
+    for objective_index, line in enumerate(mod_lines):
+        if line.lstrip().startswith(("minimize", "maximize")):
+            break
+    else:
+        raise ModelReferenceError("No objective found in the OPL model", context={"model_path": model_path})
+
+    block = ["execute CPX_PARAM_OVERRIDES {\n"]
+    for name, value in parameters.items():
+        block.append(f"\tcplex.{name} = {value};\n")
+    block.append("}\n\n")
+    with open(model_path, "w") as f:
+        f.writelines(mod_lines[:objective_index] + block + mod_lines[objective_index:])
+
+
+def find_tuple_members(model_file: str, tuple_names: list[str]) -> dict[str, list[tuple[str, str]]]:
+    """
+    Read the OPL model, retrieve the type and the name of the members of the given tuples
+
+    :param model_file: The OPL model file path (.mod)
+    :type model_file: str
+    :param tuple_names: The tuple names without the 't_' prefix (e.g. 'asset_steps')
+    :type tuple_names: list[str]
+    :return: The dictionnary containing the tuple names associated with the types and names of their members, in their order of declaration
+    :rtype: dict[str,list[tuple[str,str]]]
+    """
+    tuple_members = load_model_info(model_file).tuple_members
+    return {name: list(members) for name, members in tuple_members.items() if name in tuple_names}
+
+
+def text_output_folder(excel_output_path: str) -> str:
+    """
+    Return the folder of the CSV output files written by the OPL model with the text data format
+
+    :param excel_output_path: The output Excel file path of the Excel data format
+    :type excel_output_path: str
+    :return: The folder path, the output Excel file path without its extension
+    :rtype: str
+    """
+    return os.path.splitext(excel_output_path)[0]
+
+
+def _opl_string(value: object) -> str:
+    if value is None or (isinstance(value, float) and math.isnan(value)) or value is pd.NA or value is pd.NaT:
+        value = ""  # An empty cell is read as an empty string by SheetRead
+    elif isinstance(value, float) and value.is_integer():
+        value = int(value)
+    text = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return f'"{text}"'
+
+
+def _opl_column(column: pd.Series, member_type: str) -> list[str]:
+    """Return the values of the column as OPL .dat literals of the member type."""
+    if member_type == "string":
+        return [_opl_string(value) for value in column.astype(object).tolist()]
+    numbers = pd.to_numeric(column.astype(object), errors="coerce").fillna(0)  # An empty cell is read as 0
+    if member_type == "int":
+        return [str(int(number)) for number in numbers.tolist()]
+    literals = []
+    for number in numbers.tolist():
+        literal = repr(float(number))
+        literals.append({"inf": "infinity", "-inf": "-infinity"}.get(literal, literal))
+    return literals
+
+
+def create_text_dat_file(
+    data_dat: dict[str, pd.DataFrame],
+    dat_path: str,
+    tuple_members: dict[str, list[tuple[str, str]]],
+    output_folder: str,
+) -> None:
+    """
+    Create and save the .dat file containing the input data as tuple sets, for the text data format
+
+    :param data_dat: The dictionnary containing only the names of the input datasheets and their content as expected in the OPL model
+    :type data_dat: dict[str,pd.DataFrame]
+    :param dat_path: The .dat file path
+    :type dat_path: str
+    :param tuple_members: The input tuple names associated with the types and names of their members
+    :type tuple_members: dict[str,list[tuple[str,str]]]
+    :param output_folder: The folder where the OPL model will write the CSV output files
+    :type output_folder: str
+    :rtype: None
+    """
+    datetime_str = (datetime.now()).strftime("%d/%m/%Y %H:%M:%S")  # dd/mm/YY H:M:S
+    with open(dat_path, "w") as output:
+        output.write("/*********************************************\n")
+        output.write(" * Auto generated (text data format)\n")
+        output.write(" * Creation Date: " + datetime_str + "\n")
+        output.write(" *********************************************/\n\n")
+
+        for sheet_name, sheet_data in data_dat.items():
+            members = tuple_members[sheet_name.lower()]
+            columns = []
+            for member_type, member_name in members:
+                if member_name in sheet_data.columns:
+                    columns.append(_opl_column(sheet_data[member_name], member_type))
+                else:
+                    # The missing column is read from empty cells with the Excel data format
+                    print(f"Column '{member_name}' not found in {sheet_name}, it is filled with empty values")
+                    columns.append(_opl_column(pd.Series([None] * len(sheet_data)), member_type))
+            _write_tuple_set(output, sheet_name, columns)
+
+        output.write("textOutputFolder = " + _opl_string("/".join(output_folder.split("\\"))) + ";\n")
+
+    print(f".dat file created.\nPlease check the file at '{dat_path}'.\n")
+
+
+def _write_tuple_set(output, set_name: str, columns: list[list[str]]) -> None:
+    """Write the tuple set of the .dat file from the OPL literals of its columns."""
+    output.write(set_name + " = {\n")
+    output.write(",\n".join("<" + ", ".join(row) + ">" for row in zip(*columns)))
+    output.write("\n};\n\n")
+
+
+def add_warm_start_opl_model(copied_model_path: str, mod_file: str) -> None:
+    """
+    Add to the copied OPL model the WARM_START input and a main block giving its values to CPLEX as a MIP start.
+    The start array of each variable is declared and filled in a preprocessing block inserted before the objective,
+    from the values whose asset and step are in the index sets of the variable (e.g. the dispatchable generators and
+    the decision steps), the main block attaches them to the variables, solves the model and runs its postprocessing.
+
+    :param copied_model_path: The copied OPL model file path (.mod), modified in place
+    :type copied_model_path: str
+    :param mod_file: The original OPL model file path (.mod)
+    :type mod_file: str
+    :raises ModelReferenceError: If the model has no objective, already has a main block or no variable to start
+    :rtype: None
+    """
+    variables = warm_start_variables(mod_file)
+    if not variables:
+        raise ModelReferenceError("No variable of the OPL model can be warm started", context={"model_path": mod_file})
+    with open(copied_model_path, "r") as f:
+        mod_lines = f.readlines()
+    if any(line.startswith("main") for line in mod_lines):
+        raise ModelReferenceError("The OPL model already has a main block", context={"model_path": mod_file})
+    for objective_index, line in enumerate(mod_lines):
+        if line.lstrip().startswith(("minimize", "maximize")):
+            break
+    else:
+        raise ModelReferenceError("No objective found in the OPL model", context={"model_path": mod_file})
+
+    block = ["/* WARM START FROM THE ORIGINAL SOLUTION */\n", "tuple t_warm_start {\n"]
+    for i, (member_type, member) in enumerate(WARM_START_MEMBERS):
+        block.append(f"\t{'key ' if i < 3 else ''}{member_type} {member};\n")
+    block.append("}\n")
+    block.append(f"{{t_warm_start}} {WARM_START_SHEET} = ...;\n")
+    for variable, indexes in variables.items():
+        block.append(f"float {variable}Start{''.join(indexes)};\n")
+        # The values out of the index sets of the variable would be out of the bounds of its start array
+        members = ["w.step_id"] if len(indexes) == 1 else ["w.asset_id", "w.step_id"]
+        condition = " && ".join(f"{member} in {_index_set(index)}" for member, index in zip(members, indexes))
+        block.append(
+            f"{{t_warm_start}} {variable}StartValues = "
+            f'{{w | w in {WARM_START_SHEET}: w.variable == "{variable}" && {condition}}};\n'
+        )
+    block.append("execute WARM_START_VALUES {\n")
+    for variable, indexes in variables.items():
+        index = "[w.step_id]" if len(indexes) == 1 else "[w.asset_id][w.step_id]"
+        block.append(f"\tfor (var w in {variable}StartValues) {variable}Start{index} = w.value;\n")
+    block.append("}\n\n")
+
+    main = ["\nmain {\n", "\tthisOplModel.generate();\n", "\tvar vectors = new IloOplCplexVectors();\n"]
+    for variable in variables:
+        main.append(f"\tvectors.attach(thisOplModel.{variable}, thisOplModel.{variable}Start);\n")
+    main.append("\tvectors.setStart(cplex);\n")
+    main.append("\tif (cplex.solve()) {\n")
+    main.append("\t\tthisOplModel.postProcess();\n")
+    main.append("\t} else {\n")
+    main.append('\t\twriteln("No solution found from the warm start");\n')
+    main.append("\t}\n")
+    main.append("}\n")
+    with open(copied_model_path, "w") as f:
+        f.writelines(mod_lines[:objective_index] + block + mod_lines[objective_index:] + main)
+
+
+def _index_set(index: str) -> str:
+    """Return the set of an index of an OPL array declaration, e.g. 'isDECISION_STEPS' for '[t in isDECISION_STEPS]'."""
+    index_set = index.strip("[] ").split(" in ", 1)[-1].strip()
+    return index_set if index_set.isidentifier() else f"({index_set})"
+
+
+def append_warm_start_data(dat_path: str, warm_start: pd.DataFrame) -> None:
+    """
+    Add the WARM_START values to the .dat file
+
+    :param dat_path: The .dat file path
+    :type dat_path: str
+    :param warm_start: The values of the variables in the original solution, see warmstart.start_values
+    :type warm_start: pd.DataFrame
+    :rtype: None
+    """
+    columns = [_opl_column(warm_start[member], member_type) for member_type, member in WARM_START_MEMBERS]
+    with open(dat_path, "a") as output:
+        output.write("\n")
+        _write_tuple_set(output, WARM_START_SHEET, columns)
+
+
+def create_text_output_opl_model(copied_model_path: str, output_fields: list[str], add_costs: bool = True) -> None:
+    """
+    Add to the copied OPL model the execute block writing each output datasheet in a CSV file, for the text data format.
+    The CSV files are written in the folder given by textOutputFolder in the .dat file, their first line is the header of the Excel output sheet.
+
+    :param copied_model_path: The copied OPL model file path (.mod), including the costs extension
+    :type copied_model_path: str
+    :param output_fields: The output tuple names in the OPL model
+    :type output_fields: list[str]
+    :param add_costs: If True, the detailed optimization costs are also written, defaults to True
+    :type add_costs: bool, optional
+    :rtype: None
+    """
+    outputs = [
+        (field, OUTPUT_HEADER_SETS[output_set_field(field)], OUTPUT_DATA_SETS[output_set_field(field)])
+        for field in output_fields
+    ]
+    if add_costs:
+        outputs.append(("costs", "COSTS_HEADER", "COSTS"))
+    # The copied model is parsed without the cache, the costs tuple being declared in the costs extension
+    tuple_members = parse_model(copied_model_path).tuple_members
+
+    header_fields = ', ",", '.join(f"csvValue(h.field_{i:02d})" for i in range(1, HEADER_FIELDS_NUMBER + 1))
+    block = [
+        "\n\n\n/* OUTPUT DATA WRITTEN IN CSV FILES (text data format) */\n",
+        "string textOutputFolder = ...;\n\n",
+        "execute WRITE_TEXT_OUTPUT {\n",
+        "\tfunction csvValue(value) {\n",
+        '\t\tif (typeof(value) == "string") return "\\"" + value.split("\\"").join("\\"\\"") + "\\"";\n',
+        "\t\treturn value;\n",
+        "\t}\n",
+        "\tvar file;\n",
+    ]
+    for output_field, header_set, data_set in outputs:
+        sheet_name = output_set_field(output_field).upper()
+        values = ', ",", '.join(f"csvValue(t.{member_name})" for _, member_name in tuple_members[output_field])
+        block.append(f'\tfile = new IloOplOutputFile(textOutputFolder + "/{sheet_name}.csv");\n')
+        block.append(f"\tfor (var h in {header_set}) file.writeln({header_fields});\n")
+        block.append(f"\tfor (var t in {data_set}) file.writeln({values});\n")
+        block.append("\tfile.close();\n")
+    block.append("}\n")
+
+    with open(copied_model_path, "a") as output:
+        output.writelines(block)
+
+
 def prepare_optimization(
     data: dict[str, pd.DataFrame],
     mod_file: str,
@@ -684,9 +1022,20 @@ def prepare_optimization(
     add_costs=True,
     mod_costs_extension_path: str | None = None,
     dat_costs_extension_path: str | None = None,
-) -> None:
+    data_format: str = DATA_FORMAT_EXCEL,
+    warm_start: pd.DataFrame | None = None,
+    solver_profile: SolverProfile | None = None,
+    use_cache: bool = True,
+) -> dict[str, pd.DataFrame]:
     """
-    Create and save all files needed to run the OPL model
+    Create and save all files needed to run the OPL model.
+    With the 'excel' data format, OPL reads the input data from the input Excel file and writes the results in the output Excel file.
+    With the 'text' data format, the input data is written in the .dat file and OPL writes the results in CSV files in
+    text_output_folder(excel_output_path), no Excel file is written.
+    With warm start values, they are added to the .dat file and the model starts CPLEX from them.
+    The CPLEX parameters of the solver profile are set in the model, and the profile is recorded next to the output
+    data (see solver.record_profile).
+    The input and output Excel files and the .dat file are not written again when they are up to date (see stages).
 
     :param data: The dictionnary containing the names of the input and output datasheets and their content
     :type data: dict[str,pd.DataFrame]
@@ -706,28 +1055,107 @@ def prepare_optimization(
     :type mod_costs_extension_path: str, optional
     :param dat_costs_extension_path: The path to the file containing the additional code to add the detailed costs in the optimization output, defaults to None
     :type dat_costs_extension_path: str, optional
-    :rtype: None
+    :param data_format: 'excel' or 'text', defaults to 'excel'
+    :type data_format: str, optional
+    :param warm_start: The values of the variables in the original solution given by warmstart.start_values,
+    defaults to None to solve from scratch
+    :type warm_start: pd.DataFrame | None, optional
+    :param solver_profile: The solver profile of the run, defaults to None for the SOLVER_PROFILE setting
+    :type solver_profile: SolverProfile | None, optional
+    :param use_cache: If False, the files are written even if they are up to date, defaults to True
+    :type use_cache: bool, optional
+    :raises ValidationError: If the data format or the solver profile is unknown
+    :return: The input datasheets written in the input Excel file or in the .dat file, as they are read by the OPL model
+    :rtype: dict[str,pd.DataFrame]
     """
+    if data_format not in DATA_FORMATS:
+        raise ValidationError(f"Unknown data format '{data_format}'", context={"data_formats": list(DATA_FORMATS)})
+    if solver_profile is None:
+        solver_profile = get_solver_profile()
     print(mod_file)
     input_fields, output_fields = find_in_out_fields(mod_file)
     data_dat = prepare_input_data(data, mod_file, input_fields)
-    prepare_excel_input(data_dat, excel_input_path)
-    prepare_excel_output(excel_output_path, output_fields, add_costs=add_costs)
-    if add_costs:
-        create_cost_extraction_opl_model(mod_file, mod_costs_extension_path, dat_costs_extension_path)
-    copy_model(mod_file, copied_model_path, add_costs=add_costs, mod_costs_extension_path=mod_costs_extension_path)
-    create_dat_file(
-        data_dat,
-        dat_path,
-        output_fields,
-        excel_input_path,
-        excel_output_path,
-        add_costs=add_costs,
-        dat_costs_extension_path=dat_costs_extension_path,
+    if data_format == DATA_FORMAT_TEXT:
+        prepare_model_files(
+            mod_file,
+            copied_model_path,
+            add_costs,
+            mod_costs_extension_path,
+            dat_costs_extension_path,
+            data_format,
+            warm_start is not None,
+            solver_profile,
+        )
+        output_folder = os.path.abspath(text_output_folder(excel_output_path))
+        # The CSV files of a previous run must not be taken for the results of this one
+        shutil.rmtree(output_folder, ignore_errors=True)
+        os.makedirs(output_folder)
+
+        def build_text_dat() -> None:
+            create_text_dat_file(data_dat, dat_path, find_tuple_members(mod_file, input_fields), output_folder)
+            if warm_start is not None:
+                append_warm_start_data(dat_path, warm_start)
+
+        dat_inputs = [data_dat, find_tuple_members(mod_file, input_fields), output_folder, warm_start]
+        run_stage("text_dat", [dat_path], dat_inputs, build_text_dat, use_cache)
+        record_profile(excel_output_path, solver_profile)
+        return data_dat
+
+    run_stage(
+        "excel_input",
+        [excel_input_path],
+        [data_dat],
+        lambda: prepare_excel_input(data_dat, excel_input_path),
+        use_cache,
+    )
+    run_stage(
+        "excel_output",
+        [excel_output_path],
+        [output_fields, add_costs],
+        lambda: prepare_excel_output(excel_output_path, output_fields, add_costs=add_costs),
+        use_cache,
     )
+    prepare_model_files(
+        mod_file,
+        copied_model_path,
+        add_costs,
+        mod_costs_extension_path,
+        dat_costs_extension_path,
+        data_format,
+        warm_start is not None,
+        solver_profile,
+    )
+
+    def build_dat() -> None:
+        create_dat_file(
+            data_dat,
+            dat_path,
+            output_fields,
+            excel_input_path,
+            excel_output_path,
+            add_costs=add_costs,
+            dat_costs_extension_path=dat_costs_extension_path,
+        )
+        if warm_start is not None:
+            append_warm_start_data(dat_path, warm_start)
+
+    # The .dat file only depends on the size of the input sheets, and on the costs extension placed from the cache
+    dat_inputs = [
+        {sheet_name: sheet_data.shape for sheet_name, sheet_data in data_dat.items()},
+        output_fields,
+        [os.path.abspath(excel_input_path), os.path.abspath(excel_output_path)],
+        add_costs,
+        Path(dat_costs_extension_path) if add_costs and dat_costs_extension_path else None,
+        warm_start,
+    ]
+    run_stage("dat", [dat_path], dat_inputs, build_dat, use_cache)
+    record_profile(excel_output_path, solver_profile)
+    return data_dat
 
 
-def run_optimization(model_path: str, dat_path: str) -> None:
+def run_optimization(
+    model_path: str, dat_path: str, output_files: list[str] | None = None, runner: OplRunner | None = None
+) -> OplRunResult:
     """
     Run the optimization configuration given by the OPL model file and the .dat file
 
@@ -735,21 +1163,14 @@ def run_optimization(model_path: str, dat_path: str) -> None:
     :type model_path: str
     :param dat_path: The .dat file path
     :type dat_path: str
-    :rtype: None
+    :param output_files: The output Excel files or output folders to wait for once oplrun has exited, defaults to None
+    :type output_files: list[str] | None, optional
+    :param runner: The runner of oplrun, defaults to None for a runner with the timeout of the configuration
+    :type runner: OplRunner | None, optional
+    :raises OptimizationFail: If oplrun fails, times out or is cancelled, or the output files are not written
+    :return: The command, exit code, duration, output lines and solve metrics of the run
+    :rtype: OplRunResult
     """
-
-    command = f'oplrun "{model_path}" "{dat_path}"'
-    print(command + "\n")
-    p = subprocess.Popen(command, shell=True, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
-
-    for line in p.stdout:
-        print(line.decode(errors="replace"), end="")
-
-    p.wait()
-
-    p.terminate()
-
-    print("/////////////////////////")
-    import time
-
-    time.sleep(60)
+    if runner is None:
+        runner = OplRunner.from_config(Config.from_env())
+    return runner.run(model_path, dat_path, output_files or ())
@@ -1,12 +1,18 @@
-import json
+from __future__ import annotations
+
 import os
 import sys
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 import pandas as pd
-import yaml
 
-from optim_analyser.errors import ModelReferenceError
+from optim_analyser.errors import DataError
+from optim_analyser.optim import dataframes, excel
+from optim_analyser.optim.registry import Deployments, PlotParams, default_registry
+
+if TYPE_CHECKING:
+    from optim_analyser.optim.bundle import JobBundle
 
 
 def resource_path(relative_path: list[str]):
@@ -47,17 +53,13 @@ def get_plot_param_df(excel_plot_param_path: str) -> pd.DataFrame:
     :rtype: pd.DataFrame
     """
 
-    clients_param = pd.read_excel(excel_plot_param_path, sheet_name="PLOT_PARAM", engine="openpyxl")
+    clients_param = excel.read_excel(excel_plot_param_path, sheet_name="PLOT_PARAM")
     clients_param["Microgrids ref"] = pd.to_numeric(clients_param["Microgrids ref"])
     clients_param = clients_param.set_index(clients_param["Microgrids ref"])
 
     return clients_param
 
 
-# Dictionary associating a microgrid name to each operation id
-operation_id_to_microgrid_name = get_plot_param_df(excel_plot_param_path)["microgrid_name"].to_dict()
-
-
 def get_deployments_models_df(excel_deployment_list_path: str) -> tuple[pd.DataFrame, pd.DataFrame]:
     """
     Load all deployments and models details from the Excel file
@@ -67,41 +69,77 @@ def get_deployments_models_df(excel_deployment_list_path: str) -> tuple[pd.DataF
     :return: The dataframe containing the model IDs corresponding to all operation IDs, and the dataframe containing the model file names corresponding to all model IDs
     :rtype: tuple[pd.DataFrame,pd.DataFrame]
     """
-    deployments = pd.read_excel(excel_deployment_list_path, sheet_name="DEPLOYMENTS_PROD", engine="openpyxl").set_index(
-        "Operation ref"
-    )
-    models = pd.read_excel(excel_deployment_list_path, sheet_name="MODELS", engine="openpyxl").set_index("Model ID")
+    sheets = excel.read_excel(excel_deployment_list_path, sheet_name=["DEPLOYMENTS_PROD", "MODELS"])
+    deployments = sheets["DEPLOYMENTS_PROD"].set_index("Operation ref")
+    models = sheets["MODELS"].set_index("Model ID")
     return deployments, models
 
 
+def get_plot_params() -> PlotParams:
+    """
+    Return the plotting parameters of plot_param.xlsx indexed by operation ID, the workbook is read again only when it changes
+
+    :return: The plotting parameters of all the microgrids
+    :rtype: PlotParams
+    """
+    return default_registry().get(
+        excel_plot_param_path, "plot_param", lambda file: PlotParams.from_frame(get_plot_param_df(file))
+    )
+
+
+def get_deployments() -> Deployments:
+    """
+    Return the models of deployment_list.xlsx indexed by operation ID, the workbook is read again only when it changes
+
+    :return: The models deployed for all the operations
+    :rtype: Deployments
+    """
+    return default_registry().get(
+        excel_deployment_list_path,
+        "deployment_list",
+        lambda file: Deployments.from_frames(*get_deployments_models_df(file)),
+    )
+
+
+def microgrid_name_date(operation_id: str, optimisation_request_time: str) -> tuple[str, str]:
+    """
+    Return the microgrid name corresponding to the operation ID and the microgrid name with the optimization resquest time
+
+    :param operation_id: The operation ID
+    :type operation_id: str
+    :param optimisation_request_time: The optimization request time (e.g. '2025-01-10 08:15:02.123')
+    :type optimisation_request_time: str
+    :return: The microgrid name, and the microgrid name with the optimization resquest time
+    :rtype: tuple[str,str]
+    """
+    microgrid_name = get_plot_params().microgrid_name(operation_id)
+
+    optim_resquest_time = str(optimisation_request_time).split(".")[0]  # Remove decimals on seconds
+    optim_resquest_time = "_".join(optim_resquest_time.split(" "))
+    optim_resquest_time = "".join(optim_resquest_time.split(":"))
+
+    return microgrid_name, microgrid_name + "_" + optim_resquest_time
+
+
 def op_id_and_microgrid_name_date_from_json(json_file: str) -> tuple[str, str, str]:
     """
     Return the operation ID, the corresponding microgrid name that will be used in generated files names and the microgrid name with the optimization resquest time
     extracted from the optimization job data from the .json file
 
-    :param json_file: The optimization job path (can be a .json or a .txt)
+    :param json_file: The optimization job path (can be a .json or a .txt, compressed or not)
     :type json_file: str
     :return: The operation ID, the microgrid name, and the microgrid name with the optimization resquest time
     :rtype: tuple[str,str,str]
     """
-    with open(json_file, "r") as f:
-        json_data = json.load(f)
-        if "entity" in json_data:
-            json_data = json_data["entity"]
-
-        for sheet_data in json_data["decision_optimization"]["input_data"]:
-            if sheet_data["id"] == "OPERATION.csv":
-                for param in sheet_data["values"]:
-                    if param[0] == "operation_id":
-                        operation_id = param[1]
-                        microgrid_name = operation_id_to_microgrid_name.get(
-                            int(operation_id), "microgrid_name_not_found"
-                        )
-                    elif param[0] == "optimisation_request_time":
-                        optim_resquest_time = param[1].split(".")[0]  # Remove decimals on seconds
-                        optim_resquest_time = "_".join(optim_resquest_time.split(" "))
-                        optim_resquest_time = "".join(optim_resquest_time.split(":"))
-                return operation_id, microgrid_name, microgrid_name + "_" + optim_resquest_time
+    summary = dataframes.probe_job(json_file, with_sheet_ids=False)
+    if summary.operation_id is None or summary.optimisation_request_time is None:
+        raise DataError(
+            "No operation_id or optimisation_request_time found in the OPERATION sheet",
+            error_code="MISSING_OPERATION_DATA",
+            context={"path": json_file},
+        )
+    microgrid_name, optim_name = microgrid_name_date(summary.operation_id, summary.optimisation_request_time)
+    return summary.operation_id, microgrid_name, optim_name
 
 
 def op_id_and_microgrid_name_date_from_excel(excel_input_path: str) -> str:
@@ -114,18 +152,14 @@ def op_id_and_microgrid_name_date_from_excel(excel_input_path: str) -> str:
     :return: The operation ID, the microgrid name, and the microgrid name with the optimization resquest time
     :rtype: str
     """
-    input_data = pd.read_excel(excel_input_path, sheet_name="OPERATION")
+    input_data = excel.read_excel(excel_input_path, sheet_name="OPERATION")
     operation_df = input_data.set_index("param_id").transpose()
     operation_id = operation_df["operation_id"]["param_val"]
-    microgrid_name = operation_id_to_microgrid_name.get(int(operation_id), "microgrid_name_not_found")
-
-    optim_resquest_time = str(operation_df["optimisation_request_time"]["param_val"]).split(".")[
-        0
-    ]  # Remove decimals on seconds
-    optim_resquest_time = "_".join(optim_resquest_time.split(" "))
-    optim_resquest_time = "".join(optim_resquest_time.split(":"))
+    microgrid_name, optim_name = microgrid_name_date(
+        operation_id, operation_df["optimisation_request_time"]["param_val"]
+    )
 
-    return operation_id, microgrid_name, microgrid_name + "_" + optim_resquest_time
+    return operation_id, microgrid_name, optim_name
 
 
 def get_microgrid_param(operation_id: str) -> pd.Series:
@@ -137,16 +171,7 @@ def get_microgrid_param(operation_id: str) -> pd.Series:
     :return: The plotting parameters of the microgrid corresponding to the operation ID
     :rtype: pd.Series
     """
-    plot_param = get_plot_param_df(excel_plot_param_path)
-    default_param = plot_param.loc[-1, :]
-
-    # Load display parameters corresponding to the microgrid
-    if int(operation_id) in list(plot_param.index):
-        microgrid_param = plot_param.loc[int(operation_id), :]
-    else:
-        microgrid_param = default_param
-
-    return microgrid_param
+    return get_plot_params().microgrid_param(operation_id)
 
 
 def get_model_path(operation_id: str) -> str:
@@ -158,33 +183,18 @@ def get_model_path(operation_id: str) -> str:
     :return: The OPL model file (.mod) path
     :rtype: str
     """
-    deployments, models = get_deployments_models_df(excel_deployment_list_path)
-    try:
-        model_id = deployments.at[int(operation_id), "Model Id"]
-    except KeyError:
-        raise ModelReferenceError(
-            f"Operation ID {operation_id} not found in sheet DEPLOYMENTS_PROD in deployment_list.xslx"
-        )
-    try:
-        model_file_name = models.at[model_id, "Sharepoint file"]
-    except pd.errors.InvalidIndexError:
-        raise ModelReferenceError(f"Operation id {operation_id} refers to multiple Model IDs in deployment_list.xslx")
-    except KeyError:
-        try:
-            model_file_name = models.at[str(model_id), "Sharepoint file"]
-        except KeyError:
-            raise ModelReferenceError(f"Model ID {model_id} not found in sheet MODELS in deployment_list.xslx")
+    model_file_name = get_deployments().model_file(operation_id)
     return os.path.join(model_folder, model_file_name)
 
 
 def get_display_paths_and_param_json(
-    json_file: str, output_folder: str = "./optimAnalyser/output/"
+    job: JobBundle, output_folder: str = "./optimAnalyser/output/"
 ) -> tuple[str, str, str, pd.Series]:
     """
-    Return all paths that will be used when displaying the optimization job contained in the .json file
+    Return all paths that will be used when displaying the optimization job loaded from the .json file
 
-    :param json_file: The optimization job path (can be a .json or a .txt)
-    :type json_file: str
+    :param job: The optimization job loaded from the .json file
+    :type job: JobBundle
     :param output_folder: The folder path where all files will be saved, defaults to "./optimAnalyser/output/"
     :type output_folder: str, optional
     :return: The folder path containing the other files,
@@ -194,7 +204,7 @@ def get_display_paths_and_param_json(
     :rtype: tuple[str,str,str,pd.Series]
     """
 
-    operation_id, microgrid_name, optim_name = op_id_and_microgrid_name_date_from_json(json_file)
+    operation_id, microgrid_name, optim_name = job.operation_id, job.microgrid_name, job.optim_name
 
     # Create output folders
     if not os.path.exists(output_folder):
@@ -213,14 +223,28 @@ def get_display_paths_and_param_json(
     return (optim_folder, excel_init_path, html_path, plot_param)
 
 
+def get_replay_output_path(output_folder: str, microgrid_name: str) -> str:
+    """
+    Return the path to the output data Excel file of the local replay of the microgrid optimization jobs
+
+    :param output_folder: The folder path where all files of the replay are saved
+    :type output_folder: str
+    :param microgrid_name: The microgrid name used in generated files names
+    :type microgrid_name: str
+    :return: The path to the Excel file containing the output data of the replayed job
+    :rtype: str
+    """
+    return os.path.join(output_folder, microgrid_name, "run_cplex", "Data", microgrid_name + "_output.xlsx")
+
+
 def get_run_paths_and_param_json(
-    json_file: str, output_folder: str = "./optimAnalyser/output/"
+    job: JobBundle, output_folder: str = "./optimAnalyser/output/"
 ) -> tuple[str, str, str, str, str, str, str, str, str, str, pd.Series]:
     """
-    Return all paths that will be used when replaying and displaying the optimization job contained in the .json file
+    Return all paths that will be used when replaying and displaying the optimization job loaded from the .json file
 
-    :param json_file: The optimization job path (can be a .json or a .txt)
-    :type json_file: str
+    :param job: The optimization job loaded from the .json file
+    :type job: JobBundle
     :param output_folder: The folder path where all files will be saved, defaults to "./optimAnalyser/output/"
     :type output_folder: str, optional
     :return: The path to the Excel file containing all the initial optimization job data,
@@ -237,8 +261,8 @@ def get_run_paths_and_param_json(
     :rtype: tuple[str,str,str,str,str,str,str,str,str,str,pd.Series]
     """
 
-    operation_id, microgrid_name, _ = op_id_and_microgrid_name_date_from_json(json_file)
-    optim_folder, excel_init_path, html_path, plot_param = get_display_paths_and_param_json(json_file, output_folder)
+    operation_id, microgrid_name = job.operation_id, job.microgrid_name
+    optim_folder, excel_init_path, html_path, plot_param = get_display_paths_and_param_json(job, output_folder)
 
     model_path = get_model_path(operation_id)
 
@@ -250,7 +274,7 @@ def get_run_paths_and_param_json(
         os.makedirs(run_data_folder)
 
     excel_input_path = os.path.join(run_data_folder, microgrid_name + "_input.xlsx")
-    excel_output_path = os.path.join(run_data_folder, microgrid_name + "_output.xlsx")
+    excel_output_path = get_replay_output_path(output_folder, microgrid_name)
     # csvs_folder_path = os.path.join(run_data_folder, optim_name + "_csvs")
 
     run_dat_path = os.path.join(run_folder, microgrid_name + ".dat")
@@ -408,19 +432,19 @@ def get_compare_paths_excel(
 
 
 def get_compare_paths_json(
-    json_init_path: str, output_folder: str = "./optimAnalyser/output/"
+    job_init: JobBundle, output_folder: str = "./optimAnalyser/output/"
 ) -> tuple[str, pd.Series]:
     """
-    Return the .html visuals comparison path and the plotting parameters for the initial optimization corresponding to the .json file
+    Return the .html visuals comparison path and the plotting parameters for the initial optimization loaded from the .json file
 
-    :param json_init_path: The initial optimization job path (can be a .json or a .txt)
-    :type json_init_path: str
+    :param job_init: The initial optimization job loaded from the .json file
+    :type job_init: JobBundle
     :param output_folder: The folder path where the comparison visuals will be saved, defaults to "./optimAnalyser/output/"
     :type output_folder: str, optional
     :return: The .html file path where the comaprison visuals will be saved, and the plotting parameters corresponding to the Excel file
     :rtype: tuple[str,pd.Series]
     """
-    _, _, html_path_basic, plot_param = get_display_paths_and_param_json(json_init_path, output_folder)
+    _, _, html_path_basic, plot_param = get_display_paths_and_param_json(job_init, output_folder)
     html_basic_filename = os.path.splitext(os.path.basename(html_path_basic))[0]
     html_path_comparison = os.path.join(os.path.dirname(html_path_basic), html_basic_filename + "_comparison.html")
 
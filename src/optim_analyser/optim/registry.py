@@ -0,0 +1,165 @@
+"""In-process registry of the configuration workbooks.
+
+The plotting parameters (``plot_param.xlsx``) and the deployments and models (``deployment_list.xlsx``) are
+looked up for every display, replay, scenario and comparison. The registry loads each workbook once, indexes it
+by operation ID and model ID, and keeps it until the file changes on disk (e.g. when the GUI downloads a new
+version of the configuration), so that the lookups do not read the workbooks again.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import threading
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any, TypeVar
+
+import pandas as pd
+
+from optim_analyser.errors import ModelReferenceError
+
+T = TypeVar("T")
+
+DEFAULT_OPERATION_ID = -1
+MICROGRID_NAME_NOT_FOUND = "microgrid_name_not_found"
+
+
+class FileRegistry:
+    """Objects loaded from files, loaded again when their file is modified.
+
+    The registry can be shared between threads, a file is loaded by one thread at a time.
+    """
+
+    def __init__(self):
+        self._entries: dict[tuple[str, str], tuple[tuple[int, int], Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, file: str, kind: str, loader: Callable[[str], T]) -> T:
+        """Return the object loaded from the file, kind identifies the loader.
+
+        The loader is called with the file path if the file has not been loaded yet or has been modified since.
+        """
+        stat = os.stat(file)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        key = (os.path.abspath(file), kind)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != stamp:
+                entry = (stamp, loader(file))
+                self._entries[key] = entry
+        return entry[1]
+
+    def clear(self) -> None:
+        """Forget all the loaded objects."""
+        with self._lock:
+            self._entries.clear()
+
+
+_default_registry = FileRegistry()
+
+
+def default_registry() -> FileRegistry:
+    """
+    Return the registry shared by the whole application
+
+    :return: The registry of the configuration workbooks
+    :rtype: FileRegistry
+    """
+    return _default_registry
+
+
+def _operation_key(operation_id: Any) -> int | None:
+    """Return the operation ID as an int, None for an empty cell."""
+    if operation_id is None or (isinstance(operation_id, float) and math.isnan(operation_id)):
+        return None
+    return int(operation_id)
+
+
+def _model_key(model_id: Any) -> str:
+    """Return the model ID as a string, the IDs read as floats (e.g. 2.0) being written as ints."""
+    if isinstance(model_id, float) and model_id.is_integer():
+        model_id = int(model_id)
+    return str(model_id)
+
+
+@dataclass(frozen=True)
+class PlotParams:
+    """Plotting parameters of the microgrids indexed by operation ID.
+
+    Args:
+        table: The PLOT_PARAM sheet indexed by its 'Microgrids ref' column
+        by_operation: The plotting parameters of each operation ID
+        default: The plotting parameters of the operations without specific parameters
+    """
+
+    table: pd.DataFrame
+    by_operation: dict[int, pd.Series]
+    default: pd.Series
+
+    @classmethod
+    def from_frame(cls, table: pd.DataFrame) -> PlotParams:
+        """Index the PLOT_PARAM sheet loaded by path.get_plot_param_df."""
+        by_operation = {}
+        for operation_id, row in table.iterrows():
+            key = _operation_key(operation_id)
+            if key is not None:
+                by_operation.setdefault(key, row)
+        return cls(table, by_operation, by_operation[DEFAULT_OPERATION_ID])
+
+    def microgrid_param(self, operation_id: str | int) -> pd.Series:
+        """Return the plotting parameters of the operation, the default parameters if it has none."""
+        return self.by_operation.get(int(operation_id), self.default).copy()
+
+    def microgrid_name(self, operation_id: str | int) -> str:
+        """Return the microgrid name of the operation, 'microgrid_name_not_found' if it is unknown."""
+        param = self.by_operation.get(int(operation_id))
+        return MICROGRID_NAME_NOT_FOUND if param is None else param["microgrid_name"]
+
+
+@dataclass(frozen=True)
+class Deployments:
+    """Models deployed for each operation ID.
+
+    Args:
+        model_ids: The model IDs of each operation ID in the DEPLOYMENTS_PROD sheet
+        model_files: The model file name of each model ID (as a string) in the MODELS sheet
+    """
+
+    model_ids: dict[int, list[Any]]
+    model_files: dict[str, str]
+
+    @classmethod
+    def from_frames(cls, deployments: pd.DataFrame, models: pd.DataFrame) -> Deployments:
+        """Index the sheets loaded by path.get_deployments_models_df."""
+        model_ids: dict[int, list[Any]] = {}
+        for operation_id, model_id in deployments["Model Id"].items():
+            key = _operation_key(operation_id)
+            if key is not None:
+                model_ids.setdefault(key, []).append(model_id)
+        model_files: dict[str, str] = {}
+        for model_id, model_file in models["Sharepoint file"].items():
+            model_files.setdefault(_model_key(model_id), model_file)
+        return cls(model_ids, model_files)
+
+    def model_file(self, operation_id: str | int) -> str:
+        """Return the model file name deployed for the operation.
+
+        Raises:
+            ModelReferenceError: If the operation is not deployed, is deployed with several models, or its model
+                is not in the MODELS sheet
+        """
+        model_ids = self.model_ids.get(int(operation_id))
+        if model_ids is None:
+            raise ModelReferenceError(
+                f"Operation ID {operation_id} not found in sheet DEPLOYMENTS_PROD in deployment_list.xslx"
+            )
+        if len(model_ids) > 1:
+            raise ModelReferenceError(
+                f"Operation id {operation_id} refers to multiple Model IDs in deployment_list.xslx"
+            )
+        model_id = model_ids[0]
+        try:
+            return self.model_files[_model_key(model_id)]
+        except KeyError:
+            raise ModelReferenceError(f"Model ID {model_id} not found in sheet MODELS in deployment_list.xslx")
@@ -1,10 +1,22 @@
+from collections.abc import Mapping
+
 import pandas as pd
 
 from optim_analyser.errors import OptimizationFail
-from optim_analyser.optim import dataframes, optimization
+from optim_analyser.models import OplRunResult, WarmStartReport
+from optim_analyser.optim import dataframes, optimization, results, solvelog, warmstart
 
 
-def replay_optimization(model_path: str, dat_path: str, data: dict[str, pd.DataFrame], excel_output_path: str) -> None:
+def replay_optimization(
+    model_path: str,
+    dat_path: str,
+    data: dict[str, pd.DataFrame],
+    excel_output_path: str,
+    data_format: str = optimization.DATA_FORMAT_EXCEL,
+    input_data: Mapping[str, pd.DataFrame] | None = None,
+    use_cache: bool = True,
+    warm_start: bool = False,
+) -> Mapping[str, pd.DataFrame]:
     """
     Run the optimization configuration given by the OPL model file and the .dat file, and allow comparison of the initial and recomputed objective values
 
@@ -16,14 +28,43 @@ def replay_optimization(model_path: str, dat_path: str, data: dict[str, pd.DataF
     :type data: dict[str,pd.DataFrame]
     :param excel_output_path: The path to the recomputed output data Excel file that will be created when running the optimization configuration
     :type excel_output_path: str
+    :param data_format: 'excel' or 'text', the data format given to optimization.prepare_optimization, defaults to 'excel'
+    :type data_format: str, optional
+    :param input_data: The input datasheets written by optimization.prepare_optimization, used with the model to find
+    the results of the same problem in the result cache, defaults to None to always run the optimization
+    :type input_data: Mapping[str,pd.DataFrame] | None, optional
+    :param use_cache: If False, the optimization is run even if its results are in the result cache, defaults to True
+    :type use_cache: bool, optional
+    :param warm_start: If True, the model was prepared with the warm start values: whether CPLEX accepted them and the
+    time saved compared to a replay of the same input data from scratch are printed, defaults to False
+    :type warm_start: bool, optional
+    :raises OptimizationFail: If oplrun fails or the optimization did not write its output data
+    :return: The recomputed output datasheets and their content
+    :rtype: Mapping[str,pd.DataFrame]
     """
-    optimization.run_optimization(model_path=model_path, dat_path=dat_path)
+    key = None
+    if use_cache and input_data is not None and results.cache_enabled():
+        key = results.result_key(model_path, input_data)
+    # The output files are not written when the results are found in the cache
+    output_data = results.load_result(key) if key is not None else None
+    if output_data is None:
+        output_data, run_result = _run_and_read_output(model_path, dat_path, excel_output_path, data_format)
+        if key is not None:
+            results.store_result(key, output_data)
+        if input_data is not None and warm_start:
+            report = WarmStartReport(
+                elapsed_seconds=run_result.elapsed_seconds,
+                accepted=warmstart.mip_start_accepted(run_result.output),
+                cold_elapsed_seconds=results.load_solve_time(input_data),
+            )
+            warmstart.print_warm_start_report(report)
+        elif input_data is not None:
+            results.store_solve_time(input_data, run_result.elapsed_seconds)
+    else:
+        print("Recomputed output data found in the result cache.")
     optimiser_objective_value_init = (
         data["OPERATION_OUTPUT"].set_index("param_id").transpose()["optimiser_objective_value"]["param_val"]
     )
-    output_data = dataframes.excel_to_dataframe(excel_output_path)
-    if any([output_data[sheet_name].columns.tolist() == [] for sheet_name in output_data.keys()]):
-        raise OptimizationFail("No optimization output data")
     optimiser_objective_value_recomputed = (
         output_data["OPERATION_OUTPUT"].set_index("param_id").transpose()["optimiser_objective_value"]["param_val"]
     )
@@ -31,3 +72,25 @@ def replay_optimization(model_path: str, dat_path: str, data: dict[str, pd.DataF
     print("Recomputed optimiser_objective_value : ", optimiser_objective_value_recomputed)
 
     # assert(round(optimiser_objective_value_init,4) == round(optimiser_objective_value_recomputed,4))
+    return output_data
+
+
+def _run_and_read_output(
+    model_path: str, dat_path: str, excel_output_path: str, data_format: str
+) -> tuple[Mapping[str, pd.DataFrame], OplRunResult]:
+    """Run oplrun, return the output datasheets it wrote and the result of the run, see replay_optimization."""
+    if data_format == optimization.DATA_FORMAT_TEXT:
+        output_files = [optimization.text_output_folder(excel_output_path)]
+    else:
+        output_files = [excel_output_path]
+    run_result = optimization.run_optimization(model_path=model_path, dat_path=dat_path, output_files=output_files)
+    if data_format == optimization.DATA_FORMAT_TEXT:
+        output_data = dataframes.text_output_to_dataframe(output_files[0])
+    else:
+        output_data = dataframes.excel_output_to_dataframe(excel_output_path)
+    if "OPERATION_OUTPUT" not in output_data or any(
+        [output_data[sheet_name].columns.tolist() == [] for sheet_name in output_data.keys()]
+    ):
+        raise OptimizationFail("No optimization output data")
+    solvelog.record_metrics(excel_output_path, run_result.metrics, model_path)
+    return output_data, run_result
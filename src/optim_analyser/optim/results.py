@@ -0,0 +1,166 @@
+"""Cache of the optimization results of the replays and scenario runs.
+
+Replaying the same job again (e.g. to display it, then to compare it) solves the same problem again. The output
+sheets of each run are stored in the on-disk cache under a key computed from the content of the run model and
+of the input data as read by the model, and the next runs of the same problem return them without running
+oplrun or a WML job. The results of oplrun and of WML are stored separately.
+
+The duration of the runs solving the input data from scratch is stored as well, to measure the time saved by the
+replays started from the original solution (see warmstart).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections.abc import Mapping
+
+import pandas as pd
+
+from optim_analyser.models import ResultCacheStats
+from optim_analyser.optim import dataframes, optimization
+from optim_analyser.optim.cache import default_cache, file_digest, frames_digest
+from optim_analyser.optim.registry import default_registry
+
+RESULT_FORMAT = 1  # To increase when the stored results change
+LOCAL = "local"  # Results computed by oplrun
+DISTANT = "wml"  # Results computed by IBM Watson ML
+
+_OUTPUT_GROUP = "output"
+
+_stats = ResultCacheStats()
+_stats_lock = threading.Lock()
+
+
+def cache_enabled() -> bool:
+    """
+    Check that the on-disk cache storing the results is enabled (CACHE_MAX_SIZE_MB greater than 0)
+
+    :return: True if the results can be looked up and stored
+    :rtype: bool
+    """
+    return default_cache().enabled
+
+
+def result_key(model_path: str, input_data: Mapping[str, pd.DataFrame], backend: str = LOCAL) -> str:
+    """
+    Return the key of the results of an optimization problem
+
+    :param model_path: The OPL model file path (.mod) of the run, including the costs extension
+    :type model_path: str
+    :param input_data: The input datasheets as read by the model (see optimization.prepare_input_data)
+    :type input_data: Mapping[str,pd.DataFrame]
+    :param backend: LOCAL for oplrun, DISTANT for IBM Watson ML, defaults to LOCAL
+    :type backend: str, optional
+    :return: The key of the cache entry
+    :rtype: str
+    """
+    # The hash of the model is computed once per version of the model file
+    model_digest = default_registry().get(model_path, "digest", file_digest)
+    digest = hashlib.blake2b(f"{model_digest}-{frames_digest(input_data)}".encode(), digest_size=20).hexdigest()
+    return default_cache().digest_key(f"result{RESULT_FORMAT}-{backend}", digest)
+
+
+def excel_result_key(model_path: str, excel_input_path: str, backend: str = LOCAL) -> str:
+    """
+    Return the key of the results of the optimization problem of an input data Excel file, e.g. of a scenario
+
+    :param model_path: The OPL model file path (.mod) of the run, including the costs extension
+    :type model_path: str
+    :param excel_input_path: The input data Excel file path
+    :type excel_input_path: str
+    :param backend: LOCAL for oplrun, DISTANT for IBM Watson ML, defaults to LOCAL
+    :type backend: str, optional
+    :return: The key of the cache entry
+    :rtype: str
+    """
+    input_fields, _ = optimization.find_in_out_fields(model_path)
+    input_data = optimization.prepare_input_data(
+        dataframes.excel_to_dataframe(excel_input_path), model_path, input_fields
+    )
+    return result_key(model_path, input_data, backend)
+
+
+def load_result(key: str) -> Mapping[str, pd.DataFrame] | None:
+    """
+    Return the output datasheets stored under the key
+
+    :param key: The key given by result_key
+    :type key: str
+    :return: The output datasheets, read when accessed, or None if they are not in the cache
+    :rtype: Mapping[str,pd.DataFrame] | None
+    """
+    cache = default_cache()
+    groups = cache.load(key) if cache.enabled else None
+    with _stats_lock:
+        if groups is None:
+            _stats.misses += 1
+        else:
+            _stats.hits += 1
+    return None if groups is None else groups[_OUTPUT_GROUP]
+
+
+def store_result(key: str, output_data: Mapping[str, pd.DataFrame]) -> None:
+    """
+    Store the output datasheets of a run under the key, nothing is stored if the cache is disabled
+
+    :param key: The key given by result_key
+    :type key: str
+    :param output_data: The output datasheets and their content
+    :type output_data: Mapping[str,pd.DataFrame]
+    :rtype: None
+    """
+    cache = default_cache()
+    if not cache.enabled:
+        return
+    cache.store(key, {_OUTPUT_GROUP: output_data})
+    with _stats_lock:
+        _stats.stored += 1
+
+
+def _solve_time_key(input_data: Mapping[str, pd.DataFrame], backend: str) -> str:
+    """Return the key of the solve time of the input data."""
+    return default_cache().digest_key(f"solve_time{RESULT_FORMAT}-{backend}", frames_digest(input_data))
+
+
+def store_solve_time(input_data: Mapping[str, pd.DataFrame], elapsed_seconds: float, backend: str = LOCAL) -> None:
+    """
+    Store the duration of a run solving the input data from scratch, the first stored duration is kept
+
+    :param input_data: The input datasheets as read by the model (see optimization.prepare_input_data)
+    :type input_data: Mapping[str,pd.DataFrame]
+    :param elapsed_seconds: The duration of the run
+    :type elapsed_seconds: float
+    :param backend: LOCAL for oplrun, DISTANT for IBM Watson ML, defaults to LOCAL
+    :type backend: str, optional
+    :rtype: None
+    """
+    cache = default_cache()
+    if cache.enabled:
+        cache.store_value(_solve_time_key(input_data, backend), elapsed_seconds)
+
+
+def load_solve_time(input_data: Mapping[str, pd.DataFrame], backend: str = LOCAL) -> float | None:
+    """
+    Return the duration of a run that solved the same input data from scratch
+
+    :param input_data: The input datasheets as read by the model (see optimization.prepare_input_data)
+    :type input_data: Mapping[str,pd.DataFrame]
+    :param backend: LOCAL for oplrun, DISTANT for IBM Watson ML, defaults to LOCAL
+    :type backend: str, optional
+    :return: The duration in seconds, None if no such run is stored
+    :rtype: float | None
+    """
+    cache = default_cache()
+    return cache.load_value(_solve_time_key(input_data, backend)) if cache.enabled else None
+
+
+def result_stats() -> ResultCacheStats:
+    """
+    Return the lookups of the results in the cache since the start of the process
+
+    :return: A copy of the number of results found, not found and stored
+    :rtype: ResultCacheStats
+    """
+    with _stats_lock:
+        return ResultCacheStats(_stats.hits, _stats.misses, _stats.stored)
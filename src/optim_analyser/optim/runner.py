@@ -0,0 +1,250 @@
+"""Local runs of the OPL models with oplrun.
+
+``oplrun`` is started without a shell and its output is read by a background thread, so that the run can be
+stopped on a timeout or cancelled from another thread while the output is streamed. The run is complete when
+the process has exited and its output files (Excel workbooks, or folders of CSV files) have stopped changing
+and can be opened, instead of waiting for a fixed time for CPLEX to write them. The solve metrics are read from
+the CPLEX log while it is streamed (see solvelog).
+"""
+
+from __future__ import annotations
+
+import queue
+import subprocess
+import threading
+import time
+from collections.abc import Callable, Iterable, Sequence
+from pathlib import Path
+from typing import IO
+
+from optim_analyser.config import Config
+from optim_analyser.errors import ConfigurationError, OptimizationFail
+from optim_analyser.models import OplRunResult
+from optim_analyser.optim.solvelog import SolveLogParser
+
+OPLRUN = "oplrun"
+
+_END_OF_OUTPUT = None
+
+
+class OplRunner:
+    """Runs the OPL models with oplrun and waits for their output files.
+
+    Args:
+        executable: The oplrun command, or the command followed by its options
+        timeout: The maximum duration of a run in seconds, None for no limit
+        output_stable_seconds: The time the output files must stay unchanged to be considered written
+        output_timeout: The maximum time to wait for the output files after the end of the process, in seconds
+        poll_interval: The interval between the checks of the process, the cancellation and the output files
+        on_output: Called with each line of the oplrun output, the lines are printed by default
+    """
+
+    def __init__(
+        self,
+        executable: str | Sequence[str] = OPLRUN,
+        timeout: float | None = None,
+        output_stable_seconds: float = 0.5,
+        output_timeout: float = 30.0,
+        poll_interval: float = 0.1,
+        on_output: Callable[[str], None] | None = print,
+    ):
+        self.executable = [executable] if isinstance(executable, str) else list(executable)
+        self.timeout = timeout
+        self.output_stable_seconds = output_stable_seconds
+        self.output_timeout = output_timeout
+        self.poll_interval = poll_interval
+        self.on_output = on_output
+        self._cancelled = threading.Event()
+
+    @classmethod
+    def from_config(cls, config: Config, **kwargs) -> OplRunner:
+        """Create the runner with the oplrun command and the run timeout of the configuration, 0 meaning no limit."""
+        timeout = config.app.opl_timeout_seconds
+        kwargs.setdefault("executable", config.app.oplrun)
+        kwargs.setdefault("timeout", timeout if timeout > 0 else None)
+        return cls(**kwargs)
+
+    def cancel(self) -> None:
+        """Stop the current run, the run then raises OptimizationFail. Can be called from any thread."""
+        self._cancelled.set()
+
+    def run(self, model_path: str, dat_path: str, output_files: Iterable[str] = ()) -> OplRunResult:
+        """Run the optimization configuration and wait until its output files are written.
+
+        Args:
+            model_path: The OPL model file (.mod) path
+            dat_path: The .dat file path
+            output_files: The output Excel files or output folders written by the model
+
+        Returns:
+            The command, exit code, duration, output lines and solve metrics of the run
+
+        Raises:
+            ConfigurationError: If oplrun is not installed
+            OptimizationFail: If the run fails, times out or is cancelled, or its output files are not written
+        """
+        self._cancelled.clear()
+        command = [*self.executable, str(model_path), str(dat_path)]
+        self._emit(subprocess.list2cmdline(command))
+        start = time.perf_counter()
+        try:
+            process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+        except FileNotFoundError as e:
+            raise ConfigurationError(
+                f"'{self.executable[0]}' not found, install IBM ILOG CPLEX Optimization Studio and add its bin "
+                "folder to the PATH to run the optimizations locally",
+                error_code="MISSING_DEPENDENCY",
+            ) from e
+
+        stdout = process.stdout
+        assert stdout is not None  # Piped above
+        lines: queue.Queue[str | None] = queue.Queue()
+        reader = threading.Thread(target=_read_output, args=(stdout, lines), daemon=True)
+        reader.start()
+        output: list[str] = []
+        log = SolveLogParser()
+        peak_memory_mb = None
+        memory_checked = start
+        context = {"command": command}
+        try:
+            while True:
+                try:
+                    line = lines.get(timeout=self.poll_interval)
+                except queue.Empty:
+                    line = ""
+                if line is _END_OF_OUTPUT:
+                    break
+                now = time.perf_counter()
+                if line:
+                    output.append(line)
+                    log.feed(line, now - start)
+                    self._emit(line)
+                if now - memory_checked >= self.poll_interval:
+                    peak_memory_mb = _peak_memory_mb(process.pid) or peak_memory_mb
+                    memory_checked = now
+                if self._cancelled.is_set():
+                    _stop(process)
+                    raise OptimizationFail(
+                        "The optimization has been cancelled", error_code="OPL_CANCELLED", context=context
+                    )
+                if self.timeout is not None and time.perf_counter() - start > self.timeout:
+                    _stop(process)
+                    raise OptimizationFail(
+                        f"The optimization did not end within {self.timeout:g} seconds",
+                        error_code="OPL_TIMEOUT",
+                        context=context | {"timeout": self.timeout},
+                    )
+            return_code = process.wait()
+        except BaseException:
+            _stop(process)  # e.g. KeyboardInterrupt, oplrun must not keep running
+            raise
+        finally:
+            stdout.close()
+
+        if return_code != 0:
+            raise OptimizationFail(
+                f"oplrun exited with code {return_code}",
+                error_code="OPL_FAILED",
+                context=context | {"output": [line.rstrip() for line in output[-5:]]},
+            )
+        self.wait_for_outputs(output_files)
+        elapsed_seconds = time.perf_counter() - start
+        self._emit("/////////////////////////")
+        return OplRunResult(command, return_code, elapsed_seconds, output, log.metrics(elapsed_seconds, peak_memory_mb))
+
+    def wait_for_outputs(self, output_files: Iterable[str]) -> None:
+        """Wait until the output files stop changing and can be opened.
+
+        Raises:
+            OptimizationFail: If the files are still changing or locked after the output timeout, or if the run
+                is cancelled
+        """
+        paths = [Path(file) for file in output_files]
+        if not paths:
+            return
+        deadline = time.perf_counter() + self.output_timeout
+        previous = _snapshot(paths)
+        stable_since = time.perf_counter()
+        while True:
+            if self._cancelled.is_set():
+                raise OptimizationFail("The optimization has been cancelled", error_code="OPL_CANCELLED")
+            now = time.perf_counter()
+            if now - stable_since >= self.output_stable_seconds and all(_is_readable(path) for path in paths):
+                return
+            if now > deadline:
+                raise OptimizationFail(
+                    "The optimization output files are still being written",
+                    error_code="OPL_OUTPUT_NOT_WRITTEN",
+                    context={"output_files": [str(path) for path in paths], "output_timeout": self.output_timeout},
+                )
+            time.sleep(self.poll_interval)
+            current = _snapshot(paths)
+            if current != previous:
+                previous = current
+                stable_since = time.perf_counter()
+
+    def _emit(self, line: str) -> None:
+        if self.on_output is not None:
+            self.on_output(line.rstrip("\r\n"))
+
+
+def _read_output(stdout: IO[bytes], lines: queue.Queue) -> None:
+    """Put the decoded output lines of the process in the queue, then the end of output marker."""
+    try:
+        for line in stdout:
+            lines.put(line.decode(errors="replace"))
+    except (OSError, ValueError):  # Output closed when the process is stopped
+        pass
+    finally:
+        lines.put(_END_OF_OUTPUT)
+
+
+def _stop(process: subprocess.Popen, grace_period: float = 5.0) -> None:
+    """Terminate the process, and kill it if it is still running after the grace period."""
+    if process.poll() is not None:
+        return
+    process.terminate()
+    try:
+        process.wait(timeout=grace_period)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+def _peak_memory_mb(pid: int) -> float | None:
+    """Return the peak resident memory of the running process in MB, None where /proc is not available."""
+    try:
+        with open(f"/proc/{pid}/status", "r") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024  # in kB
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def _snapshot(paths: Sequence[Path]) -> list[tuple[str, int | None, int | None]]:
+    """Return the size and modification time of the files, and of the files of the folders, None if unreadable."""
+    snapshot: list[tuple[str, int | None, int | None]] = []
+    for path in paths:
+        files = sorted(path.iterdir()) if path.is_dir() else [path]
+        for file in files:
+            try:
+                stat = file.stat()
+                snapshot.append((str(file), stat.st_size, stat.st_mtime_ns))
+            except OSError:
+                snapshot.append((str(file), None, None))
+    return snapshot
+
+
+def _is_readable(path: Path) -> bool:
+    """Check that the file, or all the files of the folder, exist and are not locked by the writer."""
+    files = list(path.iterdir()) if path.is_dir() else [path]
+    try:
+        for file in files:
+            # Opening for update fails on Windows while Excel or CPLEX keep the file open
+            with open(file, "r+b"):
+                pass
+    except OSError:
+        return False
+    return True
@@ -0,0 +1,272 @@
+"""Parallel local runs of the scenarios of a folder.
+
+All the scenarios of a folder are run with the same generated OPL model and .dat file. Each scenario is run in
+its own working directory, a copy of the run folder::
+
+    run_cplex/scenarios/<scenario>/
+        <model>.mod     # Copy of the run model, with the CPLEX thread budget
+        <microgrid>.dat # Copy of the run .dat file
+        Data/           # Copies of the input and output Excel files of the scenario
+
+so that several oplrun processes can run at once. Once a scenario is run, its Excel files are moved back to the
+scenario folder (in place) or to a folder named after the scenario next to the run folder, and its working
+directory is removed. The working directory of a failed scenario is kept to investigate the failure.
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from optim_analyser.config import Config
+from optim_analyser.errors import ValidationError
+from optim_analyser.models import ScenarioRunReport
+from optim_analyser.optim import dataframes, optimization, results, solvelog
+from optim_analyser.optim.runner import OplRunner
+
+WORKDIRS_FOLDER = "scenarios"
+
+
+def scenario_excel_paths(excel_folder_path: str, sc_name: str) -> tuple[str, str]:
+    """
+    Return the input and output Excel files of a scenario
+
+    :param excel_folder_path: The folder path containing the scenarios in their respective subfolders
+    :type excel_folder_path: str
+    :param sc_name: The scenario name
+    :type sc_name: str
+    :raises ValidationError: If the scenario folder has no 'in_prob_' input file
+    :return: The input data Excel file path and the output data Excel file path
+    :rtype: tuple[str,str]
+    """
+    sc_folder = os.path.join(excel_folder_path, sc_name)
+    input_files = sorted(file for file in os.listdir(sc_folder) if file.startswith("in_prob_"))
+    if not input_files:
+        raise ValidationError(f"No 'in_prob_' input file in the scenario folder {sc_folder}")
+    excel_input_path = os.path.join(sc_folder, input_files[-1])
+    return excel_input_path, excel_input_path.replace("in_prob", "out_prob")
+
+
+def default_threads(jobs: int) -> int | None:
+    """
+    Return the CPLEX thread budget of each oplrun process when several scenarios run at once
+
+    :param jobs: The number of simultaneous oplrun processes
+    :type jobs: int
+    :return: The processors shared between the processes, None to let CPLEX use all of them for a single process
+    :rtype: int | None
+    """
+    if jobs <= 1:
+        return None
+    return max(1, (os.cpu_count() or 1) // jobs)
+
+
+def prepare_workdir(
+    run_model_path: str, run_dat_path: str, workdir: str, threads: int | None = None
+) -> tuple[str, str]:
+    """
+    Create the working directory of a scenario with copies of the run model and .dat file
+
+    :param run_model_path: The OPL model file path (.mod) used to run the optimization
+    :type run_model_path: str
+    :param run_dat_path: The .dat file path used to run the optimization
+    :type run_dat_path: str
+    :param workdir: The working directory path, emptied if it exists
+    :type workdir: str
+    :param threads: The number of threads used by CPLEX, defaults to None for the model setting
+    :type threads: int | None, optional
+    :return: The copied OPL model file path and the copied .dat file path
+    :rtype: tuple[str,str]
+    """
+    shutil.rmtree(workdir, ignore_errors=True)
+    # The .dat file reads and writes the Excel files relatively to its folder
+    os.makedirs(os.path.join(workdir, "Data"))
+    model_path = shutil.copy(run_model_path, workdir)
+    dat_path = shutil.copy(run_dat_path, workdir)
+    if threads is not None:
+        optimization.add_cplex_parameters(model_path, {"threads": threads})
+    return model_path, dat_path
+
+
+def run_scenario(
+    run_model_path: str,
+    run_dat_path: str,
+    excel_folder_path: str,
+    sc_name: str,
+    in_place: bool,
+    threads: int | None = None,
+    runner: OplRunner | None = None,
+    use_cache: bool = True,
+) -> bool:
+    """
+    Run the optimization configuration of a scenario in its own working directory.
+    If the results of the same model and input data are in the result cache, the output Excel file is written from
+    them instead.
+
+    :param run_model_path: The OPL model file path (.mod) used to run the optimization
+    :type run_model_path: str
+    :param run_dat_path: The .dat file path used to run the optimization
+    :type run_dat_path: str
+    :param excel_folder_path: The folder path containing the scenarios in their respective subfolders
+    :type excel_folder_path: str
+    :param sc_name: The scenario name
+    :type sc_name: str
+    :param in_place: If True, the Excel files of the scenario are replaced by the recomputed ones, otherwise they are
+    moved to a folder named after the scenario in the optimization configuration parent folder
+    :type in_place: bool
+    :param threads: The number of threads used by CPLEX, defaults to None for the model setting
+    :type threads: int | None, optional
+    :param runner: The runner of oplrun, defaults to None for a runner with the timeout of the configuration
+    :type runner: OplRunner | None, optional
+    :param use_cache: If False, the scenario is run even if its results are in the result cache, defaults to True
+    :type use_cache: bool, optional
+    :raises OptimizationFail: If oplrun fails or does not write the output file
+    :return: True if the results were found in the result cache
+    :rtype: bool
+    """
+    excel_input_path, excel_output_path = scenario_excel_paths(excel_folder_path, sc_name)
+    run_folder = os.path.dirname(run_model_path)
+
+    if in_place:
+        # The original input and output files will be replaced by the recomputed ones
+        excel_input_final_path = excel_input_path
+        excel_output_final_path = excel_output_path
+    else:
+        # The in/output excel files used for the optimization will be stored in a folder at the same level as the run_cplex folder
+        run_sc_folder = os.path.join(os.path.dirname(run_folder), sc_name)
+        os.makedirs(run_sc_folder, exist_ok=True)
+        excel_input_final_path = os.path.join(run_sc_folder, os.path.basename(excel_input_path))
+        excel_output_final_path = os.path.join(run_sc_folder, os.path.basename(excel_output_path))
+
+    key = None
+    if use_cache and results.cache_enabled():
+        key = results.excel_result_key(run_model_path, excel_input_path)
+    output_data = results.load_result(key) if key is not None else None
+    if output_data is not None:
+        if not in_place:
+            shutil.copy(excel_input_path, excel_input_final_path)
+        dataframes.dataframe_to_excel(output_data, excel_output_final_path, streaming=True)
+        return True
+
+    workdir = os.path.join(run_folder, WORKDIRS_FOLDER, sc_name)
+    model_path, dat_path = prepare_workdir(run_model_path, run_dat_path, workdir, threads)
+
+    run_excel_input_path = os.path.join(workdir, "Data", os.path.basename(excel_input_path))
+    run_excel_output_path = os.path.join(workdir, "Data", os.path.basename(excel_output_path))
+    shutil.copy(excel_input_path, run_excel_input_path)
+    shutil.copy(excel_output_path, run_excel_output_path)
+
+    run_result = optimization.run_optimization(
+        model_path, dat_path, output_files=[run_excel_output_path], runner=runner
+    )
+
+    shutil.move(run_excel_input_path, excel_input_final_path)
+    shutil.move(run_excel_output_path, excel_output_final_path)
+    # The model of the working directory only differs by the threads setting
+    solvelog.record_metrics(excel_output_final_path, run_result.metrics, run_model_path)
+    shutil.rmtree(workdir, ignore_errors=True)
+    if key is not None:
+        results.store_result(key, dataframes.excel_output_to_dataframe(excel_output_final_path))
+    return False
+
+
+def run_scenarios(
+    run_model_path: str,
+    run_dat_path: str,
+    excel_folder_path: str,
+    sc_list: list[str],
+    in_place: bool,
+    jobs: int = 1,
+    threads: int | None = None,
+    on_result: Callable[[str, str], None] | None = None,
+    use_cache: bool = True,
+) -> ScenarioRunReport:
+    """
+    Run the optimization configuration for each scenario of the list, several scenarios at once
+
+    :param run_model_path: The OPL model file path (.mod) used to run the optimization
+    :type run_model_path: str
+    :param run_dat_path: The .dat file path used to run the optimization
+    :type run_dat_path: str
+    :param excel_folder_path: The folder path containing the scenarios in their respective subfolders
+    :type excel_folder_path: str
+    :param sc_list: The scenario names list
+    :type sc_list: list[str]
+    :param in_place: If True, the Excel files of the scenarios are replaced by the recomputed ones, otherwise they are
+    moved to folders named after the scenarios in the optimization configuration parent folder
+    :type in_place: bool
+    :param jobs: The number of simultaneous oplrun processes, defaults to 1
+    :type jobs: int, optional
+    :param threads: The number of threads used by CPLEX in each process, defaults to None to share the processors
+    between the processes (the model setting for a single process)
+    :type threads: int | None, optional
+    :param on_result: Called with the scenario name and the error message ('' if it succeeded) after each
+    scenario, defaults to None
+    :type on_result: Callable[[str,str],None] | None, optional
+    :param use_cache: If False, the scenarios are run even if their results are in the result cache, defaults to True
+    :type use_cache: bool, optional
+    :raises ValidationError: If the number of processes or threads is not positive
+    :return: The completed and failed scenarios and the total run time
+    :rtype: ScenarioRunReport
+    """
+    if jobs < 1:
+        raise ValidationError("The number of oplrun processes must be at least 1", context={"jobs": jobs})
+    if threads is not None and threads < 1:
+        raise ValidationError("The number of CPLEX threads must be at least 1", context={"threads": threads})
+    if threads is None:
+        threads = default_threads(jobs)
+    config = Config.from_env()
+    report = ScenarioRunReport()
+    runners: list[OplRunner] = []
+    lock = threading.Lock()
+    start = time.perf_counter()
+
+    def task(sc_name: str) -> tuple[str, bool]:
+        # The output of the simultaneous runs is prefixed by their scenario
+        on_output = print if jobs == 1 else (lambda line: print(f"[{sc_name}] {line}"))
+        runner = OplRunner.from_config(config, on_output=on_output)
+        with lock:
+            runners.append(runner)
+        print(sc_name)
+        try:
+            cached = run_scenario(
+                run_model_path, run_dat_path, excel_folder_path, sc_name, in_place, threads, runner, use_cache
+            )
+        except Exception as e:  # One failed scenario does not stop the others
+            return f"{type(e).__name__}: {e}", False
+        finally:
+            with lock:
+                runners.remove(runner)
+        return "", cached
+
+    def add_result(sc_name: str, error: str, cached: bool) -> None:
+        if error:
+            report.failed[sc_name] = error
+        else:
+            report.completed.append(sc_name)
+            if cached:
+                report.cached.append(sc_name)
+        if on_result is not None:
+            on_result(sc_name, error)
+
+    executor = ThreadPoolExecutor(max_workers=min(jobs, max(len(sc_list), 1)))
+    try:
+        futures = {executor.submit(task, sc_name): sc_name for sc_name in sc_list}
+        for future in as_completed(futures):
+            add_result(futures[future], *future.result())
+    except BaseException:
+        # e.g. KeyboardInterrupt, the waiting scenarios are not started and the running ones are stopped
+        executor.shutdown(wait=False, cancel_futures=True)
+        with lock:
+            for runner in runners:
+                runner.cancel()
+        raise
+    finally:
+        executor.shutdown(wait=True)
+
+    report.elapsed_seconds = time.perf_counter() - start
+    return report
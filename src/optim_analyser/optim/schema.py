@@ -0,0 +1,260 @@
+"""Column types of the optimization job sheets.
+
+The types follow the tuples declared in the OPL models: the ``string`` fields (ids, types, steps) are
+stored as categories, the ``float`` fields as float64 and the ``int`` fields as int32. The step ids are
+declared ``key string`` in the models, they stay strings (as categories) so that the data written back to
+Excel or WML is unchanged, ``step_numbers`` gives their numeric value.
+"""
+
+from __future__ import annotations
+
+import pandas as pd
+
+CATEGORY = "category"
+FLOAT = "float64"
+INT = "int32"
+
+# Types of the columns of each known sheet, the columns which are not listed keep the type inferred when loading
+SHEET_SCHEMAS: dict[str, dict[str, str]] = {
+    "OPERATION_STEPS": {
+        "step_id": CATEGORY,
+        "step_duration": INT,
+        "electricity_price": FLOAT,
+        "max_export_to_main_grid": FLOAT,
+        "max_import_from_main_grid": FLOAT,
+    },
+    "ASSETS": {
+        "asset_id": CATEGORY,
+        "type": CATEGORY,
+        "site": CATEGORY,
+        "control": CATEGORY,
+        "compensation_model": CATEGORY,
+        "var_cost_model": CATEGORY,
+        "var_efficiency_model": CATEGORY,
+        "min_time_on": INT,
+        "max_time_on": INT,
+        "min_recovery_period": INT,
+        "initial_time_on": INT,
+        "initial_time_off": INT,
+        "total_block_number": INT,
+        "healthy_block_number": INT,
+        "min_power": FLOAT,
+        "max_power": FLOAT,
+        "max_energy": FLOAT,
+        "storage_charging_efficiency": FLOAT,
+        "storage_discharging_efficiency": FLOAT,
+        "min_SOC": FLOAT,
+        "max_SOC": FLOAT,
+        "initial_SOC": FLOAT,
+        "initial_power": FLOAT,
+        "max_ramp_rate": FLOAT,
+        "injection_current_potential": FLOAT,
+        "variable_cost": FLOAT,
+        "compensation_cost": FLOAT,
+        "startup_cost": FLOAT,
+        "active_power_loss": FLOAT,
+        "active_power_surge": FLOAT,
+        "reactive_power_loss": FLOAT,
+        "reactive_power_surge": FLOAT,
+        "power_tolerance": FLOAT,
+        "nominal_min_power": FLOAT,
+        "nominal_max_power": FLOAT,
+        "nominal_max_energy": FLOAT,
+        "daily_maximum_number_of_cycles": FLOAT,
+        "initial_gas_energy": FLOAT,
+    },
+    "ASSET_STEPS": {
+        "asset_id": CATEGORY,
+        "step_id": CATEGORY,
+        "power_prediction": FLOAT,
+        "soc_target": FLOAT,
+        "availability": INT,  # float in the oldest models, kept as float64 when not integral
+        "daily_known_cycle_contribution": FLOAT,
+        "forced_power": FLOAT,
+    },
+    "SITE_STEPS": {
+        "site_id": CATEGORY,
+        "step_id": CATEGORY,
+        "availability_in": FLOAT,
+        "availability_out": FLOAT,
+    },
+    "CONGESTIONS": {
+        "congestion_id": CATEGORY,
+        "max_power_in": FLOAT,
+        "max_power_out": FLOAT,
+        "power_import_coef": FLOAT,
+    },
+    "CONGESTION_ASSETS": {
+        "congestion_id": CATEGORY,
+        "asset_id": CATEGORY,
+        "power_coef": FLOAT,
+    },
+    "VARIABLE_COST_MODELS": {
+        "model_id": CATEGORY,
+        "power_interval_nbr": INT,
+        "direction": CATEGORY,
+        "lower_limit": FLOAT,
+        "upper_limit": FLOAT,
+        "marginal_cost": FLOAT,
+        "efficiency_slope": FLOAT,
+        "efficiency_intercept": FLOAT,
+    },
+    "BATTERY_EFFICIENCY_MODEL": {
+        "model_id": CATEGORY,
+        "direction": CATEGORY,
+        "type": CATEGORY,
+        "power_interval_nbr": INT,
+        "lower_limit": FLOAT,
+        "upper_limit": FLOAT,
+        "efficiency_slope": FLOAT,
+        "efficiency_intercept": FLOAT,
+        "slope": FLOAT,
+        "ordinate": FLOAT,
+    },
+    "OPERATION_STEPS_LINK": {
+        "asset_step": CATEGORY,
+        "imbalance_step": CATEGORY,
+        "day_ahead_step": CATEGORY,
+        "fcr_step": CATEGORY,
+        "mfrr_step": CATEGORY,
+        "afrr_capacity_step": CATEGORY,
+        "afrr_voluntary_step": CATEGORY,
+        "afrr_energy_step": CATEGORY,
+        "gas_day_ahead_step": CATEGORY,
+        "ppa_step": CATEGORY,
+        "asset_step_day_local_time": CATEGORY,
+        "asset_step_hour_local_time": CATEGORY,
+        "asset_step_minute_local_time": CATEGORY,
+    },
+    "MARKET_ENGAGEMENTS": {
+        "type": CATEGORY,
+        "step_index": CATEGORY,
+        "engagement": FLOAT,
+        "is_step_cleared": INT,
+        "price": FLOAT,
+    },
+    "MARKET_PRICE_STEPS": {
+        "step_index": CATEGORY,
+        "type": CATEGORY,
+        "price": FLOAT,
+    },
+    "OPERATION_STEPS_OUTPUT": {
+        "step_id": CATEGORY,
+        "step_duration": INT,
+        "electricity_price": FLOAT,
+        "imbalance_power": FLOAT,
+        "imbalance_not_CFD_power": FLOAT,
+        "imbalance_CFD_power": FLOAT,
+    },
+    "ASSETS_OUTPUT": {
+        "asset_id": CATEGORY,
+        "control": CATEGORY,
+        "non_fcr_energy_out": FLOAT,
+        "optimised_non_fcr_energy_out": FLOAT,
+        "fcr_energy_out": FLOAT,
+        "optimised_fcr_energy_out": FLOAT,
+    },
+    "ASSET_STEPS_OUTPUT": {
+        "asset_id": CATEGORY,
+        "step_id": CATEGORY,
+        "power_target": FLOAT,
+        "storage_target": FLOAT,
+        "temperature_target": FLOAT,
+        "curtailment_target": FLOAT,
+        "energy_type": CATEGORY,
+        "target_soc": FLOAT,
+        "fcr_engagement": FLOAT,
+        "afrr_up_engagement": FLOAT,
+        "afrr_down_engagement": FLOAT,
+    },
+    "VIOLATIONS_OUTPUT": {
+        "violation_type": CATEGORY,
+        "asset_id": CATEGORY,
+        "step_id": CATEGORY,
+        "violation_value": FLOAT,
+        "violation_criticality": INT,
+        "violation_cost": FLOAT,
+    },
+    "MARKET_BIDS_OUTPUT": {
+        "step_id": CATEGORY,
+        "type": CATEGORY,
+        "direction": CATEGORY,
+        "step_duration": INT,
+        "power": FLOAT,
+        "price": FLOAT,
+    },
+    "ASSET_STEPS_COST": {
+        "asset_id": CATEGORY,
+        "site_id": CATEGORY,
+        "step_id": CATEGORY,
+    },
+    "STEP_COSTS": {
+        "step_id": CATEGORY,
+    },
+    "COSTS": {
+        "step_id": CATEGORY,
+    },
+}
+
+# Type of the columns which are not listed in the schema, for the sheets whose columns depend on the model
+DEFAULT_TYPES: dict[str, str] = {
+    "ASSET_STEPS_COST": FLOAT,
+    "STEP_COSTS": FLOAT,
+    "COSTS": FLOAT,
+}
+
+
+def _to_numeric(column: pd.Series, dtype: str) -> pd.Series:
+    """Convert the column to a numeric type, return it unchanged if the conversion would lose information."""
+    if pd.api.types.infer_dtype(column, skipna=True) not in ("integer", "floating", "mixed-integer-float", "empty"):
+        return column  # Text values (e.g. '-Infinity' written by OPL) are kept as they are
+    numbers = pd.to_numeric(column)
+    if dtype == INT:
+        if numbers.isna().any() or not (numbers % 1 == 0).all():
+            return numbers.astype(FLOAT)
+        return numbers.astype(INT)
+    return numbers.astype(FLOAT)
+
+
+def apply_schema(sheet_name: str, sheet: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convert the columns of a sheet to the types of the schema
+
+    :param sheet_name: The sheet name (e.g. 'ASSET_STEPS')
+    :type sheet_name: str
+    :param sheet: The sheet content
+    :type sheet: pd.DataFrame
+    :return: The sheet content with typed columns, unchanged if the sheet is unknown or empty
+    :rtype: pd.DataFrame
+    """
+    schema = SHEET_SCHEMAS.get(sheet_name)
+    if schema is None or sheet.empty:
+        return sheet
+    default_type = DEFAULT_TYPES.get(sheet_name)
+
+    columns = dict()
+    for column in sheet.columns:
+        dtype = schema.get(column, default_type)
+        if dtype is None or sheet[column].dtype == dtype:
+            continue
+        if dtype == CATEGORY:
+            columns[column] = sheet[column].astype(CATEGORY)
+        else:
+            columns[column] = _to_numeric(sheet[column], dtype)
+    return sheet.assign(**columns) if columns else sheet
+
+
+def step_numbers(steps: pd.Series) -> pd.Series:
+    """
+    Return the numeric value of step ids (e.g. '12' or '-1.0')
+
+    :param steps: The step ids, as categories or as strings/numbers
+    :type steps: pd.Series
+    :return: The step numbers, with the same index as the step ids
+    :rtype: pd.Series
+    """
+    if isinstance(steps.dtype, pd.CategoricalDtype) and not (steps.cat.codes < 0).any():
+        # Only the distinct step ids are converted
+        numbers = pd.to_numeric(pd.Series(steps.cat.categories)).astype(float).astype(int).to_numpy()
+        return pd.Series(numbers[steps.cat.codes.to_numpy()], index=steps.index, name=steps.name)
+    return pd.to_numeric(steps).astype(float).astype(int)
@@ -0,0 +1,171 @@
+"""Sheets of an optimization job whose DataFrames are built on first access.
+
+Loading a job parses the whole file, but most workflows only read a few of its sheets and often only a few
+columns of them. A ``LazySheets`` mapping keeps how to build each sheet (from the raw job values or from the
+cache entry) and only builds the DataFrame the first time the sheet is accessed. ``select_columns`` builds only
+the requested columns of a sheet which has not been accessed yet.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable, Iterator, Mapping, MutableMapping, Sequence
+
+import pandas as pd
+
+# Builds the sheet with the given columns, or with all its columns if None
+SheetLoader = Callable[[Sequence[str] | None], pd.DataFrame]
+
+
+class _LazySheet:
+    """Sheet built by its loader on first access, shared by the mappings containing it."""
+
+    def __init__(self, fields: list[str], loader: SheetLoader):
+        self.fields = list(fields)
+        self.loader: SheetLoader | None = loader
+        self.frame: pd.DataFrame | None = None
+
+    def build(self) -> pd.DataFrame:
+        if self.frame is None:
+            self.frame = self._load(None)
+            self.loader = None  # The raw values are released
+        return self.frame
+
+    def select(self, columns: Sequence[str] | None) -> pd.DataFrame:
+        if self.frame is not None:
+            return self.frame if columns is None else self.frame.filter(items=columns)
+        if columns is not None:
+            columns = [column for column in columns if column in self.fields]
+        return self._load(columns)
+
+    def _load(self, columns: Sequence[str] | None) -> pd.DataFrame:
+        # The loader is only released once the frame is built, the frame is used from then on
+        assert self.loader is not None
+        return self.loader(columns)
+
+
+class LazySheets(MutableMapping[str, pd.DataFrame]):
+    """Mapping of sheet names to DataFrames which are built when the sheet is first accessed.
+
+    The built DataFrames are kept, accessing a sheet again returns the same DataFrame, also from the copies
+    and subsets of the mapping. Assigned DataFrames replace the lazy sheets, so the mapping can be used like a
+    dictionary of sheets.
+
+    Args:
+        sheets: The DataFrames of the already loaded sheets
+    """
+
+    def __init__(self, sheets: Mapping[str, pd.DataFrame] | None = None):
+        self._sheets: dict[str, pd.DataFrame | _LazySheet] = {}
+        if isinstance(sheets, LazySheets):
+            self._sheets.update(sheets._sheets)
+        elif sheets is not None:
+            self._sheets.update(sheets)
+
+    def add_lazy(self, name: str, fields: list[str], loader: SheetLoader) -> None:
+        """Add a sheet built by the loader when accessed, fields are the names of its columns."""
+        self._sheets[name] = _LazySheet(fields, loader)
+
+    def is_loaded(self, name: str) -> bool:
+        """Return True if the DataFrame of the sheet has already been built."""
+        sheet = self._sheets[name]
+        return not isinstance(sheet, _LazySheet) or sheet.frame is not None
+
+    def fields(self, name: str) -> list[str]:
+        """Return the column names of the sheet without building it."""
+        sheet = self._sheets[name]
+        if isinstance(sheet, _LazySheet):
+            return list(sheet.fields)
+        return list(sheet.columns)
+
+    def select(self, name: str, columns: Sequence[str] | None = None) -> pd.DataFrame:
+        """
+        Return the requested columns of the sheet, only these columns are built if the sheet is not loaded yet.
+        The requested columns missing from the sheet are ignored, like DataFrame.filter(items=columns).
+        The selected columns are not kept, accessing the sheet with [] builds it entirely.
+        """
+        sheet = self._sheets[name]
+        if isinstance(sheet, _LazySheet):
+            return sheet.select(columns)
+        return sheet if columns is None else sheet.filter(items=columns)
+
+    def subset(self, names: Iterable[str]) -> LazySheets:
+        """Return the sheets with the given names which are in the mapping, without building them."""
+        sheets = LazySheets()
+        sheets._sheets = {name: self._sheets[name] for name in names if name in self._sheets}
+        return sheets
+
+    def copy(self) -> LazySheets:
+        return LazySheets(self)
+
+    def __getitem__(self, name: str) -> pd.DataFrame:
+        sheet = self._sheets[name]
+        if isinstance(sheet, _LazySheet):
+            return sheet.build()
+        return sheet
+
+    def __setitem__(self, name: str, frame: pd.DataFrame) -> None:
+        self._sheets[name] = frame
+
+    def __delitem__(self, name: str) -> None:
+        del self._sheets[name]
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._sheets
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._sheets)
+
+    def __len__(self) -> int:
+        return len(self._sheets)
+
+    def __or__(self, other: Mapping[str, pd.DataFrame]) -> LazySheets:
+        if not isinstance(other, Mapping):
+            return NotImplemented
+        sheets = self.copy()
+        sheets._sheets.update(LazySheets(other)._sheets)
+        return sheets
+
+    def __ror__(self, other: Mapping[str, pd.DataFrame]) -> LazySheets:
+        if not isinstance(other, Mapping):
+            return NotImplemented
+        sheets = LazySheets(other)
+        sheets._sheets.update(self._sheets)
+        return sheets
+
+    def __repr__(self) -> str:
+        states = ", ".join(f"{name!r}: {'loaded' if self.is_loaded(name) else 'lazy'}" for name in self._sheets)
+        return f"LazySheets({{{states}}})"
+
+
+def select_columns(data: Mapping[str, pd.DataFrame], sheet_name: str, columns: Sequence[str]) -> pd.DataFrame:
+    """
+    Return the requested columns of a sheet, building only these columns if the sheet is lazy
+
+    :param data: The sheets names and their content
+    :type data: Mapping[str,pd.DataFrame]
+    :param sheet_name: The sheet name (e.g. 'ASSET_STEPS')
+    :type sheet_name: str
+    :param columns: The requested columns, the columns missing from the sheet are ignored
+    :type columns: Sequence[str]
+    :return: The sheet content restricted to the requested columns
+    :rtype: pd.DataFrame
+    """
+    if isinstance(data, LazySheets):
+        return data.select(sheet_name, columns)
+    return data[sheet_name].filter(items=columns)
+
+
+def sheet_fields(data: Mapping[str, pd.DataFrame], sheet_name: str) -> list[str]:
+    """
+    Return the column names of a sheet, without building it if the sheet is lazy
+
+    :param data: The sheets names and their content
+    :type data: Mapping[str,pd.DataFrame]
+    :param sheet_name: The sheet name (e.g. 'ASSET_STEPS')
+    :type sheet_name: str
+    :return: The column names of the sheet
+    :rtype: list[str]
+    """
+    if isinstance(data, LazySheets):
+        return data.fields(sheet_name)
+    return list(data[sheet_name].columns)
@@ -0,0 +1,248 @@
+"""Solve metrics of the local runs read from the oplrun and CPLEX log.
+
+The runner feeds the output lines of oplrun to a SolveLogParser while they are streamed, with the time since the
+start of the run. The parser reads the lines of the CPLEX log it knows, e.g.::
+
+    Reduced MIP has 10244 rows, 8411 columns, and 40375 nonzeros.
+    Root relaxation solution time = 0.05 sec. (32.70 ticks)
+          Nodes                                         Cuts/
+       Node  Left     Objective  IInf  Best Integer    Best Bound    ItCnt     Gap
+    *     0+    0                         2175.0000      853.4000            60.76%
+        100    45      902.1000    12     1002.0000      950.0000     5124    5.19%
+    Elapsed time = 1.23 sec. (456.78 ticks, tree = 0.51 MB, solutions = 4)
+    Total (root+branch&cut) =    2.61 sec. (1204.40 ticks)
+    // solution (optimal) with objective 1002
+
+and ignores the others. The metrics are recorded next to the output workbook of the run
+('out_prob_x.metrics.json'), to find the slow models and follow the solve times across the model versions.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import glob
+import json
+import os
+import re
+
+import pandas as pd
+
+from optim_analyser.models import SolveMetrics, SolveProgressPoint
+from optim_analyser.optim.cache import file_digest
+from optim_analyser.optim.registry import default_registry
+
+_RECORD_SUFFIX = ".metrics.json"
+
+_PRESOLVE_SIZE = re.compile(r"Reduced \w+ has (\d+) rows, (\d+) columns, and (\d+) nonzeros")
+_PRESOLVE_TIME = re.compile(r"Presolve time = ([\d.]+) sec")
+_ROOT_TIME = re.compile(r"Root relaxation solution time = ([\d.]+) sec")
+_ELAPSED = re.compile(r"Elapsed time = ([\d.]+) sec\..*tree = ([\d.]+) MB")
+_TOTAL_TIME = re.compile(r"Total \(root\+branch&cut\) =\s*([\d.]+) sec")
+_SOLUTION = re.compile(r"solution \(([\w ]+)\) with objective (\S+)")
+
+# Columns of the summary of the recorded metrics (see metrics_frame)
+METRICS_COLUMNS = [
+    "model_name",
+    "model_digest",
+    "recorded_at",
+    "elapsed_seconds",
+    "solve_seconds",
+    "root_relaxation_seconds",
+    "node_count",
+    "gap_percent",
+    "presolve_rows",
+    "presolve_columns",
+    "peak_memory_mb",
+    "status",
+    "path",
+]
+
+
+def _to_float(token: str) -> float | None:
+    """Return the number written in the token, None if it is not a number."""
+    try:
+        return float(token)
+    except ValueError:
+        return None
+
+
+class SolveLogParser:
+    """Reads the solve metrics in the output lines of oplrun, one line at a time."""
+
+    def __init__(self):
+        self._metrics = SolveMetrics()
+        self._cplex_seconds: float | None = None
+
+    def feed(self, line: str, seconds: float | None = None) -> None:
+        """Read an output line of oplrun.
+
+        Args:
+            line: The output line
+            seconds: The time since the start of the run when the line was written, None for the last time
+                reported by CPLEX
+        """
+        metrics = self._metrics
+        if match := _PRESOLVE_SIZE.search(line):
+            metrics.presolve_rows, metrics.presolve_columns, metrics.presolve_nonzeros = map(int, match.groups())
+        elif match := _PRESOLVE_TIME.search(line):
+            metrics.presolve_seconds = float(match.group(1))
+        elif match := _ROOT_TIME.search(line):
+            metrics.root_relaxation_seconds = float(match.group(1))
+        elif match := _ELAPSED.search(line):
+            self._cplex_seconds = float(match.group(1))
+            metrics.peak_tree_memory_mb = max(float(match.group(2)), metrics.peak_tree_memory_mb or 0.0)
+        elif match := _TOTAL_TIME.search(line):
+            metrics.solve_seconds = float(match.group(1))
+        elif match := _SOLUTION.search(line):
+            metrics.status, metrics.objective = match.group(1), _to_float(match.group(2))
+        else:
+            self._feed_node(line, self._cplex_seconds if seconds is None else seconds)
+
+    def _feed_node(self, line: str, seconds: float | None) -> None:
+        """Read a line of the node log ending with the gap, the other lines are ignored."""
+        tokens = line.split()
+        if tokens and len(tokens[0]) == 1 and not tokens[0].isdigit():
+            tokens.pop(0)  # Marker of the new incumbents, e.g. '*' or 'H'
+        if len(tokens) < 5 or not tokens[0].rstrip("+").isdigit() or not tokens[-1].endswith("%"):
+            return
+        gap_percent = _to_float(tokens[-1][:-1])
+        if gap_percent is None:
+            return
+        position = len(tokens) - 2
+        if tokens[position].isdigit():
+            position -= 1  # Iteration count, empty on the lines of the heuristics
+        if tokens[position - 1].endswith(":"):
+            best_bound, position = None, position - 2  # Cuts added in place of the bound, e.g. 'Cuts: 32'
+        else:
+            best_bound, position = _to_float(tokens[position]), position - 1
+        best_integer = _to_float(tokens[position])
+
+        metrics = self._metrics
+        metrics.node_count = max(int(tokens[0].rstrip("+")), metrics.node_count or 0)
+        if best_bound is None:
+            best_bound = metrics.best_bound
+        if (best_integer, best_bound) != (metrics.best_integer, metrics.best_bound) or not metrics.progress:
+            metrics.progress.append(SolveProgressPoint(seconds, best_integer, best_bound, gap_percent))
+        metrics.best_integer, metrics.best_bound, metrics.gap_percent = best_integer, best_bound, gap_percent
+
+    def metrics(self, elapsed_seconds: float, peak_memory_mb: float | None = None) -> SolveMetrics:
+        """Return the metrics read so far.
+
+        Args:
+            elapsed_seconds: The duration of the run
+            peak_memory_mb: The peak resident memory of oplrun, None if unknown
+        """
+        return dataclasses.replace(
+            self._metrics,
+            elapsed_seconds=elapsed_seconds,
+            peak_memory_mb=peak_memory_mb,
+            progress=list(self._metrics.progress),
+        )
+
+
+def parse_log(lines: list[str], elapsed_seconds: float = 0.0) -> SolveMetrics:
+    """
+    Return the solve metrics of the output lines of a run
+
+    :param lines: The output lines of oplrun
+    :type lines: list[str]
+    :param elapsed_seconds: The duration of the run, defaults to 0.0
+    :type elapsed_seconds: float, optional
+    :return: The metrics, the times of the progress points are those reported by CPLEX
+    :rtype: SolveMetrics
+    """
+    parser = SolveLogParser()
+    for line in lines:
+        parser.feed(line)
+    return parser.metrics(elapsed_seconds)
+
+
+def metrics_record_path(excel_output_path: str) -> str:
+    """
+    Return the path of the file recording the solve metrics of the output data
+
+    :param excel_output_path: The output Excel file path (or the reference path of the CSV output folder)
+    :type excel_output_path: str
+    :return: The file path next to the output data, e.g. 'out_prob_x.metrics.json' for 'out_prob_x.xlsx'
+    :rtype: str
+    """
+    return os.path.splitext(excel_output_path)[0] + _RECORD_SUFFIX
+
+
+def record_metrics(excel_output_path: str, metrics: SolveMetrics | None, model_path: str) -> None:
+    """
+    Record the solve metrics of a run next to its output data, nothing is recorded without metrics
+
+    :param excel_output_path: The output Excel file path (or the reference path of the CSV output folder)
+    :type excel_output_path: str
+    :param metrics: The metrics of the run given by the runner
+    :type metrics: SolveMetrics | None
+    :param model_path: The OPL model file path (.mod) of the run, identifying the model version
+    :type model_path: str
+    :rtype: None
+    """
+    if metrics is None:
+        return
+    metrics = dataclasses.replace(
+        metrics,
+        model_name=os.path.splitext(os.path.basename(model_path))[0],
+        # The hash of the model is computed once per version of the model file
+        model_digest=default_registry().get(model_path, "digest", file_digest),
+    )
+    with open(metrics_record_path(excel_output_path), "w") as f:
+        json.dump(metrics.to_dict(), f, indent=4)
+
+
+def load_metrics(excel_output_path: str) -> SolveMetrics | None:
+    """
+    Return the solve metrics recorded next to the output data
+
+    :param excel_output_path: The output Excel file path (or the reference path of the CSV output folder)
+    :type excel_output_path: str
+    :return: The metrics, None if they were not recorded (e.g. for the WML runs)
+    :rtype: SolveMetrics | None
+    """
+    try:
+        with open(metrics_record_path(excel_output_path), "r") as f:
+            return SolveMetrics.from_dict(json.load(f))
+    except FileNotFoundError:
+        return None
+
+
+def metrics_frame(folder: str) -> pd.DataFrame:
+    """
+    Return the solve metrics recorded in the folder and its subfolders, one row per run
+
+    :param folder: The folder path, e.g. the output folder of the replays or a scenario folder
+    :type folder: str
+    :return: The METRICS_COLUMNS of the runs, sorted by model name and recording date
+    :rtype: pd.DataFrame
+    """
+    rows = []
+    for record_path in glob.glob(os.path.join(glob.escape(folder), "**", "*" + _RECORD_SUFFIX), recursive=True):
+        with open(record_path, "r") as f:
+            metrics = SolveMetrics.from_dict(json.load(f))
+        rows.append({column: getattr(metrics, column, None) for column in METRICS_COLUMNS} | {"path": record_path})
+    frame = pd.DataFrame(rows, columns=METRICS_COLUMNS)
+    return frame.sort_values(["model_name", "recorded_at"], ignore_index=True)
+
+
+def metrics_summary(frame: pd.DataFrame) -> pd.DataFrame:
+    """
+    Return the solve times of each version of each model, to find the slow models and the regressions
+
+    :param frame: The metrics of the runs given by metrics_frame
+    :type frame: pd.DataFrame
+    :return: One row per model name and model version, in the order of their first run, with the number of runs, the
+    date of the first run, the mean and max durations, the mean CPLEX solve time and node count
+    :rtype: pd.DataFrame
+    """
+    summary = frame.groupby(["model_name", "model_digest"]).agg(
+        runs=("path", "size"),
+        first_run=("recorded_at", "min"),
+        mean_seconds=("elapsed_seconds", "mean"),
+        max_seconds=("elapsed_seconds", "max"),
+        mean_solve_seconds=("solve_seconds", "mean"),
+        mean_nodes=("node_count", "mean"),
+    )
+    return summary.sort_values(["model_name", "first_run"]).reset_index()
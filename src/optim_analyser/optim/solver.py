@@ -0,0 +1,141 @@
+"""Solver profiles: named CPLEX settings of the local and WML runs.
+
+The models set their own CPLEX parameters in their preprocessing blocks. A profile overrides them in the run model
+with a preprocessing block inserted before the objective (see optimization.add_cplex_parameters), and is given to
+WML as the ``solve_parameters`` of the jobs. The profile of a run is recorded next to its output data, so that the
+comparisons know the MIP gap tolerance of the solution.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+
+from optim_analyser.config import Config
+from optim_analyser.errors import ValidationError
+from optim_analyser.models import SolverProfile
+
+DEFAULT_PROFILE = "default"
+
+SOLVER_PROFILES = {
+    profile.name: profile
+    for profile in (
+        SolverProfile(DEFAULT_PROFILE, {}, "Settings of the model"),
+        SolverProfile("fast-preview", {"epgap": 0.01, "tilim": 60}, "1% MIP gap, at most 60 s"),
+        SolverProfile("exact", {"epgap": 0.0, "epagap": 0.0}, "Optimal solutions, without MIP gap tolerance"),
+        SolverProfile("parallel-16", {"threads": 16}, "16 CPLEX threads"),
+    )
+}
+
+# OPL names of the CPLEX parameters and their names in the solve parameters of the WML jobs
+WML_PARAMETERS = {
+    "epgap": "mip.tolerances.mipgap",
+    "epagap": "mip.tolerances.absmipgap",
+    "threads": "threads",
+    "workmem": "workmem",
+    "trelim": "mip.limits.treememory",
+}
+_WML_TIME_LIMIT = "oaas.timeLimit"  # in milliseconds, for the 'tilim' parameter in seconds
+
+_RECORD_SUFFIX = ".solver.json"
+
+
+def get_solver_profile(name: str | None = None) -> SolverProfile:
+    """
+    Return a solver profile by name
+
+    :param name: The profile name, defaults to None for the SOLVER_PROFILE setting
+    :type name: str | None, optional
+    :raises ValidationError: If the profile is unknown
+    :return: The solver profile
+    :rtype: SolverProfile
+    """
+    if name is None:
+        name = Config.from_env().app.solver_profile
+    if name not in SOLVER_PROFILES:
+        raise ValidationError(
+            f"Unknown solver profile '{name}'",
+            error_code="UNKNOWN_SOLVER_PROFILE",
+            context={"profiles": list(SOLVER_PROFILES)},
+        )
+    return SOLVER_PROFILES[name]
+
+
+def wml_solve_parameters(profile: SolverProfile) -> dict[str, str]:
+    """
+    Return the solve parameters of the WML jobs run with the profile
+
+    :param profile: The solver profile
+    :type profile: SolverProfile
+    :raises ValidationError: If a parameter of the profile cannot be given to WML
+    :return: The parameter names and values, as text like the other solve parameters
+    :rtype: dict[str,str]
+    """
+    solve_parameters = {}
+    for name, value in profile.parameters.items():
+        if name == "tilim":
+            solve_parameters[_WML_TIME_LIMIT] = str(int(value * 1000))
+        elif name in WML_PARAMETERS:
+            solve_parameters[WML_PARAMETERS[name]] = str(value)
+        else:
+            raise ValidationError(
+                f"The CPLEX parameter '{name}' of the solver profile '{profile.name}' cannot be given to WML",
+                context={"parameters": ["tilim", *WML_PARAMETERS]},
+            )
+    return solve_parameters
+
+
+def profile_record_path(excel_output_path: str) -> str:
+    """
+    Return the path of the file recording the solver profile of the output data
+
+    :param excel_output_path: The output Excel file path (or the reference path of the CSV output folder)
+    :type excel_output_path: str
+    :return: The file path next to the output data, e.g. 'out_prob_x.solver.json' for 'out_prob_x.xlsx'
+    :rtype: str
+    """
+    return os.path.splitext(excel_output_path)[0] + _RECORD_SUFFIX
+
+
+def record_profile(excel_output_path: str, profile: SolverProfile) -> None:
+    """
+    Record the solver profile of a run next to its output data
+
+    :param excel_output_path: The output Excel file path (or the reference path of the CSV output folder)
+    :type excel_output_path: str
+    :param profile: The solver profile of the run
+    :type profile: SolverProfile
+    :rtype: None
+    """
+    with open(profile_record_path(excel_output_path), "w") as f:
+        json.dump(profile.to_dict(), f, indent=4)
+
+
+def load_recorded_profile(excel_output_path: str) -> SolverProfile | None:
+    """
+    Return the solver profile recorded next to the output data
+
+    :param excel_output_path: The output Excel file path (or the reference path of the CSV output folder)
+    :type excel_output_path: str
+    :return: The solver profile, None if no profile was recorded (e.g. for the production jobs)
+    :rtype: SolverProfile | None
+    """
+    try:
+        with open(profile_record_path(excel_output_path), "r") as f:
+            return SolverProfile.from_dict(json.load(f))
+    except FileNotFoundError:
+        return None
+
+
+def recorded_mip_gap(excel_output_paths: list[str]) -> float | None:
+    """
+    Return the MIP gap tolerance within which the solutions of the outputs can differ
+
+    :param excel_output_paths: The output Excel file paths of the compared runs
+    :type excel_output_paths: list[str]
+    :return: The largest relative MIP gap of the recorded profiles, None if no profile was recorded
+    :rtype: float | None
+    """
+    profiles = [load_recorded_profile(excel_output_path) for excel_output_path in excel_output_paths]
+    gaps = [profile.mip_gap() for profile in profiles if profile is not None]
+    return max(gaps) if gaps else None
@@ -0,0 +1,167 @@
+"""Make-like stages of the replay and display pipeline.
+
+Each replay generates the same files again: the initial data workbook, the input and empty output workbooks, the
+.dat file and the HTML display. A stage builds some of these files from its inputs (data sheets, options, other
+files), and records in the folder of its first output the hash of its inputs and the size and modification time
+of its outputs::
+
+    <folder>/.optim_stages.json
+        {"<first output path>": {"stage": "excel_input", "inputs": "<hash>", "outputs": {"<path>": [size, mtime]}}}
+
+The stage is skipped when the hash of its inputs is the recorded one and its outputs have not been modified or
+removed since, e.g. when the same job is displayed or replayed again. An output modified by another program (e.g.
+the output workbook written by CPLEX) is built again by the next run of its stage.
+
+The OPL model of the run and its costs extension are placed from the on-disk cache by
+optimization.prepare_model_files, the results of the optimization by the result cache (see results).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from collections.abc import Callable, Iterable, Mapping, Sequence
+from pathlib import Path
+from typing import Any, cast
+
+import pandas as pd
+
+from optim_analyser import __version__
+from optim_analyser.optim.cache import file_digest, frames_digest
+from optim_analyser.optim.registry import default_registry
+
+STAGES_FORMAT = 1  # To increase when the generated files change, with the package version
+MANIFEST_FILE = ".optim_stages.json"
+
+_lock = threading.Lock()
+
+
+def inputs_digest(inputs: Iterable[object]) -> str:
+    """
+    Return a hash of the inputs of a stage
+
+    :param inputs: The inputs: sheets (Mapping[str,pd.DataFrame], pd.DataFrame or pd.Series, by their content),
+    files (Path, by their content, None if missing) and values serialisable in JSON
+    :type inputs: Iterable[object]
+    :return: The hexadecimal hash, which also depends on the package version
+    :rtype: str
+    """
+    digest = hashlib.blake2b(f"{STAGES_FORMAT}-{__version__}".encode(), digest_size=20)
+    for value in inputs:
+        part: str | None
+        if isinstance(value, pd.DataFrame):
+            part = frames_digest({"": value})
+        elif isinstance(value, pd.Series):
+            # Hashed by content, its text representation is rounded to the display precision
+            part = frames_digest({"": value.to_frame()})
+        elif isinstance(value, Mapping) and all(isinstance(frame, pd.DataFrame) for frame in value.values()):
+            part = frames_digest(value)
+        elif isinstance(value, Path):
+            # The hash of the file is computed once per version of the file
+            part = default_registry().get(str(value), "digest", file_digest) if value.is_file() else None
+        else:
+            digest.update(json.dumps(value, default=str).encode())
+            continue
+        digest.update(json.dumps(part).encode())
+    return digest.hexdigest()
+
+
+def _manifest_path(output: str) -> str:
+    return os.path.join(os.path.dirname(os.path.abspath(output)), MANIFEST_FILE)
+
+
+def _read_manifest(manifest_path: str) -> dict:
+    try:
+        with open(manifest_path, "r") as f:
+            return cast(dict[str, Any], json.load(f))
+    except (OSError, ValueError):
+        return {}
+
+
+def _stamp(path: str) -> list[int] | None:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def is_up_to_date(name: str, outputs: Sequence[str], digest: str) -> bool:
+    """
+    Check that the outputs of the stage were built from the same inputs and have not been modified since
+
+    :param name: The stage name
+    :type name: str
+    :param outputs: The output file paths
+    :type outputs: Sequence[str]
+    :param digest: The hash of the inputs given by inputs_digest
+    :type digest: str
+    :return: True if the stage can be skipped
+    :rtype: bool
+    """
+    entry = _read_manifest(_manifest_path(outputs[0])).get(os.path.abspath(outputs[0]))
+    if entry is None or entry["stage"] != name or entry["inputs"] != digest:
+        return False
+    for output in outputs:
+        stamp = _stamp(output)
+        if stamp is None or entry["outputs"].get(os.path.abspath(output)) != stamp:
+            return False
+    return True
+
+
+def record(name: str, outputs: Sequence[str], digest: str) -> None:
+    """
+    Record the hash of the inputs and the stamps of the outputs of a stage that has been built
+
+    :param name: The stage name
+    :type name: str
+    :param outputs: The output file paths
+    :type outputs: Sequence[str]
+    :param digest: The hash of the inputs given by inputs_digest
+    :type digest: str
+    :rtype: None
+    """
+    manifest_path = _manifest_path(outputs[0])
+    entry = {
+        "stage": name,
+        "inputs": digest,
+        "outputs": {os.path.abspath(output): _stamp(output) for output in outputs},
+    }
+    with _lock:
+        manifest = _read_manifest(manifest_path)
+        manifest[os.path.abspath(outputs[0])] = entry
+        # Replaced at once, a manifest being read is never partially written
+        temporary_path = f"{manifest_path}.{os.getpid()}.{threading.get_ident()}"
+        with open(temporary_path, "w") as f:
+            json.dump(manifest, f, indent=4)
+        os.replace(temporary_path, manifest_path)
+
+
+def run_stage(
+    name: str, outputs: Sequence[str], inputs: Iterable[object], build: Callable[[], object], use_cache: bool = True
+) -> bool:
+    """
+    Build the outputs of a stage, unless they are up to date
+
+    :param name: The stage name, e.g. 'excel_input'
+    :type name: str
+    :param outputs: The output file paths written by the build function
+    :type outputs: Sequence[str]
+    :param inputs: Everything the outputs depend on, see inputs_digest
+    :type inputs: Iterable[object]
+    :param build: The function writing the outputs
+    :type build: Callable[[],object]
+    :param use_cache: If False, the outputs are built even if they are up to date, defaults to True
+    :type use_cache: bool, optional
+    :return: True if the outputs were built, False if the stage was skipped
+    :rtype: bool
+    """
+    digest = inputs_digest(inputs)
+    if use_cache and is_up_to_date(name, outputs, digest):
+        print(f"'{outputs[0]}' is up to date, not generated again.\n")
+        return False
+    build()
+    record(name, outputs, digest)
+    return True
@@ -0,0 +1,315 @@
+"""Incremental reader for WML optimization job files.
+
+The job files are walked token by token instead of being loaded with ``json.load``: the rows of a
+sheet are decoded by batches of the size of the read buffer and stored straight into object arrays,
+so the memory used stays close to the size of the resulting DataFrames.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from collections.abc import Callable, Iterator
+from typing import Any, NamedTuple, TextIO
+
+import numpy as np
+
+from optim_analyser.errors import DataError
+
+CHUNK_SIZE = 1 << 20  # Number of characters read from the file at once
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_PLAIN = r'[^"\[\]{}]*'
+_STRING = r'"[^"\\]*(?:\\.[^"\\]*)*"'
+# Everything up to the next bracket that is not inside a string or an innermost array (e.g. a row of values).
+# Each repeated part starts with its own character, so a string or an array cut by the end of the buffer is given up
+# in linear time without possessive quantifiers (Python 3.11+)
+_FLAT = re.compile(
+    rf"{_PLAIN}(?:(?:{_STRING}|\[{_PLAIN}(?:{_STRING}{_PLAIN})*\]){_PLAIN})*",
+    re.DOTALL,
+)
+_NUMBER_START = "-0123456789"
+_DECODER = json.JSONDecoder()
+
+# Objects containing the sheets, "entity" is only present in the jobs downloaded from WML
+_CONTAINER_KEYS = ("entity", "decision_optimization")
+JOB_SECTIONS = ("input_data", "output_data")
+
+
+class SheetPayload(NamedTuple):
+    """Raw content of one sheet of an optimization job, values are stored in a 2D object array (None if empty).
+
+    ``skipped`` is True when the values were discarded by the sheet filter.
+    """
+
+    section: str
+    sheet_id: str
+    fields: list[str]
+    values: np.ndarray | None
+    skipped: bool = False
+
+
+class JobStreamReader:
+    """Buffered cursor over the text of a .json optimization job.
+
+    Args:
+        stream: The opened job file (text mode)
+        chunk_size: Number of characters read from the file each time the buffer runs out
+    """
+
+    def __init__(self, stream: TextIO, chunk_size: int = CHUNK_SIZE):
+        self._stream = stream
+        self._chunk_size = chunk_size
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+        self._array_closed = False
+
+    def _fill(self) -> bool:
+        """Drop the consumed part of the buffer and append the next chunk, return False at the end of the file."""
+        if self._eof:
+            return False
+        chunk = self._stream.read(self._chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buffer = self._buffer[self._pos :] + chunk
+        self._pos = 0
+        return True
+
+    def _error(self, message: str) -> DataError:
+        return DataError(
+            message, error_code="INVALID_JOB_JSON", context={"buffer": self._buffer[self._pos : self._pos + 40]}
+        )
+
+    def peek(self) -> str:
+        """Return the next non-whitespace character without consuming it."""
+        while True:
+            whitespace = _WHITESPACE.match(self._buffer, self._pos)
+            if whitespace is not None:
+                self._pos = whitespace.end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                raise self._error("Unexpected end of the optimization job file")
+
+    def expect(self, char: str) -> None:
+        """Consume the next non-whitespace character, which must be char."""
+        if self.peek() != char:
+            raise self._error(f"Expected '{char}' in the optimization job file")
+        self._pos += 1
+
+    def next_separator(self, closing: str) -> bool:
+        """Consume a ',' or the closing character of the current container, return True if the container continues."""
+        char = self.peek()
+        self._pos += 1
+        if char == ",":
+            return True
+        if char == closing:
+            return False
+        raise self._error(f"Expected ',' or '{closing}' in the optimization job file")
+
+    def value(self) -> Any:
+        """Decode and return the next JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                # The value is cut by the end of the buffer
+                if self._fill():
+                    continue
+                raise self._error("Malformed value in the optimization job file")
+            if end == len(self._buffer) and self._buffer[self._pos] in _NUMBER_START and self._fill():
+                continue  # A number may continue in the next chunk
+            self._pos = end
+            return value
+
+    def skip(self) -> None:
+        """Consume the next JSON value without building it."""
+        if self.peek() not in "[{":
+            self.value()
+            return
+        self._pos += 1
+        depth = 1
+        while True:
+            # Strings and innermost arrays are consumed at once, only the other brackets are counted
+            flat = _FLAT.match(self._buffer, self._pos)
+            if flat is None:
+                raise self._error("Malformed value in the optimization job file")
+            self._pos = flat.end()
+            if self._pos == len(self._buffer) or self._buffer[self._pos] == '"':
+                # End of the buffer or string cut by the end of the buffer
+                if not self._fill():
+                    raise self._error("Unexpected end of the optimization job file")
+                continue
+            depth += 1 if self._buffer[self._pos] in "[{" else -1
+            self._pos += 1
+            if depth == 0:
+                return
+
+    def iter_object(self) -> Iterator[str]:
+        """Iterate over the keys of the next JSON object, the caller must consume each value."""
+        self.expect("{")
+        if self.peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(":")
+            yield key
+            if not self.next_separator("}"):
+                return
+
+    def iter_array(self) -> Iterator[None]:
+        """Iterate over the items of the next JSON array, the caller must consume each item."""
+        self.expect("[")
+        if self.peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield None
+            if not self.next_separator("]"):
+                return
+
+    def _read_rows_batch(self) -> list[list[Any]] | None:
+        """
+        Decode at once all the rows of the current array available in the buffer.
+
+        The buffer is cut after the last row separator and decoded as one array, if the cut falls
+        inside a string the decoding fails and None is returned so that the rows are read one by one.
+        """
+        cut = self._buffer.rfind("],", self._pos)
+        if cut == -1:
+            return None
+        text = "[" + self._buffer[self._pos : cut + 1] + "]"
+        rows: list[list[Any]]
+        try:
+            rows, end = _DECODER.raw_decode(text)
+        except json.JSONDecodeError:
+            return None
+        if end == len(text):
+            self._pos = cut + 2  # Continue after the separator
+        else:
+            # The array ends before the cut, all its remaining rows have been decoded
+            self._pos += end - 1
+            self._array_closed = True
+        return rows
+
+    def read_values(self) -> np.ndarray | None:
+        """Read the next array of rows and return it as a 2D object array, None if it is empty."""
+        self.expect("[")
+        if self.peek() == "]":
+            self._pos += 1
+            return None
+        blocks = []
+        self._array_closed = False
+        while True:
+            rows = self._read_rows_batch()
+            if rows:
+                blocks.append(_rows_to_array(rows))
+                if self._array_closed:
+                    break
+                continue
+            blocks.append(_rows_to_array([self.value()]))
+            if not self.next_separator("]"):
+                break
+        return _concatenate_blocks(blocks)
+
+
+def _rows_to_array(rows: list[list[Any]]) -> np.ndarray:
+    """Convert rows decoded from the job file into a 2D object array."""
+    try:
+        block = np.array(rows, dtype=object)
+        if block.ndim == 2:
+            return block
+    except ValueError:
+        pass
+    # Rows of different lengths or containing lists, filled cell by cell
+    block = np.full((len(rows), max(len(row) for row in rows)), None, dtype=object)
+    for i, row in enumerate(rows):
+        for j, cell in enumerate(row):
+            block[i, j] = cell
+    return block
+
+
+def _widen_block(block: np.ndarray, width: int) -> np.ndarray:
+    """Pad the columns of a row block with None up to the given width."""
+    widened = np.full((block.shape[0], width), None, dtype=object)
+    widened[:, : block.shape[1]] = block
+    return widened
+
+
+def _concatenate_blocks(blocks: list[np.ndarray]) -> np.ndarray:
+    """Stack the row blocks of a sheet, padding the narrower ones with None."""
+    width = max(block.shape[1] for block in blocks)
+    blocks = [_widen_block(block, width) if block.shape[1] < width else block for block in blocks]
+    return blocks[0] if len(blocks) == 1 else np.concatenate(blocks)
+
+
+def _read_sheet(
+    reader: JobStreamReader, section: str, sheet_filter: Callable[[str, str], bool] | None, include_skipped: bool
+) -> SheetPayload | None:
+    """Read one sheet object, return None if it is discarded by the filter and include_skipped is False."""
+    sheet_id = None
+    fields: list[str] = []
+    values = None
+    for key in reader.iter_object():
+        if key == "id":
+            sheet_id = reader.value()
+        elif key == "fields":
+            fields = reader.value()
+        elif key == "values" and (sheet_id is None or sheet_filter is None or sheet_filter(section, sheet_id)):
+            values = reader.read_values()
+        else:
+            reader.skip()
+    if sheet_id is None:
+        return None
+    if sheet_filter is not None and not sheet_filter(section, sheet_id):
+        return SheetPayload(section, sheet_id, fields, None, skipped=True) if include_skipped else None
+    return SheetPayload(section, sheet_id, fields, values)
+
+
+def _iter_container(
+    reader: JobStreamReader,
+    sections: tuple[str, ...],
+    sheet_filter: Callable[[str, str], bool] | None,
+    include_skipped: bool,
+) -> Iterator[SheetPayload]:
+    for key in reader.iter_object():
+        if key in _CONTAINER_KEYS and reader.peek() == "{":
+            yield from _iter_container(reader, sections, sheet_filter, include_skipped)
+        elif key in sections and reader.peek() == "[":
+            for _ in reader.iter_array():
+                sheet = _read_sheet(reader, key, sheet_filter, include_skipped)
+                if sheet is not None:
+                    yield sheet
+        else:
+            reader.skip()
+
+
+def iter_job_sheets(
+    stream: TextIO,
+    sections: tuple[str, ...] = JOB_SECTIONS,
+    sheet_filter: Callable[[str, str], bool] | None = None,
+    chunk_size: int = CHUNK_SIZE,
+    include_skipped: bool = False,
+) -> Iterator[SheetPayload]:
+    """
+    Iterate over the sheets of an optimization job without loading the whole file
+
+    :param stream: The opened optimization job file (text mode)
+    :type stream: TextIO
+    :param sections: The sections of 'decision_optimization' to read, defaults to ("input_data", "output_data")
+    :type sections: tuple[str,...], optional
+    :param sheet_filter: Called with the section and the sheet id, the values of the sheet are skipped if it returns False, defaults to None
+    :type sheet_filter: Callable[[str,str],bool], optional
+    :param chunk_size: The number of characters read from the file at once, defaults to CHUNK_SIZE
+    :type chunk_size: int, optional
+    :param include_skipped: If True, the sheets discarded by the filter are also returned, without their values, defaults to False
+    :type include_skipped: bool, optional
+    :return: The sheets in their order of appearance in the file
+    :rtype: Iterator[SheetPayload]
+    """
+    reader = JobStreamReader(stream, chunk_size=chunk_size)
+    yield from _iter_container(reader, sections, sheet_filter, include_skipped)
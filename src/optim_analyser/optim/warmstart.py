@@ -0,0 +1,152 @@
+"""Warm start of the replays from the solution of the original job.
+
+The job contains the solution found in production, but as the post-processed output datasheets: most decision
+variables cannot be recovered from them. The on/off decisions can, from the sign of the power targets of
+ASSET_STEPS_OUTPUT, and they are what makes the problems long to solve. They are given to CPLEX as a MIP start of
+the binary variables, which CPLEX completes by solving the continuous part of the problem::
+
+    WARM_START = {<"IsCharging", "BESS", "12", 1>, ...};    # In the .dat file, or a table sent to IBM Watson ML
+
+The run model is extended with the WARM_START input, a start array per variable filled before the objective from
+the values in the index sets of the variable (the rows of other assets or steps, e.g. of the non-dispatchable
+generators, are left out), and a ``main`` block attaching the arrays to the variables with IloOplCplexVectors before
+solving (see optimization.add_warm_start_opl_model).
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping
+
+import pandas as pd
+
+from optim_analyser.errors import DataError
+from optim_analyser.models import WarmStartReport
+from optim_analyser.optim.oplmodel import load_model_info
+
+WARM_START_SHEET = "WARM_START"
+# Type and name of the members of the WARM_START tuples, the first three are the keys
+WARM_START_MEMBERS = [("string", "variable"), ("string", "asset_id"), ("string", "step_id"), ("float", "value")]
+WARM_START_COLUMNS = [member for _, member in WARM_START_MEMBERS]
+MAINGRID = "MAINGRID"  # Asset of the grid connection in ASSET_STEPS_OUTPUT
+
+# Binary decision variable: (type of the assets in ASSETS, energy types of the assets, sign of the power target
+# when the variable is 1). The power targets follow Everest's convention: +ve = consumption or charge.
+START_RULES = {
+    "IsCharging": ("STORAGE", ("ELECTRICITY", "HEAT"), 1),
+    "IsDischarging": ("STORAGE", ("ELECTRICITY", "HEAT"), -1),
+    "IsGenOn": ("GENERATOR", ("ELECTRICITY",), -1),
+    "IsImporting": (MAINGRID, (), 1),  # Indexed by step only
+}
+POWER_TOLERANCE = 1e-6  # in kW, power targets under which the asset is considered off
+
+# Lines of the CPLEX log telling whether the MIP start gave the first incumbent
+_ACCEPTED = "defined initial solution"
+_REJECTED = "No solution found from"
+
+
+def warm_start_variables(model_file: str) -> dict[str, list[str]]:
+    """
+    Return the variables of the model that can be started from the original solution
+
+    :param model_file: The OPL model file path (.mod)
+    :type model_file: str
+    :return: The names of the variables and their index sets as declared in the model
+    :rtype: dict[str,list[str]]
+    """
+    decision_variables = load_model_info(model_file).decision_variables
+    variables = {}
+    for variable, (asset_type, _, _) in START_RULES.items():
+        indexes = decision_variables.get(variable)
+        # The grid variables are indexed by step, the asset variables by asset and step
+        if indexes is not None and len(indexes) == (1 if asset_type == MAINGRID else 2):
+            variables[variable] = indexes
+    return variables
+
+
+def start_values(data: Mapping[str, pd.DataFrame], model_file: str) -> pd.DataFrame:
+    """
+    Return the values of the binary variables of the model in the solution of the original job
+
+    :param data: The initial optimization input and output data
+    :type data: Mapping[str,pd.DataFrame]
+    :param model_file: The OPL model file path (.mod)
+    :type model_file: str
+    :raises DataError: If the job has no solution or no variable of the model can be started from it
+    :return: The values with the WARM_START_COLUMNS, the asset ID is MAINGRID for the variables indexed by step
+    :rtype: pd.DataFrame
+    """
+    if "ASSET_STEPS_OUTPUT" not in data or "ASSETS" not in data:
+        raise DataError(
+            "No original solution to start from", error_code="NO_WARM_START", context={"sheets": list(data.keys())}
+        )
+    outputs = data["ASSET_STEPS_OUTPUT"]
+    asset_types = data["ASSETS"].set_index("asset_id")["type"].to_dict()
+    asset_types[MAINGRID] = MAINGRID
+    types = outputs["asset_id"].map(asset_types)
+    energy_types = (
+        outputs["energy_type"].astype(str) if "energy_type" in outputs else pd.Series("", index=outputs.index)
+    )
+    power_targets = pd.to_numeric(outputs["power_target"], errors="coerce").fillna(0.0)
+
+    values = []
+    for variable in warm_start_variables(model_file):
+        asset_type, energy_names, sign = START_RULES[variable]
+        rows = types == asset_type
+        if energy_names:
+            rows &= energy_types.apply(lambda energy_type: any(name in energy_type for name in energy_names))
+        values.append(
+            pd.DataFrame(
+                {
+                    "variable": variable,
+                    "asset_id": outputs.loc[rows, "asset_id"],
+                    "step_id": outputs.loc[rows, "step_id"],
+                    "value": (sign * power_targets[rows] > POWER_TOLERANCE).astype(int),
+                }
+            )
+        )
+    values = [frame for frame in values if not frame.empty]
+    if not values:
+        raise DataError(
+            "No variable of the model can be started from the original solution",
+            error_code="NO_WARM_START",
+            context={"model_file": model_file, "variables": list(START_RULES)},
+        )
+    return pd.concat(values, ignore_index=True)[WARM_START_COLUMNS]
+
+
+def mip_start_accepted(output: Iterable[str]) -> bool | None:
+    """
+    Read in the CPLEX log whether the MIP start was accepted
+
+    :param output: The output lines of oplrun
+    :type output: Iterable[str]
+    :return: True if the MIP start gave a solution, False if CPLEX rejected it, None if the log does not tell
+    :rtype: bool | None
+    """
+    accepted = None
+    for line in output:
+        if _ACCEPTED in line:
+            accepted = True
+        elif _REJECTED in line:
+            accepted = False
+    return accepted
+
+
+def print_warm_start_report(report: WarmStartReport) -> None:
+    """
+    Print whether the MIP start was accepted and the time saved
+
+    :param report: The report of the warm-started replay
+    :type report: WarmStartReport
+    :rtype: None
+    """
+    accepted = {True: "accepted", False: "rejected", None: "unknown (no solver log)"}[report.accepted]
+    print(f"MIP start from the original solution: {accepted}")
+    time_saved = report.time_saved()
+    if time_saved is None:
+        print(f"Solved in {report.elapsed_seconds:.1f} s, replay once without warm start to measure the time saved")
+    else:
+        print(
+            f"Solved in {report.elapsed_seconds:.1f} s instead of {report.cold_elapsed_seconds:.1f} s "
+            f"({time_saved:.1f} s saved)"
+        )
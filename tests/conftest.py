@@ -6,6 +6,77 @@ import pytest
 
 from optim_analyser.config import AppConfig, Config, IBMConfig, PathConfig
 
+# Header of the output datasheets written by the OPL models
+HEADER_FIELDS = "".join(f"\tstring field_{i:02d};\n" for i in range(1, 21))
+
+# Minimal OPL model with two input tuples and one output tuple, in the sections read by optim.oplmodel
+DATA_MODEL = f"""/* INPUT DATA */
+tuple t_operation {{
+    key string param_id;
+    string param_val;
+ }}
+{{t_operation}} OPERATION = ...;
+
+tuple t_asset_steps {{
+    key string asset_id;
+    key string step_id;\t\t// Asset step ID
+    int availability;
+    // float old_prediction;
+    float power_prediction;
+ }}
+{{t_asset_steps}} ASSET_STEPS = ...;
+// Converting this reference to a microgrid name
+string microgridName;
+
+tuple t_empty {{
+{HEADER_FIELDS}}}
+{{t_empty}} OPERATION_HEADER = {{<"param_id", "param_val"> | i in 1..1}};
+tuple t_operation_output {{
+    key string param_id;
+    string param_val;
+ }}
+{{t_operation_output}} OPERATION_OUTPUT = {{<"optimiser_objective_value", "12.5">}};
+
+execute {{
+}}
+
+minimize
+  0;
+"""
+
+# Small OPL model with binary variables of storages, generators and the grid, setting its own MIP gap
+DECISION_MODEL = """{string} isDECISION_STEPS = ...;
+dvar boolean IsCharging[isE_STORAGES union isH_STORAGES][isDECISION_STEPS];
+dvar boolean IsGenOn[isDISP_E_GENS][isDECISION_STEPS];
+dvar boolean IsImporting[isDECISION_STEPS];
+dvar float+ StorACPowerCharge[isE_STORAGES][isDECISION_STEPS];
+execute CPX_PARAM {
+    cplex.epgap = 0.001;
+}
+
+minimize
+  TotalCost;
+
+execute {
+}
+"""
+
+
+@pytest.fixture
+def model_file(tmp_path):
+    """Write the minimal OPL model with two input tuples and one output tuple."""
+    model = tmp_path / "model.mod"
+    model.write_text(DATA_MODEL)
+    return str(model)
+
+
+@pytest.fixture
+def decision_model_file(tmp_path):
+    """Write the small OPL model with binary variables and its own MIP gap."""
+    model = tmp_path / "decision.mod"
+    model.write_text(DECISION_MODEL)
+    return str(model)
+
 
 @pytest.fixture
 def sample_config():
@@ -51,3 +122,11 @@ def sample_json_data():
             "solve_state": {"solve_status": "optimal_solution"},
         }
     }
+
+
+@pytest.fixture(autouse=True)
+def cache_path(tmp_path, monkeypatch):
+    """Keep the cache of the parsed data in the test temporary directory."""
+    path = tmp_path / "cache"
+    monkeypatch.setenv("CACHE_PATH", str(path))
+    return path
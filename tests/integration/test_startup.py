@@ -1,6 +1,11 @@
 """Integration test for application startup and basic functionality."""
 
+import os
+import subprocess
+import sys
+import time
 import tkinter as tk
+from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -150,6 +155,57 @@ class TestApplicationStartup:
         assert len(duplicates) == 0, f"Data file duplication issues:\n" + "\n".join(duplicates)
 
 
+# Time budget of the CLI help, from the start of the interpreter
+STARTUP_BUDGET_SECONDS = 0.3
+SRC_DIR = Path(__file__).parent.parent.parent / "src"
+
+
+def run_python(*args: str) -> tuple[float, subprocess.CompletedProcess]:
+    """Run a new interpreter with the package sources, return its duration and its result."""
+    env = os.environ | {"PYTHONPATH": os.pathsep.join(filter(None, [str(SRC_DIR), os.environ.get("PYTHONPATH")]))}
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, *args], capture_output=True, text=True, env=env, timeout=60)
+    return time.perf_counter() - start, result
+
+
+class TestStartupTime:
+    """Test that the CLI starts without loading the configuration workbooks or the heavy libraries."""
+
+    def test_help_within_budget(self):
+        """The help is shown within the startup budget, best of 3 runs to ignore the cold caches."""
+        durations = []
+        for _ in range(3):
+            duration, result = run_python("-m", "optim_analyser", "--help")
+            assert result.returncode == 0, result.stderr
+            assert "optim-analyser" in result.stdout
+            durations.append(duration)
+
+        assert min(durations) < STARTUP_BUDGET_SECONDS, f"--help took {min(durations) * 1000:.0f} ms"
+
+    def test_cli_import_is_light(self):
+        """Importing the CLI does not import pandas, plotly, tkinter, openpyxl or yaml."""
+        _, result = run_python(
+            "-c",
+            "import sys, optim_analyser.cli; "
+            "print(sorted({'pandas', 'plotly', 'tkinter', 'openpyxl', 'yaml'} & set(sys.modules)))",
+        )
+
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.strip() == "[]"
+
+    def test_path_import_reads_no_workbook(self):
+        """The configuration workbooks are read on the first lookup, not when path is imported."""
+        _, result = run_python(
+            "-c",
+            "import pandas as pd; read_excel = pd.read_excel; reads = []; "
+            "pd.read_excel = lambda *args, **kwargs: reads.append(args[0]) or read_excel(*args, **kwargs); "
+            "from optim_analyser.optim import path; print(len(reads)); path.get_microgrid_param('-1'); print(len(reads))",
+        )
+
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.split() == ["0", "1"]
+
+
 class TestErrorHandling:
     """Test that error classes are properly defined."""
 
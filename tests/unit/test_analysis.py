@@ -1,7 +1,12 @@
-"""Test placeholder for analysis module."""
+"""Unit tests for the analysis module."""
 
+import pandas as pd
 import pytest
 
+from optim_analyser.analysis import analyse
+from optim_analyser.models import OplRunResult
+from optim_analyser.optim import dataframes, optimization, path, solver
+
 
 @pytest.mark.unit
 class TestAnalysis:
@@ -10,3 +15,62 @@ class TestAnalysis:
     def test_placeholder(self):
         """Placeholder test - will be expanded after migration."""
         assert True
+
+
+@pytest.mark.unit
+class TestRunFromExcelLocal:
+    """Test the local runs of the optimization jobs from their Excel files."""
+
+    @pytest.fixture
+    def excel_run(self, tmp_path, monkeypatch, model_file):
+        """Place the Excel files of a job, run the model without oplrun and keep the displayed data."""
+        excel_input_path = tmp_path / "in_prob_site.xlsx"
+        excel_output_path = tmp_path / "out_prob_site.xlsx"
+        dataframes.dataframe_to_excel(
+            {
+                "OPERATION": pd.DataFrame({"param_id": ["name"], "param_val": ["Site"]}),
+                "ASSET_STEPS": pd.DataFrame(
+                    {"asset_id": ["BESS"], "step_id": ["1"], "availability": [1], "power_prediction": [0.5]}
+                ),
+            },
+            str(excel_input_path),
+        )
+        run_folder = tmp_path / "output" / "run_cplex"
+        (run_folder / "Data").mkdir(parents=True)
+        paths = (
+            model_file,
+            str(run_folder / "site.dat"),
+            str(run_folder / "model.mod"),
+            str(run_folder / "Data"),
+            str(run_folder / "site_cost_extraction.dat"),
+            str(run_folder / "site_cost_extraction.mod"),
+            str(tmp_path / "output" / "site.html"),
+            str(excel_output_path),
+            pd.Series(dtype=object),
+        )
+        monkeypatch.setattr(path, "get_run_paths_and_param_excel", lambda *args: paths)
+
+        def run_optimization(run_model_path, run_dat_path, output_files):
+            output = pd.DataFrame({"param_id": ["status"], "param_val": ["Dispatch found"]})
+            output.to_excel(output_files[0], sheet_name="OPERATION_OUTPUT", index=False)
+            return OplRunResult(["oplrun", run_model_path, run_dat_path], 0, 0.1)
+
+        monkeypatch.setattr(optimization, "run_optimization", run_optimization)
+        displayed = {}
+        monkeypatch.setattr(
+            analyse, "plot_from_data_stage", lambda all_data, *args, **kwargs: displayed.update(all_data)
+        )
+        return str(excel_input_path), str(excel_output_path), run_folder, displayed
+
+    def test_run_with_solver_profile(self, tmp_path, excel_run):
+        """The model is run with the parameters of the profile and the recomputed output data is displayed."""
+        excel_input_path, excel_output_path, run_folder, displayed = excel_run
+
+        analyse.run_from_excel_and_display_local(
+            excel_input_path, str(tmp_path / "output"), add_costs=False, solver_profile="fast-preview"
+        )
+
+        assert "cplex.epgap = 0.01;" in (run_folder / "model.mod").read_text()
+        assert solver.load_recorded_profile(excel_output_path) == solver.get_solver_profile("fast-preview")
+        assert displayed["OPERATION_OUTPUT"]["param_val"].tolist() == ["Dispatch found"]
+        assert pd.read_excel(excel_output_path, sheet_name="OPERATION_OUTPUT")["param_id"].tolist() == ["status"]
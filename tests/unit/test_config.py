@@ -36,6 +36,14 @@ class TestConfig:
         assert config.ibm.hardware_spec_name == "S"
         assert config.app.theme == "Arc"
 
+    def test_excel_engine_from_env(self, monkeypatch):
+        """Test the Excel read backend selection."""
+        monkeypatch.delenv("EXCEL_ENGINE", raising=False)
+        assert Config.from_env().app.excel_engine == "auto"
+
+        monkeypatch.setenv("EXCEL_ENGINE", "openpyxl")
+        assert Config.from_env().app.excel_engine == "openpyxl"
+
     def test_config_to_dict(self, sample_config):
         """Test conversion to dictionary."""
         config_dict = sample_config.to_dict()
@@ -0,0 +1,123 @@
+"""Unit tests for the bulk conversion of optimization jobs."""
+
+import gzip
+import json
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+from optim_analyser import cli
+from optim_analyser.errors import ValidationError
+from optim_analyser.optim import convert
+
+
+@pytest.fixture
+def job_tree(tmp_path, sample_json_data):
+    """Write optimization jobs in a folder tree, one of them compressed."""
+    root = tmp_path / "jobs"
+    (root / "2025" / "01").mkdir(parents=True)
+    (root / "top.json").write_text(json.dumps(sample_json_data))
+    (root / "2025" / "01" / "nested.json.gz").write_bytes(gzip.compress(json.dumps(sample_json_data).encode()))
+    (root / "2025" / "notes.md").write_text("not a job")
+    return root
+
+
+@pytest.mark.unit
+class TestConvertJobs:
+    """Test the conversion of job folders."""
+
+    @pytest.mark.parametrize("jobs", [1, 2])
+    def test_folder_tree_is_mirrored(self, job_tree, tmp_path, cache_path, jobs):
+        """The jobs of the subfolders are converted in the same subfolders of the output folder."""
+        output = tmp_path / "converted"
+        report = convert.convert_jobs(job_tree, output, format_name="csv", recursive=True, jobs=jobs)
+
+        assert sorted(report.converted) == [job_tree / "2025" / "01" / "nested.json.gz", job_tree / "top.json"]
+        assert report.bytes_processed == sum(file.stat().st_size for file in report.converted)
+        assert sorted(path.relative_to(output).as_posix() for path in output.rglob("*.csv")) == [
+            "2025/01/nested/OPERATION.csv",
+            "top/OPERATION.csv",
+        ]
+        pd.testing.assert_frame_equal(
+            pd.read_csv(output / "top" / "OPERATION.csv"),
+            pd.DataFrame({"param": ["test_param"], "value": ["test_value"]}),
+        )
+        assert not cache_path.exists()
+
+    def test_not_recursive(self, job_tree):
+        """Only the jobs of the folder are converted, next to the jobs by default."""
+        report = convert.convert_jobs(job_tree)
+
+        assert report.converted == [job_tree / "top.json"]
+        assert (job_tree / "top.xlsx").exists()
+
+    def test_up_to_date_outputs_are_skipped(self, job_tree, tmp_path):
+        """Only the jobs modified after their conversion are converted again, unless forced."""
+        output = tmp_path / "converted"
+        convert.convert_jobs(job_tree, output, recursive=True)
+        report = convert.convert_jobs(job_tree, output, recursive=True)
+        assert report.converted == [] and len(report.skipped) == 2
+
+        modified = job_tree / "top.json"
+        os.utime(modified, (modified.stat().st_atime, (output / "top.xlsx").stat().st_mtime + 10))
+        assert convert.convert_jobs(job_tree, output, recursive=True).converted == [modified]
+        assert len(convert.convert_jobs(job_tree, output, recursive=True, force=True).converted) == 2
+
+    def test_failed_jobs_are_reported(self, job_tree, tmp_path):
+        """An invalid job does not stop the conversion of the other jobs, and leaves no output."""
+        (job_tree / "broken.json").write_text('{"decision_optimization": {"input_data": [')
+        results = []
+        report = convert.convert_jobs(
+            job_tree, tmp_path / "converted", on_result=lambda *result: results.append(result)
+        )
+
+        assert list(report.failed) == [job_tree / "broken.json"]
+        assert "DataError" in report.failed[job_tree / "broken.json"]
+        assert [status for _, status, _ in results] == [convert.FAILED, convert.CONVERTED]
+        assert [path.name for path in (tmp_path / "converted").iterdir()] == ["top.xlsx"]
+
+    def test_single_file(self, job_tree, tmp_path):
+        """A job file is converted to the output path."""
+        target = tmp_path / "single.xlsx"
+        convert.convert_jobs(job_tree / "2025" / "01" / "nested.json.gz", target)
+
+        assert pd.read_excel(target, sheet_name=None).keys() == {"OPERATION"}
+        assert convert.job_stem("archive.JSON.ZIP") == "archive"
+
+    def test_invalid_arguments(self, job_tree):
+        """Unknown formats and invalid numbers of processes are rejected."""
+        with pytest.raises(ValidationError, match="Unknown output format"):
+            convert.convert_jobs(job_tree, format_name="pdf")
+        with pytest.raises(ValidationError, match="at least 1"):
+            convert.convert_jobs(job_tree, jobs=0)
+
+
+@pytest.mark.unit
+class TestConvertCommand:
+    """Test the formats of the convert command."""
+
+    def convert(self, monkeypatch, *args):
+        """Run the convert command with the arguments."""
+        monkeypatch.setattr(sys, "argv", ["optim-analyser", "convert", *args])
+        return cli.main()
+
+    def test_registered_format_selectable(self, monkeypatch, job_tree, tmp_path, cache_path):
+        """A format registered in OUTPUT_FORMATS can be chosen with --format."""
+
+        def write_sheet_names(data, output_path):
+            with open(output_path, "w") as f:
+                f.write(",".join(data))
+
+        monkeypatch.setitem(convert.OUTPUT_FORMATS, "names", convert.OutputFormat("names", ".txt", write_sheet_names))
+
+        assert self.convert(monkeypatch, str(job_tree), "-o", str(tmp_path / "out"), "--format", "names") == 0
+        assert (tmp_path / "out" / "top.txt").read_text() == "OPERATION"
+
+    def test_unknown_format(self, monkeypatch, job_tree, capsys):
+        """An unregistered format is rejected with the registered ones."""
+        with pytest.raises(SystemExit):
+            self.convert(monkeypatch, str(job_tree), "-f", "feather")
+
+        assert "invalid choice: 'feather' (choose from 'xlsx', 'csv', 'parquet')" in capsys.readouterr().err
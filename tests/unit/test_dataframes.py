@@ -0,0 +1,689 @@
+"""Unit tests for optimization job loading."""
+
+import io
+import json
+import os
+import sys
+import zipfile
+from datetime import datetime
+from pathlib import Path
+from unittest import mock
+
+import openpyxl
+import pandas as pd
+import pytest
+
+from optim_analyser.errors import ConfigurationError, DataError
+from optim_analyser.optim import dataframes, excel, jobfile, path
+from optim_analyser.optim.bundle import JobBundle
+from optim_analyser.optim.cache import SheetCache
+from optim_analyser.optim.schema import apply_schema, step_numbers
+from optim_analyser.optim.sheets import LazySheets, select_columns, sheet_fields
+from optim_analyser.optim.streaming import iter_job_sheets
+
+CONFIG_FOLDER = Path(__file__).parents[2] / "resources" / "config"
+
+
+@pytest.fixture
+def job_data():
+    """Provide an optimization job as downloaded from WML."""
+    return {
+        "entity": {
+            "deployment": {"id": "deployment_id"},
+            "decision_optimization": {
+                "input_data": [
+                    {
+                        "id": "OPERATION.csv",
+                        "fields": ["param_id", "param_val"],
+                        "values": [
+                            ["operation_id", "1134"],
+                            ["optimisation_request_time", "2025-01-10 08:15:02.123"],
+                            ["optimisation_step_number", "3"],
+                        ],
+                    },
+                    {
+                        "id": "ASSET_STEPS.csv",
+                        "fields": ["asset_id", "step_id", "power_prediction", "availability"],
+                        "values": [
+                            ["PV", "1", -12.5, 1],
+                            ["PV", "2", -1e-3, 1],
+                            ['BESS "main"', "3", 0, 0.5],
+                        ],
+                    },
+                    {"id": "CONGESTIONS.csv", "fields": ["congestion_id", "max_power_in"], "values": []},
+                ],
+                "output_data": [
+                    {
+                        "id": "OPERATION_OUTPUT.csv",
+                        "fields": ["param_id", "param_val"],
+                        "values": [["optimiser_objective_value", "12.3"]],
+                    },
+                    {"id": "log.txt", "fields": ["line"], "values": [["[ok]"]]},
+                    {
+                        "id": "OPERATION_STEPS_OUTPUT.csv",
+                        "fields": ["step_id", "imbalance_power"],
+                        "values": [["1", 0.0], ["2", None]],
+                    },
+                    {
+                        "values": [["PV", "1", -12.5]],
+                        "fields": ["asset_id", "step_id", "power_target"],
+                        "id": "ASSET_STEPS_OUTPUT.csv",
+                    },
+                ],
+                "solve_state": {"solve_status": "optimal_solution", "details": {"{": "[\\"}},
+            },
+        }
+    }
+
+
+@pytest.fixture
+def job_file(tmp_path, job_data):
+    """Write the optimization job to a .json file."""
+    json_file = tmp_path / "job.json"
+    json_file.write_text(json.dumps(job_data, indent=2))
+    return str(json_file)
+
+
+def reference_dataframes(job_data, section):
+    """Build the sheets the way the former json.load based loader did."""
+    return {
+        sheet["id"].removesuffix(".csv"): pd.DataFrame(data=sheet["values"], columns=sheet["fields"])
+        for sheet in job_data["entity"]["decision_optimization"][section]
+    }
+
+
+@pytest.mark.unit
+class TestJobStreaming:
+    """Test the incremental job reader."""
+
+    @pytest.mark.parametrize("chunk_size", [1, 7, 64, 1 << 20])
+    def test_sheets_match_json_load(self, job_data, chunk_size):
+        """Sheets read by column are identical to the ones built from json.load, whatever the chunk size."""
+        text = json.dumps(job_data, indent=2)
+        sheets = list(iter_job_sheets(io.StringIO(text), chunk_size=chunk_size))
+
+        expected = reference_dataframes(job_data, "input_data") | reference_dataframes(job_data, "output_data")
+        assert [sheet.sheet_id.removesuffix(".csv") for sheet in sheets] == list(expected)
+        for sheet in sheets:
+            pd.testing.assert_frame_equal(
+                dataframes.sheet_to_dataframe(sheet), expected[sheet.sheet_id.removesuffix(".csv")]
+            )
+
+    def test_sheet_filter_skips_values(self, job_data):
+        """Filtered sheets are not returned."""
+        text = json.dumps(job_data)
+        sheets = iter_job_sheets(io.StringIO(text), sheet_filter=lambda section, sheet_id: section == "output_data")
+        assert [sheet.sheet_id for sheet in sheets] == [
+            "OPERATION_OUTPUT.csv",
+            "log.txt",
+            "OPERATION_STEPS_OUTPUT.csv",
+            "ASSET_STEPS_OUTPUT.csv",
+        ]
+
+    def test_truncated_job_raises_data_error(self, job_data):
+        """A truncated job file raises a DataError."""
+        text = json.dumps(job_data)
+        with pytest.raises(DataError):
+            list(iter_job_sheets(io.StringIO(text[: len(text) // 2])))
+
+    def test_rows_with_list_cells(self):
+        """Rows containing lists keep them as single cells."""
+        rows = [["a", [1, 2]], ["b", [3]]]
+        text = json.dumps({"input_data": [{"id": "X.csv", "fields": ["name", "items"], "values": rows}]})
+        (sheet,) = iter_job_sheets(io.StringIO(text))
+        pd.testing.assert_frame_equal(
+            dataframes.sheet_to_dataframe(sheet), pd.DataFrame(data=rows, columns=["name", "items"])
+        )
+
+    @pytest.mark.parametrize("chunk_size", [4, 1 << 20])
+    def test_rows_of_different_lengths(self, chunk_size):
+        """The missing cells of the shorter rows are None, whether the rows are decoded in one block or several."""
+        rows = [["a"], ["b", 2], ["c"]]
+        text = json.dumps({"input_data": [{"id": "X.csv", "fields": ["name", "value"], "values": rows}]})
+        (sheet,) = iter_job_sheets(io.StringIO(text), chunk_size=chunk_size)
+        pd.testing.assert_frame_equal(
+            dataframes.sheet_to_dataframe(sheet), pd.DataFrame(data=rows, columns=["name", "value"])
+        )
+
+
+@pytest.mark.unit
+class TestJsonToDataframe:
+    """Test the loaders of optimization job files."""
+
+    def test_json_to_dataframe(self, job_file, job_data):
+        """All input sheets and the known output sheets are loaded."""
+        data = dataframes.json_to_dataframe(job_file)
+
+        assert list(data) == [
+            "OPERATION",
+            "ASSET_STEPS",
+            "CONGESTIONS",
+            "OPERATION_OUTPUT",
+            "OPERATION_STEPS_OUTPUT",
+            "ASSET_STEPS_OUTPUT",
+        ]
+        expected = reference_dataframes(job_data, "input_data")
+        pd.testing.assert_frame_equal(
+            data["ASSET_STEPS"], expected["ASSET_STEPS"], check_dtype=False, check_categorical=False
+        )
+
+    def test_json_to_input_output_dataframes(self, job_file):
+        """Output sheets are loaded up to OPERATION_STEPS_OUTPUT."""
+        data_in, data_out = dataframes.json_to_input_output_dataframes(job_file)
+
+        assert list(data_in) == ["OPERATION", "ASSET_STEPS", "CONGESTIONS"]
+        assert list(data_out) == ["OPERATION_OUTPUT", "log.txt", "OPERATION_STEPS_OUTPUT"]
+
+
+@pytest.mark.unit
+class TestCloudInput:
+    """Test the input data formatted for the jobs on IBM cloud."""
+
+    def test_same_values_as_json_serialisation(self):
+        """The sheets have the values of DataFrame.to_json, without serialising them."""
+        sheet = pd.DataFrame(
+            {
+                "step_id": pd.Categorical(["1", "2", None]),
+                "price": [0.25, float("inf"), None],
+                "count": pd.array([1, 2, 3], dtype="int32"),
+                "date": pd.to_datetime(["2025-01-10", None, "2025-01-11"]),
+                "mixed": ['say "{hi}"', 2, datetime(2025, 1, 10)],
+                "flag": [True, False, True],
+            }
+        )
+        split = json.loads(sheet.to_json(orient="split", index=False))
+
+        assert dataframes.get_cloud_input_from_dataframe({"STEPS": sheet, "EMPTY": sheet.iloc[:0]}) == [
+            {"id": "STEPS.csv", "fields": split["columns"], "values": split["data"]},
+            {"id": "EMPTY.csv", "fields": split["columns"], "values": []},
+        ]
+
+
+@pytest.mark.unit
+class TestExcelWriter:
+    """Test the streaming Excel writer."""
+
+    def test_same_workbook_as_pandas_writer(self, tmp_path, monkeypatch):
+        """The cells written by batches have the values and formats written by DataFrame.to_excel."""
+        monkeypatch.setattr(dataframes, "EXCEL_ROWS_PER_BATCH", 2)
+        sheet = pd.DataFrame(
+            {
+                "step_id": pd.Categorical(["1", "2", None]),
+                "price": [0.25, float("-inf"), None],
+                "count": pd.array([1, 2, 3], dtype="int32"),
+                "date": pd.to_datetime(["2025-01-10 00:00:00", None, "2025-01-11 08:15:00"]),
+                "mixed": ["text", 2, datetime(2025, 1, 10)],
+            }
+        )
+        data = {"STEPS": sheet, "HEADER_ONLY": sheet.iloc[:0], "EMPTY": pd.DataFrame()}
+
+        def cells(excel_file):
+            workbook = openpyxl.load_workbook(excel_file)
+            return {
+                worksheet.title: [
+                    [(cell.value, cell.number_format, cell.font.b, cell.border.top.style) for cell in row]
+                    for row in worksheet.iter_rows()
+                ]
+                for worksheet in workbook
+            }
+
+        dataframes.dataframe_to_excel(data, str(tmp_path / "pandas.xlsx"))
+        dataframes.dataframe_to_excel(data, str(tmp_path / "streaming.xlsx"), streaming=True)
+        assert cells(tmp_path / "streaming.xlsx") == cells(tmp_path / "pandas.xlsx")
+
+
+@pytest.mark.unit
+class TestExcelEngines:
+    """Test the selection of the Excel read backend."""
+
+    def test_auto_uses_first_installed_engine(self, monkeypatch):
+        """'auto' skips the engines whose package is missing, openpyxl being the fallback."""
+        monkeypatch.setitem(excel.EXCEL_ENGINES, "missing", excel.ExcelEngine("missing", "no_such_module", "no-such"))
+        monkeypatch.setattr(excel, "ENGINE_PREFERENCE", ["missing", excel.OPENPYXL])
+        monkeypatch.setenv("EXCEL_ENGINE", "auto")
+
+        assert excel.resolve_engine().name == excel.OPENPYXL
+        with pytest.raises(ConfigurationError, match="no-such"):
+            excel.resolve_engine("missing")
+        with pytest.raises(ConfigurationError, match="Unknown Excel engine"):
+            excel.resolve_engine("xlrd2")
+
+    def test_configured_engine_reads_the_sheets(self, tmp_path, monkeypatch):
+        """The sheets read with the engine of EXCEL_ENGINE are the ones written."""
+        monkeypatch.setenv("EXCEL_ENGINE", "OpenPyXL")
+        excel_file = str(tmp_path / "input.xlsx")
+        sheet = pd.DataFrame({"param_id": ["operation_id"], "param_val": ["12"]})
+        dataframes.dataframe_to_excel({"OPERATION": sheet}, excel_file)
+
+        pd.testing.assert_frame_equal(excel.read_excel(excel_file, sheet_name="OPERATION").astype(str), sheet)
+        assert list(dataframes.excel_to_dataframe(excel_file)) == ["OPERATION"]
+
+    @pytest.mark.parametrize("workbook", ["plot_param.xlsx", "deployment_list.xlsx", "pandas", "streaming"])
+    def test_calamine_reads_like_openpyxl(self, tmp_path, monkeypatch, job_file, workbook):
+        """calamine reads the same frames as openpyxl from the configuration workbooks and the written job sheets."""
+        pytest.importorskip("python_calamine")
+        if workbook.endswith(".xlsx"):
+            excel_file = str(CONFIG_FOLDER / workbook)
+        else:
+            excel_file = str(tmp_path / f"{workbook}.xlsx")
+            data = dataframes.json_to_dataframe(job_file)
+            dataframes.dataframe_to_excel(data, excel_file, streaming=workbook == "streaming")
+
+        expected = excel.read_excel(excel_file, sheet_name=None, engine=excel.OPENPYXL)
+        read = excel.read_excel(excel_file, sheet_name=None, engine=excel.CALAMINE)
+        assert list(read) == list(expected)
+        for sheet_name in expected:
+            pd.testing.assert_frame_equal(read[sheet_name], expected[sheet_name])
+
+        # The sheets of the loader, with the types of the schema
+        loaded = {}
+        for engine in (excel.OPENPYXL, excel.CALAMINE):
+            monkeypatch.setenv("EXCEL_ENGINE", engine)
+            loaded[engine] = dataframes.excel_to_dataframe(excel_file)
+        for sheet_name in expected:
+            pd.testing.assert_frame_equal(loaded[excel.CALAMINE][sheet_name], loaded[excel.OPENPYXL][sheet_name])
+
+
+@pytest.mark.unit
+class TestExcelOutputReader:
+    """Test the reader of the output Excel files written by OPL."""
+
+    def test_populated_range_is_read(self, tmp_path):
+        """Only the header and the rows before the first blank row are read, as read_excel reads them."""
+        workbook = openpyxl.Workbook()
+        worksheet = workbook.active
+        worksheet.title = "ASSET_STEPS_OUTPUT"
+        for row in worksheet.iter_rows(min_row=1, max_row=200, max_col=20):
+            for cell in row:
+                cell.value = ""  # EMPTY_OUTPUT blanks the range before the results are written
+        for row_index, values in enumerate(
+            [("asset_id", "step_id", "power"), ("A", 1, 2.0), ("A", 2, None), ("B", 1, 0.5)], start=1
+        ):
+            for column, value in enumerate(values, start=1):
+                worksheet.cell(row_index, column, value)
+        workbook.create_sheet("VIOLATIONS_OUTPUT").append(["violation_id", "value"])
+        workbook.create_sheet("EMPTY")
+        excel_file = str(tmp_path / "output.xlsx")
+        workbook.save(excel_file)
+
+        data = dataframes.excel_output_to_dataframe(excel_file)
+
+        assert list(data) == ["ASSET_STEPS_OUTPUT", "VIOLATIONS_OUTPUT", "EMPTY"]
+        expected = pd.read_excel(excel_file, sheet_name=None)
+        for sheet_name in ["ASSET_STEPS_OUTPUT", "VIOLATIONS_OUTPUT"]:
+            pd.testing.assert_frame_equal(data[sheet_name], apply_schema(sheet_name, expected[sheet_name]))
+        assert data["ASSET_STEPS_OUTPUT"].shape == (3, 3)
+        assert data["EMPTY"].empty
+
+
+@pytest.mark.unit
+class TestSheetSchema:
+    """Test the column types applied when loading the sheets."""
+
+    def test_loaded_sheets_are_typed(self, job_file):
+        """Ids are categories and numbers float64/int32, step ids keep their string values."""
+        data_in, data_out = dataframes.json_to_dataframes_split(job_file)
+
+        asset_steps = data_in["ASSET_STEPS"]
+        assert isinstance(asset_steps["asset_id"].dtype, pd.CategoricalDtype)
+        assert list(asset_steps["step_id"]) == ["1", "2", "3"]
+        assert asset_steps["power_prediction"].dtype == "float64"
+        # availability is declared int but is not integral in this job
+        assert asset_steps["availability"].dtype == "float64"
+        assert data_out["ASSET_STEPS_OUTPUT"]["power_target"].dtype == "float64"
+        assert data_out["OPERATION_OUTPUT"]["param_val"].dtype == object
+
+    def test_lossless_conversion(self):
+        """Integral columns become int32, text in numeric columns is kept as it is."""
+        sheet = pd.DataFrame(
+            {
+                "step_id": ["1", "2"],
+                "step_duration": [15.0, 15.0],
+                "imbalance_power": ["-Infinity", "-Infinity"],
+                "other": [1, 2],
+            }
+        )
+        typed = apply_schema("OPERATION_STEPS_OUTPUT", sheet)
+
+        assert typed["step_duration"].dtype == "int32"
+        assert list(typed["imbalance_power"]) == ["-Infinity", "-Infinity"]
+        assert typed["other"].dtype == "int64"
+        assert apply_schema("UNKNOWN", sheet) is sheet
+
+    def test_default_type_of_cost_sheets(self):
+        """All the cost columns of the COSTS sheet are float64."""
+        typed = apply_schema("COSTS", pd.DataFrame({"step_id": ["1"], "energy_costs": [3]}))
+
+        assert typed["energy_costs"].dtype == "float64"
+
+    @pytest.mark.parametrize(
+        "steps", [pd.Series(["2", "10", "-1.0", "2"], dtype="category"), pd.Series(["2", "10", "-1.0", "2"])]
+    )
+    def test_step_numbers(self, steps):
+        """Step ids are converted to int, from categories or strings."""
+        assert list(step_numbers(steps)) == [2, 10, -1, 2]
+
+
+@pytest.mark.unit
+class TestSheetCache:
+    """Test the on-disk cache of the parsed files."""
+
+    def test_cached_job_is_identical(self, job_file, cache_path):
+        """The second load reads the cache and returns the same sheets, without parsing the file."""
+        dataframes.json_to_dataframes_split(job_file)
+        assert len(list(cache_path.iterdir())) == 1
+        data_in, data_out = dataframes._read_json_split(job_file)
+
+        with mock.patch.object(dataframes, "_read_json_split") as read_json:
+            cached_in, cached_out = dataframes.json_to_dataframes_split(job_file)
+        read_json.assert_not_called()
+
+        for data, cached in ((data_in, cached_in), (data_out, cached_out)):
+            assert list(cached) == list(data)
+            for sheet_name in data:
+                pd.testing.assert_frame_equal(cached[sheet_name], data[sheet_name])
+
+    def test_content_change_is_a_new_entry(self, job_file, job_data):
+        """A modified file is parsed again."""
+        dataframes.json_to_dataframes_split(job_file)
+        job_data["entity"]["decision_optimization"]["input_data"][0]["values"][0][1] = "2001"
+        with open(job_file, "w") as f:
+            json.dump(job_data, f)
+
+        assert JobBundle.from_json(job_file).operation_id == "2001"
+
+    def test_excel_round_trip(self, tmp_path):
+        """Sheets read from Excel are cached."""
+        excel_file = str(tmp_path / "data.xlsx")
+        dataframes.dataframe_to_excel(
+            {"ASSETS": pd.DataFrame({"asset_id": ["PV", "BESS"], "max_power": [10, 20]})}, excel_file
+        )
+
+        data = dataframes.excel_to_dataframe(excel_file)
+        with mock.patch.object(pd, "read_excel") as read_excel:
+            cached = dataframes.excel_to_dataframe(excel_file)
+        read_excel.assert_not_called()
+        pd.testing.assert_frame_equal(cached["ASSETS"], data["ASSETS"])
+
+    def test_least_recently_used_entries_are_evicted(self, tmp_path, cache_path):
+        """The oldest entries are removed when the cache is over its maximum size."""
+        cache = SheetCache(cache_path, max_size=1)
+        sheets = {"sheets": {"COSTS": pd.DataFrame({"step_id": ["1"], "energy_costs": [1.0]})}}
+        cache.store("entry", sheets)
+        assert not cache_path.exists() or list(cache_path.iterdir()) == []
+
+        cache.max_size = 10_000
+        for key in ("first", "second"):
+            cache.store(key, sheets)
+        os.utime(cache_path / "first" / "meta.json", (0, 0))
+        cache.max_size = cache.size() - 1
+        cache.evict()
+
+        assert [entry.name for entry in cache_path.iterdir()] == ["second"]
+
+    def test_invalidate_and_clear(self, job_file, cache_path):
+        """Entries are removed for one file or for all the files."""
+        cache = SheetCache(cache_path, max_size=1 << 20)
+        dataframes.json_to_dataframes_split(job_file)
+        cache.invalidate(job_file)
+        assert list(cache_path.iterdir()) == []
+
+        dataframes.json_to_dataframes_split(job_file)
+        cache.clear()
+        assert cache.size() == 0
+
+    def test_uncacheable_sheets_are_not_stored(self, cache_path):
+        """Sheets with values that cannot be stored, such as dates in a text column, are skipped."""
+        cache = SheetCache(cache_path, max_size=1 << 20)
+        cache.store("entry", {"sheets": {"X": pd.DataFrame({"date": [datetime(2025, 1, 1), "text"]})}})
+
+        assert cache.load("entry") is None
+        assert list(cache_path.iterdir()) == []
+
+    def test_stats_by_kind(self, job_file, cache_path):
+        """The entries are counted by kind of entry."""
+        cache = SheetCache(cache_path, max_size=1 << 20)
+        dataframes.json_to_dataframes_split(job_file)
+        cache.store_value(cache.digest_key("model1", "0" * 40), {"input_fields": []})
+
+        stats = cache.stats()
+
+        assert sorted(stats) == ["job", "model1"]
+        assert stats["job"][0] == 1 and stats["job"][1] > 0
+
+    def test_disabled_cache(self, job_file, cache_path, monkeypatch):
+        """Nothing is written when the maximum size is 0."""
+        monkeypatch.setenv("CACHE_MAX_SIZE_MB", "0")
+        dataframes.json_to_dataframes_split(job_file)
+
+        assert not cache_path.exists()
+
+
+@pytest.mark.unit
+class TestLazySheets:
+    """Test the sheets built on first access."""
+
+    @pytest.fixture(params=["cached", "not cached"])
+    def job_sheets(self, request, job_file, monkeypatch):
+        """Provide the input sheets of the job, read from the cache or from the file."""
+        if request.param == "not cached":
+            monkeypatch.setenv("CACHE_MAX_SIZE_MB", "0")
+        else:
+            dataframes.json_to_dataframes_split(job_file)
+        return dataframes.json_to_dataframes_split(job_file)[0]
+
+    def test_sheets_are_built_on_access(self):
+        """The loader is called once, when the sheet is first accessed."""
+        loader = mock.Mock(return_value=pd.DataFrame({"step_id": ["1"]}))
+        sheets = LazySheets({"OPERATION": pd.DataFrame()})
+        sheets.add_lazy("STEPS", ["step_id"], loader)
+
+        assert list(sheets) == ["OPERATION", "STEPS"]
+        assert "STEPS" in sheets and not sheets.is_loaded("STEPS")
+        assert sheet_fields(sheets, "STEPS") == ["step_id"]
+        loader.assert_not_called()
+
+        assert sheets["STEPS"] is sheets["STEPS"]
+        loader.assert_called_once_with(None)
+        assert sheets.is_loaded("STEPS")
+
+    def test_select_columns(self, job_sheets):
+        """Only the requested columns are built, with the same content as the whole sheet."""
+        columns = ["step_id", "unknown", "asset_id"]
+        selected = select_columns(job_sheets, "ASSET_STEPS", columns)
+
+        assert not job_sheets.is_loaded("ASSET_STEPS")
+        pd.testing.assert_frame_equal(selected, job_sheets["ASSET_STEPS"].filter(items=columns))
+        pd.testing.assert_frame_equal(select_columns(job_sheets, "ASSET_STEPS", columns), selected)
+
+    def test_merged_sheets_stay_lazy(self, job_sheets):
+        """Merging and subsetting the sheets does not build them, and built sheets are shared."""
+        merged = {"EXTRA": pd.DataFrame()} | job_sheets
+        assert isinstance(merged, LazySheets) and list(merged) == ["EXTRA", *job_sheets]
+        subset = merged.subset(["ASSET_STEPS", "MISSING"])
+        assert list(subset) == ["ASSET_STEPS"] and not job_sheets.is_loaded("ASSET_STEPS")
+
+        assert subset["ASSET_STEPS"] is job_sheets["ASSET_STEPS"]
+        merged["ASSET_STEPS"] = pd.DataFrame()
+        assert not job_sheets["ASSET_STEPS"].empty
+
+    def test_evicted_entry_is_parsed_again(self, job_file, cache_path):
+        """The sheets of a removed cache entry are loaded from the file."""
+        dataframes.json_to_dataframes_split(job_file)
+        data_in, _ = dataframes.json_to_dataframes_split(job_file)
+        SheetCache(cache_path, max_size=1).clear()
+
+        expected, _ = dataframes._read_json_split(job_file)
+        pd.testing.assert_frame_equal(data_in["ASSET_STEPS"], expected["ASSET_STEPS"])
+
+
+@pytest.mark.unit
+class TestCompressedJobs:
+    """Test the optimization jobs compressed with gzip, zstandard or in a zip archive."""
+
+    @pytest.fixture(params=[".json.gz", ".zip", ".json.zst"])
+    def compressed_job_file(self, request, tmp_path, job_data):
+        """Write the optimization job compressed according to the suffix."""
+        if request.param == ".json.zst":
+            pytest.importorskip("zstandard")
+        compressed_file = tmp_path / f"job{request.param}"
+        with jobfile.open_job_for_write(compressed_file) as f:
+            json.dump(job_data, f, indent=4)
+        return compressed_file
+
+    def test_loaded_like_plain_job(self, compressed_job_file, job_file):
+        """The compression is detected from the content, whatever the file name."""
+        renamed_file = compressed_job_file.rename(compressed_job_file.parent / "job.data")
+        assert jobfile.detect_compression(renamed_file) is not None
+
+        data = dataframes.json_to_dataframe(str(renamed_file))
+        expected = dataframes.json_to_dataframe(job_file)
+        assert list(data) == list(expected)
+        for sheet_name in expected:
+            pd.testing.assert_frame_equal(data[sheet_name], expected[sheet_name])
+        summary = dataframes.probe_job(str(renamed_file))
+        assert (summary.operation_id, summary.sheet_ids) == ("1134", dataframes.probe_job(job_file).sheet_ids)
+
+    def test_probe_job_folder(self, compressed_job_file):
+        """The compressed jobs of a folder are listed, the invalid archives are ignored."""
+        (compressed_job_file.parent / "broken.json.gz").write_bytes(b"\x1f\x8b\x08\x00")
+        (compressed_job_file.parent / "other.zip").write_bytes(b"not a zip")
+
+        summaries = dataframes.probe_job_folder(str(compressed_job_file.parent))
+        assert [summary.source_path for summary in summaries] == [compressed_job_file]
+
+    def test_archive_with_several_files(self, tmp_path, job_data):
+        """A zip archive must contain a single job file."""
+        archive_file = tmp_path / "jobs.zip"
+        with zipfile.ZipFile(archive_file, "w") as archive:
+            archive.writestr("first.json", json.dumps(job_data))
+            archive.writestr("second.json", json.dumps(job_data))
+
+        with pytest.raises(DataError, match="single optimization job file"):
+            dataframes.probe_job(str(archive_file))
+
+    def test_job_output_path(self):
+        """The results of the WML jobs are saved with the suffix of the compression setting."""
+        assert jobfile.job_output_path("Data/out_prob_1.json", "gzip") == "Data/out_prob_1.json.gz"
+        assert jobfile.job_output_path("Data/out_prob_1.json", "zip") == "Data/out_prob_1.zip"
+        assert jobfile.job_output_path("Data/out_prob_1.json") == "Data/out_prob_1.json"
+        with pytest.raises(ConfigurationError, match="Unknown job compression 'brotli'"):
+            jobfile.job_output_path("Data/out_prob_1.json", "brotli")
+
+    def test_missing_zstandard(self, tmp_path, monkeypatch):
+        """Reading a .zst job without the zstandard package raises a configuration error."""
+        zst_file = tmp_path / "job.json.zst"
+        zst_file.write_bytes(b"\x28\xb5\x2f\xfd")
+        monkeypatch.setitem(sys.modules, "zstandard", None)
+
+        with pytest.raises(ConfigurationError, match="zstandard"):
+            dataframes.probe_job(str(zst_file))
+
+
+@pytest.mark.unit
+class TestProbeJob:
+    """Test the metadata-only reading of optimization jobs."""
+
+    def test_probe_job(self, job_file):
+        """Operation metadata, step count and sheet ids are read."""
+        summary = dataframes.probe_job(job_file)
+
+        assert summary.is_job()
+        assert summary.operation_id == "1134"
+        assert summary.optimisation_request_time == "2025-01-10 08:15:02.123"
+        assert summary.step_number == 3
+        assert summary.sheet_ids == [
+            "OPERATION.csv",
+            "ASSET_STEPS.csv",
+            "CONGESTIONS.csv",
+            "OPERATION_OUTPUT.csv",
+            "log.txt",
+            "OPERATION_STEPS_OUTPUT.csv",
+            "ASSET_STEPS_OUTPUT.csv",
+        ]
+
+    def test_probe_stops_after_operation(self, tmp_path, job_data):
+        """Without the sheet ids, the file is not read after the OPERATION sheet."""
+        text = json.dumps(job_data)
+        json_file = tmp_path / "truncated.json"
+        json_file.write_text(text[: text.index("ASSET_STEPS.csv")])
+
+        summary = dataframes.probe_job(str(json_file), with_sheet_ids=False)
+
+        assert summary.operation_id == "1134"
+        assert summary.sheet_ids == []
+
+    @pytest.mark.parametrize("chunk_size", [1, 7, 64])
+    def test_skipped_sheets_ids(self, job_data, chunk_size):
+        """Sheets discarded by the filter are returned without values, whatever the chunk size."""
+        text = json.dumps(job_data, indent=2)
+        sheets = list(
+            iter_job_sheets(
+                io.StringIO(text),
+                sheet_filter=lambda section, sheet_id: sheet_id == "log.txt",
+                chunk_size=chunk_size,
+                include_skipped=True,
+            )
+        )
+
+        assert len(sheets) == 7
+        assert [sheet.sheet_id for sheet in sheets if not sheet.skipped] == ["log.txt"]
+        assert all(sheet.values is None for sheet in sheets if sheet.skipped)
+
+    def test_probe_job_folder(self, tmp_path, job_data):
+        """Files that are not optimization jobs are ignored."""
+        (tmp_path / "b_job.json").write_text(json.dumps(job_data))
+        (tmp_path / "a_job.json").write_text(json.dumps(job_data))
+        (tmp_path / "config.json").write_text('{"space_id": "test"}')
+        (tmp_path / "list.json").write_text("[1, 2]")
+        (tmp_path / "readme.txt").write_text("readme")
+
+        summaries = dataframes.probe_job_folder(str(tmp_path))
+
+        assert [summary.source_path.name for summary in summaries] == ["a_job.json", "b_job.json"]
+
+
+@pytest.mark.unit
+class TestJobBundle:
+    """Test the optimization job parsed once."""
+
+    def test_from_json(self, job_file):
+        """Sheets, input/output split and operation metadata come from a single parse."""
+        job = JobBundle.from_json(job_file)
+
+        assert job.source_path == job_file
+        assert list(job.dataframes) == list(dataframes.json_to_dataframe(job_file))
+        assert list(job.input_data) == ["OPERATION", "ASSET_STEPS", "CONGESTIONS"]
+        assert list(job.output_data) == ["OPERATION_OUTPUT", "OPERATION_STEPS_OUTPUT", "ASSET_STEPS_OUTPUT"]
+        assert job.operation_id == "1134"
+        assert job.optimisation_request_time == "2025-01-10 08:15:02.123"
+        assert job.optim_name == job.microgrid_name + "_2025-01-10_081502"
+
+    def test_metadata_matches_path_probe(self, job_file):
+        """The metadata is the one returned by the path helpers reading the file."""
+        job = JobBundle.from_json(job_file)
+
+        assert path.op_id_and_microgrid_name_date_from_json(job_file) == (
+            job.operation_id,
+            job.microgrid_name,
+            job.optim_name,
+        )
+
+    def test_display_paths(self, job_file, tmp_path):
+        """Display paths are built from the bundle metadata."""
+        job = JobBundle.from_json(job_file)
+
+        optim_folder, excel_init_path, html_path, _ = path.get_display_paths_and_param_json(job, str(tmp_path))
+
+        assert optim_folder == os.path.join(str(tmp_path), job.microgrid_name)
+        assert excel_init_path == os.path.join(optim_folder, job.optim_name + "_initial_job.xlsx")
+        assert html_path == os.path.join(optim_folder, job.optim_name + ".html")
+
+    def test_missing_operation_data(self, tmp_path):
+        """A job without operation metadata raises a DataError, like the path helpers reading the file."""
+        job = JobBundle.from_dataframes({"ASSET_STEPS": pd.DataFrame({"asset_id": ["BESS"]})}, {})
+
+        assert list(job.input_data) == ["ASSET_STEPS"]
+        with pytest.raises(DataError) as error:
+            path.get_display_paths_and_param_json(job, str(tmp_path))
+        assert error.value.error_code == "MISSING_OPERATION_DATA"
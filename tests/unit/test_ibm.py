@@ -1,14 +1,19 @@
 """Unit tests for IBM Watson ML integration."""
 
+import io
+import json
 from unittest.mock import Mock, patch
 
 import pytest
 
+from optim_analyser.errors import OptimizationFail
+from optim_analyser.ibm.jobWMLRestClient import WMLJobClient
 from optim_analyser.ibm.optimizationIBM import (
     create_model_and_deployment_distant,
     delete_deployment_and_model_distant,
     run_optimization_distant,
 )
+from optim_analyser.optim import dataframes
 
 
 @pytest.mark.unit
@@ -45,3 +50,105 @@ class TestIBMIntegration:
             pytest.skip("IBM credentials not configured")
 
         # Integration test would go here
+
+
+@pytest.mark.unit
+class TestJobPayload:
+    """Test the job creation payload."""
+
+    @pytest.fixture
+    def client(self):
+        return WMLJobClient("api.test", "iam.test", "key", "space", "model", "deployment", 20.1)
+
+    @pytest.fixture
+    def input_data(self):
+        return [
+            {"id": "OPERATION.csv", "fields": ["param_id", "param_val"], "values": [["operation_id", "1134"]]},
+            {"id": "EMPTY.csv", "fields": ["asset_id"], "values": []},
+            {"id": "STEPS.csv", "fields": ["step_id", "price"], "values": [[str(i), i / 3] for i in range(7)]},
+        ]
+
+    def test_streamed_payload_is_identical(self, client, input_data, monkeypatch):
+        """The streamed parts join into the serialised payload."""
+        monkeypatch.setattr(WMLJobClient, "PAYLOAD_ROWS_PER_PART", 3)
+        parts = list(client.funIterJobPayload("job", input_data))
+
+        assert b"".join(parts).decode() == client.funGetJobPayload("job", input_data)
+        assert json.loads(b"".join(parts))["decision_optimization"]["input_data"] == input_data
+        assert max(len(part) for part in parts) < len(client.funGetJobPayload("job", input_data[2:])) / 2
+
+    @patch("http.client.HTTPSConnection")
+    def test_create_job_streams_payload(self, connection, client, input_data):
+        """The request body is an iterator of parts when the payload is streamed."""
+        connection.return_value.getresponse.return_value.status = 202
+        connection.return_value.getresponse.return_value.read.return_value = b'{"metadata": {"id": "job_1"}}'
+
+        response = client.createJob(input_data, accessToken="token", streamPayload=True)
+
+        assert client.fungetJobId(response) == "job_1"
+        _, _, body, _ = connection.return_value.request.call_args.args
+        assert connection.return_value.request.call_args.kwargs == {"encode_chunked": True}
+        assert json.loads(b"".join(body)) == json.loads(client.funGetJobPayload("DEFAULT_JOB", input_data))
+
+
+@pytest.mark.unit
+class TestJobOutput:
+    """Test the results of the jobs saved while they are downloaded."""
+
+    JOB = {
+        "metadata": {"id": "job_1"},
+        "entity": {
+            "decision_optimization": {
+                "output_data": [
+                    {"id": "OPERATION_OUTPUT.csv", "fields": ["param_id", "param_val"], "values": [["cost", "12.5"]]}
+                ]
+            }
+        },
+    }
+    PROPERTIES = {key: "" for key in ("API_DOMAIN", "IAM_DOMAIN", "API_KEY", "SPACE_ID", "RUN_TIME_VERSION")}
+
+    def response(self, status=200):
+        """Return an HTTP response with the job details as body."""
+        response = io.BytesIO(json.dumps(self.JOB).encode())
+        response.status = status
+        return response
+
+    @pytest.fixture
+    def client(self, monkeypatch):
+        """Return a client of a submitted job, the job details are downloaded from the HTTPS connection."""
+        monkeypatch.setattr(WMLJobClient, "DOWNLOAD_CHUNK_SIZE", 16)
+        client = WMLJobClient("api.test", "iam.test", "key", "space", "model", "deployment", 20.1)
+        monkeypatch.setattr(client, "createJob", Mock(return_value={"metadata": {"id": "job_1"}}))
+        monkeypatch.setattr(client, "funGetJobHeaders", Mock(return_value={}))
+        return client
+
+    def run(self, client, output_path, status=200):
+        """Run a finished job through the mocked client."""
+        job_status = Mock()
+        job_status.isFinished.return_value = True
+        job_status.isCompleted.return_value = True
+        with (
+            patch("optim_analyser.ibm.jobWMLRestClient.WMLJobClient", return_value=client),
+            patch("optim_analyser.ibm.getJobsStatus.getJobsStatus", return_value=job_status),
+            patch("http.client.HTTPSConnection") as connection,
+        ):
+            connection.return_value.getresponse.return_value = self.response(status)
+            run_optimization_distant([], str(output_path), self.PROPERTIES, "model", "deployment")
+
+    @pytest.mark.parametrize("suffix", [".json", ".json.gz", ".zip"])
+    def test_results_saved_compressed(self, tmp_path, client, suffix):
+        """The job details are copied into the output file, compressed according to its suffix."""
+        output_path = tmp_path / "Data" / f"out_prob_1{suffix}"
+
+        self.run(client, output_path)
+
+        assert dataframes.json_to_dataframe(str(output_path))["OPERATION_OUTPUT"]["param_val"].tolist() == ["12.5"]
+
+    def test_results_not_retrieved(self, tmp_path, client):
+        """No output file is left when the job details cannot be downloaded."""
+        output_path = tmp_path / "Data" / "out_prob_1.json.gz"
+
+        with pytest.raises(OptimizationFail, match="could not be retrieved"):
+            self.run(client, output_path, status=404)
+
+        assert not output_path.exists()
@@ -0,0 +1,153 @@
+"""Unit tests for the parser of the OPL models."""
+
+import json
+import os
+
+import pytest
+
+from optim_analyser.errors import ModelReferenceError
+from optim_analyser.models import ModelInfo
+from optim_analyser.optim import oplmodel
+from optim_analyser.optim.registry import default_registry
+
+MODEL = """/* INPUT DATA */
+tuple t_asset_steps {
+    key string asset_id;
+    key string step_id;\t\t// Asset step ID
+    // float old_prediction;
+    float power_prediction;
+
+ }
+{t_asset_steps} ASSET_STEPS = ...;
+// Converting this reference to a microgrid name
+string microgridName;
+
+tuple t_empty {
+    string field_01;
+}
+tuple t_costs {
+    string cost_name;
+    float cost;
+ }
+{t_costs} COSTS = {};
+
+dvar boolean IsCharging[isE_STORAGES union isH_STORAGES][isDECISION_STEPS];
+dvar float+ ImbalancePower [isIMBALANCE_STEPS];\t// kW
+
+execute {
+}
+
+dexpr float EnergyCost = sum(t in isDECISION_STEPS) // Energy bought
+\tpower[t] * price[t];
+dexpr float PenaltyCost=10 * violations;
+dexpr float TotalFCRNetworkCostsByStep[t in isDECISION_STEPS] = fcr[t];
+
+minimize
+  EnergyCost
+  + PenaltyCost
+  // + OldCost
+  + sum(t in isDECISION_STEPS) slack[t]
+  ;
+"""
+
+
+@pytest.fixture
+def model_file(tmp_path):
+    """Write a small OPL model with an input tuple, an output tuple and an objective function."""
+    model = tmp_path / "model.mod"
+    model.write_text(MODEL)
+    return str(model)
+
+
+@pytest.mark.unit
+class TestParseModel:
+    """Test the information read from the OPL models."""
+
+    def test_model_information(self, model_file):
+        """The datasheets, tuple members, variables, objective terms and cost definitions are read at once."""
+        info = oplmodel.parse_model(model_file)
+
+        assert info.model_name == "model"
+        assert info.input_fields == ["asset_steps"]
+        assert info.output_fields == ["costs"]
+        assert info.tuple_members["asset_steps"] == [
+            ("string", "asset_id"),
+            ("string", "step_id"),
+            ("float", "power_prediction"),
+        ]
+        assert info.used_columns("costs") == ["cost_name", "cost"]
+        assert info.objective_terms == ["EnergyCost", "PenaltyCost"]
+        assert info.dexpr_definitions["EnergyCost"] == (
+            "dexpr float EnergyCost = sum(t in isDECISION_STEPS) power[t] * price[t];"
+        )
+        assert info.dexpr_definitions["PenaltyCost"] == "dexpr float PenaltyCost=10 * violations;"
+        assert "TotalFCRNetworkCostsByStep" in info.dexpr_definitions
+        assert info.decision_variables == {
+            "IsCharging": ["[isE_STORAGES union isH_STORAGES]", "[isDECISION_STEPS]"],
+            "ImbalancePower": ["[isIMBALANCE_STEPS]"],
+        }
+
+    def test_missing_model(self, tmp_path):
+        """A missing model file is a model reference error."""
+        with pytest.raises(ModelReferenceError, match="Model file not found"):
+            oplmodel.load_model_info(str(tmp_path / "missing.mod"))
+
+    def test_serialisation(self, model_file):
+        """The model information is written to and read back from JSON unchanged."""
+        info = oplmodel.parse_model(model_file)
+        assert ModelInfo.from_dict(json.loads(json.dumps(info.to_dict()))) == info
+
+
+@pytest.mark.unit
+class TestLoadModelInfo:
+    """Test the model information parsed once per version of the model."""
+
+    @pytest.fixture
+    def parses(self, monkeypatch):
+        """Record the parsed model files."""
+        parsed = []
+        parse_model = oplmodel.parse_model
+
+        def counting_parse_model(model_file):
+            parsed.append(model_file)
+            return parse_model(model_file)
+
+        monkeypatch.setattr(oplmodel, "parse_model", counting_parse_model)
+        return parsed
+
+    def test_parsed_once(self, model_file, parses):
+        """The model is parsed again only when it is modified, the other processes read the on-disk cache."""
+        info = oplmodel.load_model_info(model_file)
+        assert oplmodel.load_model_info(model_file) is info
+        assert len(parses) == 1
+
+        default_registry().clear()  # As in a new process
+        assert oplmodel.load_model_info(model_file) == info
+        assert len(parses) == 1
+
+        with open(model_file, "a") as f:
+            f.write("// Modified\n")
+        stat = os.stat(model_file)
+        os.utime(model_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        oplmodel.load_model_info(model_file)
+        assert len(parses) == 2
+
+    def test_same_content_at_another_path(self, tmp_path, model_file, parses):
+        """A copy of a cached model is read from the cache with its own path."""
+        oplmodel.load_model_info(model_file)
+        copy = tmp_path / "copy" / "run.mod"
+        copy.parent.mkdir()
+        copy.write_text(MODEL)
+
+        info = oplmodel.load_model_info(str(copy))
+
+        assert len(parses) == 1
+        assert info.model_path == copy
+        assert info.model_name == "run"
+
+    def test_cache_disabled(self, tmp_path, model_file, parses, monkeypatch):
+        """Nothing is written on disk when the cache is disabled."""
+        monkeypatch.setenv("CACHE_MAX_SIZE_MB", "0")
+        oplmodel.load_model_info(model_file)
+        assert len(parses) == 1
+        assert not (tmp_path / "cache").exists()
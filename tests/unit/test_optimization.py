@@ -0,0 +1,318 @@
+"""Unit tests for the preparation of the local optimization runs."""
+
+import math
+import sys
+import threading
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from optim_analyser.errors import ConfigurationError, OptimizationFail, ValidationError
+from optim_analyser.optim import dataframes, optimization
+from optim_analyser.optim.runner import OplRunner
+
+
+@pytest.fixture
+def input_data():
+    """Input sheets with the columns of the model, in another order and with extra columns."""
+    return {
+        "OPERATION": pd.DataFrame({"param_id": ["operation_id", "name"], "param_val": ["12", 'Site "A"']}),
+        "ASSET_STEPS": pd.DataFrame(
+            {
+                "step_id": pd.Categorical(["1", "2"]),
+                "asset_id": ["BESS", "BESS"],
+                "power_prediction": [0.1, math.nan],
+                "availability": [1.0, 0.0],
+                "unused": ["x", "y"],
+            }
+        ),
+    }
+
+
+@pytest.mark.unit
+class TestTextDataFormat:
+    """Test the local runs exchanging the data with OPL through the .dat file and CSV files."""
+
+    def test_input_data_written_in_dat_file(self, tmp_path, model_file, input_data):
+        """The input tuples are written as typed literals in the .dat file, and no Excel file is written."""
+        excel_output_path = str(tmp_path / "Data" / "out.xlsx")
+        written = optimization.prepare_optimization(
+            input_data,
+            model_file,
+            str(tmp_path / "run.mod"),
+            excel_input_path=str(tmp_path / "Data" / "in.xlsx"),
+            dat_path=str(tmp_path / "run.dat"),
+            excel_output_path=excel_output_path,
+            add_costs=False,
+            data_format=optimization.DATA_FORMAT_TEXT,
+        )
+
+        assert written["ASSET_STEPS"].columns.tolist() == ["asset_id", "step_id", "availability", "power_prediction"]
+        assert not list(tmp_path.rglob("*.xlsx"))
+        dat = (tmp_path / "run.dat").read_text()
+        assert 'OPERATION = {\n<"operation_id", "12">,\n<"name", "Site \\"A\\"">\n};' in dat
+        assert 'ASSET_STEPS = {\n<"BESS", "1", 1, 0.1>,\n<"BESS", "2", 0, 0.0>\n};' in dat
+        output_folder = optimization.text_output_folder(excel_output_path).replace("\\", "/")
+        assert f'textOutputFolder = "{output_folder}";' in dat
+        assert (tmp_path / "Data" / "out").is_dir()
+
+        model = (tmp_path / "run.mod").read_text()
+        assert model.startswith(Path(model_file).read_text())
+        assert "string textOutputFolder = ...;" in model
+        assert 'new IloOplOutputFile(textOutputFolder + "/OPERATION_OUTPUT.csv")' in model
+        assert (
+            'for (var t in OPERATION_OUTPUT) file.writeln(csvValue(t.param_id), ",", csvValue(t.param_val));' in model
+        )
+
+    def test_output_data_read_from_csv_files(self, tmp_path):
+        """The CSV files are read up to the first empty header name, like the output Excel files."""
+        (tmp_path / "OPERATION_OUTPUT.csv").write_text(
+            '"param_id","param_val","",""\n"optimiser_objective_value","12.5"\n"status","Dispatch ""found"""\n'
+        )
+        (tmp_path / "VIOLATIONS_OUTPUT.csv").write_text('"violation_type","asset_id",""\n')
+
+        output_data = dataframes.text_output_to_dataframe(str(tmp_path))
+
+        assert list(output_data) == ["OPERATION_OUTPUT", "VIOLATIONS_OUTPUT"]
+        pd.testing.assert_frame_equal(
+            output_data["OPERATION_OUTPUT"],
+            pd.DataFrame(
+                {"param_id": ["optimiser_objective_value", "status"], "param_val": ["12.5", 'Dispatch "found"']}
+            ),
+        )
+        assert output_data["VIOLATIONS_OUTPUT"].columns.tolist() == ["violation_type", "asset_id"]
+        assert output_data["VIOLATIONS_OUTPUT"].empty
+
+    def test_unknown_data_format(self, tmp_path, model_file, input_data):
+        """Only the Excel and text data formats are accepted."""
+        with pytest.raises(ValidationError, match="Unknown data format"):
+            optimization.prepare_optimization(
+                input_data,
+                model_file,
+                str(tmp_path / "run.mod"),
+                excel_input_path=str(tmp_path / "in.xlsx"),
+                dat_path=str(tmp_path / "run.dat"),
+                excel_output_path=str(tmp_path / "out.xlsx"),
+                data_format="json",
+            )
+
+
+@pytest.mark.unit
+class TestModelFilesCache:
+    """Test the OPL models of the runs generated once and placed from the cache."""
+
+    @pytest.fixture
+    def writes(self, monkeypatch):
+        """Record the generations of the model files."""
+        written = []
+        write_model_files = optimization.write_model_files
+
+        def counting_write_model_files(*args):
+            written.append(args[1])
+            write_model_files(*args)
+
+        monkeypatch.setattr(optimization, "write_model_files", counting_write_model_files)
+        return written
+
+    def prepare(self, model_file, run_folder):
+        """Place the model of a run with the text data format in the run folder."""
+        run_folder.mkdir(exist_ok=True)
+        run_model = run_folder / "run.mod"
+        optimization.prepare_model_files(model_file, str(run_model), add_costs=False, data_format="text")
+        return run_model
+
+    def test_model_generated_once(self, tmp_path, model_file, writes, monkeypatch):
+        """The next runs link the generated model from the cache, the model is not read again."""
+        first = self.prepare(model_file, tmp_path / "run1")
+        second = self.prepare(model_file, tmp_path / "run2")
+
+        assert len(writes) == 1
+        assert second.read_text() == first.read_text()
+        assert "execute WRITE_TEXT_OUTPUT" in second.read_text()
+        if sys.platform != "win32":
+            assert second.stat().st_ino == first.stat().st_ino
+
+        monkeypatch.setenv("CACHE_MAX_SIZE_MB", "0")
+        uncached = self.prepare(model_file, tmp_path / "uncached")
+        assert uncached.read_text() == first.read_text()
+
+    def test_modified_link_not_reused(self, tmp_path, model_file, writes):
+        """A run model modified in place through its link is generated again for the next runs."""
+        run_model = self.prepare(model_file, tmp_path / "run1")
+        with open(run_model, "a") as f:
+            f.write("// Modified by hand\n")
+
+        run_model = self.prepare(model_file, tmp_path / "run2")
+
+        assert len(writes) == 2
+        assert "Modified by hand" not in run_model.read_text()
+
+    def test_modified_model_generated_again(self, tmp_path, model_file, writes):
+        """A new version of the original model gets new run models."""
+        self.prepare(model_file, tmp_path / "run")
+        with open(model_file, "a") as f:
+            f.write("// New version\n")
+
+        run_model = self.prepare(model_file, tmp_path / "run")
+
+        assert len(writes) == 2
+        assert "// New version" in run_model.read_text()
+
+
+@pytest.fixture
+def fake_oplrun(tmp_path):
+    """Return a function writing a Python script run in place of the OPL model, with the .dat file as argument."""
+
+    def write(code):
+        script = tmp_path / "fake_model.py"
+        script.write_text("import sys, time\n" + code)
+        return str(script)
+
+    return write
+
+
+@pytest.mark.unit
+class TestOplRunner:
+    """Test the local runs of oplrun, here replaced by the Python interpreter."""
+
+    def runner(self, lines, **kwargs):
+        return OplRunner(executable=sys.executable, on_output=lines.append, poll_interval=0.01, **kwargs)
+
+    def test_output_streamed_and_outputs_awaited(self, tmp_path, fake_oplrun):
+        """The output lines are streamed, and the run ends once the output files are written."""
+        output_file = tmp_path / "out.xlsx"
+        output_folder = tmp_path / "out"
+        output_folder.mkdir()
+        model = fake_oplrun(
+            "print('Solution found', flush=True)\n"
+            f"open({str(output_file)!r}, 'w').write(sys.argv[1])\n"
+            f"open({str(output_folder / 'OPERATION_OUTPUT.csv')!r}, 'w').write('param_id')\n"
+        )
+        lines = []
+
+        result = self.runner(lines, output_stable_seconds=0.05).run(
+            model, "run.dat", output_files=[str(output_file), str(output_folder)]
+        )
+
+        assert result.return_code == 0
+        assert result.command == [sys.executable, model, "run.dat"]
+        assert [line.rstrip() for line in result.output] == ["Solution found"]
+        assert "Solution found" in lines
+        assert output_file.read_text() == "run.dat"
+
+    def test_solve_metrics_streamed(self, fake_oplrun):
+        """The CPLEX log is read while it is streamed, with the time of the lines."""
+        model = fake_oplrun(
+            "print('Reduced MIP has 120 rows, 80 columns, and 400 nonzeros.', flush=True)\n"
+            "print('*     0+    0                         2175.0000      853.4000            60.76%', flush=True)\n"
+            "time.sleep(0.2)\n"
+            "print('    100    45      902.1000    12     1002.0000      950.0000     5124    5.19%', flush=True)\n"
+        )
+
+        metrics = self.runner([]).run(model, "run.dat").metrics
+
+        assert (metrics.presolve_rows, metrics.node_count, metrics.gap_percent) == (120, 100, 5.19)
+        first, last = metrics.progress
+        assert 0.2 <= last.seconds - first.seconds < metrics.elapsed_seconds
+        if sys.platform == "linux":
+            assert metrics.peak_memory_mb > 0
+
+    def test_failed_run(self, fake_oplrun):
+        """A nonzero exit code fails the run with the last output lines."""
+        model = fake_oplrun("print('OPL error: syntax error')\nsys.exit(2)\n")
+
+        with pytest.raises(OptimizationFail, match="exited with code 2") as error:
+            self.runner([]).run(model, "run.dat")
+
+        assert error.value.error_code == "OPL_FAILED"
+        assert error.value.context["output"] == ["OPL error: syntax error"]
+
+    def test_timeout(self, fake_oplrun):
+        """The process is stopped when it runs longer than the timeout."""
+        model = fake_oplrun("time.sleep(30)\n")
+
+        with pytest.raises(OptimizationFail) as error:
+            self.runner([], timeout=0.2).run(model, "run.dat")
+
+        assert error.value.error_code == "OPL_TIMEOUT"
+
+    def test_cancel(self, fake_oplrun):
+        """The run can be cancelled from another thread."""
+        model = fake_oplrun("print('started', flush=True)\ntime.sleep(30)\n")
+        lines = []
+        runner = self.runner(lines)
+        timer = threading.Timer(0.3, runner.cancel)
+        timer.start()
+
+        with pytest.raises(OptimizationFail) as error:
+            runner.run(model, "run.dat")
+
+        timer.cancel()
+        assert error.value.error_code == "OPL_CANCELLED"
+
+    def test_output_file_not_written(self, tmp_path, fake_oplrun):
+        """The run fails if an output file does not exist after the output timeout."""
+        model = fake_oplrun("pass\n")
+
+        with pytest.raises(OptimizationFail) as error:
+            self.runner([], output_timeout=0.1).run(model, "run.dat", output_files=[str(tmp_path / "missing.xlsx")])
+
+        assert error.value.error_code == "OPL_OUTPUT_NOT_WRITTEN"
+
+    def test_missing_oplrun(self):
+        """A missing oplrun executable is a configuration error."""
+        with pytest.raises(ConfigurationError) as error:
+            OplRunner(executable="oplrun-not-installed", on_output=None).run("model.mod", "model.dat")
+
+        assert error.value.error_code == "MISSING_DEPENDENCY"
+
+
+@pytest.mark.unit
+class TestPreparedFilesStages:
+    """Test the files of a replay not written again when they are up to date."""
+
+    @pytest.fixture
+    def writes(self, monkeypatch):
+        """Record the writings of the input Excel file and of the .dat file."""
+        written = []
+        for name in ("prepare_excel_input", "create_dat_file", "create_text_dat_file"):
+            write = getattr(optimization, name)
+
+            def counting_write(*args, name=name, write=write, **kwargs):
+                written.append(name)
+                write(*args, **kwargs)
+
+            monkeypatch.setattr(optimization, name, counting_write)
+        return written
+
+    def prepare(self, tmp_path, model_file, input_data, data_format):
+        """Prepare a run of the model in the tmp_path folder."""
+        return optimization.prepare_optimization(
+            input_data,
+            model_file,
+            str(tmp_path / "run.mod"),
+            excel_input_path=str(tmp_path / "Data" / "in.xlsx"),
+            dat_path=str(tmp_path / "run.dat"),
+            excel_output_path=str(tmp_path / "Data" / "out.xlsx"),
+            add_costs=False,
+            data_format=data_format,
+        )
+
+    @pytest.mark.parametrize(
+        "data_format, data_file_writes",
+        [
+            (optimization.DATA_FORMAT_EXCEL, ["prepare_excel_input", "create_dat_file"]),
+            (optimization.DATA_FORMAT_TEXT, ["create_text_dat_file"]),
+        ],
+    )
+    def test_same_replay_written_once(self, tmp_path, model_file, input_data, writes, data_format, data_file_writes):
+        """The same replay does not write its files again, new input values only write the file with the values."""
+        (tmp_path / "Data").mkdir()
+        self.prepare(tmp_path, model_file, input_data, data_format)
+        self.prepare(tmp_path, model_file, input_data, data_format)
+
+        assert writes == data_file_writes
+        input_data["ASSET_STEPS"].loc[0, "availability"] = 0.0
+        self.prepare(tmp_path, model_file, input_data, data_format)
+        assert writes == data_file_writes + data_file_writes[:1]
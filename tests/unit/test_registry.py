@@ -0,0 +1,127 @@
+"""Unit tests for the registry of the configuration workbooks."""
+
+import os
+
+import pandas as pd
+import pytest
+
+from optim_analyser.errors import ModelReferenceError
+from optim_analyser.optim import path
+from optim_analyser.optim.registry import Deployments, FileRegistry, PlotParams
+
+
+@pytest.fixture
+def config_workbooks(tmp_path, monkeypatch):
+    """Write small plot_param.xlsx and deployment_list.xlsx files and use them in path."""
+    plot_param_path = tmp_path / "plot_param.xlsx"
+    pd.DataFrame(
+        {
+            "Microgrids ref": [-1, 1100, 1133],
+            "microgrid_name": ["default", "Site_A", "Site_B"],
+            "convention": [1, 1, -1],
+        }
+    ).to_excel(plot_param_path, sheet_name="PLOT_PARAM", index=False)
+
+    deployment_list_path = tmp_path / "deployment_list.xlsx"
+    with pd.ExcelWriter(deployment_list_path) as writer:
+        pd.DataFrame(
+            {"Operation ref": [None, 1100.0, 1133.0, 1133.0, 1200.0], "Model Id": [None, 2, 3, 4, 9]}
+        ).to_excel(writer, sheet_name="DEPLOYMENTS_PROD", index=False)
+        pd.DataFrame(
+            {"Model ID": [2, "3", 4], "Sharepoint file": ["model_2.mod", "model_3.mod", "model_4.mod"]}
+        ).to_excel(writer, sheet_name="MODELS", index=False)
+
+    monkeypatch.setattr(path, "excel_plot_param_path", str(plot_param_path))
+    monkeypatch.setattr(path, "excel_deployment_list_path", str(deployment_list_path))
+    monkeypatch.setattr(path, "model_folder", str(tmp_path / "models"))
+    return plot_param_path, deployment_list_path
+
+
+@pytest.mark.unit
+class TestFileRegistry:
+    """Test the objects loaded once per version of their file."""
+
+    def test_loaded_once_until_modified(self, tmp_path):
+        """The file is loaded again only when its modification time or size changes."""
+        file = tmp_path / "config.txt"
+        file.write_text("v1")
+        registry = FileRegistry()
+        loads = []
+
+        def loader(file_path):
+            loads.append(file_path)
+            return open(file_path).read()
+
+        assert registry.get(str(file), "text", loader) == "v1"
+        assert registry.get(str(file), "text", loader) == "v1"
+        assert len(loads) == 1
+
+        file.write_text("v2!")
+        stat = file.stat()
+        os.utime(file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        assert registry.get(str(file), "text", loader) == "v2!"
+        assert len(loads) == 2
+
+        registry.get(str(file), "length", lambda file_path: len(open(file_path).read()))
+        assert len(loads) == 2
+
+    def test_clear(self, tmp_path):
+        """The cleared objects are loaded again."""
+        file = tmp_path / "config.txt"
+        file.write_text("v1")
+        registry = FileRegistry()
+        loads = []
+        registry.get(str(file), "text", loads.append)
+        registry.clear()
+        registry.get(str(file), "text", loads.append)
+        assert len(loads) == 2
+
+
+@pytest.mark.unit
+class TestConfigLookups:
+    """Test the lookups of the plotting parameters and models by operation ID."""
+
+    def test_plot_params(self, config_workbooks):
+        """The operations without specific parameters get the default parameters."""
+        plot_params = path.get_plot_params()
+
+        assert isinstance(plot_params, PlotParams)
+        assert path.get_microgrid_param("1133")["convention"] == -1
+        assert path.get_microgrid_param("999")["microgrid_name"] == "default"
+        assert path.microgrid_name_date("1100", "2025-01-10 08:15:02.123") == ("Site_A", "Site_A_2025-01-10_081502")
+        assert path.microgrid_name_date("999", "2025-01-10 08:15:02")[0] == "microgrid_name_not_found"
+
+    def test_returned_parameters_are_copies(self, config_workbooks):
+        """Modifying the returned parameters does not modify the registry."""
+        path.get_microgrid_param("1100")["convention"] = 5
+        assert path.get_microgrid_param("1100")["convention"] == 1
+
+    def test_model_path(self, config_workbooks):
+        """The model IDs read as numbers or text find their model file."""
+        assert isinstance(path.get_deployments(), Deployments)
+        assert path.get_model_path("1100") == os.path.join(path.model_folder, "model_2.mod")
+
+    @pytest.mark.parametrize(
+        "operation_id, message",
+        [("1", "not found in sheet DEPLOYMENTS_PROD"), ("1133", "multiple Model IDs"), ("1200", "Model ID 9")],
+    )
+    def test_model_reference_errors(self, config_workbooks, operation_id, message):
+        """The operations that are not deployed, or deployed with several or unknown models, are errors."""
+        with pytest.raises(ModelReferenceError, match=message):
+            path.get_model_path(operation_id)
+
+    def test_workbook_read_once(self, config_workbooks, monkeypatch):
+        """The lookups of several operations read the workbook once."""
+        reads = []
+        read_excel = path.excel.read_excel
+
+        def counting_read_excel(*args, **kwargs):
+            reads.append(args[0])
+            return read_excel(*args, **kwargs)
+
+        monkeypatch.setattr(path.excel, "read_excel", counting_read_excel)
+        for operation_id in ["1100", "1133", "999", "1100"]:
+            path.get_microgrid_param(operation_id)
+        path.get_model_path("1100")
+
+        assert sorted(reads) == sorted(map(str, config_workbooks))
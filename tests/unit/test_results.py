@@ -0,0 +1,101 @@
+"""Unit tests for the cache of the optimization results."""
+
+import pandas as pd
+import pytest
+
+from optim_analyser.models import OplRunResult
+from optim_analyser.optim import replay, results
+
+INPUT_DATA = {
+    "OPERATION": pd.DataFrame({"param_id": ["operation_id"], "param_val": ["12"]}),
+    "ASSET_STEPS": pd.DataFrame({"asset_id": ["BESS", "BESS"], "power_prediction": [0.1, float("nan")]}),
+}
+OUTPUT_DATA = {"OPERATION_OUTPUT": pd.DataFrame({"param_id": ["optimiser_objective_value"], "param_val": [12.5]})}
+
+
+@pytest.fixture
+def run_model(tmp_path):
+    """Write the OPL model of a run."""
+    model = tmp_path / "run.mod"
+    model.write_text("minimize\n  cost;\n")
+    return str(model)
+
+
+@pytest.fixture
+def runs(monkeypatch):
+    """Replace the runs of oplrun by the output data, and record them."""
+    run_models = []
+
+    def run_and_read_output(model_path, dat_path, excel_output_path, data_format):
+        run_models.append(model_path)
+        return OUTPUT_DATA, OplRunResult(["oplrun", model_path, dat_path], 0, 2.0)
+
+    monkeypatch.setattr(replay, "_run_and_read_output", run_and_read_output)
+    return run_models
+
+
+@pytest.mark.unit
+class TestResultKey:
+    """Test the keys of the optimization problems."""
+
+    def test_same_values_same_key(self, run_model):
+        """The key depends on the values, not on how the text columns are stored."""
+        categorical = {name: frame.copy() for name, frame in INPUT_DATA.items()}
+        categorical["ASSET_STEPS"]["asset_id"] = categorical["ASSET_STEPS"]["asset_id"].astype("category")
+
+        assert results.result_key(run_model, categorical) == results.result_key(run_model, INPUT_DATA)
+
+    def test_different_problems_different_keys(self, tmp_path, run_model):
+        """The input values, the column order, the model and the backend change the key."""
+        key = results.result_key(run_model, INPUT_DATA)
+        modified = INPUT_DATA | {"OPERATION": pd.DataFrame({"param_id": ["operation_id"], "param_val": ["13"]})}
+        reordered = INPUT_DATA | {"ASSET_STEPS": INPUT_DATA["ASSET_STEPS"][["power_prediction", "asset_id"]]}
+        other_model = tmp_path / "other.mod"
+        other_model.write_text("maximize\n  revenue;\n")
+
+        assert results.result_key(run_model, modified) != key
+        assert results.result_key(run_model, reordered) != key
+        assert results.result_key(str(other_model), INPUT_DATA) != key
+        assert results.result_key(run_model, INPUT_DATA, backend=results.DISTANT) != key
+
+
+@pytest.mark.unit
+class TestReplayResultCache:
+    """Test the replays returning the stored results of the same problem."""
+
+    def replay(self, run_model, tmp_path, **kwargs):
+        """Replay the problem of the input data with the run model."""
+        data = OUTPUT_DATA | INPUT_DATA
+        return replay.replay_optimization(
+            run_model, str(tmp_path / "run.dat"), data, str(tmp_path / "out.xlsx"), input_data=INPUT_DATA, **kwargs
+        )
+
+    def test_second_replay_from_cache(self, tmp_path, run_model, runs):
+        """The second replay of the same problem returns the stored output data without running oplrun."""
+        stats = results.result_stats()
+
+        self.replay(run_model, tmp_path)
+        output_data = self.replay(run_model, tmp_path)
+
+        assert len(runs) == 1
+        pd.testing.assert_frame_equal(output_data["OPERATION_OUTPUT"], OUTPUT_DATA["OPERATION_OUTPUT"])
+        new_stats = results.result_stats()
+        assert (new_stats.hits, new_stats.misses, new_stats.stored) == (
+            stats.hits + 1,
+            stats.misses + 1,
+            stats.stored + 1,
+        )
+
+    def test_no_cache(self, tmp_path, run_model, runs):
+        """The optimization is run again when the cache is not used."""
+        self.replay(run_model, tmp_path)
+        self.replay(run_model, tmp_path, use_cache=False)
+        assert len(runs) == 2
+
+    def test_cache_disabled(self, tmp_path, run_model, runs, monkeypatch):
+        """Nothing is stored when the on-disk cache is disabled."""
+        monkeypatch.setenv("CACHE_MAX_SIZE_MB", "0")
+        self.replay(run_model, tmp_path)
+        self.replay(run_model, tmp_path)
+        assert len(runs) == 2
+        assert not (tmp_path / "cache").exists()
@@ -0,0 +1,203 @@
+"""Unit tests for the parallel local runs of the scenarios."""
+
+import stat
+import sys
+
+import pandas as pd
+import pytest
+
+from optim_analyser.errors import ValidationError
+from optim_analyser.optim import optimization, results, scenarios
+
+# Fake oplrun: waits for the other runs to start, then writes the threads setting of the model in the output file
+FAKE_OPLRUN = f"""#!{sys.executable}
+import pathlib, sys, time
+model, dat = map(pathlib.Path, sys.argv[1:3])
+started = pathlib.Path(sys.argv[0]).parent / "started"
+started.mkdir(exist_ok=True)
+(started / dat.parent.name).touch()
+deadline = time.time() + 10
+while len(list(started.iterdir())) < int(model.read_text().split("wait ")[1].split()[0]):
+    if time.time() > deadline:
+        sys.exit(3)
+    time.sleep(0.01)
+threads = [line.strip() for line in model.read_text().splitlines() if "cplex.threads" in line]
+for output in (dat.parent / "Data").glob("out_prob_*"):
+    output.write_text(" ".join(threads) or "model threads")
+"""
+
+
+@pytest.fixture
+def scenario_folder(tmp_path):
+    """Create a run folder with its model and .dat file, and three scenarios."""
+    run_folder = tmp_path / "optim" / "run_cplex"
+    run_folder.mkdir(parents=True)
+    (run_folder / "model.mod").write_text("// wait 1\nminimize\n  cost;\n")
+    (run_folder / "site.dat").write_text('SheetConnection inputSheet("Data/in_prob_site.xlsx");\n')
+    excel_folder = tmp_path / "scenarios"
+    for sc_name in ["sc1", "sc2", "sc3"]:
+        (excel_folder / sc_name).mkdir(parents=True)
+        (excel_folder / sc_name / "in_prob_site.xlsx").write_text(f"{sc_name} input")
+        (excel_folder / sc_name / "out_prob_site.xlsx").write_text("")
+    return run_folder, excel_folder
+
+
+@pytest.fixture
+def fake_oplrun(tmp_path, monkeypatch):
+    """Use the fake oplrun for the runs, without the result cache as the fake Excel files cannot be read."""
+    script = tmp_path / "bin" / "oplrun"
+    script.parent.mkdir()
+    script.write_text(FAKE_OPLRUN)
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv("OPLRUN", str(script))
+    monkeypatch.setenv("CACHE_MAX_SIZE_MB", "0")
+    return script
+
+
+@pytest.mark.unit
+@pytest.mark.skipif(sys.platform == "win32", reason="The fake oplrun is an executable script")
+class TestRunScenarios:
+    """Test the scenarios run at once in their own working directories."""
+
+    def test_scenarios_run_in_parallel_in_place(self, scenario_folder, fake_oplrun):
+        """Simultaneous runs share the processors, and the recomputed files replace the scenario files."""
+        run_folder, excel_folder = scenario_folder
+        (run_folder / "model.mod").write_text("// wait 3\nminimize\n  cost;\n")
+        results = []
+
+        report = scenarios.run_scenarios(
+            str(run_folder / "model.mod"),
+            str(run_folder / "site.dat"),
+            str(excel_folder),
+            ["sc1", "sc2", "sc3"],
+            in_place=True,
+            jobs=3,
+            threads=2,
+            on_result=lambda sc_name, error: results.append((sc_name, error)),
+        )
+
+        assert report.failed == {}
+        assert sorted(report.completed) == ["sc1", "sc2", "sc3"]
+        assert sorted(results) == [("sc1", ""), ("sc2", ""), ("sc3", "")]
+        for sc_name in ["sc1", "sc2", "sc3"]:
+            assert (excel_folder / sc_name / "out_prob_site.xlsx").read_text() == "cplex.threads = 2;"
+            assert (excel_folder / sc_name / "in_prob_site.xlsx").read_text() == f"{sc_name} input"
+        assert not list((run_folder / scenarios.WORKDIRS_FOLDER).iterdir())
+        assert "cplex.threads" not in (run_folder / "model.mod").read_text()
+
+    def test_scenarios_collected_in_run_folders(self, scenario_folder, fake_oplrun):
+        """Without in place, the files are moved to a folder per scenario next to the run folder."""
+        run_folder, excel_folder = scenario_folder
+
+        report = scenarios.run_scenarios(
+            str(run_folder / "model.mod"), str(run_folder / "site.dat"), str(excel_folder), ["sc2"], in_place=False
+        )
+
+        assert report.completed == ["sc2"]
+        assert (run_folder.parent / "sc2" / "out_prob_site.xlsx").read_text() == "model threads"
+        assert (run_folder.parent / "sc2" / "in_prob_site.xlsx").exists()
+        assert (excel_folder / "sc2" / "out_prob_site.xlsx").read_text() == ""
+
+    def test_failed_scenario_does_not_stop_the_others(self, scenario_folder, fake_oplrun):
+        """A failed scenario is reported once the other scenarios are run."""
+        run_folder, excel_folder = scenario_folder
+        (excel_folder / "sc2" / "in_prob_site.xlsx").unlink()
+
+        report = scenarios.run_scenarios(
+            str(run_folder / "model.mod"),
+            str(run_folder / "site.dat"),
+            str(excel_folder),
+            ["sc1", "sc2", "sc3"],
+            in_place=True,
+            jobs=2,
+        )
+
+        assert sorted(report.completed) == ["sc1", "sc3"]
+        assert list(report.failed) == ["sc2"]
+        assert "in_prob_" in report.failed["sc2"]
+
+    def test_invalid_jobs(self, scenario_folder):
+        """The number of processes must be positive."""
+        run_folder, excel_folder = scenario_folder
+        with pytest.raises(ValidationError):
+            scenarios.run_scenarios(
+                str(run_folder / "model.mod"), str(run_folder / "site.dat"), str(excel_folder), ["sc1"], True, jobs=0
+            )
+
+
+@pytest.mark.unit
+@pytest.mark.skipif(sys.platform == "win32", reason="The fake oplrun is an executable script")
+class TestScenarioResultCache:
+    """Test the scenarios whose results are found in the result cache."""
+
+    @pytest.fixture
+    def excel_scenario(self, scenario_folder, tmp_path, monkeypatch):
+        """Make the input file of the first scenario an Excel file, and fail the runs of oplrun."""
+        run_folder, excel_folder = scenario_folder
+        excel_input_path = excel_folder / "sc1" / "in_prob_site.xlsx"
+        pd.DataFrame({"param_id": ["name"], "param_val": ["Site"]}).to_excel(
+            excel_input_path, sheet_name="OPERATION", index=False
+        )
+        monkeypatch.setenv("OPLRUN", str(tmp_path / "missing_oplrun"))
+        return run_folder, excel_folder, excel_input_path
+
+    def test_cached_results_written(self, excel_scenario):
+        """The output file is written from the stored results without running oplrun."""
+        run_folder, excel_folder, excel_input_path = excel_scenario
+        output = pd.DataFrame({"param_id": ["status"], "param_val": ["Dispatch found"]})
+        key = results.excel_result_key(str(run_folder / "model.mod"), str(excel_input_path))
+        results.store_result(key, {"OPERATION_OUTPUT": output})
+        hits = results.result_stats().hits
+
+        report = scenarios.run_scenarios(
+            str(run_folder / "model.mod"), str(run_folder / "site.dat"), str(excel_folder), ["sc1"], in_place=False
+        )
+
+        assert report.completed == report.cached == ["sc1"]
+        assert results.result_stats().hits == hits + 1
+        written = pd.read_excel(run_folder.parent / "sc1" / "out_prob_site.xlsx", sheet_name=None)
+        pd.testing.assert_frame_equal(written["OPERATION_OUTPUT"], output, check_dtype=False)
+        assert (run_folder.parent / "sc1" / "in_prob_site.xlsx").exists()
+
+    def test_no_cache(self, excel_scenario):
+        """The scenarios are run when the result cache is not used."""
+        run_folder, excel_folder, excel_input_path = excel_scenario
+        key = results.excel_result_key(str(run_folder / "model.mod"), str(excel_input_path))
+        results.store_result(key, {"OPERATION_OUTPUT": pd.DataFrame({"param_id": ["name"]})})
+
+        report = scenarios.run_scenarios(
+            str(run_folder / "model.mod"),
+            str(run_folder / "site.dat"),
+            str(excel_folder),
+            ["sc1"],
+            in_place=True,
+            use_cache=False,
+        )
+
+        assert list(report.failed) == ["sc1"]
+        assert "not found" in report.failed["sc1"]
+
+
+@pytest.mark.unit
+class TestCplexParameters:
+    """Test the CPLEX parameters set in the OPL models."""
+
+    def test_parameters_set_before_objective(self, tmp_path):
+        """The parameters are set in a preprocessing block, after the parameters of the model."""
+        model = tmp_path / "model.mod"
+        model.write_text("execute CPX_PARAM {\n\tcplex.threads = 8;\n}\n// minimize\nminimize\n  cost;\n")
+
+        optimization.add_cplex_parameters(str(model), {"threads": 2, "epgap": 0.001})
+
+        assert model.read_text() == (
+            "execute CPX_PARAM {\n\tcplex.threads = 8;\n}\n// minimize\n"
+            "execute CPX_PARAM_OVERRIDES {\n\tcplex.threads = 2;\n\tcplex.epgap = 0.001;\n}\n\n"
+            "minimize\n  cost;\n"
+        )
+
+    def test_thread_budget_shared_between_jobs(self, monkeypatch):
+        """The processors are shared between the simultaneous runs, a single run keeps the model setting."""
+        monkeypatch.setattr(scenarios.os, "cpu_count", lambda: 32)
+        assert scenarios.default_threads(1) is None
+        assert scenarios.default_threads(4) == 8
+        assert scenarios.default_threads(64) == 1
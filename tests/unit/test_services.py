@@ -3,6 +3,7 @@
 Tests the DisplayService, ReplayService, and ComparisonService classes.
 """
 
+import os
 from pathlib import Path
 from unittest.mock import MagicMock, Mock, patch
 
@@ -10,7 +11,8 @@ import pytest
 
 from optim_analyser.analysis.services import ComparisonService, DisplayService, ReplayService
 from optim_analyser.errors import DataError, IBMJobError, OptimizationFail, VisualizationError
-from optim_analyser.models import ComparisonResult, JobStatus, VisualizationResult
+from optim_analyser.models import ComparisonResult, JobStatus, JobSummary, SolveMetrics, VisualizationResult
+from optim_analyser.optim import path, solvelog
 
 
 class TestDisplayService:
@@ -21,13 +23,13 @@ class TestDisplayService:
         service = DisplayService()
         assert service is not None
 
-    @patch("optim_analyser.analysis.services.display_service.dataframes")
+    @patch("optim_analyser.analysis.services.display_service.JobBundle")
     @patch("optim_analyser.analysis.services.display_service.path")
     @patch("optim_analyser.analysis.services.display_service.display")
-    def test_display_from_json_success(self, mock_display, mock_path, mock_dataframes):
+    def test_display_from_json_success(self, mock_display, mock_path, mock_bundle):
         """display_from_json returns VisualizationResult on success."""
         # Arrange
-        mock_dataframes.json_to_dataframe.return_value = {"data": "test"}
+        mock_bundle.from_json.return_value.dataframes = {"data": "test"}
         # Return 4 values: excel, json, html, param
         mock_path.get_display_paths_and_param_json.return_value = (
             "excel_path",
@@ -46,11 +48,11 @@ class TestDisplayService:
         assert result.html_path == Path("html_path")
         mock_display.plot_from_data.assert_called_once()
 
-    @patch("optim_analyser.analysis.services.display_service.dataframes")
-    def test_display_from_json_file_not_found(self, mock_dataframes):
+    @patch("optim_analyser.analysis.services.display_service.JobBundle")
+    def test_display_from_json_file_not_found(self, mock_bundle):
         """display_from_json raises DataError when file not found."""
         # Arrange
-        mock_dataframes.json_to_dataframe.side_effect = FileNotFoundError("Not found")
+        mock_bundle.from_json.side_effect = FileNotFoundError("Not found")
         service = DisplayService()
 
         # Act & Assert
@@ -69,15 +71,15 @@ class TestReplayService:
         service = ReplayService()
         assert service is not None
 
-    @patch("optim_analyser.analysis.services.replay_service.dataframes")
+    @patch("optim_analyser.analysis.services.replay_service.JobBundle")
     @patch("optim_analyser.analysis.services.replay_service.path")
     @patch("optim_analyser.analysis.services.replay_service.optimization")
     @patch("optim_analyser.analysis.services.replay_service.replay")
     @patch("optim_analyser.analysis.services.replay_service.display")
-    def test_replay_local_success(self, mock_display, mock_replay, mock_opt, mock_path, mock_df):
+    def test_replay_local_success(self, mock_display, mock_replay, mock_opt, mock_path, mock_bundle):
         """replay_local returns VisualizationResult on success."""
         # Arrange
-        mock_df.json_to_dataframe.return_value = {"data": "test"}
+        mock_bundle.from_json.return_value.dataframes = {"data": "test"}
         mock_path.get_run_paths_and_param_json.return_value = (
             "excel_init",
             "excel_input",
@@ -101,12 +103,17 @@ class TestReplayService:
         assert isinstance(result, VisualizationResult)
         mock_opt.prepare_optimization.assert_called_once()
         mock_replay.replay_optimization.assert_called_once()
-
-    @patch("optim_analyser.analysis.services.replay_service.dataframes")
-    def test_replay_local_failure(self, mock_dataframes):
+        # The written input data and the recomputed output data are displayed without reading the workbooks again
+        mock_display.plot_from_input_output_data.assert_called_once()
+        input_data, output_data = mock_display.plot_from_input_output_data.call_args.args
+        assert input_data is mock_opt.prepare_optimization.return_value
+        assert output_data is mock_replay.replay_optimization.return_value
+
+    @patch("optim_analyser.analysis.services.replay_service.JobBundle")
+    def test_replay_local_failure(self, mock_bundle):
         """replay_local raises OptimizationFail on error."""
         # Arrange
-        mock_dataframes.json_to_dataframe.side_effect = Exception("CPLEX error")
+        mock_bundle.from_json.side_effect = Exception("CPLEX error")
         service = ReplayService()
 
         # Act & Assert
@@ -116,11 +123,11 @@ class TestReplayService:
         assert "Local replay failed" in str(exc_info.value)
         assert exc_info.value.error_code == "REPLAY_LOCAL_FAILED"
 
-    @patch("optim_analyser.analysis.services.replay_service.dataframes")
-    def test_replay_remote_failure(self, mock_dataframes):
+    @patch("optim_analyser.analysis.services.replay_service.JobBundle")
+    def test_replay_remote_failure(self, mock_bundle):
         """replay_remote raises IBMJobError on error."""
         # Arrange
-        mock_dataframes.json_to_dataframe.side_effect = Exception("IBM error")
+        mock_bundle.from_json.side_effect = Exception("IBM error")
         service = ReplayService()
         ibm_props = {"SPACE_ID": "test-space"}
 
@@ -140,14 +147,19 @@ class TestComparisonService:
         service = ComparisonService()
         assert service is not None
 
-    @patch("optim_analyser.analysis.services.comparison_service.os.listdir")
+    @patch("optim_analyser.analysis.services.comparison_service.dataframes")
     @patch("optim_analyser.analysis.services.comparison_service.path")
     @patch("optim_analyser.analysis.services.comparison_service.compare")
-    def test_compare_jobs_from_folder_success(self, mock_compare, mock_path, mock_listdir):
+    def test_compare_jobs_from_folder_success(self, mock_compare, mock_path, mock_dataframes):
         """compare_jobs_from_folder returns ComparisonResult."""
         # Arrange
-        mock_listdir.return_value = ["job1.json", "job2.json", "readme.txt"]
+        mock_dataframes.probe_job_folder.return_value = [
+            JobSummary(source_path=Path("jobs/job1.json"), operation_id="1"),
+            JobSummary(source_path=Path("jobs/job2.json"), operation_id="1"),
+        ]
         mock_path.get_compare_paths_and_param_folder.return_value = ("compare.html", {"param": "value"})
+        mock_path.microgrid_name_date.return_value = ("Site_A", "Site_A_2025-01-10_081502")
+        mock_path.get_replay_output_path.return_value = "output/Site_A/run_cplex/Data/Site_A_output.xlsx"
 
         service = ComparisonService()
 
@@ -156,20 +168,23 @@ class TestComparisonService:
 
         # Assert
         assert isinstance(result, ComparisonResult)
-        assert len(result.jobs) == 2  # Only .json files
+        assert len(result.jobs) == 2  # Only optimization jobs
+        assert [job.job_id for job in result.jobs] == ["job1.json", "job2.json"]
+        assert [job.solve_metrics for job in result.jobs] == [None, None]  # Not replayed locally
         assert result.html_path == Path("compare.html")
         mock_compare.compare_jobs_from_folder.assert_called_once()
 
-    @patch("optim_analyser.analysis.services.comparison_service.os.listdir")
-    def test_compare_jobs_from_folder_no_jobs(self, mock_listdir):
-        """compare_jobs_from_folder raises VisualizationError (wraps DataError) when no JSON files found."""
+    def test_compare_jobs_from_folder_no_jobs(self, tmp_path):
+        """compare_jobs_from_folder raises VisualizationError (wraps DataError) when no JSON jobs found."""
         # Arrange
-        mock_listdir.return_value = ["readme.txt", "data.csv"]
+        (tmp_path / "readme.txt").write_text("readme")
+        (tmp_path / "config.json").write_text('{"space_id": "test"}')
+        (tmp_path / "list.json").write_text("[1, 2]")
         service = ComparisonService()
 
         # Act & Assert
         with pytest.raises(VisualizationError) as exc_info:
-            service.compare_jobs_from_folder("jobs/", "output/")
+            service.compare_jobs_from_folder(str(tmp_path), "output/")
 
         assert "Comparison failed" in str(exc_info.value)
         assert exc_info.value.error_code == "COMPARISON_FAILED"
@@ -189,7 +204,8 @@ class TestComparisonService:
     def test_compare_specific_jobs_success(self, mock_compare, mock_path):
         """compare_specific_jobs returns ComparisonResult."""
         # Arrange
-        mock_path.get_display_paths_and_param_json.return_value = (None, None, None, {"param": "value"})
+        mock_path.op_id_and_microgrid_name_date_from_json.return_value = ("1", "Site_A", "Site_A_2025-01-10_081502")
+        mock_path.get_microgrid_param.return_value = {"param": "value"}
 
         service = ComparisonService()
         json_paths = ["job1.json", "job2.json"]
@@ -202,3 +218,26 @@ class TestComparisonService:
         assert len(result.jobs) == 2
         assert result.comparison_name == "test_comparison"
         mock_compare.compare_jobs_from_list.assert_called_once()
+        mock_path.get_microgrid_param.assert_called_once_with("1")
+
+    @patch("optim_analyser.analysis.services.comparison_service.path")
+    @patch("optim_analyser.analysis.services.comparison_service.compare")
+    def test_compare_specific_jobs_solve_metrics(self, mock_compare, mock_path, tmp_path):
+        """The compared jobs replayed locally in the output folder carry the solve metrics of the replay."""
+        mock_path.op_id_and_microgrid_name_date_from_json.side_effect = lambda jp: (
+            "1",
+            Path(jp).stem.replace("job", "Site_"),
+            "Site_2025-01-10_081502",
+        )
+        mock_path.get_replay_output_path.side_effect = path.get_replay_output_path
+        model_path = tmp_path / "model.mod"
+        model_path.write_text("minimize\n  TotalCost;\n")
+        excel_output_path = path.get_replay_output_path(str(tmp_path), "Site_1")
+        os.makedirs(os.path.dirname(excel_output_path))
+        solvelog.record_metrics(excel_output_path, SolveMetrics(node_count=200, solve_seconds=2.61), str(model_path))
+
+        result = ComparisonService().compare_specific_jobs(["job1.json", "job2.json"], str(tmp_path))
+
+        assert result.jobs[0].solve_metrics.node_count == 200
+        assert result.jobs[0].solve_metrics.model_name == "model"
+        assert result.jobs[1].solve_metrics is None
@@ -0,0 +1,129 @@
+"""Unit tests for the solve metrics read from the oplrun and CPLEX log."""
+
+import pytest
+
+from optim_analyser.models import JobStatus, OptimizationJob, SolveMetrics, SolveProgressPoint
+from optim_analyser.optim import solvelog
+
+LOG = """<<< setup
+
+Version identifier: 22.1.1.0 | 2022-11-28 | 9160aff4d
+CPXPARAM_MIP_Tolerances_MIPGap                   0.001
+Tried aggregator 2 times.
+MIP Presolve eliminated 1520 rows and 1377 columns.
+Reduced MIP has 10244 rows, 8411 columns, and 40375 nonzeros.
+Reduced MIP has 2880 binaries, 0 generals, 0 SOSs, and 0 indicators.
+Presolve time = 0.04 sec. (21.30 ticks)
+Root relaxation solution time = 0.05 sec. (32.70 ticks)
+
+        Nodes                                         Cuts/
+   Node  Left     Objective  IInf  Best Integer    Best Bound    ItCnt     Gap
+
+*     0+    0                         2175.0000      853.4000            60.76%
+      0     0      860.2000    60     2175.0000      Cuts: 32      467   60.45%
+H     0+    0                         1002.0000      860.2000            14.15%
+Elapsed time = 1.23 sec. (456.78 ticks, tree = 0.51 MB, solutions = 4)
+    100    45      902.1000    12     1002.0000      950.0000     5124    5.19%
+    200    12    infeasible           1002.0000      950.0000     6010    5.19%
+Elapsed time = 2.10 sec. (901.02 ticks, tree = 1.75 MB, solutions = 4)
+
+Total (root+branch&cut) =    2.61 sec. (1204.40 ticks)
+
+<<< solve
+
+
+OBJECTIVE: 1002
+// solution (optimal) with objective 1002
+""".splitlines()
+
+
+@pytest.mark.unit
+class TestSolveLogParser:
+    """Test the metrics read from the CPLEX log."""
+
+    def test_metrics(self):
+        """The size after presolve, the times, the node count, the bound and the gap are read."""
+        metrics = solvelog.parse_log(LOG, elapsed_seconds=3.5)
+
+        assert (metrics.presolve_rows, metrics.presolve_columns, metrics.presolve_nonzeros) == (10244, 8411, 40375)
+        assert (metrics.presolve_seconds, metrics.root_relaxation_seconds) == (0.04, 0.05)
+        assert (metrics.node_count, metrics.best_integer, metrics.best_bound) == (200, 1002.0, 950.0)
+        assert metrics.gap_percent == 5.19
+        assert (metrics.solve_seconds, metrics.elapsed_seconds, metrics.peak_tree_memory_mb) == (2.61, 3.5, 1.75)
+        assert (metrics.status, metrics.objective) == ("optimal", 1002.0)
+
+    def test_gap_over_time(self):
+        """A progress point is added when the incumbent or the bound changes, with the time of the line."""
+        parser = solvelog.SolveLogParser()
+        for seconds, line in enumerate(LOG):
+            parser.feed(line, float(seconds))
+
+        progress = parser.metrics(30.0).progress
+
+        assert [(point.best_integer, point.best_bound, point.gap_percent) for point in progress] == [
+            (2175.0, 853.4, 60.76),
+            (1002.0, 860.2, 14.15),
+            (1002.0, 950.0, 5.19),
+        ]
+        assert progress[0].seconds == float(
+            LOG.index("*     0+    0                         2175.0000      853.4000            60.76%")
+        )
+
+    def test_other_output(self):
+        """A run without CPLEX log, e.g. of a linear model, only has its duration."""
+        metrics = solvelog.parse_log(["OPL error: no objective", "  1  2  3  4"], elapsed_seconds=0.5)
+        assert metrics == SolveMetrics(elapsed_seconds=0.5, recorded_at=metrics.recorded_at)
+
+
+@pytest.mark.unit
+class TestRecordedMetrics:
+    """Test the metrics recorded next to the output workbooks."""
+
+    def record(self, folder, name, model_path, elapsed_seconds):
+        """Record the metrics of a run of the model with the output workbook of the given name."""
+        folder.mkdir(parents=True, exist_ok=True)
+        excel_output_path = str(folder / f"{name}.xlsx")
+        solvelog.record_metrics(excel_output_path, solvelog.parse_log(LOG, elapsed_seconds), str(model_path))
+        return excel_output_path
+
+    def test_record_and_load(self, tmp_path):
+        """The metrics are recorded with the name and the hash of the model, and loaded back."""
+        model = tmp_path / "Microgrid.mod"
+        model.write_text("minimize\n  cost;\n")
+        excel_output_path = self.record(tmp_path, "out_prob_1", model, 3.5)
+
+        metrics = solvelog.load_metrics(excel_output_path)
+
+        assert (tmp_path / "out_prob_1.metrics.json").exists()
+        assert (metrics.model_name, len(metrics.model_digest)) == ("Microgrid", 40)
+        assert metrics == SolveMetrics.from_dict(metrics.to_dict())
+        # Without the times of the lines, the progress is timed by the last elapsed time reported by CPLEX
+        assert metrics.progress[-1] == SolveProgressPoint(1.23, 1002.0, 950.0, 5.19)
+        assert solvelog.load_metrics(str(tmp_path / "out_prob_2.xlsx")) is None
+
+    def test_summary_per_model_version(self, tmp_path):
+        """The runs are summarised per model and model version, in the order of their first run."""
+        model = tmp_path / "Microgrid.mod"
+        model.write_text("minimize\n  cost;\n")
+        self.record(tmp_path / "runs" / "sc1", "out_prob_1", model, 2.0)
+        self.record(tmp_path / "runs" / "sc2", "out_prob_2", model, 4.0)
+        model.write_text("minimize\n  cost + penalty;\n")
+        self.record(tmp_path / "runs" / "sc1", "out_prob_3", model, 9.0)
+
+        frame = solvelog.metrics_frame(str(tmp_path / "runs"))
+        summary = solvelog.metrics_summary(frame)
+
+        assert len(frame) == 3
+        assert summary["runs"].tolist() == [2, 1]
+        assert summary["mean_seconds"].tolist() == [3.0, 9.0]
+        assert summary["model_digest"].nunique() == 2
+
+    def test_job_metrics(self):
+        """The metrics of the run are kept on the completed job."""
+        job = OptimizationJob(job_id="1134", input_data=None)
+        metrics = solvelog.parse_log(LOG, 3.5)
+
+        job.mark_completed(output_data=None, solve_metrics=metrics)
+
+        assert job.status == JobStatus.COMPLETED
+        assert job.solve_metrics.node_count == 200
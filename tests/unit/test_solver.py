@@ -0,0 +1,106 @@
+"""Unit tests for the solver profiles of the local and WML runs."""
+
+import json
+
+import pytest
+
+from optim_analyser.errors import ValidationError
+from optim_analyser.ibm.jobWMLRestClient import WMLJobClient
+from optim_analyser.models import SolverProfile
+from optim_analyser.optim import optimization, solver
+
+
+@pytest.mark.unit
+class TestSolverProfiles:
+    """Test the named solver profiles."""
+
+    def test_profile_from_setting(self, monkeypatch):
+        """The profile is chosen by name, or by the SOLVER_PROFILE setting."""
+        assert solver.get_solver_profile("exact").parameters == {"epgap": 0.0, "epagap": 0.0}
+        assert solver.get_solver_profile().name == solver.DEFAULT_PROFILE
+
+        monkeypatch.setenv("SOLVER_PROFILE", "fast-preview")
+        assert solver.get_solver_profile().mip_gap() == 0.01
+
+    def test_unknown_profile(self):
+        """An unknown profile name is rejected with the known names."""
+        with pytest.raises(ValidationError, match="Unknown solver profile 'fastest'") as error:
+            solver.get_solver_profile("fastest")
+        assert "parallel-16" in error.value.context["profiles"]
+
+    def test_wml_solve_parameters(self):
+        """The CPLEX parameters are given to WML under their names in the solve parameters, as text."""
+        assert solver.wml_solve_parameters(solver.get_solver_profile("fast-preview")) == {
+            "mip.tolerances.mipgap": "0.01",
+            "oaas.timeLimit": "60000",
+        }
+        assert solver.wml_solve_parameters(solver.get_solver_profile(solver.DEFAULT_PROFILE)) == {}
+        with pytest.raises(ValidationError, match="cannot be given to WML"):
+            solver.wml_solve_parameters(SolverProfile("custom", {"mip.strategy.search": 1}))
+
+    def test_job_payload(self):
+        """The solve parameters of the profile are added to those of the job payload."""
+        client = WMLJobClient(
+            "api.test", "iam.test", "key", "space", "model", "deployment", 20.1, solveParameters={"threads": "16"}
+        )
+        solve_parameters = json.loads(client.funGetJobPayload("job", []))["decision_optimization"]["solve_parameters"]
+        assert solve_parameters["threads"] == "16"
+        assert solve_parameters["oaas.logTailEnabled"] == "true"
+
+
+@pytest.mark.unit
+class TestProfileInModel:
+    """Test the profile settings in the run models."""
+
+    def prepare(self, decision_model_file, run_folder, profile):
+        """Place the model of a run with the text data format and the profile in the run folder."""
+        run_folder.mkdir(exist_ok=True)
+        run_model = run_folder / "run.mod"
+        optimization.prepare_model_files(
+            decision_model_file, str(run_model), add_costs=False, data_format="text", solver_profile=profile
+        )
+        return run_model.read_text()
+
+    def test_parameters_override_model(self, tmp_path, decision_model_file):
+        """The parameters of the profile are set after those of the model, before the objective."""
+        text = self.prepare(decision_model_file, tmp_path / "run", solver.get_solver_profile("exact"))
+
+        overrides = text.index("execute CPX_PARAM_OVERRIDES")
+        assert text.index("cplex.epgap = 0.001;") < overrides < text.index("minimize")
+        assert "\tcplex.epgap = 0.0;\n\tcplex.epagap = 0.0;\n" in text[overrides:]
+
+    def test_one_run_model_per_profile(self, tmp_path, decision_model_file):
+        """The run models of the profiles are cached separately, the default profile leaves the model unchanged."""
+        exact = self.prepare(decision_model_file, tmp_path / "exact", solver.get_solver_profile("exact"))
+        default = self.prepare(
+            decision_model_file, tmp_path / "default", solver.get_solver_profile(solver.DEFAULT_PROFILE)
+        )
+        parallel = self.prepare(decision_model_file, tmp_path / "parallel", solver.get_solver_profile("parallel-16"))
+
+        assert "CPX_PARAM_OVERRIDES" not in default
+        assert "cplex.epagap" in exact
+        assert "cplex.threads = 16;" in parallel and "cplex.epagap" not in parallel
+
+
+@pytest.mark.unit
+class TestRecordedProfile:
+    """Test the profiles recorded next to the outputs."""
+
+    def test_record_and_load(self, tmp_path):
+        """The profile is recorded next to the output Excel file."""
+        excel_output_path = str(tmp_path / "out_prob_1.xlsx")
+        solver.record_profile(excel_output_path, solver.get_solver_profile("fast-preview"))
+
+        assert (tmp_path / "out_prob_1.solver.json").exists()
+        assert solver.load_recorded_profile(excel_output_path) == solver.get_solver_profile("fast-preview")
+        assert solver.load_recorded_profile(str(tmp_path / "out_prob_2.xlsx")) is None
+
+    def test_comparison_tolerance(self, tmp_path):
+        """The objective values are compared within the largest MIP gap of the recorded profiles."""
+        init, forced, production = (str(tmp_path / f"{name}.xlsx") for name in ("init", "forced", "production"))
+        solver.record_profile(init, solver.get_solver_profile("exact"))
+        solver.record_profile(forced, solver.get_solver_profile("fast-preview"))
+
+        assert solver.recorded_mip_gap([init, forced]) == 0.01
+        assert solver.recorded_mip_gap([init, production]) == 0.0
+        assert solver.recorded_mip_gap([production]) is None
@@ -0,0 +1,112 @@
+"""Unit tests for the make-like stages of the replay and display pipeline."""
+
+import os
+
+import pandas as pd
+import pytest
+
+from optim_analyser.optim import optimization, stages
+
+
+@pytest.fixture
+def builds(tmp_path):
+    """Record the builds of a stage writing the 'out.txt' file from a text."""
+    built = []
+    output = str(tmp_path / "out.txt")
+
+    def run(text, use_cache=True):
+        def build():
+            built.append(text)
+            with open(output, "w") as f:
+                f.write(text)
+
+        return stages.run_stage("text", [output], [text], build, use_cache)
+
+    run.output = output
+    run.built = built
+    return run
+
+
+@pytest.mark.unit
+class TestRunStage:
+    """Test the stages skipped when their outputs are up to date."""
+
+    def test_skipped_when_up_to_date(self, tmp_path, builds):
+        """The stage is built once for the same inputs, and its outputs are recorded in the folder manifest."""
+        assert builds("a") is True
+        assert builds("a") is False
+
+        assert builds.built == ["a"]
+        assert (tmp_path / stages.MANIFEST_FILE).exists()
+
+    def test_built_again_when_inputs_change(self, builds):
+        """New inputs build the stage again."""
+        builds("a")
+        builds("b")
+        builds("b")
+
+        assert builds.built == ["a", "b"]
+
+    def test_built_again_when_output_modified(self, builds):
+        """An output modified or removed since the build is built again."""
+        builds("a")
+        with open(builds.output, "a") as f:
+            f.write(" modified by CPLEX")
+        builds("a")
+        os.remove(builds.output)
+        builds("a")
+
+        assert builds.built == ["a", "a", "a"]
+
+    def test_without_cache(self, builds):
+        """The stage is always built without the cache."""
+        builds("a")
+        builds("a", use_cache=False)
+
+        assert builds.built == ["a", "a"]
+
+
+@pytest.mark.unit
+class TestInputsDigest:
+    """Test the hash of the inputs of the stages."""
+
+    def test_sheets_values_and_files(self, tmp_path):
+        """The sheets are hashed by content, the files by content, None when they are missing."""
+        sheets = {"OPERATION": pd.DataFrame({"param_id": ["name"], "param_val": ["Site A"]})}
+        costs = tmp_path / "costs.dat"
+        digest = stages.inputs_digest([sheets, costs, 1])
+
+        assert stages.inputs_digest([{"OPERATION": sheets["OPERATION"].copy()}, costs, 1]) == digest
+        assert stages.inputs_digest([sheets, costs, 2]) != digest
+        costs.write_text("costs = 1;")
+        assert stages.inputs_digest([sheets, costs, 1]) != digest
+        sheets["OPERATION"].loc[0, "param_val"] = "Site B"
+        assert stages.inputs_digest([sheets, None, 1]) != stages.inputs_digest([sheets, costs, 1])
+
+    def test_series_hashed_by_content(self):
+        """A change of the plotting parameters beyond the display precision of pandas changes the hash."""
+        plot_param = pd.Series({"ylim_power": 1.0, "microgrid_name": "Site A"}, dtype=object)
+        digest = stages.inputs_digest([plot_param])
+        plot_param["ylim_power"] = 1.0000000001
+
+        assert str(plot_param) == str(plot_param.replace(1.0000000001, 1.0))
+        assert stages.inputs_digest([plot_param]) != digest
+
+    def test_initial_data_saved_once(self, tmp_path, monkeypatch):
+        """The initial data workbook of a job is not saved again for the same data."""
+        saved = []
+        dataframe_to_excel = optimization.dataframe_to_excel
+
+        def counting_dataframe_to_excel(data, path, **kwargs):
+            saved.append(path)
+            dataframe_to_excel(data, path, **kwargs)
+
+        monkeypatch.setattr(optimization, "dataframe_to_excel", counting_dataframe_to_excel)
+        data = {"OPERATION": pd.DataFrame({"param_id": ["name"], "param_val": ["Site A"]})}
+        excel_init_path = str(tmp_path / "init.xlsx")
+
+        optimization.prepare_excel_initial_data(data, excel_init_path)
+        optimization.prepare_excel_initial_data(data, excel_init_path)
+        optimization.prepare_excel_initial_data(data, excel_init_path, use_cache=False)
+
+        assert saved == [excel_init_path, excel_init_path]
@@ -0,0 +1,179 @@
+"""Unit tests for the replays started from the solution of the original job."""
+
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from optim_analyser.errors import DataError, ModelReferenceError
+from optim_analyser.models import OplRunResult
+from optim_analyser.optim import optimization, replay, warmstart
+
+DATA = {
+    "ASSETS": pd.DataFrame({"asset_id": ["BESS", "GEN", "BOILER"], "type": ["STORAGE", "GENERATOR", "GENERATOR"]}),
+    "ASSET_STEPS_OUTPUT": pd.DataFrame(
+        {
+            "asset_id": ["BESS", "BESS", "GEN", "GEN", "BOILER", "MAINGRID", "MAINGRID"],
+            "step_id": ["1", "2", "1", "2", "1", "1", "2"],
+            "power_target": [50.0, -20.0, -100.0, 0.0, -10.0, 12.0, -3.0],
+            "energy_type": ["ELECTRICITY", "ELECTRICITY", "ELECTRICITY", "ELECTRICITY", "HEAT", "dummy", "dummy"],
+        }
+    ),
+    "OPERATION_OUTPUT": pd.DataFrame({"param_id": ["optimiser_objective_value"], "param_val": [12.5]}),
+}
+
+
+@pytest.mark.unit
+class TestStartValues:
+    """Test the values of the variables read from the original solution."""
+
+    def test_on_off_decisions(self, decision_model_file):
+        """The binary variables of the model are set from the sign of the power targets of their assets."""
+        values = warmstart.start_values(DATA, decision_model_file)
+
+        assert values.columns.tolist() == warmstart.WARM_START_COLUMNS
+        assert values.values.tolist() == [
+            ["IsCharging", "BESS", "1", 1],
+            ["IsCharging", "BESS", "2", 0],
+            ["IsGenOn", "GEN", "1", 1],
+            ["IsGenOn", "GEN", "2", 0],
+            ["IsImporting", "MAINGRID", "1", 1],
+            ["IsImporting", "MAINGRID", "2", 0],
+        ]
+
+    def test_no_solution(self, decision_model_file):
+        """A job without output data cannot be warm started."""
+        with pytest.raises(DataError, match="No original solution"):
+            warmstart.start_values({"ASSETS": DATA["ASSETS"]}, decision_model_file)
+
+    def test_no_variable(self, tmp_path):
+        """A model without the binary variables cannot be warm started."""
+        model = tmp_path / "continuous.mod"
+        model.write_text("dvar float+ Power[isDECISION_STEPS];\nminimize\n  Cost;\n")
+        with pytest.raises(DataError, match="No variable of the model"):
+            warmstart.start_values(DATA, str(model))
+
+    @pytest.mark.parametrize(
+        "output, accepted",
+        [
+            (["MIP start 'm1' defined initial solution with objective 12.5000."], True),
+            (["Warning:  No solution found from 1 MIP starts."], False),
+            (["Found incumbent of value 12.5 after 0.02 sec."], None),
+        ],
+    )
+    def test_mip_start_accepted(self, output, accepted):
+        """Whether CPLEX accepted the MIP start is read in its log."""
+        assert warmstart.mip_start_accepted(output) is accepted
+
+
+@pytest.mark.unit
+class TestWarmStartModel:
+    """Test the run model and .dat file starting CPLEX from the values."""
+
+    def test_model_extension(self, tmp_path, decision_model_file):
+        """The start arrays are filled before the objective and attached to the variables in the main block."""
+        run_model = tmp_path / "run.mod"
+        run_model.write_text(Path(decision_model_file).read_text())
+
+        optimization.add_warm_start_opl_model(str(run_model), decision_model_file)
+
+        text = run_model.read_text()
+        assert text.index("{t_warm_start} WARM_START = ...;") < text.index("minimize")
+        assert "float IsChargingStart[isE_STORAGES union isH_STORAGES][isDECISION_STEPS];" in text
+        assert "for (var w in IsImportingStartValues) IsImportingStart[w.step_id] = w.value;" in text
+        assert "StorACPowerChargeStart" not in text
+        main = text[text.index("main {") :]
+        assert "vectors.attach(thisOplModel.IsGenOn, thisOplModel.IsGenOnStart);" in main
+        assert "thisOplModel.postProcess();" in main
+
+    def test_values_out_of_the_index_sets(self, tmp_path):
+        """The values of the assets and steps out of the index sets of a variable are left out of its start array."""
+        model = tmp_path / "model.mod"
+        model.write_text(
+            "dvar boolean IsGenOn[g in isDISP_E_GENS][t in isDECISION_STEPS];\n"
+            "dvar boolean IsCharging[isE_STORAGES union isH_STORAGES][isDECISION_STEPS];\nminimize\n  Cost;\n"
+        )
+        run_model = tmp_path / "run.mod"
+        run_model.write_text(model.read_text())
+        # PV is a generator out of isDISP_E_GENS, step 0 is out of isDECISION_STEPS
+        data = DATA | {
+            "ASSETS": pd.DataFrame({"asset_id": ["BESS", "GEN", "PV"], "type": ["STORAGE", "GENERATOR", "GENERATOR"]}),
+            "ASSET_STEPS_OUTPUT": pd.DataFrame(
+                {
+                    "asset_id": ["GEN", "GEN", "PV", "BESS"],
+                    "step_id": ["0", "1", "1", "1"],
+                    "power_target": [-100.0, -100.0, -5.0, 50.0],
+                    "energy_type": ["ELECTRICITY", "ELECTRICITY", "ELECTRICITY", "ELECTRICITY"],
+                }
+            ),
+        }
+        assert ["IsGenOn", "PV", "1", 1] in warmstart.start_values(data, str(model)).values.tolist()
+
+        optimization.add_warm_start_opl_model(str(run_model), str(model))
+
+        text = run_model.read_text()
+        assert (
+            '{t_warm_start} IsGenOnStartValues = {w | w in WARM_START: w.variable == "IsGenOn" '
+            "&& w.asset_id in isDISP_E_GENS && w.step_id in isDECISION_STEPS};"
+        ) in text
+        assert "w.asset_id in (isE_STORAGES union isH_STORAGES) && w.step_id in isDECISION_STEPS" in text
+        assert "for (var w in IsGenOnStartValues) IsGenOnStart[w.asset_id][w.step_id] = w.value;" in text
+        assert "for (var w in WARM_START)" not in text
+
+    def test_model_with_main_block(self, tmp_path, decision_model_file):
+        """A model controlling its own solve cannot be warm started."""
+        run_model = tmp_path / "run.mod"
+        run_model.write_text(Path(decision_model_file).read_text() + "main {\n}\n")
+        with pytest.raises(ModelReferenceError, match="main block"):
+            optimization.add_warm_start_opl_model(str(run_model), decision_model_file)
+
+    def test_dat_values(self, tmp_path, decision_model_file):
+        """The values are added to the .dat file as the WARM_START tuple set."""
+        dat = tmp_path / "run.dat"
+        dat.write_text("ASSETS = {};\n")
+
+        optimization.append_warm_start_data(str(dat), warmstart.start_values(DATA, decision_model_file).head(2))
+
+        assert dat.read_text() == (
+            'ASSETS = {};\n\nWARM_START = {\n<"IsCharging", "BESS", "1", 1.0>,\n<"IsCharging", "BESS", "2", 0.0>\n};\n\n'
+        )
+
+
+@pytest.mark.unit
+class TestWarmStartReport:
+    """Test the report of the warm-started replays."""
+
+    @pytest.fixture
+    def runs(self, monkeypatch):
+        """Replace the runs of oplrun by runs of 30 s without warm start and 10 s with an accepted MIP start."""
+
+        def run_and_read_output(model_path, dat_path, excel_output_path, data_format):
+            output = ["MIP start 'm1' defined initial solution with objective 12.5000."] if "warm" in model_path else []
+            elapsed_seconds = 10.0 if "warm" in model_path else 30.0
+            run_result = OplRunResult(["oplrun", model_path, dat_path], 0, elapsed_seconds, output)
+            return {"OPERATION_OUTPUT": DATA["OPERATION_OUTPUT"]}, run_result
+
+        monkeypatch.setattr(replay, "_run_and_read_output", run_and_read_output)
+
+    def replay(self, tmp_path, model_name, **kwargs):
+        """Replay the job with the run model of the given name."""
+        model = tmp_path / model_name
+        model.write_text(model_name)
+        input_data = {"ASSETS": DATA["ASSETS"]}
+        return replay.replay_optimization(
+            str(model), str(tmp_path / "run.dat"), DATA, str(tmp_path / "out.xlsx"), input_data=input_data, **kwargs
+        )
+
+    def test_time_saved(self, tmp_path, runs, capsys):
+        """The warm-started replay reports the acceptance of the MIP start and the time saved."""
+        self.replay(tmp_path, "cold.mod")
+        self.replay(tmp_path, "warm.mod", warm_start=True)
+
+        printed = capsys.readouterr().out
+        assert "MIP start from the original solution: accepted" in printed
+        assert "Solved in 10.0 s instead of 30.0 s (20.0 s saved)" in printed
+
+    def test_no_cold_replay(self, tmp_path, runs, capsys):
+        """The time saved is unknown until the same input data is replayed without warm start."""
+        self.replay(tmp_path, "warm.mod", warm_start=True)
+        assert "replay once without warm start" in capsys.readouterr().out